@@ -0,0 +1,5 @@
+"""
+Benchmarks for the Zomato recommender.
+Each module is runnable with `python -m benchmarks.<name>` and builds its own
+synthetic database, so no dataset download or API key is needed.
+"""
@@ -0,0 +1,74 @@
+"""
+Columnar backend benchmark.
+Checks that the columnar backend returns the same recommendations as the SQL
+backend, then reports recommendations/sec (single thread) for both.
+
+Usage:
+    python -m benchmarks.columnar [--restaurants 1000000] [--queries 20000] [--check 500]
+"""
+
+import argparse
+import logging
+import tempfile
+import time
+from pathlib import Path
+
+from phase1.database_setup import DatabaseManager
+from phase3.recommender import RecommendationEngine
+from benchmarks.synthetic import build_database, make_queries
+
+
+def throughput(engine: RecommendationEngine, db_manager: DatabaseManager, workload) -> float:
+    """
+    Recommendations per second on one connected DatabaseManager.
+    """
+    start = time.perf_counter()
+    for user_input in workload:
+        engine._recommend(db_manager, user_input, 5)
+    return len(workload) / (time.perf_counter() - start)
+
+
+def run(restaurants: int, queries: int, check: int):
+    """
+    Build a synthetic database, compare both backends and time them.
+    """
+    logging.disable(logging.INFO)
+    workload = make_queries(queries)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = build_database(Path(tmp_dir) / "zomato.db", restaurants)
+        db_manager = DatabaseManager(db_path=db_path)
+        db_manager.connect()
+
+        sql = RecommendationEngine(db_manager, backend="sql")
+        columnar = RecommendationEngine(db_manager, backend="columnar")
+
+        start = time.perf_counter()
+        columnar._get_columnar_index(db_manager)
+        load_seconds = time.perf_counter() - start
+
+        mismatches = sum(
+            sql._recommend(db_manager, user_input, 5) != columnar._recommend(db_manager, user_input, 5)
+            for user_input in workload[:check]
+        )
+
+        print(f"{restaurants} restaurants, {queries} queries, index load {load_seconds:.1f}s")
+        print(f"identical results: {check - mismatches}/{check}")
+        print(f"{'backend':<10} {'recs/sec':>10}")
+        sql_queries = workload[:max(1, queries // 20)]  # the SQL path is much slower at this size
+        print(f"{'sql':<10} {throughput(sql, db_manager, sql_queries):>10,.0f}")
+        print(f"{'columnar':<10} {throughput(columnar, db_manager, workload):>10,.0f}")
+        db_manager.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--restaurants", type=int, default=1000000)
+    parser.add_argument("--queries", type=int, default=20000)
+    parser.add_argument("--check", type=int, default=500)
+    args = parser.parse_args()
+    run(args.restaurants, args.queries, args.check)
+
+
+if __name__ == "__main__":
+    main()
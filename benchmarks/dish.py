@@ -0,0 +1,107 @@
+"""
+Dish index benchmark.
+Compares dish requests ("biryani in Btm") answered from the dish posting
+lists with the same requests answered by scanning the locality with a LIKE
+filter on the dishes column, and reports the size of the compressed postings.
+
+Usage:
+    python -m benchmarks.dish [--restaurants 100000] [--queries 2000]
+"""
+
+import argparse
+import logging
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+from phase1.config import DISH_INDEX_TABLE_NAME
+from phase1.database_setup import DatabaseManager
+from phase2.models import UserInput
+from phase3.dish_index import build_dish_index
+from phase3.recommender import RecommendationEngine, _ranking_key
+from benchmarks.synthetic import DISHES, LOCALITIES, build_database
+from benchmarks.timing import percentile
+
+# The locality scan a dish request needs without the index
+SCAN_QUERY = """
+SELECT name, city, address, cuisines, average_cost_for_two, price_category, aggregate_rating, votes, id
+FROM restaurants
+WHERE city = ?1 AND average_cost_for_two >= ?2 AND average_cost_for_two < ?3 AND aggregate_rating >= ?4
+  AND dishes LIKE '%' || ?5 || '%'
+"""
+
+
+def make_dish_queries(count: int, seed: int = 5) -> List[UserInput]:
+    """
+    Reproducible dish requests, half of them with a price category.
+    """
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(count):
+        price_range = rng.choice(["budget", "mid-range", "premium"]) if rng.random() < 0.5 else None
+        queries.append(UserInput(
+            city=rng.choice(LOCALITIES),
+            price_range=price_range,
+            max_cost=None if price_range else 4000,
+            dish=rng.choice(DISHES)
+        ))
+    return queries
+
+
+def run(restaurants: int, queries: int):
+    """
+    Report build time, index size and latency percentiles of both paths.
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = build_database(Path(temp_dir) / "dish.db", restaurants)
+        db_manager = DatabaseManager(db_path=db_path)
+        start = time.perf_counter()
+        lists = build_dish_index(db_manager)
+        build_seconds = time.perf_counter() - start
+        db_manager.write_build_metadata()
+        postings, size = db_manager.connect().execute(
+            f"SELECT SUM(restaurants), SUM(LENGTH(postings) + LENGTH(liked)) FROM {DISH_INDEX_TABLE_NAME}"
+        ).fetchone()
+        db_manager.close()
+
+        engine = RecommendationEngine(DatabaseManager(db_path=db_path), cache_size=0)
+        db_manager = engine.db_manager
+        db_manager.connect()
+        requests = make_dish_queries(queries)
+        for user_input in requests[:len(LOCALITIES) * 3]:
+            engine._recommend(db_manager, user_input, 10)  # Load every city's vocabulary
+
+        indexed, scanned = [], []
+        for user_input in requests:
+            start = time.perf_counter()
+            engine._score_dish_candidates(db_manager, user_input, 10)
+            indexed.append((time.perf_counter() - start) * 1000)
+
+            start = time.perf_counter()
+            min_cost, max_cost = user_input.cost_bounds()
+            rows = db_manager.connection.execute(SCAN_QUERY, (user_input.city, min_cost, max_cost, user_input.min_rating, user_input.dish[0])).fetchall()
+            scored = [(tuple(row), engine._calculate_match_score(row[6], row[7], user_input, row[3])) for row in rows]
+            sorted(scored, key=_ranking_key)[:10]
+            scanned.append((time.perf_counter() - start) * 1000)
+        db_manager.close()
+
+    print(f"{restaurants} restaurants, {queries} dish requests")
+    print(f"build: {build_seconds:.2f} s, {lists} posting lists, {postings} postings in {size / 1e6:.2f} MB "
+          f"({size / postings:.2f} bytes per posting, liked lists included; int64 ids take 8)")
+    print(f"posting lists: p50 {percentile(indexed, 50):.2f} ms, p99 {percentile(indexed, 99):.2f} ms")
+    print(f"locality scan: p50 {percentile(scanned, 50):.2f} ms, p99 {percentile(scanned, 99):.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--restaurants", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+    run(args.restaurants, args.queries)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Explain mode benchmark.
+Times the same requests with explain off and on, and reports where explained
+requests spent their time (mean microseconds per stage).
+
+Usage:
+    python -m benchmarks.explain [--restaurants 100000] [--queries 500]
+"""
+
+import argparse
+import logging
+import random
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from phase1.database_setup import DatabaseManager
+from phase2.models import UserInput
+from phase3.recommender import RecommendationEngine
+from benchmarks.synthetic import CUISINES, LOCALITIES, build_database
+from benchmarks.timing import percentile
+
+
+def run(restaurants: int, queries: int):
+    """
+    Report latency percentiles with explain off and on, and the mean stage timings.
+    """
+    rng = random.Random(11)
+    requests = [
+        UserInput(
+            city=rng.choice(LOCALITIES), price_range=rng.choice(["budget", "mid-range", "premium"]),
+            cuisine=rng.sample(CUISINES, rng.randint(0, 2)) or None, min_rating=rng.choice([0.0, 3.0, 4.0])
+        )
+        for _ in range(queries)
+    ]
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = build_database(Path(temp_dir) / "explain.db", restaurants)
+        db_manager = DatabaseManager(db_path=db_path)
+        db_manager.write_build_metadata()
+        db_manager.close()
+
+        results = {}
+        for backend in ("sql", "columnar"):
+            engine = RecommendationEngine(DatabaseManager(db_path=db_path), backend=backend, cache_size=0, feedback_path=None)
+            engine.get_recommendations(requests[0], limit=10)
+            off, on = [], []
+            stages = defaultdict(float)
+            # Interleaved, so both modes see the same cache and clock conditions
+            for user_input in requests:
+                start = time.perf_counter()
+                engine.get_recommendations(user_input, limit=10)
+                off.append((time.perf_counter() - start) * 1000)
+
+                start = time.perf_counter()
+                report = engine.get_recommendations(user_input, limit=10, explain=True).explain
+                on.append((time.perf_counter() - start) * 1000)
+                for stage, micros in report.timings_us.items():
+                    stages[stage] += micros / len(requests)
+            engine.close()
+            results[backend] = (off, on, stages)
+
+    print(f"{restaurants} restaurants, {queries} requests")
+    for backend, (off, on, stages) in results.items():
+        print(f"{backend:8} explain off: p50 {percentile(off, 50):.2f} ms, p99 {percentile(off, 99):.2f} ms")
+        print(f"{backend:8} explain on:  p50 {percentile(on, 50):.2f} ms, p99 {percentile(on, 99):.2f} ms")
+        print(f"{backend:8} mean stages (us): " + ", ".join(f"{stage} {micros:.0f}" for stage, micros in stages.items()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--restaurants", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=500)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+    run(args.restaurants, args.queries)
+
+
+if __name__ == "__main__":
+    main()
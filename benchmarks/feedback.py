@@ -0,0 +1,99 @@
+"""
+Feedback-aware ranking benchmark.
+Times incremental feedback writes, the engine's refresh of changed
+aggregates, and recommendation latency of the SQL and columnar backends with
+and without feedback adjustments folded into the match scores.
+
+Usage:
+    python -m benchmarks.feedback [--restaurants 100000] [--rated 10000] [--queries 2000]
+"""
+
+import argparse
+import logging
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from phase1.database_setup import DatabaseManager
+from phase3.feedback import FeedbackStore
+from phase3.recommender import RecommendationEngine
+from benchmarks.synthetic import build_database, make_queries
+from benchmarks.timing import percentile
+
+
+def latencies(engine: RecommendationEngine, queries) -> list:
+    """
+    Milliseconds per uncached request (after one warm-up request).
+    """
+    db_manager = engine.db_manager
+    db_manager.connect()
+    engine._recommend(db_manager, queries[0], 10)
+    samples = []
+    for user_input in queries:
+        start = time.perf_counter()
+        engine._recommend(db_manager, user_input, 10)
+        samples.append((time.perf_counter() - start) * 1000)
+    db_manager.close()
+    return samples
+
+
+def run(restaurants: int, rated: int, queries: int):
+    """
+    Report write and refresh costs and latency percentiles per backend.
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = build_database(Path(temp_dir) / "feedback.db", restaurants)
+        db_manager = DatabaseManager(db_path=db_path)
+        db_manager.write_build_metadata()
+        db_manager.close()
+
+        # Ratings skewed towards a minority of restaurants, as real feedback is
+        feedback_path = Path(temp_dir) / "aggregates.db"
+        store = FeedbackStore(feedback_path)
+        rng = random.Random(3)
+        writes = []
+        for _ in range(rated * 2):
+            name = f"Restaurant {min(int(rng.paretovariate(1.2)) * rng.randrange(rated), restaurants - 1)}"
+            start = time.perf_counter()
+            store.record(name, rng.choice([0, 1, 1, 5]))
+            writes.append((time.perf_counter() - start) * 1000)
+
+        reader = FeedbackStore(feedback_path, refresh_seconds=0)
+        start = time.perf_counter()
+        adjustments = reader.adjustments()
+        full_ms = (time.perf_counter() - start) * 1000
+        for i in range(100):
+            store.record(f"Restaurant {i}", 1)
+        start = time.perf_counter()
+        reader.adjustments()
+        incremental_ms = (time.perf_counter() - start) * 1000
+
+        requests = make_queries(queries)
+        results = {}
+        for backend in ("sql", "columnar"):
+            for path in (None, feedback_path):
+                engine = RecommendationEngine(DatabaseManager(db_path=db_path), backend=backend, cache_size=0, use_precomputed=False, feedback_path=path)
+                results[(backend, path is not None)] = latencies(engine, requests)
+
+    print(f"{restaurants} restaurants, {len(adjustments)} with feedback "
+          f"(adjustments within +{adjustments.max_boost:.2f} / -{adjustments.max_penalty:.2f})")
+    print(f"write: p50 {percentile(writes, 50):.2f} ms, p99 {percentile(writes, 99):.2f} ms")
+    print(f"refresh: full {full_ms:.1f} ms, 100 changed rows {incremental_ms:.2f} ms")
+    for (backend, with_feedback), samples in results.items():
+        label = "with feedback" if with_feedback else "no feedback"
+        print(f"{backend:8} {label:14} p50 {percentile(samples, 50):.2f} ms, p99 {percentile(samples, 99):.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--restaurants", type=int, default=100000)
+    parser.add_argument("--rated", type=int, default=10000)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+    run(args.restaurants, args.rated, args.queries)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Response model build cost benchmark.
+Times building the RecommendationResponse for one request: validated models
+for every candidate (the old rescoring path), validated models for the final
+rows only, and unvalidated (trusted) models for the final rows only.
+
+Usage:
+    python -m benchmarks.model_build [--candidates 50] [--limit 5] [--requests 20000]
+"""
+
+import argparse
+import time
+from typing import Callable, List
+
+from phase3.columnar_index import ScoredRow
+from phase3.recommender import _build_response
+from benchmarks.synthetic import make_restaurants
+
+
+def make_scored(count: int) -> List[ScoredRow]:
+    """
+    Scored rows shaped like the SQL backend's output.
+    """
+    return [
+        (
+            (r['name'], r['city'], r['address'], r['cuisines'], r['average_cost_for_two'],
+             r['price_category'], r['aggregate_rating'], r['votes']),
+            float(i % 10)
+        )
+        for i, r in enumerate(make_restaurants(count))
+    ]
+
+
+def time_per_request(build: Callable[[], object], requests: int, repeats: int = 5) -> float:
+    """
+    Microseconds per call of build (best average of several repeats, to damp noise).
+    """
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(requests):
+            build()
+        best = min(best, (time.perf_counter() - start) / requests * 1e6)
+    return best
+
+
+def run(candidates: int, limit: int, requests: int):
+    """
+    Report the model build cost per request for each strategy.
+    """
+    scored = make_scored(candidates)
+    top = scored[:limit]
+    assert _build_response("Hsr", top) == _build_response("Hsr", top, trusted=True)
+
+    print(f"{candidates} candidates, limit {limit}, {requests} requests")
+    print(f"{'strategy':<28} {'us/request':>10}")
+    for name, build in [
+        (f"validated, all {candidates}", lambda: _build_response("Hsr", scored)),
+        (f"validated, top {limit}", lambda: _build_response("Hsr", top)),
+        (f"trusted, top {limit}", lambda: _build_response("Hsr", top, trusted=True)),
+    ]:
+        print(f"{name:<28} {time_per_request(build, requests):>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--candidates", type=int, default=50)
+    parser.add_argument("--limit", type=int, default=5)
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+    run(args.candidates, args.limit, args.requests)
+
+
+if __name__ == "__main__":
+    main()
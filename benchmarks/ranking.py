@@ -0,0 +1,92 @@
+"""
+Learned ranking benchmark.
+Times the learning-to-rank trainer on a synthetic query and feedback log, and
+recommendation latency of the SQL and columnar backends with the hand-tuned
+and with learned ranking weights.
+
+Usage:
+    python -m benchmarks.ranking [--restaurants 100000] [--pages 20000] [--queries 2000]
+"""
+
+import argparse
+import json
+import logging
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from phase1.database_setup import DatabaseManager
+from phase3.ltr_trainer import train
+from phase3.ranking_model import HAND_TUNED
+from phase3.recommender import RecommendationEngine
+from benchmarks.feedback import latencies
+from benchmarks.synthetic import build_database, make_queries
+from benchmarks.timing import percentile
+
+
+def write_logs(directory: Path, pages: int):
+    """
+    Query and feedback logs of users who favour popular restaurants.
+    """
+    rng = random.Random(11)
+    start = datetime(2026, 1, 1)
+    feedback = []
+    with open(directory / "queries.jsonl", "w") as f:
+        for number in range(pages):
+            served = start + timedelta(seconds=number * 30)
+            results = [
+                {"id": i, "name": f"R{number}-{i}", "rating": round(rng.uniform(2.5, 5.0), 1), "votes": rng.randint(0, 2000), "match_score": 0.0}
+                for i in range(10)
+            ]
+            f.write(json.dumps({"timestamp": served.isoformat(), "query": {}, "page": False, "results": results}) + "\n")
+            for result in rng.sample(results, 3):
+                liked = rng.random() < 0.2 + 0.4 * result["rating"] / 5.0 + 0.4 * min(result["votes"], 1000) / 1000.0
+                feedback.append({"timestamp": (served + timedelta(minutes=5)).isoformat(), "restaurant": result["name"], "rating": int(liked)})
+    with open(directory / "feedback.json", "w") as f:
+        json.dump(feedback, f)
+    return directory / "queries.jsonl", directory / "feedback.json"
+
+
+def run(restaurants: int, pages: int, queries: int):
+    """
+    Report training time and latency percentiles per backend and weights.
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        query_log, feedback_file = write_logs(Path(temp_dir), pages)
+        start = time.perf_counter()
+        weights = train(query_log, feedback_file)
+        train_s = time.perf_counter() - start
+
+        db_path = build_database(Path(temp_dir) / "ranking.db", restaurants)
+        db_manager = DatabaseManager(db_path=db_path)
+        db_manager.write_build_metadata()
+        db_manager.close()
+
+        requests = make_queries(queries)
+        results = {}
+        for backend in ("sql", "columnar"):
+            for ranking in (HAND_TUNED, weights):
+                engine = RecommendationEngine(DatabaseManager(db_path=db_path), backend=backend, cache_size=0, use_precomputed=False, feedback_path=None, ranking_weights=ranking)
+                results[(backend, ranking.version)] = latencies(engine, requests)
+
+    print(f"trained on {weights.metadata['pairs']} pairs in {train_s:.2f} s: quality {weights.quality:.2f}, "
+          f"popularity {weights.popularity:.2f}, held-out accuracy {weights.metadata['validation_accuracy']:.3f} "
+          f"(hand-tuned {weights.metadata['hand_tuned_accuracy']:.3f})")
+    for (backend, version), samples in results.items():
+        print(f"{backend:8} {version:22} p50 {percentile(samples, 50):.2f} ms, p99 {percentile(samples, 99):.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--restaurants", type=int, default=100000)
+    parser.add_argument("--pages", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+    run(args.restaurants, args.pages, args.queries)
+
+
+if __name__ == "__main__":
+    main()
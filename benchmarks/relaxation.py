@@ -0,0 +1,103 @@
+"""
+Zero-result relaxation benchmark.
+Times requests that match nothing: answered by the engine's single relaxation
+pass, versus the round trips a client needs without it (the original request,
+then one request per relaxation until something matches).
+
+Usage:
+    python -m benchmarks.relaxation [--restaurants 100000] [--queries 500]
+"""
+
+import argparse
+import logging
+import math
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from phase1.database_setup import DatabaseManager
+from phase2.models import UserInput
+from phase3.recommender import RecommendationEngine
+from phase3.relaxation import Relaxation
+from benchmarks.synthetic import CUISINES, LOCALITIES, build_database
+from benchmarks.timing import percentile
+
+
+def relaxed_inputs(user_input: UserInput):
+    """
+    The cumulative relaxations as separate requests.
+    """
+    relaxation = Relaxation(user_input)
+    upper = None if math.isinf(relaxation.relaxed_upper) else relaxation.relaxed_upper
+    rating = {"min_rating": relaxation.relaxed_rating}
+    widened = {"price_range": None, "min_cost": relaxation.relaxed_lower, "max_cost": upper}
+    return [
+        user_input.model_copy(update=rating),
+        user_input.model_copy(update={**rating, **widened}),
+        user_input.model_copy(update={**rating, **widened, "cuisine": None})
+    ]
+
+
+def run(restaurants: int, queries: int):
+    """
+    Report latency percentiles of both ways to answer empty requests.
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = build_database(Path(temp_dir) / "relaxation.db", restaurants)
+        db_manager = DatabaseManager(db_path=db_path)
+        db_manager.write_build_metadata()
+        db_manager.close()
+
+        strict = RecommendationEngine(DatabaseManager(db_path=db_path), cache_size=0, feedback_path=None, relax_empty=False)
+
+        # Requests too strict to match anything
+        rng = random.Random(9)
+        requests = []
+        while len(requests) < queries:
+            user_input = UserInput(
+                city=rng.choice(LOCALITIES), price_range=rng.choice(["budget", "mid-range", "premium"]),
+                cuisine=rng.sample(CUISINES, 1), min_rating=4.9
+            )
+            if strict.get_recommendations(user_input, limit=10).count == 0:
+                requests.append(user_input)
+
+        results = {}
+        for backend in ("sql", "columnar"):
+            single = RecommendationEngine(DatabaseManager(db_path=db_path), backend=backend, cache_size=0, feedback_path=None)
+            strict = RecommendationEngine(DatabaseManager(db_path=db_path), backend=backend, cache_size=0, feedback_path=None, relax_empty=False)
+            single.get_recommendations(requests[0], limit=10)
+            one_pass, round_trips, trips = [], [], []
+            for user_input in requests:
+                start = time.perf_counter()
+                single.get_recommendations(user_input, limit=10)
+                one_pass.append((time.perf_counter() - start) * 1000)
+
+                start = time.perf_counter()
+                count = 0
+                for relaxed in [user_input] + relaxed_inputs(user_input):
+                    count += 1
+                    if strict.get_recommendations(relaxed, limit=10).count:
+                        break
+                round_trips.append((time.perf_counter() - start) * 1000)
+                trips.append(count)
+            results[backend] = (one_pass, round_trips, trips)
+
+    print(f"{restaurants} restaurants, {len(requests)} requests matching nothing")
+    for backend, (one_pass, round_trips, trips) in results.items():
+        print(f"{backend:8} single pass: p50 {percentile(one_pass, 50):.2f} ms, p99 {percentile(one_pass, 99):.2f} ms (1 request)")
+        print(f"{backend:8} round trips: p50 {percentile(round_trips, 50):.2f} ms, p99 {percentile(round_trips, 99):.2f} ms "
+              f"({sum(trips) / len(trips):.2f} requests)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--restaurants", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=500)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+    run(args.restaurants, args.queries)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Semantic search benchmark.
+Times the offline build of the semantic index (hashed features, truncated SVD,
+IVF lists), the latency of RecommendationEngine semantic searches (index
+probe plus row fetch) and their recall@10 against an exhaustive scan.
+
+Usage:
+    python -m benchmarks.semantic [--restaurants 1000000] [--queries 1000]
+"""
+
+import argparse
+import logging
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional, Set, Tuple
+
+import numpy as np
+
+from phase1.database_setup import DatabaseManager
+from phase3.config import SEMANTIC_NPROBE
+from phase3.models import SemanticFilters
+from phase3.recommender import RecommendationEngine
+from phase3.semantic import SemanticIndex, build_semantic_index
+from benchmarks.synthetic import DISHES, LOCALITIES, REVIEW_PHRASES, build_database
+from benchmarks.timing import percentile
+
+
+def make_searches(count: int, seed: int = 11):
+    """
+    Reproducible free-text queries, a third of them filtered by locality and
+    a third of those by price category and rating as well.
+    """
+    rng = random.Random(seed)
+    searches = []
+    for _ in range(count):
+        words = rng.sample(REVIEW_PHRASES, rng.randint(1, 2)) + rng.sample(DISHES, rng.randint(0, 1))
+        text = " ".join(" ".join(phrase.split()[:rng.randint(2, 4)]) for phrase in words).lower()
+        filters = None
+        if rng.random() < 1 / 3:
+            filters = SemanticFilters(city=rng.choice(LOCALITIES))
+            if rng.random() < 1 / 3:
+                filters = SemanticFilters(city=filters.city, price_range=rng.choice(["budget", "mid-range", "premium"]), min_rating=3.5)
+        searches.append((text, filters))
+    return searches
+
+
+def exact_top(index: SemanticIndex, text: str, filters: Optional[SemanticFilters], limit: int) -> Tuple[Set[int], float]:
+    """
+    Top restaurant ids of an exhaustive scan and the last of their scores
+    (cosine similarities rounded as the index ranks them).
+    """
+    filters = filters or SemanticFilters()
+    city = index.cities.index(filters.city) if filters.city in index.cities else None
+    price = index.prices.index(filters.price_range) if filters.price_range in index.prices else None
+    scores = np.round((index.vectors @ index.embed(text)).astype(np.float64), 4)
+    mask = index._filter_mask(0, len(index), city, price, filters.min_rating)
+    candidates = np.arange(len(index)) if mask is None else np.flatnonzero(mask)
+    order = np.lexsort((index.ids[candidates], -scores[candidates]))[:limit]
+    return set(index.ids[candidates[order]].tolist()), float(scores[candidates[order[-1]]]) if order.size else 0.0
+
+
+def run(restaurants: int, queries: int):
+    """
+    Report the build time, search latency percentiles and recall@10.
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = build_database(Path(temp_dir) / "semantic.db", restaurants)
+        db_manager = DatabaseManager(db_path=db_path)
+        db_manager.write_build_metadata()
+        start = time.perf_counter()
+        indexed = build_semantic_index(db_manager)
+        build_seconds = time.perf_counter() - start
+        db_manager.close()
+
+        engine = RecommendationEngine(DatabaseManager(db_path=db_path))
+        db_manager = engine.db_manager
+        db_manager.connect()
+        index = engine._get_semantic_index(db_manager)
+        searches = make_searches(queries)
+        engine._semantic_search(db_manager, *searches[0], 10)  # Warm-up
+
+        samples = []
+        for text, filters in searches:
+            start = time.perf_counter()
+            engine._semantic_search(db_manager, text, filters, 10)
+            samples.append((time.perf_counter() - start) * 1000)
+
+        # Recall, counting a hit tied with the exact 10th score as correct
+        recall = []
+        for text, filters in searches[:min(queries, 200)]:
+            hits = index.search(text, filters, limit=10)
+            exact, tenth = exact_top(index, text, filters, 10)
+            if exact:
+                recall.append(sum(1 for hit in hits if hit[0] in exact or hit[2] >= tenth) / len(exact))
+        db_manager.close()
+
+    print(f"{restaurants} restaurants, {len(index.centroids)} lists, nprobe={SEMANTIC_NPROBE}")
+    print(f"build: {build_seconds:.1f} s for {indexed} restaurants")
+    print(f"search (10 results): p50 {percentile(samples, 50):.2f} ms, p99 {percentile(samples, 99):.2f} ms")
+    print(f"recall@10 vs exhaustive scan: {np.mean(recall):.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--restaurants", type=int, default=1000000)
+    parser.add_argument("--queries", type=int, default=1000)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+    run(args.restaurants, args.queries)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Serving mode benchmark.
+Reports p50/p99 RecommendationEngine latency for each DatabaseManager serving mode.
+
+Usage:
+    python -m benchmarks.serving_modes [--restaurants 50000] [--queries 2000]
+"""
+
+import argparse
+import logging
+import tempfile
+import time
+from pathlib import Path
+
+from phase1.config import DATABASE_SERVING_MODES
+from phase1.database_setup import DatabaseManager
+from phase3.recommender import RecommendationEngine
+from benchmarks.synthetic import build_database, make_queries
+from benchmarks.timing import percentile
+
+
+def run(restaurants: int, queries: int):
+    """
+    Build a synthetic database and time engine queries in every serving mode.
+    """
+    logging.disable(logging.INFO)
+    workload = make_queries(queries)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = build_database(Path(tmp_dir) / "zomato.db", restaurants)
+
+        print(f"{restaurants} restaurants, {queries} queries")
+        print(f"{'mode':<10} {'p50 (ms)':>10} {'p99 (ms)':>10}")
+        for mode in DATABASE_SERVING_MODES:
+            engine = RecommendationEngine(DatabaseManager(db_path=db_path, serving_mode=mode))
+            engine.get_recommendations(workload[0])  # warm up (loads the memory copy)
+
+            timings = []
+            for user_input in workload:
+                start = time.perf_counter()
+                engine.get_recommendations(user_input)
+                timings.append((time.perf_counter() - start) * 1000)
+
+            print(f"{mode:<10} {percentile(timings, 50):>10.3f} {percentile(timings, 99):>10.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--restaurants", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+    run(args.restaurants, args.queries)
+
+
+if __name__ == "__main__":
+    main()
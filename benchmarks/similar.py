@@ -0,0 +1,66 @@
+"""
+Similar restaurants benchmark.
+Times the build of the neighbour table (blocked TF-IDF similarity products,
+one process per city) and the serving-time lookup of RecommendationEngine.similar.
+
+Usage:
+    python -m benchmarks.similar [--restaurants 50000] [--workers 4] [--lookups 5000]
+"""
+
+import argparse
+import logging
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+from phase1.database_setup import DatabaseManager
+from phase3.recommender import RecommendationEngine
+from phase3.similarity import build_similar_restaurants
+from benchmarks.synthetic import build_database
+from benchmarks.timing import percentile
+
+
+def run(restaurants: int, workers: Optional[int], lookups: int):
+    """
+    Report the build time and lookup latency percentiles.
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = build_database(Path(temp_dir) / "similar.db", restaurants)
+
+        db_manager = DatabaseManager(db_path=db_path)
+        start = time.perf_counter()
+        stored = build_similar_restaurants(db_manager, workers=workers)
+        build_seconds = time.perf_counter() - start
+        db_manager.close()
+
+        engine = RecommendationEngine(DatabaseManager(db_path=db_path))
+        db_manager = engine.db_manager
+        db_manager.connect()
+        rng = random.Random(3)
+        samples = []
+        for _ in range(lookups):
+            restaurant_id = rng.randint(1, restaurants)
+            start = time.perf_counter()
+            engine._similar(db_manager, restaurant_id, None, 6)
+            samples.append((time.perf_counter() - start) * 1e6)
+        db_manager.close()
+
+    print(f"{restaurants} restaurants, workers={workers or 'cpu count'}")
+    print(f"build: {build_seconds:.2f} s for {stored} restaurants")
+    print(f"lookup (6 neighbours): p50 {percentile(samples, 50):.0f} us, p99 {percentile(samples, 99):.0f} us")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--restaurants", type=int, default=50000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--lookups", type=int, default=5000)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+    run(args.restaurants, args.workers, args.lookups)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Per-call SQL overhead benchmark.
+Compares the legacy per-request SQL builder (one statement text per cuisine
+count) with the single statement-stable RECOMMENDATION_QUERY on one reused
+connection, with and without SQLite's statement cache.
+
+Usage:
+    python -m benchmarks.sql_overhead [--restaurants 20000] [--calls 5000]
+"""
+
+import argparse
+import json
+import logging
+import math
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, List, Tuple
+
+from phase1.config import DATABASE_TABLE_NAME
+from phase3.recommender import RECOMMENDATION_QUERY, score_floor
+from benchmarks.synthetic import build_database, make_queries
+
+
+def legacy_statement(user_input) -> Tuple[str, List[Any]]:
+    """
+    The query builder RecommendationEngine used before statements were made stable.
+    """
+    query = (
+        "SELECT name, city, address, cuisines, average_cost_for_two, price_category, aggregate_rating, votes "
+        f"FROM {DATABASE_TABLE_NAME} WHERE city = ? AND price_category = ? AND aggregate_rating >= ?"
+    )
+    params: List[Any] = [user_input.city, user_input.price_range, user_input.min_rating]
+    if user_input.cuisine:
+        query += f" AND ({' OR '.join(['cuisines LIKE ?' for _ in user_input.cuisine])})"
+        params.extend(f"%{c}%" for c in user_input.cuisine)
+    query += " ORDER BY aggregate_rating DESC, votes DESC LIMIT 50"
+    return query, params
+
+
+def stable_statement(user_input) -> Tuple[str, Tuple[Any, ...]]:
+    """
+    The statement-stable query RecommendationEngine uses now.
+    """
+    cuisines_json = json.dumps(user_input.cuisine) if user_input.cuisine else None
+    min_cost, max_cost = user_input.cost_bounds()
+    params = (user_input.city, min_cost, max_cost, user_input.min_rating, cuisines_json, math.inf, score_floor(user_input.min_rating))
+    return RECOMMENDATION_QUERY.format(table=DATABASE_TABLE_NAME), params
+
+
+def time_calls(db_path: Path, workload, build, cached_statements: int) -> float:
+    """
+    Average microseconds per build + execute + fetch of the first 50 rows on one connection.
+    """
+    connection = sqlite3.connect(db_path, cached_statements=cached_statements)
+    try:
+        for user_input in workload[:100]:  # warm the page cache
+            connection.execute(*build(user_input)).fetchmany(50)
+
+        start = time.perf_counter()
+        for user_input in workload:
+            connection.execute(*build(user_input)).fetchmany(50)
+        return (time.perf_counter() - start) / len(workload) * 1e6
+    finally:
+        connection.close()
+
+
+def run(restaurants: int, calls: int):
+    """
+    Build a synthetic database and report the per-call SQL overhead.
+    """
+    logging.disable(logging.INFO)
+    workload = make_queries(calls)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = build_database(Path(tmp_dir) / "zomato.db", restaurants)
+
+        print(f"{restaurants} restaurants, {calls} calls")
+        print(f"{'statement':<10} {'stmt cache':>10} {'us/call':>10}")
+        for name, build in [("legacy", legacy_statement), ("stable", stable_statement)]:
+            for cached_statements in (0, 128):
+                per_call = time_calls(db_path, workload, build, cached_statements)
+                print(f"{name:<10} {cached_statements:>10} {per_call:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--restaurants", type=int, default=20000)
+    parser.add_argument("--calls", type=int, default=5000)
+    args = parser.parse_args()
+    run(args.restaurants, args.calls)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Synthetic restaurant data for benchmarks.
+Generates records shaped like the cleaned Phase 1 output and stores them with DatabaseManager.
+"""
+
+import random
+from pathlib import Path
+from typing import List, Dict, Any
+
+from phase1.data_cleaner import normalize_dish
+from phase1.feature_engineer import FeatureEngineer
+from phase1.database_setup import DatabaseManager
+from phase2.models import UserInput
+
+LOCALITIES = [
+    'Banashankari', 'Bannerghatta Road', 'Basavanagudi', 'Bellandur', 'Brigade Road',
+    'Brookefield', 'Btm', 'Church Street', 'Electronic City', 'Frazer Town', 'Hsr',
+    'Indiranagar', 'Jayanagar', 'Jp Nagar', 'Kalyan Nagar', 'Kammanahalli',
+    'Koramangala 4Th Block', 'Koramangala 5Th Block', 'Koramangala 6Th Block',
+    'Koramangala 7Th Block', 'Lavelle Road', 'Malleshwaram', 'Marathahalli', 'Mg Road',
+    'New Bel Road', 'Old Airport Road', 'Rajajinagar', 'Residency Road', 'Sarjapur Road',
+    'Whitefield'
+]
+
+CUISINES = [
+    'North Indian', 'South Indian', 'Chinese', 'Italian', 'Continental', 'Cafe',
+    'Fast Food', 'Biryani', 'Desserts', 'Beverages', 'Street Food', 'Pizza', 'Burger',
+    'Bakery', 'Seafood', 'Thai', 'Mughlai', 'Andhra', 'Kerala', 'Momos', 'Japanese',
+    'Mexican', 'Asian', 'Arabian', 'Salad', 'Juices', 'Ice Cream', 'Rolls'
+]
+
+REST_TYPES = [
+    'Casual Dining', 'Quick Bites', 'Cafe', 'Delivery', 'Dessert Parlor', 'Bakery',
+    'Pub', 'Bar', 'Fine Dining', 'Beverage Shop', 'Takeaway', 'Food Court', 'Lounge',
+    'Microbrewery', 'Kiosk'
+]
+
+DISHES = [
+    'Pasta', 'Pizza', 'Burgers', 'Biryani', 'Masala Dosa', 'Filter Coffee', 'Paneer Tikka',
+    'Butter Chicken', 'Noodles', 'Momos', 'Brownie', 'Cheesecake', 'Waffles', 'Sandwiches',
+    'Fish Curry', 'Appam', 'Nachos', 'Tacos', 'Sushi', 'Ramen', 'Rolls', 'Mocktails',
+    'Cocktails', 'Salads', 'Shawarma', 'Kebabs', 'Idli', 'Vada', 'Lassi', 'Falooda',
+    'Thali', 'Chaat', 'Ice Cream', 'Hot Chocolate', 'Fries', 'Dim Sum', 'Pancakes'
+]
+
+REVIEW_PHRASES = [
+    'rooftop seating with a great view', 'live music on weekends', 'craft beer on tap',
+    'cozy place for a date', 'quick service and friendly staff', 'great for large groups',
+    'loud music and packed on fridays', 'authentic home style food', 'amazing desserts',
+    'perfect for working with a laptop', 'outdoor seating in a garden', 'family friendly with a play area',
+    'pet friendly cafe', 'late night food', 'value for money buffet', 'spicy and flavourful curries',
+    'fresh seafood from the coast', 'strong filter coffee', 'cocktails are creative', 'small and crowded',
+    'breakfast all day', 'sports screening on big screens', 'quiet and peaceful ambience', 'vegan options available'
+]
+
+# Variants prefixed to dishes on synthetic menus ("Chicken Biryani")
+MENU_VARIANTS = ['', '', 'Chicken ', 'Mutton ', 'Paneer ', 'Veg ', 'Special ', 'Hyderabadi ']
+
+
+def make_restaurants(count: int, seed: int = 42) -> List[Dict[str, Any]]:
+    """
+    Generate synthetic restaurant records with engineered features.
+
+    Args:
+        count: Number of restaurants to generate
+        seed: Random seed for reproducible data
+
+    Returns:
+        List of dictionaries ready for DatabaseManager.insert_data
+    """
+    rng = random.Random(seed)
+    # Separate stream, so the other fields stay identical to earlier versions
+    extras = random.Random(seed + 1)
+    reviews = random.Random(seed + 2)
+    menus = random.Random(seed + 3)
+    data = []
+
+    for i in range(count):
+        cuisines = rng.sample(CUISINES, rng.randint(1, 4))
+        dish_liked = ', '.join(extras.sample(DISHES, extras.randint(0, 7)))
+        menu = [menus.choice(MENU_VARIANTS) + dish for dish in menus.sample(DISHES, menus.randint(0, 12))]
+        dishes = dict.fromkeys(normalize_dish(dish) for dish in dish_liked.split(',') + menu if dish.strip())
+        data.append({
+            'name': f"Restaurant {i}",
+            'city': rng.choice(LOCALITIES),
+            'cuisines': ', '.join(cuisines),
+            'average_cost_for_two': float(rng.choice(range(100, 4000, 50))),
+            'aggregate_rating': round(rng.uniform(2.5, 4.9), 1),
+            'votes': int(rng.paretovariate(1.2) * 10),
+            'address': f"{i} Main Road, Bangalore",
+            'online_order': rng.choice(['Yes', 'No']),
+            'book_table': rng.choice(['Yes', 'No']),
+            'rest_type': ', '.join(extras.sample(REST_TYPES, extras.randint(1, 2))),
+            'dish_liked': dish_liked,
+            'reviews_text': '. '.join(reviews.sample(REVIEW_PHRASES, reviews.randint(0, 4))),
+            'dishes': ', '.join(dishes)
+        })
+
+    return FeatureEngineer(data).engineer_features()
+
+
+def build_database(db_path: Path, count: int, seed: int = 42) -> Path:
+    """
+    Build a synthetic restaurants database.
+
+    Args:
+        db_path: Path of the SQLite file to (re)create
+        count: Number of restaurants to generate
+        seed: Random seed for reproducible data
+
+    Returns:
+        Path to the built database
+    """
+    db_manager = DatabaseManager(db_path=db_path)
+    db_manager.connect()
+    db_manager.insert_data(make_restaurants(count, seed), if_exists='replace')
+    db_manager.close()
+    return db_path
+
+
+def make_queries(count: int, seed: int = 7) -> List[UserInput]:
+    """
+    Generate a reproducible mix of user queries.
+
+    Args:
+        count: Number of queries to generate
+        seed: Random seed for reproducible queries
+
+    Returns:
+        List of UserInput objects
+    """
+    rng = random.Random(seed)
+    return [
+        UserInput(
+            city=rng.choice(LOCALITIES),
+            price_range=rng.choice(['budget', 'mid-range', 'premium']),
+            cuisine=rng.sample(CUISINES, rng.randint(0, 2)) or None,
+            min_rating=rng.choice([0.0, 3.0, 3.5, 4.0])
+        )
+        for _ in range(count)
+    ]
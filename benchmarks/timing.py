@@ -0,0 +1,14 @@
+"""
+Timing helpers shared by the benchmarks.
+"""
+
+from typing import List
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """
+    Nearest-rank percentile of a list of samples.
+    """
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[index]
@@ -0,0 +1,77 @@
+"""
+Batch validation throughput benchmark.
+Compares InputValidator.validate_user_input in a loop with validate_many on
+the same payloads (with a share of typos and invalid items), in payloads/sec.
+
+Usage:
+    python -m benchmarks.validate_many [--restaurants 20000] [--sizes 1000 10000 100000]
+"""
+
+import argparse
+import logging
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from phase1.database_setup import DatabaseManager
+from phase2.input_validator import InputValidator
+from benchmarks.synthetic import build_database, make_queries
+
+
+def make_payloads(count: int, seed: int = 11) -> List[Dict[str, Any]]:
+    """
+    Raw payload dicts: mostly valid, ~5% misspelled localities, ~5% invalid price ranges.
+    """
+    rng = random.Random(seed)
+    payloads = []
+    for user_input in make_queries(count, seed=seed):
+        payload = user_input.model_dump()
+        roll = rng.random()
+        if roll < 0.05:
+            city = payload["city"]
+            cut = rng.randrange(len(city))
+            payload["city"] = city[:cut] + city[cut + 1:]
+        elif roll < 0.10:
+            payload["price_range"] = "luxury"
+        payloads.append(payload)
+    return payloads
+
+
+def run(restaurants: int, sizes: List[int]):
+    """
+    Build a synthetic database and report validation throughput per batch size.
+    """
+    logging.disable(logging.INFO)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = build_database(Path(tmp_dir) / "zomato.db", restaurants)
+        validator = InputValidator(db_manager=DatabaseManager(db_path=db_path))
+
+        print(f"{'payloads':>10} {'single/s':>12} {'many/s':>12} {'speedup':>8}")
+        for size in sizes:
+            payloads = make_payloads(size)
+
+            start = time.perf_counter()
+            for payload in payloads:
+                validator.validate_user_input(payload)
+            single = size / (time.perf_counter() - start)
+
+            start = time.perf_counter()
+            validator.validate_many(payloads)
+            many = size / (time.perf_counter() - start)
+
+            print(f"{size:>10} {single:>12,.0f} {many:>12,.0f} {many / single:>7.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--restaurants", type=int, default=20000)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    args = parser.parse_args()
+    run(args.restaurants, args.sizes)
+
+
+if __name__ == "__main__":
+    main()
@@ -16,6 +16,32 @@ document.addEventListener('DOMContentLoaded', () => {
     if (localityCount) localityCount.textContent = localities.length;
     if (cuisineCount) cuisineCount.textContent = cuisines.length;
 
+    // Typeahead: ask the server's suggest index (ranked by popularity), falling
+    // back to filtering the built-in lists when the API is unavailable.
+    const suggestRequests = {};
+
+    async function fetchSuggestions(filter, type, fallback) {
+        const query = filter.trim();
+        if (!query) return fallback;
+        try {
+            const params = new URLSearchParams({ q: query, type: type, limit: '50' });
+            const response = await fetch(`/api/suggest?${params}`);
+            if (!response.ok) throw new Error(`Suggest failed: ${response.status}`);
+            const data = await response.json();
+            return data.suggestions.map(s => s.text);
+        } catch (err) {
+            return fallback.filter(item => item.toLowerCase().includes(query.toLowerCase()));
+        }
+    }
+
+    async function suggestLatest(filter, type, fallback) {
+        // Only the latest request per type is rendered, so slow responses never overwrite newer ones
+        const token = (suggestRequests[type] || 0) + 1;
+        suggestRequests[type] = token;
+        const results = await fetchSuggestions(filter, type, fallback);
+        return suggestRequests[type] === token ? results : null;
+    }
+
     function hideAllDropdowns() {
         cityDropdown.classList.add('hidden');
         cuisineDropdown.classList.add('hidden');
@@ -32,9 +58,10 @@ document.addEventListener('DOMContentLoaded', () => {
     const citySearch = document.getElementById('city-search');
     let selectedCity = null;
 
-    function renderCityOptions(filter = '') {
+    async function renderCityOptions(filter = '') {
+        const filtered = await suggestLatest(filter, 'locality', localities);
+        if (filtered === null) return;
         cityOptions.innerHTML = '';
-        const filtered = localities.filter(l => l.toLowerCase().includes(filter.toLowerCase()));
 
         if (filtered.length === 0) {
             const div = document.createElement('div');
@@ -155,9 +182,10 @@ document.addEventListener('DOMContentLoaded', () => {
     const cuisineSearch = document.getElementById('cuisine-search');
     let selectedCuisines = [];
 
-    function renderCuisineOptions(filter = '') {
+    async function renderCuisineOptions(filter = '') {
+        const filtered = await suggestLatest(filter, 'cuisine', cuisines);
+        if (filtered === null) return;
         cuisineOptions.innerHTML = '';
-        const filtered = cuisines.filter(c => c.toLowerCase().includes(filter.toLowerCase()));
 
         if (filtered.length === 0) {
             const div = document.createElement('div');
@@ -257,23 +285,20 @@ document.addEventListener('DOMContentLoaded', () => {
             city: selectedCity,
             price_range: selectedPrice,
             cuisine: selectedCuisines.length > 0 ? selectedCuisines : null,
-            min_rating: parseFloat(document.getElementById('min_rating').value) || 0
+            min_rating: parseFloat(document.getElementById('min_rating').value) || 0,
+            dish: document.getElementById('dish').value.trim() || null
         };
 
-        try {
-            const response = await fetch('/api/recommend', {
-                method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify(payload)
-            });
+        lastPayload = payload;
 
-            const data = await response.json();
-            if (!response.ok) throw new Error(data.detail || 'Failed to fetch recommendations');
+        try {
+            const data = await fetchRecommendations(payload, null);
 
             if (data.count === 0) {
                 showError(data.message || 'No restaurants found matching your criteria.');
             } else {
-                renderRecommendations(data.recommendations, data.ai_reasoning_summary);
+                renderRecommendations(data.recommendations, data.ai_reasoning_summary, data.message);
+                renderLoadMore(data.next_cursor);
             }
         } catch (err) {
             showError(err.message);
@@ -283,7 +308,57 @@ document.addEventListener('DOMContentLoaded', () => {
         }
     });
 
-    function renderRecommendations(recommendations, summary) {
+    // Keyset pagination: the last request and the cursor of its next page
+    let lastPayload = null;
+
+    async function fetchRecommendations(payload, cursor) {
+        const url = cursor ? `/api/recommend?${new URLSearchParams({ cursor })}` : '/api/recommend';
+        const response = await fetch(url, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(payload)
+        });
+
+        const data = await response.json();
+        if (!response.ok) throw new Error(data.detail || 'Failed to fetch recommendations');
+        return data;
+    }
+
+    function renderLoadMore(cursor) {
+        if (!cursor) return;
+
+        const button = document.createElement('button');
+        button.type = 'button';
+        button.className = 'btn-primary load-more-btn';
+        button.style.gridColumn = '1 / -1';
+        button.textContent = 'Load more';
+        button.addEventListener('click', async () => {
+            button.disabled = true;
+            try {
+                const data = await fetchRecommendations(lastPayload, cursor);
+                button.remove();
+                renderRecommendations(data.recommendations, null);
+                renderLoadMore(data.next_cursor);
+            } catch (err) {
+                button.disabled = false;
+                showError(err.message);
+            }
+        });
+        resultsGrid.appendChild(button);
+    }
+
+    function renderRecommendations(recommendations, summary, notice) {
+        if (notice) {
+            // Nothing matched exactly; the engine relaxed some constraints
+            const noticeDiv = document.createElement('div');
+            noticeDiv.className = 'glass-card summary-card';
+            noticeDiv.style.marginBottom = '20px';
+            noticeDiv.style.gridColumn = '1 / -1';
+            noticeDiv.style.borderLeft = '4px solid #f59e0b';
+            noticeDiv.textContent = notice;
+            resultsGrid.appendChild(noticeDiv);
+        }
+
         if (summary) {
             const summaryDiv = document.createElement('div');
             summaryDiv.className = 'glass-card summary-card';
@@ -316,12 +391,47 @@ document.addEventListener('DOMContentLoaded', () => {
                     ${cleanReasoning}
                 </div>
             `;
+            if (rec.id != null) card.appendChild(renderMoreLikeThis(rec.id));
             resultsGrid.appendChild(card);
         });
 
         if (window.lucide) window.lucide.createIcons();
     }
 
+    // "More like this": neighbours stored for each restaurant by the Phase 1 build
+    function renderMoreLikeThis(restaurantId) {
+        const container = document.createElement('div');
+        container.className = 'res-similar';
+
+        const button = document.createElement('button');
+        button.type = 'button';
+        button.className = 'btn-secondary';
+        button.textContent = 'More like this';
+        button.addEventListener('click', async () => {
+            button.disabled = true;
+            try {
+                const params = new URLSearchParams({ city: lastPayload.city });
+                const response = await fetch(`/api/restaurants/${restaurantId}/similar?${params}`);
+                const data = await response.json();
+                if (!response.ok) throw new Error(data.detail || 'Failed to fetch similar restaurants');
+
+                const list = document.createElement('ul');
+                data.recommendations.forEach((rec) => {
+                    const item = document.createElement('li');
+                    item.textContent = `${rec.name} · ${rec.rating} ★ · ₹${rec.average_cost} for two`;
+                    list.appendChild(item);
+                });
+                if (data.count === 0) list.innerHTML = '<li>No similar restaurants found.</li>';
+                button.replaceWith(list);
+            } catch (err) {
+                button.disabled = false;
+                showError(err.message);
+            }
+        });
+        container.appendChild(button);
+        return container;
+    }
+
     function showError(message) {
         errorText.textContent = message;
         errorCard.classList.remove('hidden');
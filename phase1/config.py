@@ -27,6 +27,49 @@ DATASET_SPLIT = "train"  # Default split to load
 # Database configuration
 DATABASE_PATH = DATABASE_DIR / "zomato.db"
 DATABASE_TABLE_NAME = "restaurants"
+BUILD_METADATA_TABLE_NAME = "build_metadata"
+
+# Materialized top-k recommendations per locality x price x cuisine x rating
+# threshold, built after the data is stored (see phase3/precomputed.py).
+# Disable with ZOMATO_PRECOMPUTE=0.
+PRECOMPUTED_TABLE_NAME = "precomputed_recommendations"
+PRECOMPUTE_RECOMMENDATIONS = os.getenv("ZOMATO_PRECOMPUTE", "1") == "1"
+
+# Top "more like this" neighbours per restaurant (TF-IDF over cuisines,
+# restaurant type, liked dishes and cost band; see phase3/similarity.py).
+# Disable with ZOMATO_SIMILAR=0.
+SIMILAR_TABLE_NAME = "similar_restaurants"
+BUILD_SIMILAR_RESTAURANTS = os.getenv("ZOMATO_SIMILAR", "1") == "1"
+
+# Offline semantic search index (hashed TF-IDF + truncated SVD + IVF, see
+# phase3/semantic.py), stored next to the database as <name>.semantic.npz.
+# Disable with ZOMATO_SEMANTIC=0.
+BUILD_SEMANTIC_INDEX = os.getenv("ZOMATO_SEMANTIC", "1") == "1"
+REVIEW_TEXT_MAX_CHARS = 2000  # Review text kept per restaurant for the semantic index
+
+# Dish inverted index (normalized dishes from dish_liked and menu_item ->
+# delta-encoded restaurant id postings per city, see phase3/dish_index.py).
+# Disable with ZOMATO_DISH_INDEX=0.
+DISH_INDEX_TABLE_NAME = "dish_index"
+BUILD_DISH_INDEX = os.getenv("ZOMATO_DISH_INDEX", "1") == "1"
+DISHES_MAX_PER_RESTAURANT = 200  # Menu items kept per restaurant
+
+# Partitioned storage: one SQLite file per city, routed through a manifest
+# table in the main database. Enable with ZOMATO_DB_PARTITIONED=1.
+PARTITION_MANIFEST_TABLE_NAME = "partitions"
+DATABASE_PARTITIONED = os.getenv("ZOMATO_DB_PARTITIONED", "0") == "1"
+PARTITION_BUILD_WORKERS = None  # None = one build process per CPU
+
+# Database serving configuration
+# "file" opens the database read-write (used by the Phase 1 build),
+# "immutable" opens it read-only with immutable=1 and a large mmap,
+# "memory" copies it into a shared in-memory database on first connect.
+DATABASE_SERVING_MODES = ("file", "immutable", "memory")
+DATABASE_SERVING_MODE = os.getenv("ZOMATO_DB_SERVING_MODE", "file")
+DATABASE_MMAP_SIZE = 256 * 1024 * 1024  # 256 MB
+
+# Rows fetched per page by the streaming query iterators
+QUERY_BATCH_SIZE = 1000
 
 # Data cleaning configuration
 REQUIRED_COLUMNS = [
@@ -3,16 +3,75 @@ Data Cleaner module for Phase 1 - Simplified Version (No Pandas)
 Cleans and validates the Zomato restaurant dataset using standard library.
 """
 
+import ast
 import logging
+import re
 from typing import List, Dict, Any
 from collections import Counter
 
-from phase1.config import MIN_RATING, MAX_RATING
+from phase1.config import MIN_RATING, MAX_RATING, REVIEW_TEXT_MAX_CHARS, DISHES_MAX_PER_RESTAURANT
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# "RATED\n  " prefix of every review in the dataset's reviews_list
+_REVIEW_PREFIX = re.compile(r"^\s*RATED\s*", re.IGNORECASE)
+
+# Anything that is not a letter or digit separates the words of a dish name
+_DISH_SEPARATOR = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_dish(name: Any) -> str:
+    """
+    Canonical form of a dish name: lower-case words separated by single spaces
+    ("Chicken Biryani!" and "chicken-biryani" both become "chicken biryani").
+    """
+    return " ".join(word for word in _DISH_SEPARATOR.split(str(name).lower()) if word)
+
+
+def _parse_list(value: Any) -> List[Any]:
+    """
+    Items of a list column stored as its repr (as menu_item is); values that
+    do not parse give no items.
+    """
+    if isinstance(value, str):
+        try:
+            value = ast.literal_eval(value)
+        except (ValueError, SyntaxError, MemoryError, RecursionError):
+            return []
+    return list(value) if isinstance(value, (list, tuple)) else []
+
+
+def _review_text(reviews: Any, max_chars: int = REVIEW_TEXT_MAX_CHARS) -> str:
+    """
+    Plain text of a reviews_list value, truncated to max_chars.
+    
+    The dataset stores reviews as the repr of a list of (rating, text) tuples;
+    values that do not parse are kept as plain text.
+    """
+    if not reviews:
+        return ""
+    if isinstance(reviews, str):
+        try:
+            reviews = ast.literal_eval(reviews)
+        except (ValueError, SyntaxError, MemoryError, RecursionError):
+            return reviews[:max_chars]
+    if not isinstance(reviews, (list, tuple)):
+        return str(reviews)[:max_chars]
+    
+    parts: List[str] = []
+    length = 0
+    for review in reviews:
+        text = review[-1] if isinstance(review, (list, tuple)) and review else review
+        text = _REVIEW_PREFIX.sub("", str(text)).strip()
+        if text:
+            parts.append(text)
+            length += len(text) + 1
+            if length >= max_chars:
+                break
+    return " ".join(parts)[:max_chars]
+
 
 class DataCleaner:
     """
@@ -131,10 +190,55 @@ class DataCleaner:
             # Standardize cuisines
             if item.get('cuisines'):
                 item['cuisines'] = str(item['cuisines']).strip()
+            
+            # Standardize restaurant type and liked dishes (comma-separated lists)
+            for field in ('rest_type', 'dish_liked'):
+                if item.get(field):
+                    item[field] = str(item[field]).strip()
         
         logger.info("Text fields standardized")
         return self.data
     
+    def extract_review_text(self) -> List[Dict[str, Any]]:
+        """
+        Replace the raw reviews_list with its plain text (reviews_text), for the
+        semantic search index.
+        
+        Returns:
+            Cleaned data
+        """
+        logger.info("Extracting review text...")
+        
+        for item in self.data:
+            if 'reviews_list' in item:
+                item['reviews_text'] = _review_text(item.pop('reviews_list'))
+        
+        logger.info("Review text extracted")
+        return self.data
+    
+    def extract_dishes(self, max_dishes: int = DISHES_MAX_PER_RESTAURANT) -> List[Dict[str, Any]]:
+        """
+        Merge dish_liked and the raw menu_item list into dishes: normalized,
+        de-duplicated dish names (liked dishes first), comma-separated, for the
+        dish index.
+        
+        Args:
+            max_dishes: Maximum number of dishes kept per restaurant
+            
+        Returns:
+            Cleaned data
+        """
+        logger.info("Extracting dishes...")
+        
+        for item in self.data:
+            menu = _parse_list(item.pop('menu_item', None))
+            names = str(item.get('dish_liked') or '').split(',') + [str(dish) for dish in menu]
+            dishes = dict.fromkeys(dish for dish in map(normalize_dish, names) if dish)
+            item['dishes'] = ', '.join(list(dishes)[:max_dishes])
+        
+        logger.info("Dishes extracted")
+        return self.data
+    
     def remove_invalid_entries(self) -> List[Dict[str, Any]]:
         """
         Remove invalid entries (negative prices, invalid ratings, etc.).
@@ -218,6 +322,8 @@ class DataCleaner:
         self.remove_duplicates()
         self.handle_missing_values()
         self.standardize_text_fields()
+        self.extract_review_text()
+        self.extract_dishes()
         self.remove_invalid_entries()
         
         # Update final count
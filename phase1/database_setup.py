@@ -3,18 +3,141 @@ Database Setup module for Phase 1 - Simplified Version (No Pandas)
 Creates and manages the SQLite database for storing restaurant data.
 """
 
+import hashlib
+import json
 import logging
+import re
+import uuid
+from collections import namedtuple, Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import chain, islice
 import sqlite3
 import os
+import queue
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple, Iterator, Sequence
 
-from phase1.config import DATABASE_PATH, DATABASE_TABLE_NAME
+from phase1.config import (
+    DATABASE_PATH,
+    DATABASE_TABLE_NAME,
+    BUILD_METADATA_TABLE_NAME,
+    PARTITION_MANIFEST_TABLE_NAME,
+    PRECOMPUTED_TABLE_NAME,
+    SIMILAR_TABLE_NAME,
+    DISH_INDEX_TABLE_NAME,
+    PARTITION_BUILD_WORKERS,
+    DATABASE_SERVING_MODES,
+    DATABASE_MMAP_SIZE,
+    QUERY_BATCH_SIZE
+)
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Columns accepted by insert_data
+INSERTABLE_COLUMNS = (
+    "name", "city", "cuisines", "average_cost_for_two", "aggregate_rating",
+    "votes", "price_category", "popularity_score", "cuisine_diversity",
+    "has_online_delivery", "has_table_booking", "is_popular", "address",
+    "locality", "online_order", "book_table", "rating_text", "rest_type",
+    "dish_liked", "reviews_text", "dishes"
+)
+
+# Columns that may be projected by the streaming query iterators
+SCHEMA_COLUMNS = ("id",) + INSERTABLE_COLUMNS + ("created_at",)
+
+# Unrounded recommendation match score (quality + popularity, before the cuisine
+# bonus), indexed per city so the recommendation query can read restaurants
+# best first without sorting. Queries must repeat this text exactly to use it.
+MATCH_SCORE_EXPR = "(aggregate_rating / 5.0) * 7.0 + (MIN(votes, 1000) / 1000.0) * 3.0"
+
+# Shared in-memory copies used by the "memory" serving mode, keyed by the
+# resolved database path. The anchor connection keeps the copy alive while
+# DatabaseManager instances connect and close around it.
+_memory_anchors: Dict[str, Tuple[sqlite3.Connection, str, Tuple[int, int]]] = {}
+_memory_lock = threading.Lock()
+
+
+def _file_stamp(path: Path) -> Tuple[int, int]:
+    """
+    Return a cheap (mtime_ns, size) stamp for a database file.
+    """
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _memory_uri(path: Path) -> str:
+    """
+    Get the URI of the shared in-memory copy of a database file.
+    """
+    digest = hashlib.sha1(str(Path(path).resolve()).encode('utf-8')).hexdigest()[:16]
+    return f"file:zomato_{digest}?mode=memory&cache=shared"
+
+
+def _load_memory_copy(path: Path) -> str:
+    """
+    Copy a database file into a shared in-memory database.
+
+    The copy is made once per process with sqlite3.Connection.backup and is
+    reloaded only if the file on disk has been rebuilt since.
+
+    Args:
+        path: Path to the SQLite database file
+
+    Returns:
+        URI of the shared in-memory database
+    """
+    key = str(Path(path).resolve())
+    stamp = _file_stamp(path)
+
+    with _memory_lock:
+        anchor = _memory_anchors.get(key)
+        if anchor is not None and anchor[2] == stamp:
+            return anchor[1]
+
+        if anchor is not None:
+            anchor[0].close()
+
+        uri = _memory_uri(path)
+        memory_conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        source = sqlite3.connect(Path(path).resolve().as_uri() + "?mode=ro", uri=True)
+        try:
+            source.backup(memory_conn)
+        finally:
+            source.close()
+
+        _memory_anchors[key] = (memory_conn, uri, stamp)
+        logger.info(f"Loaded in-memory serving copy of {path}")
+        return uri
+
+
+@lru_cache(maxsize=64)
+def _row_type(columns: Tuple[str, ...]):
+    """
+    Get the (cached) namedtuple type for a column projection.
+    """
+    return namedtuple("RestaurantRow", columns)
+
+
+def _page_rows(cursor: sqlite3.Cursor, batch_size: int, make_row) -> Iterator[Tuple]:
+    """
+    Yield rows from an executed cursor one fetchmany page at a time.
+    """
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        if make_row is not None:
+            for row in rows:
+                yield make_row(row)
+        else:
+            yield from rows
+
 
 class DatabaseManager:
     """
@@ -22,44 +145,196 @@ class DatabaseManager:
     Uses standard library instead of pandas.
     """
     
-    def __init__(self, db_path: Path = DATABASE_PATH):
+    def __init__(self, db_path: Path = DATABASE_PATH, serving_mode: str = "file", check_same_thread: bool = True):
         """
         Initialize the DatabaseManager.
         
         Args:
             db_path: Path to the SQLite database file
+            serving_mode: How to open the database ("file", "immutable" or "memory")
+            check_same_thread: Passed to sqlite3.connect; pooled managers disable it
+                because they are handed between worker threads (one at a time)
         """
+        if serving_mode not in DATABASE_SERVING_MODES:
+            raise ValueError(
+                f"Serving mode must be one of: {', '.join(DATABASE_SERVING_MODES)}"
+            )
+        
         self.db_path = db_path
+        self.serving_mode = serving_mode
+        self.check_same_thread = check_same_thread
         self.connection: Optional[sqlite3.Connection] = None
         self.table_name = DATABASE_TABLE_NAME
+        # File stamp of the main database when its connection was opened
+        self._stamp: Optional[Tuple[int, int]] = None
+        
+        # Partition routing: city -> partition file, loaded from the manifest on connect.
+        # None means the database is a single, unpartitioned file.
+        self.partitions: Optional[Dict[str, Path]] = None
+        self._partition_connections: Dict[str, Tuple[sqlite3.Connection, Tuple[int, int]]] = {}
+    
+    def _open(self, path: Path) -> sqlite3.Connection:
+        """
+        Open a connection to a database file according to the serving mode.
+        
+        Args:
+            path: Path to the SQLite database file
+            
+        Returns:
+            sqlite3.Connection object
+        """
+        if self.serving_mode == "immutable":
+            # Read-only and immutable: SQLite skips file locking and change
+            # detection entirely, and reads pages through the mmap.
+            uri = Path(path).resolve().as_uri() + "?mode=ro&immutable=1"
+            connection = sqlite3.connect(uri, uri=True, check_same_thread=self.check_same_thread)
+            connection.execute(f"PRAGMA mmap_size = {DATABASE_MMAP_SIZE}")
+        elif self.serving_mode == "memory":
+            connection = sqlite3.connect(_load_memory_copy(path), uri=True, check_same_thread=self.check_same_thread)
+        else:
+            db_dir = os.path.dirname(path)
+            if db_dir:
+                os.makedirs(db_dir, exist_ok=True)
+            connection = sqlite3.connect(path, check_same_thread=self.check_same_thread)
+        
+        connection.row_factory = sqlite3.Row
+        return connection
     
     def connect(self) -> sqlite3.Connection:
         """
         Connect to the SQLite database.
         
+        In the immutable and memory serving modes an open connection is
+        reopened once the file has been rebuilt since it was opened: SQLite
+        does not notice changes to an immutable file, and the in-memory copy
+        is only reloaded on open. File-mode connections see changes themselves.
+        
         Returns:
             sqlite3.Connection object
         """
+        if self.connection is not None and self._is_stale():
+            logger.info(f"Database {self.db_path} was rebuilt; reopening it")
+            self.connection.close()
+            self.connection = None
+        
         if self.connection is None:
-            db_dir = os.path.dirname(self.db_path)
-            if db_dir:
-                os.makedirs(db_dir, exist_ok=True)
-            self.connection = sqlite3.connect(self.db_path)
-            self.connection.row_factory = sqlite3.Row
-            logger.info(f"Connecting to database: {self.db_path}")
+            self._stamp = _file_stamp(self.db_path) if self.serving_mode != "file" else None
+            self.connection = self._open(self.db_path)
+            logger.info(f"Connecting to database: {self.db_path} (mode: {self.serving_mode})")
+            self._load_partition_manifest()
         
         assert self.connection is not None
         return self.connection
     
+    def _is_stale(self) -> bool:
+        """
+        Whether the main database file changed since a read-only connection to it was opened.
+        """
+        if self._stamp is None:
+            return False
+        try:
+            return _file_stamp(self.db_path) != self._stamp
+        except OSError:
+            return False
+    
     def close(self):
         """
-        Close the database connection.
+        Close the database connection (and any open partition connections).
         """
+        self._close_partitions()
+        
         if self.connection is not None:
             self.connection.close()
             self.connection = None
+            self._stamp = None
             logger.info("Database connection closed")
     
+    def _close_partitions(self):
+        """
+        Close any open partition connections.
+        """
+        for connection, _ in self._partition_connections.values():
+            connection.close()
+        self._partition_connections = {}
+    
+    @property
+    def partition_dir(self) -> Path:
+        """
+        Directory holding the per-city partition files of this database.
+        """
+        return Path(self.db_path).parent / f"{Path(self.db_path).stem}_partitions"
+    
+    @property
+    def is_partitioned(self) -> bool:
+        """
+        Whether restaurants are stored in per-city partition files.
+        """
+        return self.partitions is not None
+    
+    def _load_partition_manifest(self):
+        """
+        Load the city -> partition file routing table from the main database.
+        """
+        assert self.connection is not None  # Type hint for IDE
+        try:
+            rows = self.connection.execute(
+                f"SELECT city, path FROM {PARTITION_MANIFEST_TABLE_NAME}"
+            ).fetchall()
+        except sqlite3.OperationalError:
+            self.partitions = None
+            self._close_partitions()
+            return
+        
+        base_dir = Path(self.db_path).parent
+        self.partitions = {city: base_dir / path for city, path in rows}
+        
+        # Partition connections stay open across a reload (they check their own file stamps)
+        for city in [city for city in self._partition_connections if self.partitions.get(city) is None]:
+            self._partition_connections.pop(city)[0].close()
+    
+    def connection_for(self, city: str) -> sqlite3.Connection:
+        """
+        Route a city-scoped query to the connection holding that city's rows.
+        
+        Unpartitioned databases (and cities without a partition) use the main
+        connection. Partition connections are opened lazily and reopened when
+        their file has been replaced by a rebuild.
+        
+        Args:
+            city: City name
+            
+        Returns:
+            sqlite3.Connection whose restaurants table holds the city
+        """
+        connection = self.connect()
+        if self.partitions is None or city not in self.partitions:
+            return connection
+        
+        path = self.partitions[city]
+        stamp = _file_stamp(path)
+        cached = self._partition_connections.get(city)
+        if cached is not None and cached[1] == stamp:
+            return cached[0]
+        
+        if cached is not None:
+            cached[0].close()
+        partition_connection = self._open(path)
+        self._partition_connections[city] = (partition_connection, stamp)
+        return partition_connection
+    
+    def _scan_connections(self) -> Iterator[sqlite3.Connection]:
+        """
+        Connections to visit for queries that are not scoped to a city.
+        """
+        self.connect()
+        if self.partitions is None:
+            assert self.connection is not None  # Type hint for IDE
+            yield self.connection
+            return
+        
+        for city in sorted(self.partitions):
+            yield self.connection_for(city)
+    
     def create_table(self):
         """
         Create the restaurants table with appropriate schema.
@@ -90,6 +365,10 @@ class DatabaseManager:
             online_order TEXT,
             book_table TEXT,
             rating_text TEXT,
+            rest_type TEXT,
+            dish_liked TEXT,
+            reviews_text TEXT,
+            dishes TEXT,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
         """
@@ -112,6 +391,11 @@ class DatabaseManager:
         cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_city ON {self.table_name} (city)")
         cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_price ON {self.table_name} (price_category)")
         cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_city_price ON {self.table_name} (city, price_category)")
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_city_cost ON {self.table_name} (city, average_cost_for_two)")
+        cursor.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_city_match ON {self.table_name} "
+            f"(city, ({MATCH_SCORE_EXPR}) DESC, aggregate_rating DESC, votes DESC, id)"
+        )
         self.connection.commit()
         logger.info("Database indexes created successfully")
     
@@ -128,11 +412,21 @@ class DatabaseManager:
         
         assert self.connection is not None  # Type hint for IDE
         
+        # Precomputed rankings, neighbours and dish postings describe the previous contents
+        self.connection.execute(f"DROP TABLE IF EXISTS {PRECOMPUTED_TABLE_NAME}")
+        self.connection.execute(f"DROP TABLE IF EXISTS {SIMILAR_TABLE_NAME}")
+        self.connection.execute(f"DROP TABLE IF EXISTS {DISH_INDEX_TABLE_NAME}")
+        
         # Drop table if replace mode
         if if_exists == 'replace':
             cursor = self.connection.cursor()
             cursor.execute(f"DROP TABLE IF EXISTS {self.table_name}")
+            # Metadata and partition routing describe the previous build
+            cursor.execute(f"DROP TABLE IF EXISTS {BUILD_METADATA_TABLE_NAME}")
+            cursor.execute(f"DROP TABLE IF EXISTS {PARTITION_MANIFEST_TABLE_NAME}")
             self.connection.commit()
+            self._close_partitions()
+            self.partitions = None
             self.create_table()
             self.create_indexes()
         
@@ -143,15 +437,8 @@ class DatabaseManager:
         logger.info(f"Inserting {len(data)} records into database...")
         
         # Filter columns to only include those that exist in our schema
-        allowed_columns = [
-            "name", "city", "cuisines", "average_cost_for_two", "aggregate_rating", 
-            "votes", "price_category", "popularity_score", "cuisine_diversity", 
-            "has_online_delivery", "has_table_booking", "is_popular", "address", 
-            "locality", "online_order", "book_table", "rating_text"
-        ]
-        
         # Get intersection of data keys and allowed columns from the first record
-        columns = [col for col in data[0].keys() if col in allowed_columns]
+        columns = [col for col in data[0].keys() if col in INSERTABLE_COLUMNS]
         if not columns:
             logger.error("No valid columns found in data to insert")
             return
@@ -183,10 +470,9 @@ class DatabaseManager:
         if not self.connection:
             self.connect()
         
-        assert self.connection is not None  # Type hint for IDE
-        cursor = self.connection.cursor()
-        cursor.execute(f"SELECT COUNT(*) FROM {self.table_name}")
-        count = cursor.fetchone()[0]
+        count = 0
+        for connection in self._scan_connections():
+            count += connection.execute(f"SELECT COUNT(*) FROM {self.table_name}").fetchone()[0]
         
         return count
     
@@ -200,6 +486,10 @@ class DatabaseManager:
         if not self.connection:
             self.connect()
         
+        if self.partitions is not None:
+            # One partition per city: the manifest is the city list
+            return sorted(self.partitions)
+        
         assert self.connection is not None  # Type hint for IDE
         cursor = self.connection.cursor()
         cursor.execute(f"SELECT DISTINCT city FROM {self.table_name} ORDER BY city")
@@ -217,17 +507,17 @@ class DatabaseManager:
         if not self.connection:
             self.connect()
         
-        assert self.connection is not None  # Type hint for IDE
-        cursor = self.connection.cursor()
-        cursor.execute(f"SELECT cuisines FROM {self.table_name}")
-        
         all_cuisines = set()
-        for row in cursor.fetchall():
-            cuisines_str = row[0]
-            if cuisines_str:
-                # Split by comma and add each cuisine to the set
-                parts = [c.strip() for c in cuisines_str.split(',') if c.strip()]
-                all_cuisines.update(parts)
+        for connection in self._scan_connections():
+            cursor = connection.cursor()
+            cursor.execute(f"SELECT cuisines FROM {self.table_name}")
+            
+            for row in cursor:
+                cuisines_str = row[0]
+                if cuisines_str:
+                    # Split by comma and add each cuisine to the set
+                    parts = [c.strip() for c in cuisines_str.split(',') if c.strip()]
+                    all_cuisines.update(parts)
         
         return sorted(list(all_cuisines))
     
@@ -244,13 +534,15 @@ class DatabaseManager:
         if not self.connection:
             self.connect()
         
-        assert self.connection is not None  # Type hint for IDE
-        cursor = self.connection.cursor()
-        cursor.execute(f"SELECT * FROM {self.table_name} LIMIT {limit}")
-        
-        # Convert rows to dictionaries
-        rows = cursor.fetchall()
-        data = [dict(row) for row in rows]
+        data: List[Dict[str, Any]] = []
+        for connection in self._scan_connections():
+            if len(data) >= limit:
+                break
+            cursor = connection.cursor()
+            cursor.execute(f"SELECT * FROM {self.table_name} LIMIT {limit - len(data)}")
+            
+            # Convert rows to dictionaries
+            data.extend(dict(row) for row in cursor.fetchall())
         
         return data
     
@@ -267,8 +559,7 @@ class DatabaseManager:
         if not self.connection:
             self.connect()
         
-        assert self.connection is not None  # Type hint for IDE
-        cursor = self.connection.cursor()
+        cursor = self.connection_for(city).cursor()
         cursor.execute(f"SELECT * FROM {self.table_name} WHERE city = ?", (city,))
         
         rows = cursor.fetchall()
@@ -290,8 +581,7 @@ class DatabaseManager:
         if not self.connection:
             self.connect()
         
-        assert self.connection is not None  # Type hint for IDE
-        cursor = self.connection.cursor()
+        cursor = self.connection_for(city).cursor()
         query = f"""
         SELECT * FROM {self.table_name} 
         WHERE city = ? AND price_category = ?
@@ -304,32 +594,574 @@ class DatabaseManager:
         
         return data
     
-    def get_database_stats(self) -> dict:
+    def _iter_rows(
+        self,
+        connection: sqlite3.Connection,
+        where: str,
+        params: Sequence[Any],
+        columns: Optional[Sequence[str]],
+        batch_size: int,
+        as_namedtuple: bool,
+        suffix: str = ""
+    ) -> Iterator[Tuple]:
         """
-        Get statistics about the database.
+        Run a projected query and stream it in pages of fetchmany(batch_size).
         
+        Args:
+            connection: Connection to run the query on
+            where: SQL WHERE clause (without the keyword), or an empty string
+            params: Query parameters
+            columns: Columns to select (defaults to every schema column)
+            batch_size: Number of rows fetched per page
+            as_namedtuple: Yield namedtuples instead of plain tuples
+            suffix: Trailing SQL such as ORDER BY or LIMIT
+            
         Returns:
-            Dictionary containing database statistics
+            Iterator over one tuple (or namedtuple) per row
+            
+        Raises:
+            ValueError: If a projected column is not part of the schema
         """
-        if not self.connection:
-            self.connect()
+        columns = tuple(columns or SCHEMA_COLUMNS)
+        unknown = [col for col in columns if col not in SCHEMA_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown columns in projection: {', '.join(unknown)}")
+        
+        query = f"SELECT {', '.join(columns)} FROM {self.table_name}"
+        if where:
+            query += f" WHERE {where}"
+        if suffix:
+            query += f" {suffix}"
+        
+        cursor = connection.cursor()
+        cursor.row_factory = None  # Plain tuples instead of sqlite3.Row
+        cursor.execute(query, tuple(params))
+        
+        make_row = _row_type(columns)._make if as_namedtuple else None
+        return _page_rows(cursor, batch_size, make_row)
+    
+    def iter_sample_data(
+        self,
+        limit: int = 10,
+        columns: Optional[Sequence[str]] = None,
+        batch_size: int = QUERY_BATCH_SIZE,
+        as_namedtuple: bool = False
+    ) -> Iterator[Tuple]:
+        """
+        Stream sample rows from the database.
+        
+        Args:
+            limit: Number of records to retrieve
+            columns: Columns to select (defaults to every schema column)
+            batch_size: Number of rows fetched per page
+            as_namedtuple: Yield namedtuples instead of plain tuples
+            
+        Returns:
+            Iterator over one tuple (or namedtuple) per row
+        """
+        connection = self.connect()
+        if self.partitions is None:
+            return self._iter_rows(connection, "", (), columns, batch_size, as_namedtuple, suffix=f"LIMIT {int(limit)}")
+        
+        # Partitioned: chain partitions lazily until the limit is reached
+        pages = (
+            self._iter_rows(connection, "", (), columns, batch_size, as_namedtuple, suffix=f"LIMIT {int(limit)}")
+            for connection in self._scan_connections()
+        )
+        return islice(chain.from_iterable(pages), int(limit))
+    
+    def iter_all(
+        self,
+        columns: Optional[Sequence[str]] = None,
+        batch_size: int = QUERY_BATCH_SIZE,
+        as_namedtuple: bool = False
+    ) -> Iterator[Tuple]:
+        """
+        Stream every restaurant in the database (all partitions) with constant memory.
+        
+        Args:
+            columns: Columns to select (defaults to every schema column)
+            batch_size: Number of rows fetched per page
+            as_namedtuple: Yield namedtuples instead of plain tuples
+            
+        Returns:
+            Iterator over one tuple (or namedtuple) per row
+        """
+        self.connect()
+        pages = (
+            self._iter_rows(connection, "", (), columns, batch_size, as_namedtuple)
+            for connection in self._scan_connections()
+        )
+        return chain.from_iterable(pages)
+    
+    def iter_by_city(
+        self,
+        city: str,
+        columns: Optional[Sequence[str]] = None,
+        batch_size: int = QUERY_BATCH_SIZE,
+        as_namedtuple: bool = False
+    ) -> Iterator[Tuple]:
+        """
+        Stream restaurants in a city with constant memory.
+        
+        Args:
+            city: City name
+            columns: Columns to select (defaults to every schema column)
+            batch_size: Number of rows fetched per page
+            as_namedtuple: Yield namedtuples instead of plain tuples
+            
+        Returns:
+            Iterator over one tuple (or namedtuple) per row
+        """
+        return self._iter_rows(self.connection_for(city), "city = ?", (city,), columns, batch_size, as_namedtuple)
+    
+    def iter_by_city_and_price(
+        self,
+        city: str,
+        price_category: str,
+        columns: Optional[Sequence[str]] = None,
+        batch_size: int = QUERY_BATCH_SIZE,
+        as_namedtuple: bool = False
+    ) -> Iterator[Tuple]:
+        """
+        Stream restaurants by city and price category, most popular first.
+        
+        Args:
+            city: City name
+            price_category: Price category (budget, mid-range, premium)
+            columns: Columns to select (defaults to every schema column)
+            batch_size: Number of rows fetched per page
+            as_namedtuple: Yield namedtuples instead of plain tuples
+            
+        Returns:
+            Iterator over one tuple (or namedtuple) per row
+        """
+        return self._iter_rows(
+            self.connection_for(city),
+            "city = ? AND price_category = ?",
+            (city, price_category),
+            columns,
+            batch_size,
+            as_namedtuple,
+            suffix="ORDER BY popularity_score DESC"
+        )
+    
+    def _partition_file(self, city: str) -> Path:
+        """
+        Get the partition file path for a city.
+        """
+        slug = re.sub(r'[^a-z0-9]+', '_', city.lower()).strip('_') or 'city'
+        digest = hashlib.sha1(city.encode('utf-8')).hexdigest()[:8]
+        return self.partition_dir / f"{slug}_{digest}.db"
+    
+    def _write_manifest_rows(self, rows: List[Tuple[str, Path, int, str]]):
+        """
+        Upsert partition manifest rows (city, path, record_count, build_id).
+        """
+        assert self.connection is not None  # Type hint for IDE
+        base_dir = Path(self.db_path).parent
+        cursor = self.connection.cursor()
+        cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS {PARTITION_MANIFEST_TABLE_NAME} (
+            city TEXT PRIMARY KEY,
+            path TEXT NOT NULL,
+            record_count INTEGER NOT NULL,
+            build_id TEXT NOT NULL,
+            built_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """)
+        cursor.executemany(
+            f"INSERT OR REPLACE INTO {PARTITION_MANIFEST_TABLE_NAME} (city, path, record_count, build_id) VALUES (?, ?, ?, ?)",
+            [(city, str(path.relative_to(base_dir)), count, build_id) for city, path, count, build_id in rows]
+        )
+        self.connection.commit()
+        self._load_partition_manifest()
+    
+    def build_partitions(self, data: List[Dict[str, Any]], workers: Optional[int] = PARTITION_BUILD_WORKERS) -> Dict[str, int]:
+        """
+        Store restaurants as one SQLite file per city, built in parallel.
+        
+        Each partition is written to a temporary file and moved into place
+        atomically, so readers never see a half-built partition. The main
+        database keeps an empty restaurants table plus the routing manifest.
         
+        Args:
+            data: List of dictionaries containing restaurant data
+            workers: Number of build processes (defaults to the CPU count)
+            
+        Returns:
+            Dictionary mapping each city to its record count
+        """
+        self.connect()
         assert self.connection is not None  # Type hint for IDE
+        
+        groups: Dict[str, List[Dict[str, Any]]] = {}
+        for item in data:
+            groups.setdefault(item['city'], []).append(item)
+        
+        logger.info(f"Building {len(groups)} partitions in {self.partition_dir}...")
+        self.partition_dir.mkdir(parents=True, exist_ok=True)
+        
+        # Main database: empty restaurants table, no manifest until the partitions are in place
+        self.insert_data([], if_exists='replace')
+        
+        build_id = uuid.uuid4().hex
+        manifest_rows = []
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                city: executor.submit(_write_partition, str(self._partition_file(city)), rows, build_id)
+                for city, rows in groups.items()
+            }
+            for city, future in futures.items():
+                manifest_rows.append((city, self._partition_file(city), future.result(), build_id))
+        
+        # Remove partitions of cities that are no longer in the data
+        live_files = {path for _, path, _, _ in manifest_rows}
+        for stale in self.partition_dir.glob("*.db"):
+            if stale not in live_files:
+                stale.unlink()
+        
+        self._write_manifest_rows(manifest_rows)
+        logger.info(f"Partitions built successfully (build id: {build_id})")
+        
+        return {city: count for city, _, count, _ in manifest_rows}
+    
+    def replace_partition(self, city: str, data: List[Dict[str, Any]]) -> int:
+        """
+        Rebuild a single city's partition without touching the others.
+        
+        The per-city tables derived from restaurants (precomputed
+        recommendations, similar restaurants, dish index) are rebuilt for the
+        new partition when the build had them, and the build metadata is
+        recomputed under a new build id, so caches keyed on the build id see the
+        change. An existing semantic index is rebuilt for the new build.
+        
+        Args:
+            city: City whose partition is replaced
+            data: Restaurants of that city
+            
+        Returns:
+            Number of records in the new partition
+        """
+        self.connect()
+        self.partition_dir.mkdir(parents=True, exist_ok=True)
+        derived = self._derived_tables(city)
+        
+        build_id = uuid.uuid4().hex
+        path = self._partition_file(city)
+        count = _write_partition(str(path), data, build_id)
+        self._write_manifest_rows([(city, path, count, build_id)])
+        
+        # Imported here because the builders import this module
+        if PRECOMPUTED_TABLE_NAME in derived:
+            from phase3.precomputed import build_precomputed_recommendations
+            build_precomputed_recommendations(self, workers=1, cities=[city])
+        if SIMILAR_TABLE_NAME in derived:
+            from phase3.similarity import build_similar_restaurants
+            build_similar_restaurants(self, workers=1, cities=[city])
+        if DISH_INDEX_TABLE_NAME in derived:
+            from phase3.dish_index import build_dish_index
+            build_dish_index(self, cities=[city])
+        
+        if self.get_build_id() is not None:
+            self.write_build_metadata()
+            # The semantic index spans every city and is tagged with the build
+            # id, so it is rebuilt whole
+            from phase3.semantic import build_semantic_index, semantic_index_path
+            if semantic_index_path(self.db_path).exists():
+                build_semantic_index(self)
+        logger.info(f"Partition for '{city}' replaced ({count} records)")
+        
+        return count
+    
+    def _derived_tables(self, city: str) -> set:
+        """
+        Names of the derived tables stored next to a city's restaurants (for a
+        city without a partition yet, next to any other city's).
+        """
+        if self.partitions and city not in self.partitions:
+            city = next(iter(self.partitions))
+        connection = self.connection_for(city)
+        names = {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        return names & {PRECOMPUTED_TABLE_NAME, SIMILAR_TABLE_NAME, DISH_INDEX_TABLE_NAME}
+    
+    def write_precomputed_recommendations(self, city: str, rows: List[Tuple[str, str, str, str, float, str]]):
+        """
+        Store materialized recommendations for one city next to its restaurants
+        (in its partition file when partitioned), replacing existing entries.
+        
+        Args:
+            city: City the rows belong to
+            rows: (city, price_category, price_bounds, cuisine, min_rating, entries)
+                tuples, where price_bounds is the JSON [lower, upper] cost range
+                the list was filtered with, cuisine is lower-cased ('' for any
+                cuisine) and entries is a JSON array of [restaurant id, match
+                score] pairs, best first
+        """
+        connection = self.connection_for(city)
+        connection.execute(f"""
+        CREATE TABLE IF NOT EXISTS {PRECOMPUTED_TABLE_NAME} (
+            city TEXT NOT NULL,
+            price_category TEXT NOT NULL,
+            price_bounds TEXT NOT NULL,
+            cuisine TEXT NOT NULL,
+            min_rating REAL NOT NULL,
+            entries TEXT NOT NULL,
+            PRIMARY KEY (city, price_category, cuisine, min_rating)
+        ) WITHOUT ROWID
+        """)
+        connection.executemany(
+            f"INSERT OR REPLACE INTO {PRECOMPUTED_TABLE_NAME} (city, price_category, price_bounds, cuisine, min_rating, entries) VALUES (?, ?, ?, ?, ?, ?)",
+            rows
+        )
+        connection.commit()
+    
+    def write_similar_restaurants(self, city: str, rows: List[Tuple[int, str]]):
+        """
+        Store the nearest neighbours of one city's restaurants next to them
+        (in its partition file when partitioned), replacing existing entries.
+        
+        Args:
+            city: City the restaurants belong to
+            rows: (restaurant id, neighbors) tuples, where neighbors is a JSON
+                array of [restaurant id, similarity] pairs, most similar first
+        """
+        connection = self.connection_for(city)
+        connection.execute(f"""
+        CREATE TABLE IF NOT EXISTS {SIMILAR_TABLE_NAME} (
+            id INTEGER PRIMARY KEY,
+            neighbors TEXT NOT NULL
+        )
+        """)
+        connection.executemany(f"INSERT OR REPLACE INTO {SIMILAR_TABLE_NAME} (id, neighbors) VALUES (?, ?)", rows)
+        connection.commit()
+    
+    def write_dish_index(self, city: str, rows: List[Tuple[str, int, bytes, bytes]]):
+        """
+        Store the dish postings of one city next to its restaurants (in its
+        partition file when partitioned), replacing existing entries.
+        
+        Args:
+            city: City the restaurants belong to
+            rows: (dish, restaurant count, postings, liked postings) tuples, where
+                postings are delta-encoded restaurant ids (see phase3/dish_index.py)
+        """
+        connection = self.connection_for(city)
+        connection.execute(f"""
+        CREATE TABLE IF NOT EXISTS {DISH_INDEX_TABLE_NAME} (
+            city TEXT NOT NULL,
+            dish TEXT NOT NULL,
+            restaurants INTEGER NOT NULL,
+            postings BLOB NOT NULL,
+            liked BLOB NOT NULL,
+            PRIMARY KEY (city, dish)
+        ) WITHOUT ROWID
+        """)
+        connection.execute(f"DELETE FROM {DISH_INDEX_TABLE_NAME} WHERE city = ?", (city,))
+        connection.executemany(
+            f"INSERT INTO {DISH_INDEX_TABLE_NAME} (city, dish, restaurants, postings, liked) VALUES (?, ?, ?, ?, ?)",
+            [(city,) + tuple(row) for row in rows]
+        )
+        connection.commit()
+    
+    def _compute_database_stats(self) -> Dict[str, Any]:
+        """
+        Compute database statistics by scanning the restaurants table.
+        
+        Returns:
+            Dictionary with counts and distributions
+        """
         stats: Dict[str, Any] = {
             "total_records": self.get_record_count(),
             "cities": len(self.get_cities()),
-            "cuisines": len(self.get_cuisines()),
-            "database_size_mb": self.db_path.stat().st_size / (1024 * 1024) if self.db_path.exists() else 0
+            "cuisines": len(self.get_cuisines())
         }
         
-        # Get price category distribution
+        # Get price category and city distributions
+        price_distribution: Counter = Counter()
+        city_distribution: Counter = Counter()
+        for connection in self._scan_connections():
+            cursor = connection.cursor()
+            cursor.execute(f"SELECT price_category, COUNT(*) FROM {self.table_name} GROUP BY price_category")
+            price_distribution.update(dict(cursor.fetchall()))
+            cursor.execute(f"SELECT city, COUNT(*) FROM {self.table_name} GROUP BY city")
+            city_distribution.update(dict(cursor.fetchall()))
+        stats["price_distribution"] = dict(price_distribution)
+        stats["city_distribution"] = dict(city_distribution)
+        
+        return stats
+    
+    def write_build_metadata(self, build_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Compute statistics once and store them in the build metadata table.
+        Called by the Phase 1 pipeline after every build.
+        
+        Args:
+            build_id: Identifier for this build (a new UUID if omitted)
+            
+        Returns:
+            Dictionary with the stored metadata
+        """
+        if not self.connection:
+            self.connect()
+        
+        assert self.connection is not None  # Type hint for IDE
+        metadata = self._compute_database_stats()
+        metadata["build_id"] = build_id or uuid.uuid4().hex
+        metadata["built_at"] = datetime.now(timezone.utc).isoformat()
+        
         cursor = self.connection.cursor()
-        cursor.execute(f"SELECT price_category, COUNT(*) FROM {self.table_name} GROUP BY price_category")
-        stats["price_distribution"] = dict(cursor.fetchall())
+        cursor.execute(f"DROP TABLE IF EXISTS {BUILD_METADATA_TABLE_NAME}")
+        cursor.execute(f"CREATE TABLE {BUILD_METADATA_TABLE_NAME} (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        cursor.executemany(
+            f"INSERT INTO {BUILD_METADATA_TABLE_NAME} (key, value) VALUES (?, ?)",
+            [(key, json.dumps(value)) for key, value in metadata.items()]
+        )
+        self.connection.commit()
+        logger.info(f"Build metadata written (build id: {metadata['build_id']})")
+        
+        return metadata
+    
+    def get_build_metadata(self) -> Optional[Dict[str, Any]]:
+        """
+        Read the metadata stored by the last build.
+        
+        Returns:
+            Dictionary of metadata, or None if the database has none
+        """
+        if not self.connection:
+            self.connect()
+        
+        assert self.connection is not None  # Type hint for IDE
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(f"SELECT key, value FROM {BUILD_METADATA_TABLE_NAME}")
+        except sqlite3.OperationalError:
+            return None
+        
+        metadata = {key: json.loads(value) for key, value in cursor.fetchall()}
+        return metadata or None
+    
+    def get_build_id(self) -> Optional[str]:
+        """
+        Get the identifier of the last build.
+        
+        Returns:
+            Build id, or None if the database has no build metadata
+        """
+        metadata = self.get_build_metadata()
+        return metadata.get("build_id") if metadata else None
+    
+    def get_database_stats(self) -> dict:
+        """
+        Get statistics about the database.
+        
+        Served from the build metadata table when present (a handful of rows,
+        independent of table size); falls back to scanning the table otherwise.
+        
+        Returns:
+            Dictionary containing database statistics
+        """
+        if not self.connection:
+            self.connect()
+        
+        assert self.connection is not None  # Type hint for IDE
+        stats: Dict[str, Any] = self.get_build_metadata() or self._compute_database_stats()
+        stats["database_size_mb"] = self.db_path.stat().st_size / (1024 * 1024) if self.db_path.exists() else 0
         
         return stats
 
 
+def _write_partition(path: str, data: List[Dict[str, Any]], build_id: str) -> int:
+    """
+    Write one partition file (runs in a build worker process).
+    
+    Args:
+        path: Final path of the partition file
+        data: Restaurants stored in the partition
+        build_id: Build id recorded in the partition's metadata
+        
+    Returns:
+        Number of records written
+    """
+    tmp_path = Path(path + ".tmp")
+    if tmp_path.exists():
+        tmp_path.unlink()
+    
+    db_manager = DatabaseManager(db_path=tmp_path)
+    db_manager.connect()
+    db_manager.insert_data(data, if_exists='replace')
+    db_manager.write_build_metadata(build_id)
+    db_manager.close()
+    
+    os.replace(tmp_path, path)
+    return len(data)
+
+
+class ConnectionPool:
+    """
+    Bounded pool of connected DatabaseManager instances.
+    Each manager is used by one thread at a time, so its connection (and its
+    SQLite statement cache) is reused across requests instead of reopened.
+    """
+    
+    def __init__(self, db_path: Path = DATABASE_PATH, serving_mode: str = "file", size: int = 4):
+        """
+        Initialize the ConnectionPool.
+        
+        Args:
+            db_path: Path to the SQLite database file
+            serving_mode: Serving mode of the pooled managers
+            size: Maximum number of open connections
+        """
+        self.db_path = db_path
+        self.serving_mode = serving_mode
+        self.size = size
+        self._idle: "queue.LifoQueue[DatabaseManager]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+    
+    @contextmanager
+    def acquire(self) -> Iterator[DatabaseManager]:
+        """
+        Borrow a connected DatabaseManager, blocking while all are in use.
+        
+        Yields:
+            A connected DatabaseManager
+        """
+        self._slots.acquire()
+        try:
+            try:
+                db_manager = self._idle.get_nowait()
+            except queue.Empty:
+                db_manager = DatabaseManager(
+                    db_path=self.db_path,
+                    serving_mode=self.serving_mode,
+                    check_same_thread=False
+                )
+            
+            try:
+                db_manager.connect()
+                yield db_manager
+            except sqlite3.Error:
+                # Drop connections that hit a database error instead of reusing them
+                db_manager.close()
+                raise
+            finally:
+                self._idle.put(db_manager)
+        finally:
+            self._slots.release()
+    
+    def close(self):
+        """
+        Close every idle connection in the pool.
+        """
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
 def main():
     """
     Main function to demonstrate database setup.
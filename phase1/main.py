@@ -10,7 +10,14 @@ from phase1.data_loader import DataLoader
 from phase1.data_cleaner import DataCleaner
 from phase1.feature_engineer import FeatureEngineer
 from phase1.database_setup import DatabaseManager
-from phase1.config import PROCESSED_DATA_DIR
+from phase1.config import (
+    PROCESSED_DATA_DIR, DATABASE_PARTITIONED, PRECOMPUTE_RECOMMENDATIONS, BUILD_SIMILAR_RESTAURANTS,
+    BUILD_DISH_INDEX, BUILD_SEMANTIC_INDEX
+)
+from phase3.dish_index import build_dish_index
+from phase3.precomputed import build_precomputed_recommendations
+from phase3.semantic import build_semantic_index
+from phase3.similarity import build_similar_restaurants
 
 # Set up logging
 logging.basicConfig(
@@ -36,32 +43,45 @@ class Phase1Pipeline:
         self.db_manager = DatabaseManager()
         self.processed_data = None
     
-    def run(self, save_intermediate: bool = True):
+    def run(
+        self,
+        save_intermediate: bool = True,
+        partitioned: bool = DATABASE_PARTITIONED,
+        precompute: bool = PRECOMPUTE_RECOMMENDATIONS,
+        similar: bool = BUILD_SIMILAR_RESTAURANTS,
+        dishes: bool = BUILD_DISH_INDEX,
+        semantic: bool = BUILD_SEMANTIC_INDEX
+    ):
         """
         Run the complete Phase 1 pipeline.
         
         Args:
             save_intermediate: Whether to save intermediate processed data to CSV
+            partitioned: Store each city in its own partition file, built in parallel
+            precompute: Materialize top-k recommendations for every locality x price x cuisine
+            similar: Store the nearest neighbours of every restaurant ("more like this")
+            dishes: Store the dish -> restaurants posting lists used by dish requests
+            semantic: Build the offline semantic search index next to the database
         """
         logger.info("=" * 80)
         logger.info("Starting Phase 1 Pipeline: Zomato Data Input and Processing")
         logger.info("=" * 80)
         
         # Step 1: Load data
-        logger.info("\n[STEP 1/5] Loading dataset from Hugging Face...")
+        logger.info("\n[STEP 1/9] Loading dataset from Hugging Face...")
         self.loader.load_dataset()
         data = self.loader.to_list()
         logger.info(f"✓ Dataset loaded: {len(data)} records")
         
         # Step 2: Clean data
-        logger.info("\n[STEP 2/5] Cleaning data...")
+        logger.info("\n[STEP 2/9] Cleaning data...")
         self.cleaner = DataCleaner(data)
         cleaned_data = self.cleaner.clean()
         cleaning_report = self.cleaner.get_cleaning_report()
         logger.info(f"✓ Data cleaned: {cleaning_report}")
         
         # Step 3: Engineer features
-        logger.info("\n[STEP 3/5] Engineering features...")
+        logger.info("\n[STEP 3/9] Engineering features...")
         self.engineer = FeatureEngineer(cleaned_data)
         processed_data = self.engineer.engineer_features()
         feature_summary = self.engineer.get_feature_summary()
@@ -71,17 +91,54 @@ class Phase1Pipeline:
         
         # Step 4: Save processed data (optional)
         if save_intermediate:
-            logger.info("\n[STEP 4/5] Saving processed data...")
+            logger.info("\n[STEP 4/9] Saving processed data...")
             processed_file = PROCESSED_DATA_DIR / "processed_restaurants.csv"
             self._save_to_csv(processed_data, processed_file)
             logger.info(f"✓ Processed data saved to: {processed_file}")
         else:
-            logger.info("\n[STEP 4/5] Skipping intermediate save...")
+            logger.info("\n[STEP 4/9] Skipping intermediate save...")
         
         # Step 5: Store in database
-        logger.info("\n[STEP 5/5] Storing data in database...")
+        logger.info("\n[STEP 5/9] Storing data in database...")
         self.db_manager.connect()
-        self.db_manager.insert_data(processed_data, if_exists='replace')
+        if partitioned:
+            self.db_manager.build_partitions(processed_data)
+        else:
+            self.db_manager.insert_data(processed_data, if_exists='replace')
+        
+        # Step 6: Precompute recommendations (before the build metadata, so the
+        # build id is only published once the database is complete)
+        if precompute:
+            logger.info("\n[STEP 6/9] Precomputing recommendations...")
+            combinations = build_precomputed_recommendations(self.db_manager)
+            logger.info(f"✓ Precomputed {combinations} recommendation lists")
+        else:
+            logger.info("\n[STEP 6/9] Skipping recommendation precomputation...")
+        
+        # Step 7: Similar restaurants (also part of the build before its id is published)
+        if similar:
+            logger.info("\n[STEP 7/9] Computing similar restaurants...")
+            restaurants = build_similar_restaurants(self.db_manager)
+            logger.info(f"✓ Stored similar restaurants for {restaurants} restaurants")
+        else:
+            logger.info("\n[STEP 7/9] Skipping similar restaurants...")
+        
+        # Step 8: Dish index (also published with the build id)
+        if dishes:
+            logger.info("\n[STEP 8/9] Building dish index...")
+            posting_lists = build_dish_index(self.db_manager)
+            logger.info(f"✓ Stored {posting_lists} dish posting lists")
+        else:
+            logger.info("\n[STEP 8/9] Skipping dish index...")
+        self.db_manager.write_build_metadata()
+        
+        # Step 9: Semantic search index (a separate file, tagged with the build id just written)
+        if semantic:
+            logger.info("\n[STEP 9/9] Building semantic search index...")
+            indexed = build_semantic_index(self.db_manager)
+            logger.info(f"✓ Semantic index built for {indexed} restaurants")
+        else:
+            logger.info("\n[STEP 9/9] Skipping semantic search index...")
         
         db_stats = self.db_manager.get_database_stats()
         logger.info(f"✓ Data stored in database: {db_stats}")
@@ -93,7 +150,8 @@ class Phase1Pipeline:
         logger.info("Phase 1 Pipeline Completed Successfully!")
         logger.info("=" * 80)
         logger.info(f"Total records processed: {len(processed_data)}")
-        logger.info(f"Total cities: {db_stats.get('total_cities', 'N/A')}")
+        logger.info(f"Total cities: {db_stats.get('cities', 'N/A')}")
+        logger.info(f"Build id: {db_stats.get('build_id', 'N/A')}")
         logger.info(f"Database location: {self.db_manager.db_path}")
         logger.info("=" * 80)
         
@@ -4,7 +4,7 @@ Unit tests for DataCleaner module - Simplified Version (No Pandas)
 
 import unittest
 
-from phase1.data_cleaner import DataCleaner
+from phase1.data_cleaner import DataCleaner, normalize_dish
 
 
 class TestDataCleaner(unittest.TestCase):
@@ -62,6 +62,39 @@ class TestDataCleaner(unittest.TestCase):
         self.assertIn('Delhi', cities)
         self.assertNotIn('delhi', cities)
     
+    def test_extract_review_text(self):
+        """
+        Test that reviews_list is reduced to plain, truncated review text
+        """
+        data = [
+            {'name': 'A', 'city': 'Hsr', 'reviews_list': "[('Rated 4.0', 'RATED\\n  Rooftop seating and live music.'), ('Rated 3.0', 'RATED\\n  Slow service')]"},
+            {'name': 'B', 'city': 'Hsr', 'reviews_list': "not a list"},
+            {'name': 'C', 'city': 'Hsr', 'reviews_list': "[]"}
+        ]
+        result = DataCleaner(data).extract_review_text()
+        
+        self.assertEqual(result[0]['reviews_text'], "Rooftop seating and live music. Slow service")
+        self.assertEqual(result[1]['reviews_text'], "not a list")
+        self.assertEqual(result[2]['reviews_text'], "")
+        self.assertNotIn('reviews_list', result[0])
+    
+    def test_extract_dishes(self):
+        """
+        Test that liked dishes and menu items are merged into normalized, distinct dishes
+        """
+        data = [
+            {'name': 'A', 'city': 'Btm', 'dish_liked': 'Chicken Biryani, Kebabs', 'menu_item': "['Chicken  Biryani', 'Mutton-Biryani', 'Raita']"},
+            {'name': 'B', 'city': 'Btm', 'dish_liked': None, 'menu_item': "[]"},
+            {'name': 'C', 'city': 'Btm', 'dish_liked': 'Dosa', 'menu_item': "not a list"}
+        ]
+        result = DataCleaner(data).extract_dishes()
+        
+        self.assertEqual(result[0]['dishes'], "chicken biryani, kebabs, mutton biryani, raita")
+        self.assertEqual(result[1]['dishes'], "")
+        self.assertEqual(result[2]['dishes'], "dosa")
+        self.assertNotIn('menu_item', result[0])
+        self.assertEqual(normalize_dish("  Paneer Tikka (Half)! "), "paneer tikka half")
+    
     def test_remove_invalid_entries(self):
         """
         Test removal of invalid entries
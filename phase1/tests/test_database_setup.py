@@ -8,7 +8,7 @@ from pathlib import Path
 import tempfile
 import os
 
-from phase1.database_setup import DatabaseManager
+from phase1.database_setup import DatabaseManager, ConnectionPool
 
 
 class TestDatabaseManager(unittest.TestCase):
@@ -172,6 +172,54 @@ class TestDatabaseManager(unittest.TestCase):
         self.assertEqual(len(results), 1)
         self.assertEqual(results[0]['name'], 'Restaurant A')
     
+    def test_iter_by_city_projection(self):
+        """
+        Test streaming a projected city query as plain tuples
+        """
+        self.db_manager.connect()
+        self.db_manager.insert_data(self.sample_data)
+        
+        rows = list(self.db_manager.iter_by_city('Mumbai', columns=['name', 'votes'], batch_size=1))
+        
+        self.assertEqual(sorted(rows), [('Restaurant A', 100), ('Restaurant C', 200)])
+    
+    def test_iter_by_city_and_price_namedtuples(self):
+        """
+        Test streaming rows as namedtuples
+        """
+        self.db_manager.connect()
+        self.db_manager.insert_data(self.sample_data)
+        
+        rows = list(self.db_manager.iter_by_city_and_price(
+            'Mumbai', 'budget', columns=('name', 'aggregate_rating'), as_namedtuple=True
+        ))
+        
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0].name, 'Restaurant A')
+        self.assertEqual(rows[0].aggregate_rating, 4.5)
+    
+    def test_iter_sample_data_limit(self):
+        """
+        Test streaming a limited sample with every column
+        """
+        self.db_manager.connect()
+        self.db_manager.insert_data(self.sample_data)
+        
+        rows = list(self.db_manager.iter_sample_data(limit=2))
+        
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(len(rows[0]), len(self.db_manager.get_sample_data(limit=1)[0]))
+    
+    def test_iter_rejects_unknown_columns(self):
+        """
+        Test that projections are restricted to schema columns
+        """
+        self.db_manager.connect()
+        self.db_manager.insert_data(self.sample_data)
+        
+        with self.assertRaises(ValueError):
+            self.db_manager.iter_by_city('Mumbai', columns=['name', 'votes; DROP TABLE restaurants'])
+    
     def test_get_database_stats(self):
         """
         Test getting database statistics
@@ -188,6 +236,41 @@ class TestDatabaseManager(unittest.TestCase):
         self.assertIn('price_distribution', stats)
         self.assertEqual(stats['total_records'], 3)
     
+    def test_build_metadata_serves_stats(self):
+        """
+        Test that stats come from build metadata once it is written
+        """
+        self.db_manager.connect()
+        self.db_manager.insert_data(self.sample_data)
+        metadata = self.db_manager.write_build_metadata(build_id='build-1')
+        
+        self.assertEqual(metadata['total_records'], 3)
+        self.assertEqual(metadata['price_distribution'], {'budget': 1, 'mid-range': 1, 'premium': 1})
+        self.assertEqual(metadata['city_distribution'], {'Mumbai': 2, 'Delhi': 1})
+        
+        # Stats are read from the metadata table, not recomputed from the data
+        self.db_manager.connection.execute(f"DELETE FROM {self.db_manager.table_name}")
+        stats = self.db_manager.get_database_stats()
+        self.assertEqual(stats['total_records'], 3)
+        self.assertEqual(stats['cities'], 2)
+        self.assertEqual(stats['build_id'], 'build-1')
+        self.assertIn('built_at', stats)
+        self.assertIn('database_size_mb', stats)
+    
+    def test_replace_clears_build_metadata(self):
+        """
+        Test that replacing the data invalidates the previous build metadata
+        """
+        self.db_manager.connect()
+        self.db_manager.insert_data(self.sample_data)
+        self.db_manager.write_build_metadata()
+        self.assertIsNotNone(self.db_manager.get_build_id())
+        
+        self.db_manager.insert_data(self.sample_data[:1], if_exists='replace')
+        
+        self.assertIsNone(self.db_manager.get_build_id())
+        self.assertEqual(self.db_manager.get_database_stats()['total_records'], 1)
+    
     def test_close_connection(self):
         """
         Test closing database connection
@@ -258,5 +341,230 @@ class TestDatabaseManagerEdgeCases(unittest.TestCase):
         self.assertEqual(len(results), 0)
 
 
+
+class TestDatabaseServingModes(unittest.TestCase):
+    """
+    Test the read-only serving modes of DatabaseManager
+    """
+    
+    def setUp(self):
+        """
+        Build a small database file to serve from
+        """
+        self.temp_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
+        self.temp_db_path = Path(self.temp_db.name)
+        self.temp_db.close()
+        
+        builder = DatabaseManager(db_path=self.temp_db_path)
+        builder.connect()
+        builder.insert_data([
+            {'name': 'Restaurant A', 'city': 'Mumbai', 'cuisines': 'Italian', 'average_cost_for_two': 500, 'aggregate_rating': 4.5, 'votes': 100, 'price_category': 'mid-range'},
+            {'name': 'Restaurant B', 'city': 'Delhi', 'cuisines': 'Indian', 'average_cost_for_two': 300, 'aggregate_rating': 3.8, 'votes': 50, 'price_category': 'budget'}
+        ])
+        builder.close()
+    
+    def tearDown(self):
+        """
+        Clean up
+        """
+        if self.temp_db_path.exists():
+            os.unlink(self.temp_db_path)
+    
+    def test_invalid_serving_mode(self):
+        """
+        Test that unknown serving modes are rejected
+        """
+        with self.assertRaises(ValueError):
+            DatabaseManager(db_path=self.temp_db_path, serving_mode='replica')
+    
+    def test_immutable_mode_reads(self):
+        """
+        Test that immutable mode serves reads and rejects writes
+        """
+        db_manager = DatabaseManager(db_path=self.temp_db_path, serving_mode='immutable')
+        db_manager.connect()
+        
+        self.assertEqual(db_manager.get_record_count(), 2)
+        self.assertEqual(len(db_manager.query_by_city('Mumbai')), 1)
+        with self.assertRaises(sqlite3.OperationalError):
+            db_manager.connection.execute(f"DELETE FROM {db_manager.table_name}")
+        
+        db_manager.close()
+    
+    def test_memory_mode_survives_reconnect(self):
+        """
+        Test that the in-memory copy outlives individual connections
+        """
+        db_manager = DatabaseManager(db_path=self.temp_db_path, serving_mode='memory')
+        db_manager.connect()
+        self.assertEqual(db_manager.get_record_count(), 2)
+        db_manager.close()
+        
+        db_manager.connect()
+        self.assertEqual(db_manager.get_cities(), ['Delhi', 'Mumbai'])
+        db_manager.close()
+    
+    def test_memory_mode_reloads_after_rebuild(self):
+        """
+        Test that a rebuilt database file replaces the in-memory copy
+        """
+        db_manager = DatabaseManager(db_path=self.temp_db_path, serving_mode='memory')
+        db_manager.connect()
+        self.assertEqual(db_manager.get_record_count(), 2)
+        db_manager.close()
+        
+        builder = DatabaseManager(db_path=self.temp_db_path)
+        builder.connect()
+        builder.insert_data([
+            {'name': 'Restaurant C', 'city': 'Pune', 'cuisines': 'Cafe', 'average_cost_for_two': 800, 'aggregate_rating': 4.0, 'votes': 10, 'price_category': 'mid-range'}
+        ])
+        builder.close()
+        
+        db_manager.connect()
+        self.assertEqual(db_manager.get_cities(), ['Pune'])
+        db_manager.close()
+    
+    def test_connection_pool_reuses_connections(self):
+        """
+        Test that the pool hands back the same open connection
+        """
+        pool = ConnectionPool(db_path=self.temp_db_path, serving_mode='immutable', size=2)
+        
+        with pool.acquire() as first:
+            first_connection = first.connection
+            self.assertEqual(first.get_record_count(), 2)
+        with pool.acquire() as second:
+            self.assertIs(second.connection, first_connection)
+        
+        pool.close()
+        self.assertIsNone(first.connection)
+
+    def test_connection_pool_reopens_after_rebuild(self):
+        """
+        Test that pooled connections serve a database rebuilt in place under them
+        """
+        for serving_mode in ('immutable', 'memory'):
+            pool = ConnectionPool(db_path=self.temp_db_path, serving_mode=serving_mode, size=2)
+            with pool.acquire() as db_manager:
+                self.assertEqual(db_manager.get_cities(), ['Delhi', 'Mumbai'])
+                stale_connection = db_manager.connection
+
+            builder = DatabaseManager(db_path=self.temp_db_path)
+            builder.connect()
+            builder.insert_data([
+                {'name': f'Restaurant {i}', 'city': 'Pune', 'cuisines': 'Cafe', 'average_cost_for_two': 800, 'aggregate_rating': 4.0, 'votes': i, 'price_category': 'mid-range'}
+                for i in range(500)
+            ])
+            builder.write_build_metadata()
+            builder.close()
+
+            with pool.acquire() as db_manager:
+                self.assertIsNot(db_manager.connection, stale_connection)
+                self.assertEqual(db_manager.get_cities(), ['Pune'])
+                self.assertEqual(db_manager.get_record_count(), 500)
+                self.assertEqual(db_manager.get_build_metadata()['total_records'], 500)
+            pool.close()
+
+            # Restore the original contents for the next serving mode
+            builder.connect()
+            builder.insert_data([
+                {'name': 'Restaurant A', 'city': 'Mumbai', 'cuisines': 'Italian', 'average_cost_for_two': 500, 'aggregate_rating': 4.5, 'votes': 100, 'price_category': 'mid-range'},
+                {'name': 'Restaurant B', 'city': 'Delhi', 'cuisines': 'Indian', 'average_cost_for_two': 300, 'aggregate_rating': 3.8, 'votes': 50, 'price_category': 'budget'}
+            ])
+            builder.close()
+
+
+class TestPartitionedStorage(unittest.TestCase):
+    """
+    Test per-city partitioned storage and query routing
+    """
+    
+    def setUp(self):
+        """
+        Build a partitioned database in a temporary directory
+        """
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.temp_dir.name) / 'zomato.db'
+        self.db_manager = DatabaseManager(db_path=self.db_path)
+        self.sample_data = [
+            {'name': 'Restaurant A', 'city': 'Mumbai', 'cuisines': 'Italian', 'average_cost_for_two': 500, 'aggregate_rating': 4.5, 'votes': 100, 'price_category': 'mid-range'},
+            {'name': 'Restaurant B', 'city': 'Delhi', 'cuisines': 'Indian, Chinese', 'average_cost_for_two': 300, 'aggregate_rating': 3.8, 'votes': 50, 'price_category': 'budget'},
+            {'name': 'Restaurant C', 'city': 'Mumbai', 'cuisines': 'Chinese', 'average_cost_for_two': 1500, 'aggregate_rating': 4.2, 'votes': 200, 'price_category': 'premium'}
+        ]
+        self.db_manager.connect()
+        self.counts = self.db_manager.build_partitions(self.sample_data, workers=2)
+    
+    def tearDown(self):
+        """
+        Clean up
+        """
+        self.db_manager.close()
+        self.temp_dir.cleanup()
+    
+    def test_build_creates_one_file_per_city(self):
+        """
+        Test that each city gets its own partition file
+        """
+        self.assertEqual(self.counts, {'Mumbai': 2, 'Delhi': 1})
+        self.assertTrue(self.db_manager.is_partitioned)
+        self.assertEqual(len(list(self.db_manager.partition_dir.glob('*.db'))), 2)
+    
+    def test_queries_are_routed_to_partitions(self):
+        """
+        Test that city-scoped queries only see their partition
+        """
+        self.assertEqual(len(self.db_manager.query_by_city('Mumbai')), 2)
+        self.assertEqual(self.db_manager.query_by_city_and_price('Delhi', 'budget')[0]['name'], 'Restaurant B')
+        self.assertEqual(list(self.db_manager.iter_by_city('Delhi', columns=['name'])), [('Restaurant B',)])
+        self.assertEqual(self.db_manager.query_by_city('Pune'), [])
+        
+        mumbai_connection = self.db_manager.connection_for('Mumbai')
+        self.assertIsNot(mumbai_connection, self.db_manager.connection_for('Delhi'))
+        self.assertIs(mumbai_connection, self.db_manager.connection_for('Mumbai'))
+    
+    def test_whole_database_queries_span_partitions(self):
+        """
+        Test that counts, cities, cuisines and stats cover every partition
+        """
+        self.assertEqual(self.db_manager.get_record_count(), 3)
+        self.assertEqual(self.db_manager.get_cities(), ['Delhi', 'Mumbai'])
+        self.assertEqual(self.db_manager.get_cuisines(), ['Chinese', 'Indian', 'Italian'])
+        self.assertEqual(len(self.db_manager.get_sample_data(limit=2)), 2)
+        self.assertEqual(len(list(self.db_manager.iter_sample_data(limit=3))), 3)
+        
+        stats = self.db_manager.write_build_metadata()
+        self.assertEqual(stats['city_distribution'], {'Mumbai': 2, 'Delhi': 1})
+    
+    def test_replace_partition_is_independent(self):
+        """
+        Test that one partition can be replaced while readers stay connected
+        """
+        build_id = self.db_manager.write_build_metadata()['build_id']
+        reader = DatabaseManager(db_path=self.db_path, serving_mode='immutable')
+        self.assertEqual(len(reader.query_by_city('Mumbai')), 2)
+        delhi_connection = reader.connection_for('Delhi')
+        
+        self.db_manager.replace_partition('Mumbai', [
+            {'name': 'Restaurant D', 'city': 'Mumbai', 'cuisines': 'Cafe', 'average_cost_for_two': 400, 'aggregate_rating': 4.0, 'votes': 20, 'price_category': 'budget'}
+        ])
+        
+        self.assertEqual([r['name'] for r in reader.query_by_city('Mumbai')], ['Restaurant D'])
+        self.assertIs(reader.connection_for('Delhi'), delhi_connection)
+        
+        stats = reader.get_database_stats()
+        self.assertEqual(stats['total_records'], 2)
+        self.assertEqual(stats['city_distribution'], {'Mumbai': 1, 'Delhi': 1})
+        self.assertNotEqual(stats['build_id'], build_id)
+        reader.close()
+    
+    def test_unpartitioned_rebuild_drops_routing(self):
+        """
+        Test that a regular insert replaces the partitioned layout
+        """
+        self.db_manager.insert_data(self.sample_data[:1], if_exists='replace')
+        
+        self.assertFalse(self.db_manager.is_partitioned)
+        self.assertEqual(self.db_manager.get_cities(), ['Mumbai'])
+
 if __name__ == '__main__':
     unittest.main()
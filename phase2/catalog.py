@@ -0,0 +1,126 @@
+"""
+Catalog cache for Phase 2 - User Input
+Holds the cities and cuisines of the current database build, shared by every
+InputValidator in the process and reloaded only when the database changes.
+"""
+
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from phase1.database_setup import DatabaseManager
+from phase2.fuzzy_index import FuzzyIndex
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class Catalog:
+    """
+    Immutable snapshot of the valid cities and cuisines for one database build.
+    """
+    
+    def __init__(self, cities: List[str], cuisines: List[str], stamp: Optional[Tuple[int, int]], build_id: Optional[str] = None):
+        """
+        Initialize the Catalog.
+        
+        Args:
+            cities: Sorted list of city (locality) names
+            cuisines: Sorted list of cuisine names
+            stamp: (mtime_ns, size) of the database file the catalog was loaded from
+            build_id: Build id from the database metadata, if any
+        """
+        self.cities = cities
+        self.cuisines = cuisines
+        self.city_set: FrozenSet[str] = frozenset(cities)
+        self.city_index = FuzzyIndex(cities)
+        self.cuisine_index = FuzzyIndex(cuisines)
+        self.stamp = stamp
+        self.build_id = build_id
+
+
+_catalogs: Dict[str, Catalog] = {}
+_catalog_lock = threading.Lock()
+
+
+def database_stamp(db_manager: DatabaseManager) -> Optional[Tuple[int, int]]:
+    """
+    Cheap change detector for a database: (mtime_ns, size) of its main file.
+    Every build (and every partition replacement) rewrites the main file.
+    """
+    path = db_manager.db_path
+    if not isinstance(path, (str, Path)):
+        return None
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _load_catalog(db_manager: DatabaseManager, stamp: Optional[Tuple[int, int]]) -> Catalog:
+    """
+    Load cities and cuisines from the database.
+    """
+    try:
+        db_manager.connect()
+        try:
+            catalog = Catalog(
+                cities=db_manager.get_cities(),
+                cuisines=db_manager.get_cuisines(),
+                stamp=stamp,
+                build_id=db_manager.get_build_id()
+            )
+        finally:
+            db_manager.close()
+        logger.info(f"Loaded {len(catalog.cities)} cities and {len(catalog.cuisines)} cuisines from database")
+        return catalog
+    except Exception as e:
+        logger.error(f"Failed to load data from database: {e}")
+        return Catalog(cities=[], cuisines=[], stamp=stamp)
+
+
+def get_catalog(db_manager: DatabaseManager, current: Optional[Catalog] = None) -> Catalog:
+    """
+    Get the process-wide catalog for a database, reloading it lazily when the
+    database file has changed since it was loaded.
+    
+    Databases without a file on disk (e.g. test doubles) have no stamp and are
+    never shared; the caller's own catalog is reused instead.
+    
+    Args:
+        db_manager: DatabaseManager of the database to read
+        current: Catalog the caller already holds, if any
+        
+    Returns:
+        The current Catalog
+    """
+    stamp = database_stamp(db_manager)
+    if stamp is None:
+        if current is not None and current.stamp is None:
+            return current
+        return _load_catalog(db_manager, stamp)
+    
+    key = str(db_manager.db_path)
+    catalog = _catalogs.get(key)
+    if catalog is not None and catalog.stamp == stamp:
+        return catalog
+    
+    with _catalog_lock:
+        # Another thread may have reloaded while we waited
+        catalog = _catalogs.get(key)
+        if catalog is None or catalog.stamp != stamp:
+            catalog = _load_catalog(db_manager, stamp)
+            _catalogs[key] = catalog
+        return catalog
+
+
+def clear_catalog_cache():
+    """
+    Drop every cached catalog (forces a reload on next use).
+    """
+    with _catalog_lock:
+        _catalogs.clear()
@@ -80,25 +80,20 @@ class CommandLineInterface:
             
             price_input = input("\nEnter Option (1-3), Category Name, or Budget Amount: ").strip().lower()
             
-            # Map input to category
+            # Map input to category or numeric budget
             price_range = price_input
+            max_cost = None
             
             # Case 1: Numbered Selection (1, 2, 3)
             if price_input in ['1', '2', '3']:
                 price_range = categories[int(price_input) - 1]
                 print(f"Selected: {price_range}")
             
-            # Case 2: Numeric Budget Amount (e.g., 559)
+            # Case 2: Numeric Budget Amount (e.g., 559), used as a cost ceiling
             elif price_input.replace('.', '', 1).isdigit():
-                budget_amount = float(price_input)
-                for cat, (min_p, max_p) in PRICE_CATEGORIES.items():
-                    if min_p <= budget_amount < max_p:
-                        price_range = cat
-                        print(f"Mapped budget ₹{budget_amount} to category: {price_range}")
-                        break
-                else:
-                    price_range = "premium"
-                    print(f"Mapped budget ₹{budget_amount} to category: {price_range}")
+                price_range = None
+                max_cost = float(price_input)
+                print(f"Budget: up to ₹{max_cost:g} for two")
             
             # 3. Display and prompt for Cuisine
             print("\nAvailable Cuisines (Sample):")
@@ -116,6 +111,7 @@ class CommandLineInterface:
             raw_data = {
                 "city": selected_city,
                 "price_range": price_range,
+                "max_cost": max_cost,
                 "cuisine": cuisine,
                 "min_rating": min_rating
             }
@@ -140,7 +136,7 @@ class CommandLineInterface:
             
             print("\nSummary of your request:")
             print(f"- Bangalore Locality: {user_input.city}")
-            print(f"- Price: {user_input.price_range}")
+            print(f"- Price: {user_input.budget_label}")
             if user_input.cuisine:
                 print(f"- Cuisine: {user_input.cuisine}")
             print(f"- Min Rating: {user_input.min_rating}")
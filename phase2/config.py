@@ -19,3 +19,8 @@ FUZZY_MATCH_THRESHOLD = 0.6
 
 # Default values
 DEFAULT_TOP_N = 10
+
+# Typeahead suggestions
+SUGGEST_DEFAULT_LIMIT = 10
+SUGGEST_MAX_LIMIT = 50
+SUGGEST_PRECOMPUTE_MIN_MATCHES = 256  # Prefixes matching more keys than this get precomputed top results
@@ -0,0 +1,129 @@
+"""
+Fuzzy matching index for Phase 2 - User Input
+Trigram postings over a fixed vocabulary (localities, cuisines) so typo
+suggestions do not need a linear difflib scan on every miss.
+"""
+
+import difflib
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set
+
+
+def _trigrams(text: str) -> Set[str]:
+    """
+    Trigrams of a lower-cased term, padded so short words still produce some.
+    """
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class FuzzyIndex:
+    """
+    Case-insensitive exact and fuzzy lookup over a vocabulary of terms.
+    
+    Candidates are the terms sharing the most trigrams with the query; they are
+    then ranked with difflib's ratio, so suggestions match what
+    difflib.get_close_matches would return for the same cutoff.
+    """
+    
+    # Terms re-ranked with difflib per lookup
+    MAX_CANDIDATES = 12
+    # Trigrams found in more than this share of terms (e.g. "nagar") are skipped
+    # when counting candidates, as long as the query has rarer ones to use
+    COMMON_TRIGRAM_RATIO = 0.05
+    
+    def __init__(self, terms: Iterable[str]):
+        """
+        Initialize the FuzzyIndex.
+        
+        Args:
+            terms: Vocabulary to index (original spelling is kept for results)
+        """
+        self.terms: List[str] = []
+        self._keys: List[str] = []
+        self._by_key: Dict[str, str] = {}
+        self._postings: Dict[str, List[int]] = {}
+        
+        for term in terms:
+            key = term.strip().lower()
+            if not key or key in self._by_key:
+                continue
+            position = len(self.terms)
+            self.terms.append(term)
+            self._keys.append(key)
+            self._by_key[key] = term
+            for gram in _trigrams(key):
+                self._postings.setdefault(gram, []).append(position)
+                
+    def __len__(self) -> int:
+        return len(self.terms)
+        
+    def exact(self, query: str) -> Optional[str]:
+        """
+        Case-insensitive exact match.
+        
+        Args:
+            query: Term to look up
+            
+        Returns:
+            The indexed spelling of the term, or None
+        """
+        return self._by_key.get(query.strip().lower())
+        
+    def suggest(self, query: str, n: int = 3, cutoff: float = 0.6) -> List[str]:
+        """
+        Ranked suggestions for a (possibly misspelled) term.
+        
+        Args:
+            query: Term to look up
+            n: Maximum number of suggestions
+            cutoff: Minimum similarity ratio (0-1) for a suggestion
+            
+        Returns:
+            Up to n indexed terms, best match first
+        """
+        key = query.strip().lower()
+        if not key or n <= 0:
+            return []
+            
+        postings = [self._postings[gram] for gram in _trigrams(key) if gram in self._postings]
+        common = max(self.COMMON_TRIGRAM_RATIO * len(self.terms), self.MAX_CANDIDATES)
+        rare = [posting for posting in postings if len(posting) <= common]
+        if len(rare) >= 2:
+            postings = rare
+            
+        shared = Counter()
+        for posting in postings:
+            shared.update(posting)
+        if not shared:
+            return []
+            
+        matcher = difflib.SequenceMatcher()
+        matcher.set_seq2(key)
+        scored = []
+        for position, _ in shared.most_common(self.MAX_CANDIDATES):
+            matcher.set_seq1(self._keys[position])
+            if matcher.real_quick_ratio() >= cutoff and matcher.quick_ratio() >= cutoff:
+                ratio = matcher.ratio()
+                if ratio >= cutoff:
+                    scored.append((-ratio, position))
+                    
+        scored.sort()
+        return [self.terms[position] for _, position in scored[:n]]
+        
+    def correct(self, query: str, cutoff: float = 0.6) -> Optional[str]:
+        """
+        Exact match if there is one, otherwise the single best suggestion.
+        
+        Args:
+            query: Term to look up
+            cutoff: Minimum similarity ratio (0-1) for a correction
+            
+        Returns:
+            The corrected term, or None if nothing is close enough
+        """
+        match = self.exact(query)
+        if match is not None:
+            return match
+        suggestions = self.suggest(query, n=1, cutoff=cutoff)
+        return suggestions[0] if suggestions else None
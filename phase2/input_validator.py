@@ -4,10 +4,14 @@ Validates user choices against the database and constraints.
 """
 
 import logging
-from typing import List, Optional, Tuple, Dict, Any
-import difflib
+from typing import List, Optional, Sequence, Tuple, Dict, Any, Union
 
+from pydantic import Field, TypeAdapter, ValidationError
+from typing_extensions import Annotated
+
+from phase1.config import DATABASE_SERVING_MODE
 from phase1.database_setup import DatabaseManager
+from phase2.catalog import Catalog, get_catalog
 from phase2.models import UserInput
 from phase2.config import FUZZY_MATCH_THRESHOLD, MAX_CITIES_SUGGESTIONS
 
@@ -15,6 +19,10 @@ from phase2.config import FUZZY_MATCH_THRESHOLD, MAX_CITIES_SUGGESTIONS
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Validates a whole list of payloads in one pydantic call. Invalid items fall
+# through to Any (left to right) and are reported individually.
+_USER_INPUT_LIST = TypeAdapter(List[Annotated[Union[UserInput, Any], Field(union_mode="left_to_right")]])
+
 
 class InputValidator:
     """
@@ -25,28 +33,32 @@ class InputValidator:
         """
         Initialize the InputValidator.
         
+        Construction is cheap: cities and cuisines come from the process-wide
+        catalog, which is loaded once per database build.
+        
         Args:
             db_manager: DatabaseManager instance for city validation
         """
-        self.db_manager = db_manager or DatabaseManager()
-        self.available_cities: List[str] = []
-        self.available_cuisines: List[str] = []
+        self.db_manager = db_manager or DatabaseManager(serving_mode=DATABASE_SERVING_MODE)
+        self._catalog: Optional[Catalog] = None
         self._refresh_data()
         
-    def _refresh_data(self):
+    def _refresh_data(self) -> Catalog:
         """
-        Fetch available cities and cuisines from the database.
+        Get the current catalog of cities and cuisines (reloaded only if the database changed).
         """
-        try:
-            self.db_manager.connect()
-            self.available_cities = self.db_manager.get_cities()
-            self.available_cuisines = self.db_manager.get_cuisines()
-            self.db_manager.close()
-            logger.info(f"Loaded {len(self.available_cities)} cities and {len(self.available_cuisines)} cuisines from database")
-        except Exception as e:
-            logger.error(f"Failed to load data from database: {e}")
-            self.available_cities = []
-            self.available_cuisines = []
+        self._catalog = get_catalog(self.db_manager, self._catalog)
+        return self._catalog
+    
+    @property
+    def available_cities(self) -> List[str]:
+        """Cities (localities) available in the current database build."""
+        return self._refresh_data().cities
+    
+    @property
+    def available_cuisines(self) -> List[str]:
+        """Cuisines available in the current database build."""
+        return self._refresh_data().cuisines
             
     def get_valid_localities(self) -> List[str]:
         """Returns the list of available localities (cities)."""
@@ -71,20 +83,66 @@ class InputValidator:
             
         city_clean = city.strip().title()
         
-        # Check for exact match
-        if city_clean in self.available_cities:
+        catalog = self._refresh_data()
+        
+        # Check for exact match (case-insensitive, returns the stored spelling)
+        if city_clean in catalog.city_set:
             return True, city_clean, []
+        matched = catalog.city_index.exact(city_clean)
+        if matched is not None:
+            return True, matched, []
             
         # Fuzzy matching for suggestions
-        suggestions = difflib.get_close_matches(
+        suggestions = catalog.city_index.suggest(
             city_clean, 
-            self.available_cities, 
             n=MAX_CITIES_SUGGESTIONS, 
             cutoff=FUZZY_MATCH_THRESHOLD
         )
         
         return False, None, suggestions
         
+    def correct_cuisines(self, cuisines: Optional[List[str]]) -> Optional[List[str]]:
+        """
+        Replace misspelled cuisines with their closest known cuisine.
+        
+        Args:
+            cuisines: Cuisines as entered by the user
+            
+        Returns:
+            Cuisines with typos fixed; unknown ones without a close match are kept as-is
+        """
+        return self._correct_cuisines(cuisines, self._refresh_data(), {})
+        
+    @staticmethod
+    def _correct_cuisines(cuisines: Optional[List[str]], catalog: Catalog, memo: Dict[str, str]) -> Optional[List[str]]:
+        """
+        Correct cuisines against a catalog, reusing (and filling) a memo of corrections.
+        """
+        if not cuisines or not len(catalog.cuisine_index):
+            return cuisines
+            
+        corrected = []
+        for cuisine in cuisines:
+            match = memo.get(cuisine)
+            if match is None:
+                match = catalog.cuisine_index.correct(cuisine, cutoff=FUZZY_MATCH_THRESHOLD) or cuisine
+                memo[cuisine] = match
+                if match != cuisine:
+                    logger.info(f"Corrected cuisine '{cuisine}' to '{match}'")
+            if match not in corrected:
+                corrected.append(match)
+        return corrected
+        
+    @staticmethod
+    def _city_error(city: str, suggestions: List[str]) -> str:
+        """
+        Error message for a city that is not in the database.
+        """
+        error_msg = f"City '{city}' not found in database."
+        if suggestions:
+            error_msg += f" Did you mean: {', '.join(suggestions)}?"
+        return error_msg
+        
     def validate_user_input(self, data: Dict[str, Any]) -> Tuple[Optional[UserInput], Optional[str]]:
         """
         Validate full user input using Pydantic and database checks.
@@ -103,14 +161,14 @@ class InputValidator:
             is_valid, matched_city, suggestions = self.validate_city(user_input.city)
             
             if not is_valid:
-                error_msg = f"City '{user_input.city}' not found in database."
-                if suggestions:
-                    error_msg += f" Did you mean: {', '.join(suggestions)}?"
-                return None, error_msg
+                return None, self._city_error(user_input.city, suggestions)
                 
             # Update city with standardized name
             user_input.city = matched_city
             
+            # 3. Fix cuisine typos against the known cuisines
+            user_input.cuisine = self.correct_cuisines(user_input.cuisine)
+            
             return user_input, None
             
         except ValueError as e:
@@ -118,3 +176,59 @@ class InputValidator:
         except Exception as e:
             logger.error(f"Unexpected validation error: {e}")
             return None, "An unexpected error occurred during validation."
+
+    def validate_many(self, payloads: Sequence[Any]) -> List[Tuple[Optional[UserInput], Optional[str]]]:
+        """
+        Validate many raw inputs at once, e.g. logged or synthetic preference sets.
+        
+        The whole list goes through one pydantic pass; cities and cuisines are
+        resolved once per distinct value against the catalog's hash set and
+        fuzzy index. Results match validate_user_input item by item.
+        
+        Args:
+            payloads: Raw input dictionaries
+            
+        Returns:
+            List of (UserInput object, error_message) tuples, in input order
+        """
+        payloads = list(payloads)
+        results: List[Tuple[Optional[UserInput], Optional[str]]] = []
+        catalog = self._refresh_data()
+        
+        # Each distinct city and cuisine is resolved once per batch
+        cities: Dict[str, Tuple[bool, Optional[str], List[str]]] = {}
+        cuisines: Dict[str, str] = {}
+        
+        # 1. Basic type/format validation via Pydantic, one pass over the list;
+        # items that fail come back unchanged instead of failing the batch
+        for payload, user_input in zip(payloads, _USER_INPUT_LIST.validate_python(payloads)):
+            if not isinstance(user_input, UserInput):
+                results.append(self._model_error(payload))
+                continue
+                
+            # 2. Domain validation against the catalog
+            city = cities.get(user_input.city)
+            if city is None:
+                city = cities[user_input.city] = self.validate_city(user_input.city)
+            is_valid, matched_city, suggestions = city
+            
+            if not is_valid:
+                results.append((None, self._city_error(user_input.city, suggestions)))
+                continue
+                
+            user_input.city = matched_city
+            user_input.cuisine = self._correct_cuisines(user_input.cuisine, catalog, cuisines)
+            results.append((user_input, None))
+            
+        return results
+        
+    @staticmethod
+    def _model_error(payload: Any) -> Tuple[None, str]:
+        """
+        Error message for one payload that failed pydantic validation.
+        """
+        try:
+            UserInput.model_validate(payload)
+        except ValidationError as e:
+            return None, str(e)
+        return None, "An unexpected error occurred during validation."
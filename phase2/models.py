@@ -3,19 +3,28 @@ Data models for Phase 2 - User Input
 Uses Pydantic for validation.
 """
 
-from typing import Optional, List, Any
-from pydantic import BaseModel, Field, field_validator
+import math
+from typing import Optional, List, Any, Tuple
+from pydantic import BaseModel, Field, field_validator, model_validator
+
+from phase1.data_cleaner import normalize_dish
+from phase2.config import PRICE_CATEGORIES
 
 class UserInput(BaseModel):
     """
     Model for user preferences and filters.
     """
     city: str = Field(..., description="City to search for restaurants")
-    price_range: str = Field(..., description="Price category (budget, mid-range, premium)")
+    price_range: Optional[str] = Field(None, description="Price category (budget, mid-range, premium)")
+    
+    # Numeric budget (average cost for two, inclusive); narrows or replaces price_range
+    min_cost: Optional[float] = Field(None, ge=0.0, description="Minimum average cost for two")
+    max_cost: Optional[float] = Field(None, ge=0.0, description="Maximum average cost for two")
     
     # Optional filters
     cuisine: Optional[List[str]] = Field(None, description="Preferred cuisines")
     min_rating: float = Field(0.0, ge=0.0, le=5.0, description="Minimum restaurant rating")
+    dish: Optional[List[str]] = Field(None, description="Dishes the restaurant must serve (normalized)")
     
     @field_validator('cuisine', mode='before')
     @classmethod
@@ -28,6 +37,15 @@ class UserInput(BaseModel):
             return [str(item).strip() for item in v if str(item).strip()]
         return None
     
+    @field_validator('dish', mode='before')
+    @classmethod
+    def validate_dish(cls, v: Any) -> Optional[List[str]]:
+        if v is None:
+            return None
+        items = [v] if isinstance(v, str) else v if isinstance(v, list) else []
+        dishes = list(dict.fromkeys(dish for dish in map(normalize_dish, items) if dish))
+        return dishes or None
+    
     @field_validator('city')
     @classmethod
     def validate_city(cls, v: str) -> str:
@@ -37,9 +55,48 @@ class UserInput(BaseModel):
     
     @field_validator('price_range')
     @classmethod
-    def validate_price_range(cls, v: str) -> str:
+    def validate_price_range(cls, v: Optional[str]) -> Optional[str]:
+        if v is None:
+            return None
         v = v.strip().lower()
         valid_ranges = ['budget', 'mid-range', 'premium']
         if v not in valid_ranges:
             raise ValueError(f"Price range must be one of: {', '.join(valid_ranges)}")
         return v
+    
+    @model_validator(mode='after')
+    def validate_budget(self) -> 'UserInput':
+        if self.price_range is None and self.min_cost is None and self.max_cost is None:
+            raise ValueError("Either price_range or min_cost/max_cost must be given")
+        if self.min_cost is not None and self.max_cost is not None and self.min_cost > self.max_cost:
+            raise ValueError("min_cost cannot be greater than max_cost")
+        return self
+    
+    def cost_bounds(self) -> Tuple[float, float]:
+        """
+        Average-cost-for-two range to search, as (lower inclusive, upper exclusive).
+        
+        The price category (if any) is resolved through PRICE_CATEGORIES at
+        query time and intersected with min_cost/max_cost.
+        """
+        lower, upper = PRICE_CATEGORIES[self.price_range] if self.price_range else (0.0, math.inf)
+        if self.min_cost is not None:
+            lower = max(lower, self.min_cost)
+        if self.max_cost is not None:
+            upper = min(upper, math.nextafter(self.max_cost, math.inf))
+        return float(lower), float(upper)
+    
+    @property
+    def budget_label(self) -> str:
+        """
+        Human-readable budget, e.g. "mid-range", "up to ₹800" or "budget (₹200 to ₹400)".
+        """
+        if self.min_cost is not None and self.max_cost is not None:
+            costs = f"₹{self.min_cost:g} to ₹{self.max_cost:g}"
+        elif self.max_cost is not None:
+            costs = f"up to ₹{self.max_cost:g}"
+        elif self.min_cost is not None:
+            costs = f"from ₹{self.min_cost:g}"
+        else:
+            return self.price_range or ""
+        return f"{self.price_range} ({costs})" if self.price_range else costs
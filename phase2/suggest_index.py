@@ -0,0 +1,226 @@
+"""
+Typeahead index for Phase 2 - User Input
+Sorted-array prefix index over localities, cuisines, restaurant names and dishes,
+ranked by popularity (total votes) and rebuilt when the database build changes.
+"""
+
+import heapq
+import logging
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from phase1.database_setup import DatabaseManager
+from phase2.catalog import database_stamp
+from phase2.config import SUGGEST_MAX_LIMIT, SUGGEST_PRECOMPUTE_MIN_MATCHES
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SUGGEST_KINDS = ("locality", "cuisine", "restaurant", "dish")
+
+
+class SuggestIndex:
+    """
+    Prefix index over (text, kind, popularity) entries.
+    
+    Every word start of an entry is a key ("JP Nagar" is found by "jp" and by
+    "nag"). Keys are kept in one sorted array, so a prefix is a bisect range;
+    prefixes whose range is large (short or shared prefixes) get their top
+    results precomputed, so no lookup ranks more than a few hundred keys.
+    """
+    
+    def __init__(
+        self,
+        entries: Iterable[Tuple[str, str, float]],
+        build_id: Optional[str] = None,
+        stamp: Optional[Tuple[int, int]] = None
+    ):
+        """
+        Initialize the SuggestIndex.
+        
+        Args:
+            entries: (text, kind, popularity) tuples
+            build_id: Build id of the database the entries come from
+            stamp: (mtime_ns, size) of that database file
+        """
+        self.build_id = build_id
+        self.stamp = stamp
+        self.entries: List[Tuple[str, str, float]] = []
+        
+        seen = set()
+        pairs = []
+        for text, kind, popularity in entries:
+            lowered = text.strip().lower()
+            if not lowered or (kind, lowered) in seen:
+                continue
+            seen.add((kind, lowered))
+            position = len(self.entries)
+            self.entries.append((text.strip(), kind, float(popularity)))
+            words = lowered.split()
+            for i in range(len(words)):
+                pairs.append((" ".join(words[i:]), position))
+                
+        pairs.sort()
+        self._keys = [key for key, _ in pairs]
+        self._positions = [position for _, position in pairs]
+        
+        # Precomputed top results per (prefix, kind); kind None = all kinds
+        self._top: Dict[Tuple[str, Optional[str]], List[int]] = {}
+        self._precompute(0, len(self._keys), 0)
+        
+    def __len__(self) -> int:
+        return len(self.entries)
+        
+    def _precompute(self, start: int, end: int, depth: int):
+        """
+        Store top results for the prefix shared by keys[start:end] (of length
+        depth) when the range is large, then recurse into its one-character
+        longer prefixes.
+        """
+        if end - start <= SUGGEST_PRECOMPUTE_MIN_MATCHES:
+            return
+            
+        keys = self._keys
+        if depth:
+            positions = set(self._positions[start:end])
+            by_kind = defaultdict(list)
+            for position in positions:
+                by_kind[self.entries[position][1]].append(position)
+            prefix = keys[start][:depth]
+            self._top[(prefix, None)] = self._best(positions, SUGGEST_MAX_LIMIT)
+            for kind, kind_positions in by_kind.items():
+                self._top[(prefix, kind)] = self._best(kind_positions, SUGGEST_MAX_LIMIT)
+                
+        i = start
+        while i < end:
+            if len(keys[i]) <= depth:
+                i += 1
+                continue
+            child_end = bisect_left(keys, keys[i][:depth + 1] + "\uffff", i, end)
+            self._precompute(i, child_end, depth + 1)
+            i = child_end
+            
+    def _best(self, positions: Iterable[int], limit: int) -> List[int]:
+        """
+        Most popular entries first, ties broken alphabetically.
+        """
+        entries = self.entries
+        return heapq.nsmallest(limit, set(positions), key=lambda p: (-entries[p][2], entries[p][0].lower()))
+        
+    def suggest(self, query: str, limit: int = 10, kinds: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Entries with a word starting with the query, most popular first.
+        
+        Args:
+            query: Prefix typed by the user
+            limit: Maximum number of suggestions (capped at SUGGEST_MAX_LIMIT)
+            kinds: Restrict to these kinds (locality, cuisine, restaurant, dish)
+            
+        Returns:
+            List of {"text", "type", "popularity"} dicts
+        """
+        prefix = " ".join(query.lower().split())
+        limit = max(0, min(limit, SUGGEST_MAX_LIMIT))
+        if not prefix or not limit:
+            return []
+            
+        kinds = tuple(kinds) if kinds else None
+        if (prefix, None) in self._top:
+            if kinds is None:
+                positions = self._top[(prefix, None)][:limit]
+            else:
+                candidates = [p for kind in kinds for p in self._top.get((prefix, kind), [])]
+                positions = self._best(candidates, limit)
+        else:
+            start = bisect_left(self._keys, prefix)
+            end = bisect_left(self._keys, prefix + "\uffff", start)
+            candidates = self._positions[start:end]
+            if kinds is not None:
+                candidates = [p for p in candidates if self.entries[p][1] in kinds]
+            positions = self._best(candidates, limit)
+            
+        return [
+            {"text": text, "type": kind, "popularity": popularity}
+            for text, kind, popularity in (self.entries[p] for p in positions)
+        ]
+
+
+def _load_entries(db_manager: DatabaseManager) -> List[Tuple[str, str, float]]:
+    """
+    Aggregate popularity (total votes) per locality, cuisine, restaurant name
+    and dish (from the normalized dishes column).
+    """
+    popularity = {kind: defaultdict(float) for kind in SUGGEST_KINDS}
+    for name, city, cuisines, dishes, votes in db_manager.iter_all(columns=("name", "city", "cuisines", "dishes", "votes")):
+        votes = votes or 0
+        if city:
+            popularity["locality"][city] += votes
+        if name:
+            popularity["restaurant"][name] += votes
+        for cuisine in (cuisines or "").split(","):
+            if cuisine.strip():
+                popularity["cuisine"][cuisine.strip()] += votes
+        for dish in (dishes or "").split(","):
+            if dish.strip():
+                popularity["dish"][dish.strip()] += votes
+                
+    return [
+        (text, kind, total)
+        for kind, totals in popularity.items()
+        for text, total in totals.items()
+    ]
+
+
+_indexes: Dict[str, SuggestIndex] = {}
+_index_lock = threading.Lock()
+
+
+def get_suggest_index(db_manager: DatabaseManager) -> SuggestIndex:
+    """
+    Get the process-wide suggest index for a database.
+    
+    A changed database file triggers a build id check; the index is only
+    rebuilt when the build id differs.
+    
+    Args:
+        db_manager: DatabaseManager of the database to read
+        
+    Returns:
+        The current SuggestIndex
+    """
+    key = str(db_manager.db_path)
+    stamp = database_stamp(db_manager)
+    
+    index = _indexes.get(key)
+    if index is not None and index.stamp == stamp:
+        return index
+        
+    with _index_lock:
+        index = _indexes.get(key)
+        if index is not None and index.stamp == stamp:
+            return index
+            
+        db_manager.connect()
+        try:
+            build_id = db_manager.get_build_id()
+            if index is not None and build_id is not None and index.build_id == build_id:
+                index.stamp = stamp
+                return index
+            index = SuggestIndex(_load_entries(db_manager), build_id=build_id, stamp=stamp)
+        finally:
+            db_manager.close()
+            
+        logger.info(f"Built suggest index with {len(index)} entries (build {build_id})")
+        _indexes[key] = index
+        return index
+
+
+def clear_suggest_cache():
+    """
+    Drop every cached suggest index (forces a rebuild on next use).
+    """
+    with _index_lock:
+        _indexes.clear()
@@ -0,0 +1,44 @@
+"""
+Unit tests for Phase 2 FuzzyIndex
+"""
+
+import difflib
+import unittest
+from phase2.fuzzy_index import FuzzyIndex
+
+class TestFuzzyIndex(unittest.TestCase):
+    """
+    Test cases for FuzzyIndex.
+    """
+    
+    def setUp(self):
+        self.terms = ["Mumbai", "Bangalore", "Delhi", "Pune", "JP Nagar", "BTM", "Koramangala 5th Block"]
+        self.index = FuzzyIndex(self.terms)
+
+    def test_exact_is_case_insensitive(self):
+        """Test that exact lookups return the indexed spelling"""
+        self.assertEqual(self.index.exact("jp nagar"), "JP Nagar")
+        self.assertIsNone(self.index.exact("Chennai"))
+
+    def test_suggest_typos(self):
+        """Test ranked suggestions for misspelled terms"""
+        self.assertEqual(self.index.suggest("Mumbay")[0], "Mumbai")
+        self.assertEqual(self.index.suggest("Bangalor")[0], "Bangalore")
+        self.assertEqual(self.index.suggest("Atlantis"), [])
+
+    def test_matches_difflib(self):
+        """Test that suggestions agree with difflib.get_close_matches"""
+        lowered = [term.lower() for term in self.terms]
+        for query in ["mumbay", "delhii", "koramangla 5th block", "pnue", "btm layout"]:
+            expected = difflib.get_close_matches(query, lowered, n=3, cutoff=0.6)
+            self.assertEqual([term.lower() for term in self.index.suggest(query)], expected)
+
+    def test_correct(self):
+        """Test single best correction"""
+        cuisines = FuzzyIndex(["Italian", "Chinese", "North Indian", "South Indian"])
+        self.assertEqual(cuisines.correct("Itallian"), "Italian")
+        self.assertEqual(cuisines.correct("north indian"), "North Indian")
+        self.assertIsNone(cuisines.correct("Martian"))
+
+if __name__ == "__main__":
+    unittest.main()
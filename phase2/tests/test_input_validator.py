@@ -2,8 +2,12 @@
 Unit tests for Phase 2 Input Validator
 """
 
+import os
+import tempfile
 import unittest
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
+from phase1.database_setup import DatabaseManager
+from phase2.catalog import clear_catalog_cache
 from phase2.input_validator import InputValidator
 
 class TestInputValidator(unittest.TestCase):
@@ -53,6 +57,35 @@ class TestInputValidator(unittest.TestCase):
         self.assertIsNone(error)
         self.assertEqual(user_input.city, "Pune")
 
+    def test_validate_user_input_corrects_cuisine(self):
+        """Test that misspelled cuisines are corrected"""
+        data = {"city": "Pune", "price_range": "mid-range", "cuisine": ["Itallian", "chinese", "Martian"]}
+        user_input, error = self.validator.validate_user_input(data)
+        self.assertIsNone(error)
+        self.assertEqual(user_input.cuisine, ["Italian", "Chinese", "Martian"])
+
+    def test_validate_many(self):
+        """Test batch validation returns per-item results in input order"""
+        payloads = [
+            {"city": "pune", "price_range": "budget", "cuisine": "Itallian"},
+            {"city": "Delhi", "price_range": "expensive"},
+            {"city": "Mumbay", "price_range": "budget"},
+            "not a payload",
+            {"city": "Mumbai", "price_range": "premium", "min_rating": 4}
+        ]
+        results = self.validator.validate_many(payloads)
+        self.assertEqual(len(results), 5)
+        self.assertEqual(results[0][0].city, "Pune")
+        self.assertEqual(results[0][0].cuisine, ["Italian"])
+        self.assertIn("Price range must be one of", results[1][1])
+        self.assertIn("Did you mean: Mumbai?", results[2][1])
+        self.assertIsNone(results[3][0])
+        self.assertIsNotNone(results[3][1])
+        self.assertEqual(results[4][0].min_rating, 4.0)
+        for payload, (user_input, error) in zip(payloads, results):
+            if isinstance(payload, dict):
+                self.assertEqual(self.validator.validate_user_input(payload), (user_input, error))
+
     def test_validate_user_input_failure(self):
         """Test full validation failure due to invalid city"""
         data = {"city": "New York", "price_range": "budget"}
@@ -61,5 +94,53 @@ class TestInputValidator(unittest.TestCase):
         self.assertIsNotNone(error)
         self.assertIn("City 'New York' not found", error)
 
+
+class TestSharedCatalog(unittest.TestCase):
+    """
+    Test cases for the process-wide catalog shared by validators.
+    """
+    
+    def setUp(self):
+        clear_catalog_cache()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "test.db")
+        self._build([{"name": "A", "city": "Mumbai", "cuisines": "Italian"}])
+        
+    def tearDown(self):
+        clear_catalog_cache()
+        self.temp_dir.cleanup()
+        
+    def _build(self, records):
+        db = DatabaseManager(db_path=self.db_path)
+        db.connect()
+        db.create_table()
+        db.insert_data(records)
+        db.write_build_metadata()
+        db.close()
+        
+    def test_validators_share_one_load(self):
+        """Test that only the first validator reads the database"""
+        with patch.object(DatabaseManager, "get_cities", autospec=True, side_effect=DatabaseManager.get_cities) as get_cities:
+            first = InputValidator(db_manager=DatabaseManager(db_path=self.db_path))
+            second = InputValidator(db_manager=DatabaseManager(db_path=self.db_path))
+            self.assertEqual(second.available_cities, ["Mumbai"])
+            self.assertIs(first._catalog, second._catalog)
+            self.assertEqual(get_cities.call_count, 1)
+            
+    def test_catalog_reloads_after_rebuild(self):
+        """Test that a rebuilt database is picked up lazily"""
+        validator = InputValidator(db_manager=DatabaseManager(db_path=self.db_path))
+        build_id = validator._catalog.build_id
+        self.assertFalse(validator.validate_city("Pune")[0])
+        
+        self._build([
+            {"name": "A", "city": "Mumbai", "cuisines": "Italian"},
+            {"name": "B", "city": "Pune", "cuisines": "Chinese"}
+        ])
+        
+        self.assertTrue(validator.validate_city("Pune")[0])
+        self.assertIn("Chinese", validator.available_cuisines)
+        self.assertNotEqual(validator._catalog.build_id, build_id)
+
 if __name__ == "__main__":
     unittest.main()
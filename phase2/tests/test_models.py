@@ -30,6 +30,13 @@ class TestModels(unittest.TestCase):
         user_input = UserInput(city="  bangalore  ", price_range="mid-range")
         self.assertEqual(user_input.city, "Bangalore")
 
+    def test_dish_normalization(self):
+        """Test that dishes are normalized, de-duplicated and blank ones dropped"""
+        user_input = UserInput(city="Btm", price_range="budget", dish=["Chicken  Biryani!", "chicken biryani", " "])
+        self.assertEqual(user_input.dish, ["chicken biryani"])
+        self.assertEqual(UserInput(city="Btm", price_range="budget", dish="Dosa").dish, ["dosa"])
+        self.assertIsNone(UserInput(city="Btm", price_range="budget", dish="  ").dish)
+
     def test_invalid_price_range(self):
         """Test with an invalid price category"""
         data = {"city": "Delhi", "price_range": "expensive"}
@@ -43,6 +50,26 @@ class TestModels(unittest.TestCase):
         with self.assertRaises(ValidationError):
             UserInput(city="Delhi", price_range="budget", min_rating=-1.0)
 
+    def test_cost_range(self):
+        """Test numeric budgets and their cost bounds"""
+        user_input = UserInput(city="Delhi", max_cost=559)
+        self.assertIsNone(user_input.price_range)
+        lower, upper = user_input.cost_bounds()
+        self.assertEqual(lower, 0.0)
+        self.assertTrue(559 < upper < 559.001)
+        self.assertEqual(user_input.budget_label, "up to ₹559")
+
+        user_input = UserInput(city="Delhi", price_range="mid-range", min_cost=300, max_cost=800)
+        self.assertEqual(user_input.cost_bounds()[0], 500.0)
+        self.assertEqual(UserInput(city="Delhi", price_range="premium").cost_bounds(), (1500.0, float("inf")))
+
+    def test_budget_required(self):
+        """Test that a price range or a cost range is required"""
+        with self.assertRaises(ValidationError):
+            UserInput(city="Delhi")
+        with self.assertRaises(ValidationError):
+            UserInput(city="Delhi", min_cost=900, max_cost=500)
+
     def test_empty_city(self):
         """Test that city cannot be empty"""
         with self.assertRaises(ValidationError):
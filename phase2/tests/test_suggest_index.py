@@ -0,0 +1,119 @@
+"""
+Unit tests for Phase 2 SuggestIndex
+"""
+
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from phase1.database_setup import DatabaseManager
+from phase2.suggest_index import SuggestIndex, clear_suggest_cache, get_suggest_index
+
+class TestSuggestIndex(unittest.TestCase):
+    """
+    Test cases for SuggestIndex.
+    """
+    
+    def setUp(self):
+        self.index = SuggestIndex([
+            ("JP Nagar", "locality", 900),
+            ("Jayanagar", "locality", 1200),
+            ("Japanese", "cuisine", 300),
+            ("Jalsa", "restaurant", 2000),
+            ("Nagarjuna", "restaurant", 800)
+        ])
+
+    def test_prefix_ranked_by_popularity(self):
+        """Test that matches come back most popular first"""
+        texts = [s["text"] for s in self.index.suggest("ja")]
+        self.assertEqual(texts, ["Jalsa", "Jayanagar", "Japanese"])
+
+    def test_word_start_match(self):
+        """Test that any word of an entry can match"""
+        texts = [s["text"] for s in self.index.suggest("NAGAR")]
+        self.assertEqual(texts, ["JP Nagar", "Nagarjuna"])
+
+    def test_kind_filter_and_limit(self):
+        """Test filtering by kind and limiting results"""
+        self.assertEqual(self.index.suggest("j", kinds=["cuisine"])[0]["text"], "Japanese")
+        self.assertEqual(len(self.index.suggest("j", limit=2)), 2)
+        self.assertEqual(self.index.suggest(""), [])
+
+    def test_precomputed_prefixes_match_scan(self):
+        """Test that precomputed top results equal a full range scan"""
+        entries = [(f"Restaurant {i}", "restaurant", i % 97) for i in range(2000)]
+        entries += [(f"Road {i}", "locality", i % 13) for i in range(500)]
+        with patch("phase2.suggest_index.SUGGEST_PRECOMPUTE_MIN_MATCHES", 10 ** 9):
+            scanned = SuggestIndex(entries)
+        precomputed = SuggestIndex(entries)
+        self.assertTrue(precomputed._top)
+        for query in ["r", "re", "restaurant 1", "ro", "road 4"]:
+            for kinds in [None, ["locality"], ["locality", "restaurant"]]:
+                self.assertEqual(precomputed.suggest(query, kinds=kinds), scanned.suggest(query, kinds=kinds))
+
+class TestSuggestIndexCache(unittest.TestCase):
+    """
+    Test cases for the process-wide suggest index.
+    """
+    
+    def setUp(self):
+        clear_suggest_cache()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "test.db")
+        
+    def tearDown(self):
+        clear_suggest_cache()
+        self.temp_dir.cleanup()
+        
+    def _build(self, records):
+        db = DatabaseManager(db_path=self.db_path)
+        db.connect()
+        db.create_table()
+        db.insert_data(records)
+        db.write_build_metadata()
+        db.close()
+        
+    def test_rebuilt_on_new_build(self):
+        """Test that the index follows the database build id"""
+        self._build([{"name": "Cafe Blue", "city": "Indiranagar", "cuisines": "Cafe, Italian", "votes": 10}])
+        first = get_suggest_index(DatabaseManager(db_path=self.db_path))
+        self.assertIs(get_suggest_index(DatabaseManager(db_path=self.db_path)), first)
+        self.assertEqual([s["type"] for s in first.suggest("i")], ["locality", "cuisine"])
+        
+        self._build([{"name": "Dragon Wok", "city": "Indiranagar", "cuisines": "Chinese", "votes": 5}])
+        second = get_suggest_index(DatabaseManager(db_path=self.db_path))
+        self.assertIsNot(second, first)
+        self.assertEqual(second.suggest("dra")[0]["text"], "Dragon Wok")
+        
+    def test_dishes_are_suggested(self):
+        """Test that dishes are a kind of their own, ranked by the votes of the restaurants serving them"""
+        self._build([
+            {"name": "Meghana Foods", "city": "Btm", "cuisines": "Biryani", "dishes": "chicken biryani, mutton biryani", "votes": 900},
+            {"name": "Biryani Zone", "city": "Btm", "cuisines": "Biryani", "dishes": "mutton biryani", "votes": 300}
+        ])
+        index = get_suggest_index(DatabaseManager(db_path=self.db_path))
+        suggestions = index.suggest("biry", kinds=["dish"])
+        self.assertEqual([(s["text"], s["popularity"]) for s in suggestions], [("mutton biryani", 1200.0), ("chicken biryani", 900.0)])
+        self.assertEqual({s["type"] for s in index.suggest("biry")}, {"dish", "cuisine", "restaurant"})
+        
+    def test_rebuilt_on_replaced_partition(self):
+        """Test that replacing one city's partition refreshes its names and dishes"""
+        db = DatabaseManager(db_path=self.db_path)
+        db.build_partitions([
+            {"name": "Meghana Foods", "city": "Btm", "cuisines": "Biryani", "dishes": "mutton biryani", "votes": 900},
+            {"name": "Toit", "city": "Indiranagar", "cuisines": "Pub", "dishes": "pizza", "votes": 500}
+        ], workers=1)
+        db.write_build_metadata()
+        first = get_suggest_index(DatabaseManager(db_path=self.db_path))
+        self.assertEqual(first.suggest("meg")[0]["text"], "Meghana Foods")
+        
+        db.replace_partition("Btm", [{"name": "Empire", "city": "Btm", "cuisines": "North Indian", "dishes": "ghee rice", "votes": 700}])
+        db.close()
+        second = get_suggest_index(DatabaseManager(db_path=self.db_path))
+        self.assertIsNot(second, first)
+        self.assertEqual(second.suggest("meg"), [])
+        self.assertEqual(second.suggest("ghee", kinds=["dish"])[0]["text"], "ghee rice")
+        self.assertEqual(second.suggest("toit")[0]["text"], "Toit")
+
+if __name__ == "__main__":
+    unittest.main()
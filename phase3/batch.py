@@ -0,0 +1,147 @@
+"""
+Batch recommendations for Phase 3 - Recommendation Engine
+Scores JSONL preference sets offline (campaigns, push notifications) and
+writes one JSONL result per input line.
+
+Usage:
+    python -m phase3.batch --input preferences.jsonl --output results.jsonl [--limit 5] [--workers 8]
+
+Each input line is a JSON object with the UserInput fields (city, price_range,
+cuisine, min_rating, min_cost, max_cost) and an optional "id" that is copied to
+the result. Results keep the input order:
+    {"line": 1, "id": "u1", "count": 5, "recommendations": [...]}
+    {"line": 2, "id": "u2", "error": "City 'Atlantis' not found. ..."}
+"""
+
+import argparse
+import json
+import logging
+import sys
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, TextIO
+
+from phase1.config import DATABASE_PATH, DATABASE_SERVING_MODE
+from phase1.database_setup import DatabaseManager
+from phase2.input_validator import InputValidator
+from phase3.config import BATCH_CHUNK_SIZE, BATCH_WORKERS
+from phase3.recommender import RecommendationEngine
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def _parse_line(line: str) -> Any:
+    """
+    Parse one input line, returning the error message as a string if it is not a JSON object.
+    """
+    try:
+        payload = json.loads(line)
+    except json.JSONDecodeError as e:
+        return f"Invalid JSON: {e}"
+    return payload if isinstance(payload, dict) else "Each line must be a JSON object"
+
+
+def run_batch(
+    lines: Iterable[str],
+    output: TextIO,
+    engine: RecommendationEngine,
+    validator: InputValidator,
+    limit: int = 5,
+    workers: Optional[int] = BATCH_WORKERS,
+    chunk_size: int = BATCH_CHUNK_SIZE
+) -> Dict[str, int]:
+    """
+    Validate, score and write a stream of JSONL preference sets.
+
+    Lines are processed in chunks of chunk_size, so memory stays bounded for
+    arbitrarily large inputs. Blank lines are skipped but still counted for
+    the "line" field.
+
+    Args:
+        lines: Input lines (JSON objects)
+        output: Stream the JSONL results are written to
+        engine: RecommendationEngine used for get_recommendations_batch
+        validator: InputValidator used for validate_many
+        limit: Maximum number of recommendations per input
+        workers: Number of worker processes
+        chunk_size: Number of lines scored per batch
+
+    Returns:
+        Dictionary with the number of answered and invalid inputs
+    """
+    counts = {"answered": 0, "invalid": 0}
+    numbered = ((number, line) for number, line in enumerate(lines, 1) if line.strip())
+
+    while True:
+        chunk = list(islice(numbered, chunk_size))
+        if not chunk:
+            break
+
+        parsed = [_parse_line(line) for _, line in chunk]
+        ids = [payload.pop("id", None) if isinstance(payload, dict) else None for payload in parsed]
+        records: List[Dict[str, Any]] = [{"line": number, "id": record_id} for (number, _), record_id in zip(chunk, ids)]
+
+        # Lines that are not JSON objects never reach the validator
+        valid_json = [i for i, payload in enumerate(parsed) if isinstance(payload, dict)]
+        for i, payload in enumerate(parsed):
+            if isinstance(payload, str):
+                records[i]["error"] = payload
+
+        validated = validator.validate_many([parsed[i] for i in valid_json])
+        answered = []
+        for i, (user_input, error) in zip(valid_json, validated):
+            if user_input is None:
+                records[i]["error"] = error
+            else:
+                answered.append((i, user_input))
+
+        responses = engine.get_recommendations_batch([user_input for _, user_input in answered], limit=limit, workers=workers)
+        for (i, _), response in zip(answered, responses):
+            records[i]["count"] = response.count
+            records[i]["recommendations"] = [rec.model_dump() for rec in response.recommendations]
+
+        for record in records:
+            output.write(json.dumps(record) + "\n")
+
+        counts["answered"] += len(answered)
+        counts["invalid"] += len(records) - len(answered)
+        logger.info(f"Scored {counts['answered'] + counts['invalid']} lines ({counts['invalid']} invalid)")
+
+    return counts
+
+
+def main(argv: Optional[List[str]] = None):
+    """
+    Command line entry point.
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", default="-", help="JSONL preferences file ('-' for stdin)")
+    parser.add_argument("--output", default="-", help="JSONL results file ('-' for stdout)")
+    parser.add_argument("--limit", type=int, default=5, help="Recommendations per input")
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS, help="Worker processes (default: one per CPU)")
+    parser.add_argument("--chunk-size", type=int, default=BATCH_CHUNK_SIZE, help="Lines scored per batch")
+    parser.add_argument("--db", type=Path, default=DATABASE_PATH, help="Restaurants database")
+    args = parser.parse_args(argv)
+
+    db_manager = DatabaseManager(db_path=args.db, serving_mode=DATABASE_SERVING_MODE)
+    engine = RecommendationEngine(db_manager)
+    validator = InputValidator(db_manager)
+
+    source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    sink = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        counts = run_batch(source, sink, engine, validator, args.limit, args.workers, args.chunk_size)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+        db_manager.close()
+
+    logger.info(f"Batch complete: {counts['answered']} answered, {counts['invalid']} invalid")
+
+
+if __name__ == "__main__":
+    main()
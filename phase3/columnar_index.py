@@ -0,0 +1,493 @@
+"""
+Columnar recommendation index for Phase 3 - Recommendation Engine
+Keeps every restaurant in NumPy arrays, one partition per city, with cuisine
+membership as bitmasks and precomputed match scores. Each partition keeps its
+rows in final ranking order, so the exact top-k is the first k rows passing
+the filters; results match the SQL path.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from phase1.database_setup import DatabaseManager
+from phase2.models import UserInput
+from phase3.config import COLUMNAR_QUERY_MASK_CACHE_SIZE
+from phase3.feedback import FeedbackAdjustments
+from phase3.pagination import InvalidCursorError, RankKey
+from phase3.ranking_model import HAND_TUNED, RankingWeights
+from phase3.relaxation import Relaxation
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Columns loaded from the database, in the order from_rows expects
+INDEX_COLUMNS = (
+    "id", "name", "city", "address", "cuisines", "average_cost_for_two",
+    "price_category", "aggregate_rating", "votes"
+)
+
+# A scored result: the row in RECOMMENDATION_QUERY column order (ending with
+# the restaurant id), and its match score
+ScoredRow = Tuple[Tuple[Any, ...], float]
+
+
+def _cuisine_tokens(cuisines: Optional[str]) -> List[str]:
+    """
+    Lower-cased cuisines of one restaurant.
+    """
+    return [token.strip().lower() for token in (cuisines or "").split(",") if token.strip()]
+
+
+class _Ranking:
+    """
+    Match scores of one partition under one set of ranking weights, and their
+    ranking orders.
+    """
+
+    def __init__(self, rating: np.ndarray, votes: np.ndarray, weights: RankingWeights):
+        # Match scores depend only on the row and on whether cuisines were
+        # requested (every candidate then gets the +1 bonus), so both variants
+        # are computed once, with the arithmetic of _calculate_match_score
+        base = weights.base_array(rating, votes)
+        self.base = base  # Unrounded, for feedback adjustments
+        self.score = np.minimum(round_2(base), 10.0)
+        self.score_with_cuisine = np.minimum(round_2(base + 1.0), 10.0)
+        # Ranking order of each variant: score DESC, ties in best-first order
+        # (stable sort). Unrated rows have NaN scores and sort last.
+        self.by_score = np.argsort(-self.score, kind="stable")
+        self.by_score_with_cuisine = np.argsort(-self.score_with_cuisine, kind="stable")
+        # Inverse permutations (position -> rank), to resume after a cursor
+        self.rank_by_score = np.argsort(self.by_score)
+        self.rank_by_score_with_cuisine = np.argsort(self.by_score_with_cuisine)
+        # Scores in ranking order (descending, NaN last), to seek by score
+        self.sorted_score = self.score[self.by_score]
+        self.sorted_score_with_cuisine = self.score_with_cuisine[self.by_score_with_cuisine]
+
+
+class _CityPartition:
+    """
+    Arrays for the restaurants of one city, best first (rating DESC, votes DESC,
+    id ASC), with the ranking order of their match scores.
+    """
+
+    def __init__(self, rows: List[Tuple[Any, ...]], vocabulary: Dict[str, int], words: int):
+        ids = np.array([row[0] for row in rows], dtype=np.int64)
+        rating = np.array([np.nan if row[7] is None else row[7] for row in rows], dtype=np.float64)
+        votes = np.array([row[8] or 0 for row in rows], dtype=np.float64)
+        best_first = np.lexsort((ids, -votes, np.nan_to_num(-rating, nan=np.inf)))  # Unrated rows last
+
+        masks = np.zeros((words, len(rows)), dtype=np.uint64)
+        for i, row in enumerate(rows):
+            for token in _cuisine_tokens(row[4]):
+                bit = vocabulary[token]
+                masks[bit // 64, i] |= np.uint64(1 << (bit % 64))
+
+        cost = np.array([np.nan if row[5] is None else row[5] for row in rows], dtype=np.float64)
+        self.ids = ids[best_first]
+        self.cost = cost[best_first]
+        self.rating = rating[best_first]
+        self.votes = votes[best_first]
+        self.has_unknown_cost = bool(np.isnan(cost).any())
+        # Hand-tuned scores up front; learned weights are ranked on first use
+        self._rankings = {HAND_TUNED.key: _Ranking(self.rating, self.votes, HAND_TUNED)}
+        self._id_order = np.argsort(self.ids)
+        # One contiguous array per 64-bit mask word
+        self.masks = [np.ascontiguousarray(word[best_first]) for word in masks]
+        # Rows as RECOMMENDATION_QUERY returns them (id last)
+        self.rows = [rows[i][1:] + rows[i][:1] for i in best_first.tolist()]
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def ranking(self, weights: RankingWeights) -> _Ranking:
+        """
+        Scores and ranking orders under weights.
+        """
+        ranking = self._rankings.get(weights.key)
+        if ranking is None:
+            ranking = self._rankings[weights.key] = _Ranking(self.rating, self.votes, weights)
+        return ranking
+
+    def position_of(self, restaurant_id: int) -> Optional[int]:
+        """
+        Position of a restaurant id in the partition, or None if absent.
+        """
+        i = int(np.searchsorted(self.ids, restaurant_id, sorter=self._id_order))
+        if i < len(self.ids) and self.ids[self._id_order[i]] == restaurant_id:
+            return int(self._id_order[i])
+        return None
+
+
+class ColumnarIndex:
+    """
+    In-memory, vectorized equivalent of RECOMMENDATION_QUERY plus match scoring.
+    """
+
+    # Rows filtered in the first scan step (each further step is 4x larger)
+    SCAN_CHUNK = 64
+
+    def __init__(self, partitions: Dict[str, _CityPartition], vocabulary: Dict[str, int], words: int, stamp: Optional[Tuple[int, int]] = None):
+        """
+        Initialize the ColumnarIndex (use from_rows or from_database).
+
+        Args:
+            partitions: City name -> partition arrays
+            vocabulary: Lower-cased cuisine -> bit position
+            words: Number of 64-bit words per cuisine bitmask
+            stamp: (mtime_ns, size) of the database the index was loaded from
+        """
+        self.partitions = partitions
+        self.vocabulary = vocabulary
+        self.words = words
+        self.stamp = stamp
+        # Bounded: cuisine lists come from user input
+        self._query_masks: "OrderedDict[Tuple[str, ...], Optional[np.ndarray]]" = OrderedDict()
+        self._query_masks_lock = threading.Lock()
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Sequence[Any]], stamp: Optional[Tuple[int, int]] = None) -> "ColumnarIndex":
+        """
+        Build an index from rows in INDEX_COLUMNS order.
+
+        Args:
+            rows: Restaurant rows (id, name, city, address, cuisines, cost, price_category, rating, votes)
+            stamp: (mtime_ns, size) of the source database, if any
+
+        Returns:
+            ColumnarIndex
+        """
+        by_city: Dict[str, List[Tuple[Any, ...]]] = {}
+        vocabulary: Dict[str, int] = {}
+        for row in rows:
+            row = tuple(row)
+            by_city.setdefault(row[2], []).append(row)
+            for token in _cuisine_tokens(row[4]):
+                vocabulary.setdefault(token, len(vocabulary))
+
+        words = max(1, (len(vocabulary) + 63) // 64)
+        partitions = {city: _CityPartition(city_rows, vocabulary, words) for city, city_rows in by_city.items()}
+        return cls(partitions, vocabulary, words, stamp=stamp)
+
+    @classmethod
+    def from_database(cls, db_manager: DatabaseManager, stamp: Optional[Tuple[int, int]] = None) -> "ColumnarIndex":
+        """
+        Load every restaurant from a database (all partitions).
+
+        Args:
+            db_manager: Connected DatabaseManager to read from
+            stamp: (mtime_ns, size) of the database file
+
+        Returns:
+            ColumnarIndex
+        """
+        index = cls.from_rows(db_manager.iter_all(columns=INDEX_COLUMNS), stamp=stamp)
+        logger.info(f"Loaded columnar index: {len(index)} restaurants in {len(index.partitions)} cities")
+        return index
+
+    def __len__(self) -> int:
+        return sum(len(partition) for partition in self.partitions.values())
+
+    def _query_mask(self, cuisines: Tuple[str, ...]) -> Optional[np.ndarray]:
+        """
+        Bitmask of every vocabulary cuisine containing one of the requested
+        cuisines (the LIKE '%cuisine%' semantics of the SQL path), or None if a
+        request can only be matched against the raw string. The last
+        COLUMNAR_QUERY_MASK_CACHE_SIZE masks are kept.
+        """
+        with self._query_masks_lock:
+            if cuisines in self._query_masks:
+                self._query_masks.move_to_end(cuisines)
+                return self._query_masks[cuisines]
+
+        mask: Optional[np.ndarray] = np.zeros(self.words, dtype=np.uint64)
+        for cuisine in cuisines:
+            wanted = cuisine.lower()
+            if "," in wanted:
+                # Spans several cuisines of one restaurant: no single bit can say
+                mask = None
+                break
+            for token, bit in self.vocabulary.items():
+                if wanted in token:
+                    mask[bit // 64] |= np.uint64(1 << (bit % 64))
+
+        with self._query_masks_lock:
+            self._query_masks[cuisines] = mask
+            while len(self._query_masks) > COLUMNAR_QUERY_MASK_CACHE_SIZE:
+                self._query_masks.popitem(last=False)
+        return mask
+
+    def _matches(
+        self,
+        partition: _CityPartition,
+        positions: np.ndarray,
+        min_rating: float,
+        cost_bounds: Tuple[float, float],
+        cuisines: Optional[Tuple[str, ...]],
+        cuisine_mask: Optional[np.ndarray]
+    ) -> np.ndarray:
+        """
+        Boolean mask of the rows at positions that satisfy the rating, cost
+        range and cuisine filters.
+        """
+        keep = partition.rating[positions] >= min_rating  # NaN (unrated) never passes
+        min_cost, max_cost = cost_bounds
+        if min_cost > 0 or max_cost != np.inf or partition.has_unknown_cost:
+            cost = partition.cost[positions]
+            keep &= (cost >= min_cost) & (cost < max_cost)
+        if not cuisines:
+            return keep
+
+        if cuisine_mask is None:
+            matched = np.array([
+                any(c.lower() in (partition.rows[i][3] or "").lower() for c in cuisines)
+                for i in positions.tolist()
+            ], dtype=bool)
+        else:
+            matched = np.zeros(positions.size, dtype=bool)
+            for word, bits in enumerate(cuisine_mask.tolist()):
+                if bits:
+                    matched |= (partition.masks[word][positions] & np.uint64(bits)) != 0
+        return keep & matched
+
+    def _top_positions(
+        self,
+        user_input: UserInput,
+        limit: int,
+        after: Optional[RankKey] = None,
+        feedback: Optional[FeedbackAdjustments] = None,
+        weights: RankingWeights = HAND_TUNED
+    ) -> Tuple[Optional[_CityPartition], np.ndarray, np.ndarray]:
+        """
+        Partition positions of the top-k rows, best first, with their match scores.
+        """
+        empty = np.zeros(0, dtype=np.int64)
+        partition = self.partitions.get(user_input.city)
+        if partition is None or limit <= 0:
+            return None, empty, empty
+
+        cost_bounds = user_input.cost_bounds()
+        cuisines = tuple(user_input.cuisine) if user_input.cuisine else None
+        cuisine_mask = self._query_mask(cuisines) if cuisines else None
+        if cuisine_mask is not None and not cuisine_mask.any():
+            return None, empty, empty  # No known cuisine contains the requested ones
+
+        ranking = partition.ranking(weights)
+        if cuisines:
+            order, ranks, scores = ranking.by_score_with_cuisine, ranking.rank_by_score_with_cuisine, ranking.score_with_cuisine
+        else:
+            order, ranks, scores = ranking.by_score, ranking.rank_by_score, ranking.score
+
+        def matches(positions: np.ndarray) -> np.ndarray:
+            return positions[self._matches(partition, positions, user_input.min_rating, cost_bounds, cuisines, cuisine_mask)]
+
+        if feedback:
+            return self._top_adjusted(partition, ranking, order, matches, 1.0 if cuisines else 0.0, limit, after, feedback)
+
+        start = 0
+        if after is not None:
+            # Keyset: continue right after the cursor's row in ranking order
+            position = partition.position_of(after[3])
+            if position is None:
+                raise InvalidCursorError("Cursor row is not part of this database build")
+            start = int(ranks[position]) + 1
+
+        hits = []
+        found = 0
+        chunk = self.SCAN_CHUNK
+        while start < len(order) and found < limit:
+            positions = matches(order[start:start + chunk])
+            hits.append(positions)
+            found += positions.size
+            start += chunk
+            chunk *= 4
+        if not found:
+            return None, empty, empty
+
+        top = (hits[0] if len(hits) == 1 else np.concatenate(hits))[:limit]
+        return partition, top, scores[top]
+
+    def _top_adjusted(
+        self,
+        partition: _CityPartition,
+        ranking: _Ranking,
+        order: np.ndarray,
+        matches,
+        bonus: float,
+        limit: int,
+        after: Optional[RankKey],
+        feedback: FeedbackAdjustments
+    ) -> Tuple[Optional[_CityPartition], np.ndarray, np.ndarray]:
+        """
+        Top-k with feedback adjustments folded into the match scores.
+
+        Rows are still visited by unadjusted score; an adjustment moves a row
+        by at most max_boost up or max_penalty down, so the scan starts where
+        a cursor's score plus max_penalty is reached and stops once the next
+        unadjusted score plus max_boost falls below the k-th adjusted score.
+        """
+        empty = np.zeros(0, dtype=np.int64)
+        sorted_scores = ranking.sorted_score_with_cuisine if bonus else ranking.sorted_score
+        # Rounding moves a score by at most 0.005 either way
+        slack = 0.01
+        start = 0
+        if after is not None:
+            start = int(np.searchsorted(-sorted_scores, -(after[0] + feedback.max_penalty + slack), side="left"))
+
+        hits, adjusted = [], []
+        found = 0
+        kth = None
+        chunk = self.SCAN_CHUNK
+        while start < len(order):
+            upper = sorted_scores[start]
+            if np.isnan(upper) or (kth is not None and upper + feedback.max_boost + slack < kth):
+                break  # Unrated rows (NaN) never pass the rating filter
+            positions = matches(order[start:start + chunk])
+            start += chunk
+            chunk *= 4
+            score = ranking.base[positions] + bonus
+            score = np.clip(round_2(score + np.array([feedback.get(partition.rows[i][0]) for i in positions.tolist()])), 0.0, 10.0)
+            if after is not None:
+                later = ranked_after(after, score, partition.rating[positions], partition.votes[positions], partition.ids[positions])
+                positions, score = positions[later], score[later]
+            hits.append(positions)
+            adjusted.append(score)
+            found += positions.size
+            if found >= limit:
+                kth = float(np.partition(np.concatenate(adjusted), found - limit)[found - limit])
+        if not found:
+            return None, empty, empty
+
+        positions, score = np.concatenate(hits), np.concatenate(adjusted)
+        best = np.lexsort((partition.ids[positions], -partition.votes[positions], -partition.rating[positions], -score))[:limit]
+        return partition, positions[best], score[best]
+
+    def top_k(
+        self,
+        user_input: UserInput,
+        limit: int,
+        after: Optional[RankKey] = None,
+        feedback: Optional[FeedbackAdjustments] = None,
+        weights: RankingWeights = HAND_TUNED
+    ) -> List[ScoredRow]:
+        """
+        Exact top-k by match score, equivalent to the SQL backend.
+
+        Rows are visited in ranking order, so the first limit rows passing the
+        filters are the answer. They are found by filtering growing chunks of
+        that order, which usually touches a small prefix of the city.
+
+        Args:
+            user_input: Validated user preferences
+            limit: Number of results to return
+            after: Ranking key of a row already served; results continue after it
+            feedback: Per-restaurant match score adjustments to fold in
+            weights: Quality and popularity weights of the match score
+
+        Returns:
+            Up to limit (row, match_score) pairs, best first
+
+        Raises:
+            InvalidCursorError: If the after row is not in the index
+        """
+        partition, top, scores = self._top_positions(user_input, limit, after, feedback, weights)
+        if partition is None:
+            return []
+        return [(partition.rows[i], score) for i, score in zip(top.tolist(), scores.tolist())]
+
+    def relaxed_top_k(
+        self,
+        user_input: UserInput,
+        relaxation: Relaxation,
+        limit: int,
+        feedback: Optional[FeedbackAdjustments] = None,
+        weights: RankingWeights = HAND_TUNED
+    ) -> Tuple[Optional[int], List[ScoredRow]]:
+        """
+        Top-k of the lowest relaxation level with any match, from one
+        vectorized pass over the city's partition (see relaxation.py).
+
+        Args:
+            user_input: Validated user preferences (without dishes)
+            relaxation: Relaxation levels of user_input
+            limit: Number of results to return
+            feedback: Per-restaurant match score adjustments to fold in
+            weights: Quality and popularity weights of the match score
+
+        Returns:
+            (level, up to limit (row, match_score) pairs best first), or
+            (None, []) if even the loosest constraints match nothing
+        """
+        partition = self.partitions.get(user_input.city)
+        if partition is None or limit <= 0:
+            return None, []
+
+        loose = (relaxation.relaxed_lower, relaxation.relaxed_upper)
+        positions = np.flatnonzero(self._matches(partition, np.arange(len(partition)), relaxation.relaxed_rating, loose, None, None))
+        if not positions.size:
+            return None, []
+
+        cost, rating = partition.cost[positions], partition.rating[positions]
+        level = np.where(rating < relaxation.min_rating, 1, 0)
+        level = np.where((cost >= relaxation.lower) & (cost < relaxation.upper), level, 2)
+        cuisines = tuple(user_input.cuisine) if user_input.cuisine else None
+        if cuisines:
+            matched = self._matches(partition, positions, -np.inf, (-np.inf, np.inf), cuisines, self._query_mask(cuisines))
+            level = np.where(matched, level, 3)
+        best = int(level.min())
+        positions = positions[level == best]
+
+        # Rows below level 3 all match a requested cuisine, so they all get the bonus
+        score = partition.ranking(weights).base[positions]
+        if cuisines and best < 3:
+            score = score + 1.0
+        if feedback:
+            score = score + np.array([feedback.get(partition.rows[i][0]) for i in positions.tolist()])
+        score = np.clip(round_2(score), 0.0, 10.0)
+
+        order = np.lexsort((partition.ids[positions], -partition.votes[positions], -partition.rating[positions], -score))[:limit]
+        return best, [(partition.rows[i], s) for i, s in zip(positions[order].tolist(), score[order].tolist())]
+
+    def top_k_ids(self, user_input: UserInput, limit: int) -> List[Tuple[int, float]]:
+        """
+        Like top_k, but returns restaurant ids instead of rows.
+
+        Args:
+            user_input: Validated user preferences
+            limit: Number of results to return
+
+        Returns:
+            Up to limit (restaurant id, match_score) pairs, best first
+        """
+        partition, top, scores = self._top_positions(user_input, limit)
+        if partition is None:
+            return []
+        return list(zip(partition.ids[top].tolist(), scores.tolist()))
+
+
+def ranked_after(after: RankKey, score: np.ndarray, rating: np.ndarray, votes: np.ndarray, ids: np.ndarray) -> np.ndarray:
+    """
+    Boolean mask of the rows ranked after a cursor (score DESC, rating DESC, votes DESC, id ASC).
+    """
+    s, r, v, i = after
+    return (score < s) | ((score == s) & ((rating < r) | ((rating == r) & ((votes < v) | ((votes == v) & (ids > i))))))
+
+
+def round_2(values: np.ndarray) -> np.ndarray:
+    """
+    Round to 2 decimals exactly like Python's round(x, 2).
+
+    np.round scales by 100 first, which can land on the other side of a
+    half-way point; those few values are recomputed with round().
+    """
+    scaled = values * 100.0
+    rounded = np.round(values, 2)
+    near_half = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if near_half.any():
+        for i in np.nonzero(near_half)[0].tolist():
+            rounded[i] = round(float(values[i]), 2)
+    return rounded
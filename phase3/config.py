@@ -0,0 +1,93 @@
+"""
+Configuration constants for Phase 3 - Recommendation Engine
+"""
+
+import os
+
+# Async data access: size of the engine's dedicated executor and connection pool
+ASYNC_MAX_WORKERS = 4
+
+# Recommendation backend: "sql" runs RECOMMENDATION_QUERY per request,
+# "columnar" serves requests from in-memory NumPy arrays (see columnar_index.py)
+RECOMMENDATION_BACKENDS = ("sql", "columnar")
+RECOMMENDATION_BACKEND = os.getenv("ZOMATO_RECOMMENDER_BACKEND", "sql")
+
+# Cuisine query bitmasks the columnar index keeps per distinct cuisine list
+# (least recently used ones are dropped)
+COLUMNAR_QUERY_MASK_CACHE_SIZE = 256
+
+# Result cache for repeated preference sets (0 entries disables it)
+RESULT_CACHE_SIZE = 1024
+RESULT_CACHE_TTL_SECONDS = 300
+
+# Batch recommendations: worker processes (None = one per CPU) and the number
+# of JSONL lines python -m phase3.batch answers per batch
+BATCH_WORKERS = None
+BATCH_CHUNK_SIZE = 50000
+
+# Materialized recommendations (see precomputed.py): results kept per
+# locality x price category x cuisine x rating threshold, and build processes
+# (None = one per CPU)
+PRECOMPUTED_TOP_N = 20
+PRECOMPUTED_RATING_THRESHOLDS = (0.0, 3.0, 3.5, 4.0, 4.5)
+PRECOMPUTE_WORKERS = None
+
+# Skip pydantic validation when building response models from database rows
+# (safe for databases written by the Phase 1 build). Enable with ZOMATO_TRUSTED_ROWS=1.
+TRUSTED_DATABASE_ROWS = os.getenv("ZOMATO_TRUSTED_ROWS", "0") == "1"
+
+# "More like this" neighbours (see similarity.py): neighbours stored per
+# restaurant, cost band width in INR, rows per blocked similarity product,
+# build processes (None = one per CPU) and neighbours returned by default
+SIMILAR_TOP_N = 20
+SIMILAR_COST_BAND_WIDTH = 250
+SIMILAR_BLOCK_ROWS = 256
+SIMILAR_WORKERS = None
+SIMILAR_DEFAULT_LIMIT = 6
+
+# Offline semantic search (see semantic.py): hashed feature dimensions (a power
+# of two), SVD dimensions, documents sampled to fit the SVD and the IVF
+# centroids, IVF lists (None = sqrt of the restaurant count), lists probed
+# per query, and results returned by default and at most
+SEMANTIC_HASH_DIMS = 2 ** 16
+SEMANTIC_DIMS = 64
+SEMANTIC_FIT_SAMPLE = 20000
+SEMANTIC_IVF_LISTS = None
+SEMANTIC_NPROBE = 16
+SEMANTIC_DEFAULT_LIMIT = 10
+SEMANTIC_MAX_LIMIT = 50
+
+# Dish requests (see dish_index.py): match score bonus for restaurants known
+# for a requested dish (listed in dish_liked, not only on the menu)
+DISH_LIKED_BONUS = 1.0
+
+# Feedback-aware ranking (see feedback.py): aggregate store (kept next to the
+# feedback log), half-life of a rating, beta prior (mean approval and weight
+# in pseudo-ratings), largest match score adjustment either way, and how often
+# the engine reads changed aggregates / recomputes every decayed adjustment
+FEEDBACK_AGGREGATES_FILE = "feedback_aggregates.db"
+FEEDBACK_AGGREGATES_PATH = os.getenv("ZOMATO_FEEDBACK_AGGREGATES", os.path.join("data", "feedback", FEEDBACK_AGGREGATES_FILE))
+FEEDBACK_HALF_LIFE_DAYS = 30.0
+FEEDBACK_PRIOR_MEAN = 0.5
+FEEDBACK_PRIOR_WEIGHT = 5.0
+FEEDBACK_MAX_ADJUSTMENT = 1.0
+FEEDBACK_REFRESH_SECONDS = 5.0
+FEEDBACK_REBUILD_SECONDS = 3600.0
+
+# Learning to rank (see ranking_model.py and ltr_trainer.py): JSONL log of
+# served pages (unset = no logging), weight file exported by the trainer
+# (unset = hand-tuned weights), seconds after a page within which feedback
+# on a shown restaurant labels it, L2 strengths tried in parallel, gradient
+# descent epochs and training processes (None = one per CPU)
+QUERY_LOG_PATH = os.getenv("ZOMATO_QUERY_LOG")
+RANKING_WEIGHTS_PATH = os.getenv("ZOMATO_RANKING_WEIGHTS")
+LTR_LABEL_WINDOW_SECONDS = 24 * 3600
+LTR_L2_GRID = (0.0, 1e-4, 1e-3, 1e-2, 1e-1)
+LTR_EPOCHS = 500
+LTR_WORKERS = None
+
+# Zero-result relaxation (see relaxation.py): how far min_rating is lowered
+# before the budget widens to the adjacent price categories and the cuisine
+# is dropped. Disable with ZOMATO_RELAX_EMPTY_RESULTS=0.
+RELAX_EMPTY_RESULTS = os.getenv("ZOMATO_RELAX_EMPTY_RESULTS", "1") == "1"
+RELAX_MIN_RATING_STEP = 1.0
@@ -0,0 +1,360 @@
+"""
+Dish index for Phase 3 - Recommendation Engine
+Maps every normalized dish (from the dataset's dish_liked and menu_item) to
+the restaurants serving it, per city, as compressed posting lists: sorted
+restaurant ids, delta-encoded and stored as variable-length integers. Dish
+requests ("best biryani in BTM") start from the intersection of a few
+posting lists instead of a scan of the locality.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from phase1.config import DISH_INDEX_TABLE_NAME
+from phase1.data_cleaner import normalize_dish
+from phase1.database_setup import DatabaseManager
+from phase2.models import UserInput
+from phase3.columnar_index import ScoredRow, ranked_after, round_2
+from phase3.config import DISH_LIKED_BONUS
+from phase3.feedback import FeedbackAdjustments
+from phase3.pagination import RankKey
+from phase3.ranking_model import HAND_TUNED, RankingWeights
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Columns the postings are built from
+DISH_INDEX_COLUMNS = ("id", "dish_liked", "dishes")
+
+# Ranking columns of a city's restaurants, loaded with its postings
+RANKING_COLUMNS = ("id", "average_cost_for_two", "aggregate_rating", "votes", "cuisines", "name")
+
+# Result rows by id, in RECOMMENDATION_QUERY column order
+DISH_ROWS_QUERY = """
+SELECT name, city, address, cuisines, average_cost_for_two, price_category, aggregate_rating, votes, id
+FROM {table}
+WHERE id IN (SELECT value FROM json_each(?1))
+"""
+
+_EMPTY = np.zeros(0, dtype=np.int64)
+
+
+def encode_postings(ids: Sequence[int]) -> bytes:
+    """
+    Compress strictly increasing restaurant ids: gaps between consecutive ids
+    (the first id itself for the first one), 7 bits per byte, with the high
+    bit set on every byte but the last of a gap (LEB128 varints).
+
+    Args:
+        ids: Strictly increasing non-negative ids
+
+    Returns:
+        Encoded postings
+    """
+    gaps = np.diff(np.asarray(ids, dtype=np.int64), prepend=0)
+    if not gaps.size:
+        return b""
+    lengths = np.ones(gaps.size, dtype=np.int64)
+    rest = gaps >> 7
+    while rest.any():
+        lengths += rest > 0
+        rest >>= 7
+
+    encoded = np.empty(int(lengths.sum()), dtype=np.uint8)
+    starts = np.cumsum(lengths) - lengths
+    for k in range(int(lengths.max())):
+        selected = lengths > k
+        more = (lengths[selected] > k + 1).astype(np.int64) << 7
+        encoded[starts[selected] + k] = ((gaps[selected] >> (7 * k)) & 0x7F) | more
+    return encoded.tobytes()
+
+
+def decode_postings(data: bytes) -> np.ndarray:
+    """
+    Restaurant ids of encoded postings (vectorized; no per-id Python work).
+
+    Args:
+        data: Postings written by encode_postings
+
+    Returns:
+        Sorted int64 array of ids
+    """
+    encoded = np.frombuffer(data, dtype=np.uint8)
+    if not encoded.size:
+        return _EMPTY
+    last = encoded < 0x80
+    starts = np.flatnonzero(np.concatenate(([True], last[:-1])))
+    value_of = np.cumsum(last) - last
+    shifts = 7 * (np.arange(encoded.size) - starts[value_of])
+    gaps = np.add.reduceat((encoded & 0x7F).astype(np.int64) << shifts, starts)
+    return np.cumsum(gaps)
+
+
+def _split_dishes(value: Optional[str]) -> List[str]:
+    """
+    Normalized dish names of a comma-separated column value.
+    """
+    return [dish for dish in (normalize_dish(name) for name in (value or "").split(",")) if dish]
+
+
+def dish_postings(rows: Iterable[Sequence[Any]]) -> List[Tuple[str, int, bytes, bytes]]:
+    """
+    Posting lists of one city's restaurants.
+
+    Args:
+        rows: (id, dish_liked, dishes) rows
+
+    Returns:
+        (dish, restaurant count, postings, liked postings) tuples, where the
+        liked postings are the restaurants listing the dish in dish_liked
+    """
+    served: Dict[str, List[int]] = {}
+    liked: Dict[str, List[int]] = {}
+    for restaurant_id, dish_liked, dishes in sorted(rows):
+        favourites = _split_dishes(dish_liked)
+        for dish in dict.fromkeys(favourites + _split_dishes(dishes)):
+            served.setdefault(dish, []).append(restaurant_id)
+        for dish in dict.fromkeys(favourites):
+            liked.setdefault(dish, []).append(restaurant_id)
+    return [
+        (dish, len(ids), encode_postings(ids), encode_postings(liked.get(dish, [])))
+        for dish, ids in sorted(served.items())
+    ]
+
+
+def build_dish_index(db_manager: DatabaseManager, cities: Optional[Sequence[str]] = None) -> int:
+    """
+    Store the dish posting lists of every city.
+
+    Args:
+        db_manager: DatabaseManager of the freshly built database
+        cities: Cities to (re)build (defaults to every city)
+
+    Returns:
+        Number of (city, dish) posting lists stored
+    """
+    cities = list(cities) if cities is not None else db_manager.get_cities()
+    logger.info(f"Building the dish index for {len(cities)} cities...")
+
+    lists = postings = size = 0
+    for city in cities:
+        rows = dish_postings(db_manager.iter_by_city(city, columns=DISH_INDEX_COLUMNS))
+        db_manager.write_dish_index(city, rows)
+        lists += len(rows)
+        postings += sum(row[1] for row in rows)
+        size += sum(len(row[2]) + len(row[3]) for row in rows)
+
+    logger.info(f"Stored {lists} dish posting lists ({postings} postings, {size} bytes)")
+    return lists
+
+
+class CityDishes:
+    """
+    Dish vocabulary and encoded posting lists of one city, with the columns
+    its restaurants are filtered and ranked by (NumPy arrays in id order).
+    """
+
+    def __init__(self, rows: Iterable[Tuple[str, int, bytes, bytes]], restaurants: Iterable[Sequence[Any]] = ()):
+        """
+        Initialize CityDishes (use load_city_dishes).
+
+        Args:
+            rows: (dish, restaurant count, postings, liked postings) tuples
+            restaurants: The city's restaurants, in RANKING_COLUMNS order
+        """
+        self.postings: Dict[str, Tuple[int, bytes, bytes]] = {}
+        self._by_word: Dict[str, List[str]] = {}
+        for dish, count, postings, liked in rows:
+            self.postings[dish] = (count, bytes(postings), bytes(liked))
+            for word in set(dish.split()):
+                self._by_word.setdefault(word, []).append(dish)
+
+        restaurants = sorted(restaurants)
+        self.ids = np.array([row[0] for row in restaurants], dtype=np.int64)
+        self.cost = np.array([np.nan if row[1] is None else row[1] for row in restaurants], dtype=np.float64)
+        self.rating = np.array([np.nan if row[2] is None else row[2] for row in restaurants], dtype=np.float64)
+        self.votes = np.array([row[3] or 0 for row in restaurants], dtype=np.float64)
+        self.cuisines = [(row[4] or "").lower() for row in restaurants]
+        self.names = [row[5] for row in restaurants]
+
+    def __len__(self) -> int:
+        return len(self.postings)
+
+    def match(self, query: str) -> List[str]:
+        """
+        Vocabulary dishes containing the query's words as a phrase
+        ("biryani" matches "biryani" and "chicken biryani").
+
+        Args:
+            query: Dish name as requested
+
+        Returns:
+            Matching dishes
+        """
+        query = normalize_dish(query)
+        lists = [self._by_word.get(word, []) for word in query.split()]
+        if not lists:
+            return []
+        phrase = f" {query} "
+        return [dish for dish in min(lists, key=len) if phrase in f" {dish} "]
+
+    def lookup(self, queries: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Restaurants serving every requested dish.
+
+        Each request dish is the union of the postings of the dishes it
+        matches; the unions are intersected, smallest first.
+
+        Args:
+            queries: Requested dishes
+
+        Returns:
+            (restaurant ids, ids of those known for one of the dishes), both sorted
+        """
+        matches = [self.match(query) for query in queries]
+        if not matches or not all(matches):
+            return _EMPTY, _EMPTY
+        matches.sort(key=lambda dishes: sum(self.postings[dish][0] for dish in dishes))
+
+        served: Optional[np.ndarray] = None
+        liked = []
+        for dishes in matches:
+            ids = _union([decode_postings(self.postings[dish][1]) for dish in dishes])
+            served = ids if served is None else np.intersect1d(served, ids, assume_unique=True)
+            if not served.size:
+                return _EMPTY, _EMPTY
+            liked.extend(decode_postings(self.postings[dish][2]) for dish in dishes)
+        assert served is not None
+        return served, np.intersect1d(_union(liked), served, assume_unique=True)
+
+    def top_k(
+        self,
+        user_input: UserInput,
+        limit: int,
+        after: Optional[RankKey] = None,
+        feedback: Optional[FeedbackAdjustments] = None,
+        weights: RankingWeights = HAND_TUNED
+    ) -> List[Tuple[int, float]]:
+        """
+        Exact top-k of a dish request among the restaurants of the posting-list
+        intersection, ranked like the SQL backend.
+
+        Filters and match scores are computed for the candidates alone, with
+        the arithmetic of RecommendationEngine._calculate_match_score plus
+        DISH_LIKED_BONUS for restaurants known for a requested dish and the
+        feedback adjustment of each candidate.
+
+        Args:
+            user_input: Validated user preferences with at least one dish
+            limit: Number of results to return
+            after: Ranking key of a row already served; results continue after it
+            feedback: Per-restaurant match score adjustments to fold in
+            weights: Quality and popularity weights of the match score
+
+        Returns:
+            Up to limit (restaurant id, match_score) pairs, best first
+        """
+        served, liked = self.lookup(user_input.dish or [])
+        if limit <= 0 or not served.size:
+            return []
+
+        positions = np.minimum(np.searchsorted(self.ids, served), len(self.ids) - 1)
+        positions = positions[self.ids[positions] == served]
+        ids, rating, votes, cost = self.ids[positions], self.rating[positions], self.votes[positions], self.cost[positions]
+        min_cost, max_cost = user_input.cost_bounds()
+        keep = (rating >= user_input.min_rating) & (cost >= min_cost) & (cost < max_cost)  # NaN never passes
+        if user_input.cuisine:
+            wanted = [cuisine.lower() for cuisine in user_input.cuisine]
+            candidates = np.flatnonzero(keep)
+            matched = [any(c in self.cuisines[i] for c in wanted) for i in positions[candidates].tolist()]
+            keep[candidates[~np.array(matched, dtype=bool)]] = False
+        ids, rating, votes, positions = ids[keep], rating[keep], votes[keep], positions[keep]
+
+        score = weights.base_array(rating, votes)
+        if user_input.cuisine:
+            score = score + 1.0
+        score = score + np.where(np.isin(ids, liked), DISH_LIKED_BONUS, 0.0)
+        if feedback:
+            score = score + np.array([feedback.get(self.names[i]) for i in positions.tolist()])
+        score = np.clip(round_2(score), 0.0, 10.0)
+
+        if after is not None:
+            later = ranked_after(after, score, rating, votes, ids)
+            ids, rating, votes, score = ids[later], rating[later], votes[later], score[later]
+
+        order = np.lexsort((ids, -votes, -rating, -score))[:limit]
+        return list(zip(ids[order].tolist(), score[order].tolist()))
+
+
+def _union(arrays: List[np.ndarray]) -> np.ndarray:
+    """
+    Sorted union of sorted id arrays.
+    """
+    if len(arrays) == 1:
+        return arrays[0]
+    return np.unique(np.concatenate(arrays)) if arrays else _EMPTY
+
+
+def load_city_dishes(db_manager: DatabaseManager, city: str) -> Optional[CityDishes]:
+    """
+    Read the dish index of one city, with its restaurants' ranking columns.
+
+    Args:
+        db_manager: Connected DatabaseManager
+        city: City name
+
+    Returns:
+        CityDishes, or None if the database was built without a dish index
+    """
+    try:
+        rows = db_manager.connection_for(city).execute(
+            f"SELECT dish, restaurants, postings, liked FROM {DISH_INDEX_TABLE_NAME} WHERE city = ?",
+            (city,)
+        ).fetchall()
+    except sqlite3.OperationalError:
+        return None
+    return CityDishes(rows, db_manager.iter_by_city(city, columns=RANKING_COLUMNS))
+
+
+class DishIndex:
+    """
+    Dish index of one database version, loaded city by city on first use.
+    """
+
+    def __init__(self, version: Optional[Hashable]):
+        self.version = version
+        self._cities: Dict[str, Optional[CityDishes]] = {}
+        self._lock = threading.Lock()
+
+    def city(self, db_manager: DatabaseManager, city: str) -> Optional[CityDishes]:
+        """
+        Dishes of one city (None if the database has no dish index).
+        """
+        if city not in self._cities:
+            with self._lock:
+                if city not in self._cities:
+                    self._cities[city] = load_city_dishes(db_manager, city)
+        return self._cities[city]
+
+
+def fetch_ranked_rows(connection: sqlite3.Connection, table_name: str, ranked: List[Tuple[int, float]]) -> List[ScoredRow]:
+    """
+    Rows of ranked restaurants, by primary key, in ranking order.
+
+    Args:
+        connection: Connection holding the city's restaurants
+        table_name: Restaurants table name
+        ranked: (restaurant id, match_score) pairs from CityDishes.top_k
+
+    Returns:
+        (row, match_score) pairs in RECOMMENDATION_QUERY column order
+    """
+    ids = json.dumps([restaurant_id for restaurant_id, _ in ranked])
+    rows = {row[-1]: tuple(row) for row in connection.execute(DISH_ROWS_QUERY.format(table=table_name), (ids,))}
+    return [(rows[restaurant_id], score) for restaurant_id, score in ranked if restaurant_id in rows]
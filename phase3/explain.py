@@ -0,0 +1,217 @@
+"""
+Explain mode for Phase 3 - Recommendation Engine
+Profiles one recommendation request (get_recommendations(explain=True)):
+where its time went stage by stage, the SQL it executed with the query plans
+SQLite chose, how many candidates survived the filters and whether the result
+cache answered it.
+
+Stages are laps of one clock: each lap is the time since the previous one, so
+the stages add up to the request's total and nothing is timed twice. Row
+fetches are timed separately (sql_fetch) and taken out of the lap they happen
+in, which leaves the Python work on the rows (scoring) in that lap. SQLite
+decodes the columns of a row while stepping to it, so row decoding is part of
+sql_fetch.
+
+Requests without explain pass no trace and skip every timing point.
+"""
+
+import json
+import logging
+import re
+import sqlite3
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from phase1.database_setup import DatabaseManager
+from phase2.models import UserInput
+from phase3.models import ExplainReport, ExplainedStatement, RecommendationResponse
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Rows of a locality and rows of it passing the request's filters, with the
+# filters of RECOMMENDATION_QUERY (the dish constraint is not counted)
+CANDIDATE_COUNT_QUERY = """
+SELECT COUNT(*), COALESCE(SUM(
+    average_cost_for_two >= ?2 AND average_cost_for_two < ?3 AND aggregate_rating >= ?4
+    AND (?5 IS NULL OR EXISTS (
+        SELECT 1 FROM json_each(?5) WHERE {table}.cuisines LIKE '%' || json_each.value || '%'
+    ))
+), 0)
+FROM {table}
+WHERE city = ?1
+"""
+
+# Quoted strings, which are kept as they are when statements are planned
+_QUOTED = re.compile(r"('(?:[^']|'')*')")
+_INFINITY = re.compile(r"\bInf\b")
+
+
+def _plannable(sql: str) -> str:
+    """
+    Executed statement in a form EXPLAIN accepts: SQLite writes infinite
+    bound values as a bare Inf, which is not valid SQL, so they are replaced
+    with a literal that parses to infinity.
+    """
+    parts = _QUOTED.split(sql)
+    return "".join(part if i % 2 else _INFINITY.sub("1e999", part) for i, part in enumerate(parts))
+
+
+def query_plan(connection: sqlite3.Connection, sql: str) -> List[str]:
+    """
+    EXPLAIN QUERY PLAN of an executed statement, one line per plan step,
+    indented by depth like the sqlite3 shell prints it.
+
+    Args:
+        connection: Connection the statement ran on
+        sql: Statement with its bound values inlined
+
+    Returns:
+        Plan lines (a single "unavailable" line if it cannot be planned)
+    """
+    try:
+        rows = connection.execute("EXPLAIN QUERY PLAN " + _plannable(sql)).fetchall()
+    except sqlite3.Error as e:
+        return [f"unavailable: {e}"]
+    depths = {0: -1}
+    lines = []
+    for node, parent, _, detail in rows:
+        depths[node] = depths.get(parent, -1) + 1
+        lines.append("  " * depths[node] + detail)
+    return lines
+
+
+class _TimedRows:
+    """
+    Iterator over a cursor's rows that times every fetch and counts the rows read.
+    """
+
+    def __init__(self, trace: "ExplainTrace", rows: Any, stage: str):
+        self._trace = trace
+        self._rows = iter(rows)
+        self._stage = stage
+
+    def __iter__(self) -> "_TimedRows":
+        return self
+
+    def __next__(self) -> Any:
+        start = time.perf_counter()
+        try:
+            row = next(self._rows)
+        finally:
+            elapsed = time.perf_counter() - start
+            self._trace.add(self._stage, elapsed)
+            # Fetches are not part of the lap they happen in
+            self._trace._last += elapsed
+        self._trace.candidates["read"] = self._trace.candidates.get("read", 0) + 1
+        return row
+
+
+class ExplainTrace:
+    """
+    Timings, executed statements and candidate counts of one request.
+    """
+
+    def __init__(self):
+        self.created = self._last = time.perf_counter()
+        self.timings: Dict[str, float] = {}  # Stage -> seconds, in first-seen order
+        self.candidates: Dict[str, int] = {}
+        self.path = "unknown"  # Ranker that answered: sql, precomputed, columnar, dish, relaxed or cache
+        self.result_cache = "disabled"  # hit, miss or disabled
+        self._statements: List[Tuple[sqlite3.Connection, str]] = []
+        self._watched: List[sqlite3.Connection] = []
+
+    def add(self, stage: str, seconds: float):
+        """
+        Add time to a stage.
+        """
+        self.timings[stage] = self.timings.get(stage, 0.0) + seconds
+
+    def lap(self, stage: str):
+        """
+        Charge the time since the previous lap to a stage.
+        """
+        now = time.perf_counter()
+        self.add(stage, now - self._last)
+        self._last = now
+
+    def rows(self, cursor: Any, stage: str = "sql_fetch") -> _TimedRows:
+        """
+        Iterate a cursor, charging its fetches to stage and counting the rows read.
+        """
+        return _TimedRows(self, cursor, stage)
+
+    def watch(self, db_manager: DatabaseManager, city: str):
+        """
+        Record every statement executed on the connections serving city until
+        unwatch is called (before the connections serve other requests).
+        """
+        connections = [db_manager.connect(), db_manager.connection_for(city)]
+        for connection in connections:
+            if connection not in self._watched:
+                connection.set_trace_callback(lambda sql, c=connection: self._statements.append((c, sql)))
+                self._watched.append(connection)
+
+    def unwatch(self):
+        """
+        Stop recording statements.
+        """
+        for connection in self._watched:
+            connection.set_trace_callback(None)
+        self._watched = []
+
+    def count_candidates(self, db_manager: DatabaseManager, user_input: UserInput):
+        """
+        Count the rows of the locality and those passing the request's filters
+        (an extra query, run after the request and not timed).
+        """
+        lower, upper = user_input.cost_bounds()
+        cuisines_json = json.dumps(user_input.cuisine) if user_input.cuisine else None
+        try:
+            locality, matched = db_manager.connection_for(user_input.city).execute(
+                CANDIDATE_COUNT_QUERY.format(table=db_manager.table_name),
+                (user_input.city, lower, upper, user_input.min_rating, cuisines_json)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Could not count candidates: {e}")
+            return
+        self.candidates["locality"] = locality
+        self.candidates["matched"] = matched
+
+    def report(
+        self,
+        db_manager: DatabaseManager,
+        user_input: UserInput,
+        response: RecommendationResponse,
+        backend: str,
+        cache_stats: Optional[Dict[str, int]] = None
+    ) -> ExplainReport:
+        """
+        Finish the trace: plan the recorded statements and count the candidates.
+
+        Args:
+            db_manager: Connected DatabaseManager the request ran on
+            user_input: Preferences of the request
+            response: Response served
+            backend: Engine backend
+            cache_stats: Result cache counters
+
+        Returns:
+            ExplainReport with timings in microseconds
+        """
+        timings = {stage: round(seconds * 1e6, 1) for stage, seconds in self.timings.items()}
+        timings["total"] = round((time.perf_counter() - self.created) * 1e6, 1)
+
+        statements = [ExplainedStatement(sql=sql.strip(), plan=query_plan(connection, sql)) for connection, sql in self._statements]
+        self.count_candidates(db_manager, user_input)
+        self.candidates["returned"] = response.count
+        return ExplainReport(
+            backend=backend,
+            path=self.path,
+            timings_us=timings,
+            statements=statements,
+            candidates=self.candidates,
+            result_cache=self.result_cache,
+            cache_stats=cache_stats or {}
+        )
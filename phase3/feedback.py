@@ -0,0 +1,250 @@
+"""
+Feedback-aware ranking for Phase 3 - Recommendation Engine
+Keeps one aggregate row per restaurant in a small SQLite store next to the
+feedback log: time-decayed positive and negative counts, updated in place on
+every write. The engine reads the aggregates into an immutable snapshot of
+match score adjustments (a Bayesian-smoothed approval, centred on the prior),
+refreshed incrementally from the rows changed since the last refresh, so a
+request never reads the feedback log.
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+from phase3.config import (
+    FEEDBACK_HALF_LIFE_DAYS, FEEDBACK_MAX_ADJUSTMENT, FEEDBACK_PRIOR_MEAN, FEEDBACK_PRIOR_WEIGHT,
+    FEEDBACK_REBUILD_SECONDS, FEEDBACK_REFRESH_SECONDS
+)
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+FEEDBACK_TABLE_NAME = "feedback_aggregates"
+
+# seq orders the rows by last update, so a refresh reads only what changed
+CREATE_FEEDBACK_TABLE = f"""
+CREATE TABLE IF NOT EXISTS {FEEDBACK_TABLE_NAME} (
+    restaurant TEXT PRIMARY KEY,
+    positive REAL NOT NULL,
+    negative REAL NOT NULL,
+    count INTEGER NOT NULL,
+    updated_at REAL NOT NULL,
+    seq INTEGER NOT NULL
+)
+"""
+CREATE_SEQ_INDEX = f"CREATE INDEX IF NOT EXISTS idx_feedback_seq ON {FEEDBACK_TABLE_NAME}(seq)"
+
+
+def feedback_key(restaurant_name: str) -> str:
+    """
+    Aggregate key of a restaurant name (case and whitespace insensitive).
+    """
+    return " ".join(restaurant_name.lower().split())
+
+
+def feedback_signal(rating: float) -> float:
+    """
+    Share of a rating that counts as positive: 0 is a thumbs down and 1 a
+    thumbs up; 2 to 5 are read as stars (5 fully positive, 3 neutral).
+    """
+    if rating <= 1:
+        return 1.0 if rating >= 1 else 0.0
+    return min((rating - 1.0) / 4.0, 1.0)
+
+
+def decay_factor(elapsed_seconds: float, half_life_days: float = FEEDBACK_HALF_LIFE_DAYS) -> float:
+    """
+    Weight left to feedback after elapsed_seconds (halved every half_life_days).
+    """
+    return 0.5 ** (max(elapsed_seconds, 0.0) / (half_life_days * 86400.0))
+
+
+def smoothed_score(
+    positive: float,
+    negative: float,
+    prior_mean: float = FEEDBACK_PRIOR_MEAN,
+    prior_weight: float = FEEDBACK_PRIOR_WEIGHT
+) -> float:
+    """
+    Bayesian (beta prior) estimate of the share of positive feedback: a few
+    votes barely move it away from prior_mean, many votes dominate the prior.
+    """
+    return (positive + prior_mean * prior_weight) / (positive + negative + prior_weight)
+
+
+def adjustment(positive: float, negative: float, max_adjustment: float = FEEDBACK_MAX_ADJUSTMENT) -> float:
+    """
+    Match score adjustment of a restaurant, within [-max_adjustment, max_adjustment]
+    (0 for a restaurant scored exactly at the prior).
+    """
+    score = smoothed_score(positive, negative)
+    if score >= FEEDBACK_PRIOR_MEAN:
+        return max_adjustment * (score - FEEDBACK_PRIOR_MEAN) / (1.0 - FEEDBACK_PRIOR_MEAN)
+    return max_adjustment * (score - FEEDBACK_PRIOR_MEAN) / FEEDBACK_PRIOR_MEAN
+
+
+class FeedbackAdjustments:
+    """
+    Immutable snapshot of per-restaurant match score adjustments.
+
+    max_boost and max_penalty bound every adjustment in the snapshot, so
+    rankers that stream candidates by unadjusted score know when no later
+    candidate can still enter the top-k.
+    """
+
+    def __init__(self, adjustments: Dict[str, float], generation: int = 0):
+        """
+        Initialize FeedbackAdjustments.
+
+        Args:
+            adjustments: feedback_key -> match score adjustment
+            generation: Counter bumped by every refresh that changed something
+        """
+        self._adjustments = adjustments
+        self.generation = generation
+        self.max_boost = max([0.0] + [value for value in adjustments.values() if value > 0])
+        self.max_penalty = max([0.0] + [-value for value in adjustments.values() if value < 0])
+
+    def __len__(self) -> int:
+        return len(self._adjustments)
+
+    def get(self, restaurant_name: Optional[str]) -> float:
+        """
+        Adjustment of one restaurant (0 without feedback); one dict lookup.
+        """
+        if not restaurant_name:
+            return 0.0
+        return self._adjustments.get(feedback_key(restaurant_name), 0.0)
+
+    def as_dict(self) -> Dict[str, float]:
+        """
+        Copy of the adjustments (e.g. to ship to batch worker processes).
+        """
+        return dict(self._adjustments)
+
+
+class FeedbackStore:
+    """
+    Per-restaurant feedback aggregates in SQLite, written incrementally by
+    FeedbackCollector and read by the engine as FeedbackAdjustments.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        refresh_seconds: float = FEEDBACK_REFRESH_SECONDS,
+        rebuild_seconds: float = FEEDBACK_REBUILD_SECONDS,
+        clock=time.time
+    ):
+        """
+        Initialize the FeedbackStore.
+
+        Args:
+            path: SQLite file of the aggregates (created on the first write)
+            refresh_seconds: Minimum seconds between two reads of changed rows
+            rebuild_seconds: Seconds after which every adjustment is recomputed,
+                so decay also reaches restaurants without new feedback
+            clock: Wall clock (seconds since the epoch)
+        """
+        self.path = Path(path)
+        self.refresh_seconds = refresh_seconds
+        self.rebuild_seconds = rebuild_seconds
+        self._clock = clock
+        self._snapshot = FeedbackAdjustments({})
+        self._seq = 0
+        self._refreshed_at: Optional[float] = None
+        self._rebuilt_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        # Autocommit mode; writes open their own IMMEDIATE transaction
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    def record(self, restaurant_name: str, rating: float, timestamp: Optional[float] = None):
+        """
+        Fold one rating into the restaurant's aggregate: its counts are decayed
+        to now and the rating is added (one row read and written).
+
+        Args:
+            restaurant_name: Name of the restaurant
+            rating: 0/1 thumbs or 1-5 stars (see feedback_signal)
+            timestamp: Time of the feedback (defaults to now)
+        """
+        key = feedback_key(restaurant_name)
+        if not key:
+            return
+        now = self._clock() if timestamp is None else timestamp
+        up = feedback_signal(rating)
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as connection:
+            connection.execute(CREATE_FEEDBACK_TABLE)
+            connection.execute(CREATE_SEQ_INDEX)
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                row = connection.execute(
+                    f"SELECT positive, negative, count, updated_at FROM {FEEDBACK_TABLE_NAME} WHERE restaurant = ?",
+                    (key,)
+                ).fetchone()
+                positive, negative, count, updated_at = row if row is not None else (0.0, 0.0, 0, now)
+                factor = decay_factor(now - updated_at)
+                seq = connection.execute(f"SELECT COALESCE(MAX(seq), 0) + 1 FROM {FEEDBACK_TABLE_NAME}").fetchone()[0]
+                connection.execute(
+                    f"INSERT OR REPLACE INTO {FEEDBACK_TABLE_NAME} VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, positive * factor + up, negative * factor + (1.0 - up), count + 1, max(now, updated_at), seq)
+                )
+                connection.execute("COMMIT")
+            except Exception:
+                connection.execute("ROLLBACK")
+                raise
+
+    def adjustments(self) -> FeedbackAdjustments:
+        """
+        Current adjustments, refreshed at most every refresh_seconds from the
+        aggregate rows written since the previous refresh.
+
+        Returns:
+            FeedbackAdjustments (empty if no feedback was ever recorded)
+        """
+        now = self._clock()
+        if self._refreshed_at is not None and now - self._refreshed_at < self.refresh_seconds:
+            return self._snapshot
+
+        with self._lock:
+            if self._refreshed_at is not None and now - self._refreshed_at < self.refresh_seconds:
+                return self._snapshot
+            self._refreshed_at = now
+            if not self.path.exists():
+                return self._snapshot
+
+            rebuild = self._rebuilt_at is None or now - self._rebuilt_at >= self.rebuild_seconds
+            since = 0 if rebuild else self._seq
+            try:
+                with closing(sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, timeout=30)) as connection:
+                    rows = connection.execute(
+                        f"SELECT restaurant, positive, negative, updated_at, seq FROM {FEEDBACK_TABLE_NAME} WHERE seq > ?",
+                        (since,)
+                    ).fetchall()
+            except sqlite3.Error as e:
+                logger.warning(f"Could not read feedback aggregates from {self.path}: {e}")
+                return self._snapshot
+
+            if not rows and not rebuild:
+                return self._snapshot
+            # Changed rows are recomputed; the others keep the decay of the last rebuild
+            adjusted = {} if rebuild else self._snapshot.as_dict()
+            for key, positive, negative, updated_at, seq in rows:
+                factor = decay_factor(now - updated_at)
+                adjusted[key] = adjustment(positive * factor, negative * factor)
+                self._seq = max(self._seq, seq)
+
+            if rebuild:
+                self._rebuilt_at = now
+            self._snapshot = FeedbackAdjustments(adjusted, self._snapshot.generation + 1)
+            return self._snapshot
@@ -0,0 +1,267 @@
+"""
+Learning-to-rank trainer for Phase 3 - Recommendation Engine
+Fits the quality and popularity weights of the match score offline from the
+query log (pages the engine served, see query_log.py) and the feedback log
+(ratings users gave, see phase5/feedback_collector.py), and exports a
+versioned weight file the engine loads (ZOMATO_RANKING_WEIGHTS).
+
+Usage:
+    python -m phase3.ltr_trainer --query-log data/logs/queries.jsonl [--feedback data/feedback/user_feedback.json]
+        [--output-dir data/models] [--window-hours 24] [--workers 4]
+
+Feedback given within the label window after a page was served labels the
+restaurants on it. Training pairs are (preferred, other) restaurants of one
+page: a better-rated restaurant over a worse-rated one, and a liked
+restaurant over the unlabelled ones shown above it (they were skipped). A
+pairwise logistic model is fitted on the feature differences for every L2
+strength in LTR_L2_GRID, in parallel, and the strength with the best pairwise
+accuracy on held-out queries wins.
+
+Only the quality and popularity weights are learned: the cuisine bonus is
+the same for every restaurant of a page, so pairs carry no signal about it.
+Weights are constrained to be non-negative and scaled to the hand-tuned sum
+of 10, so learned scores stay on the 0-10 scale.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import zlib
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from phase3.config import LTR_EPOCHS, LTR_L2_GRID, LTR_LABEL_WINDOW_SECONDS, LTR_WORKERS
+from phase3.feedback import feedback_key, feedback_signal
+from phase3.query_log import read_query_log
+from phase3.ranking_model import FEATURES, HAND_TUNED, RankingWeights, features
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PAIR_CHUNK_SIZE = 2000
+VALIDATION_SHARE = 0.2
+
+# Feedback log of the worker process (set once per worker by _init_worker)
+_feedback: Dict[str, List[Tuple[float, float]]] = {}
+
+
+def load_feedback(path: Path) -> Dict[str, List[Tuple[float, float]]]:
+    """
+    Ratings of the feedback log by restaurant.
+
+    Args:
+        path: JSON array written by FeedbackCollector
+
+    Returns:
+        feedback_key -> sorted (timestamp, positive share) pairs
+    """
+    with open(path, encoding="utf-8") as f:
+        entries = json.load(f)
+    ratings = defaultdict(list)
+    for entry in entries:
+        try:
+            timestamp = datetime.fromisoformat(entry["timestamp"]).timestamp()
+            ratings[feedback_key(entry["restaurant"])].append((timestamp, feedback_signal(float(entry["rating"]))))
+        except (KeyError, TypeError, ValueError):
+            continue
+    return {key: sorted(values) for key, values in ratings.items()}
+
+
+def _init_worker(feedback: Dict[str, List[Tuple[float, float]]]):
+    global _feedback
+    _feedback = feedback
+
+
+def _label(name: str, start: float, window_seconds: float) -> Optional[float]:
+    """
+    Mean positive share of the ratings of a restaurant within the window, or None.
+    """
+    signals = [signal for timestamp, signal in _feedback.get(feedback_key(name), ()) if start <= timestamp <= start + window_seconds]
+    return sum(signals) / len(signals) if signals else None
+
+
+def _page_pairs(entry: Dict[str, Any], window_seconds: float) -> List[Tuple[int, int]]:
+    """
+    (preferred, other) result positions of one logged page.
+    """
+    start = datetime.fromisoformat(entry["timestamp"]).timestamp()
+    labels = [_label(result["name"], start, window_seconds) for result in entry["results"]]
+    pairs = []
+    for i, label in enumerate(labels):
+        if label is None:
+            continue
+        for j, other in enumerate(labels):
+            if other is not None and label > other:
+                pairs.append((i, j))
+            elif other is None and j < i and label > 0.5:
+                pairs.append((i, j))
+    return pairs
+
+
+def _pairs_for_chunk(args: Tuple[int, List[Dict[str, Any]], float]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Feature differences of the pairs of a chunk of logged pages and the query
+    number of every pair (to split training and validation by query).
+    """
+    first, entries, window_seconds = args
+    diffs, queries = [], []
+    for number, entry in enumerate(entries, first):
+        try:
+            pairs = _page_pairs(entry, window_seconds)
+        except (KeyError, TypeError, ValueError):
+            continue
+        if not pairs:
+            continue
+        results = entry["results"]
+        matrix = features(
+            np.array([float(r["rating"]) for r in results]),
+            np.array([float(r["votes"]) for r in results])
+        )
+        preferred, other = np.array(pairs).T
+        diffs.append(matrix[preferred] - matrix[other])
+        queries.append(np.full(len(pairs), number))
+    if not diffs:
+        return np.empty((0, len(FEATURES))), np.empty(0, dtype=np.int64)
+    return np.concatenate(diffs), np.concatenate(queries)
+
+
+def _chunks(entries: Iterable[Dict[str, Any]], window_seconds: float) -> Iterable[Tuple[int, List[Dict[str, Any]], float]]:
+    entries = iter(entries)
+    first = 0
+    while True:
+        chunk = list(islice(entries, PAIR_CHUNK_SIZE))
+        if not chunk:
+            return
+        yield first, chunk, window_seconds
+        first += len(chunk)
+
+
+def pairwise_accuracy(diffs: np.ndarray, weights: Sequence[float]) -> float:
+    """
+    Share of pairs the weights order correctly (ties count as half).
+    """
+    if len(diffs) == 0:
+        return 0.0
+    margins = diffs @ np.asarray(weights, dtype=float)
+    return float((np.sum(margins > 0) + 0.5 * np.sum(margins == 0)) / len(diffs))
+
+
+def fit_pairwise(args: Tuple[np.ndarray, float, int]) -> np.ndarray:
+    """
+    Pairwise logistic regression (RankNet with a linear scorer) by projected
+    gradient descent, keeping the weights non-negative.
+
+    Args:
+        args: (feature differences of the pairs, L2 strength, epochs)
+
+    Returns:
+        Weights in FEATURES order
+    """
+    diffs, l2, epochs = args
+    weights = np.array(HAND_TUNED.key) / 10.0
+    # Features lie in [0, 1], so the gradient is Lipschitz with a constant below 1
+    step = 1.0
+    for _ in range(epochs):
+        margins = diffs @ weights
+        gradient = -(diffs.T @ (1.0 / (1.0 + np.exp(margins)))) / len(diffs) + 2.0 * l2 * weights
+        weights = np.maximum(weights - step * gradient, 0.0)
+    return weights
+
+
+def train(
+    query_log: Path,
+    feedback_file: Path,
+    window_seconds: float = LTR_LABEL_WINDOW_SECONDS,
+    l2_grid: Sequence[float] = LTR_L2_GRID,
+    epochs: int = LTR_EPOCHS,
+    workers: Optional[int] = LTR_WORKERS
+) -> RankingWeights:
+    """
+    Build training pairs from the logs and fit the ranking weights.
+
+    Args:
+        query_log: JSONL query log written by the engine
+        feedback_file: JSON feedback log written by FeedbackCollector
+        window_seconds: Seconds after a page during which feedback labels it
+        l2_grid: L2 strengths to fit (the best on held-out queries wins)
+        epochs: Gradient descent epochs per fit
+        workers: Processes building pairs and fitting (None = one per CPU)
+
+    Returns:
+        RankingWeights scaled to the hand-tuned sum, with training metadata
+
+    Raises:
+        ValueError: If the logs yield no training pairs or no preference
+    """
+    feedback = load_feedback(feedback_file)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(feedback,)) as pool:
+        parts = list(pool.map(_pairs_for_chunk, _chunks(read_query_log(query_log), window_seconds)))
+        diffs = np.concatenate([part[0] for part in parts]) if parts else np.empty((0, len(FEATURES)))
+        queries = np.concatenate([part[1] for part in parts]) if parts else np.empty(0, dtype=np.int64)
+        if len(diffs) == 0:
+            raise ValueError(f"No training pairs in {query_log} labelled by {feedback_file}")
+
+        # Held-out queries by a stable hash of their number; fall back to all pairs if too few
+        held_out = np.array([zlib.crc32(int(q).to_bytes(8, "little")) % 100 < VALIDATION_SHARE * 100 for q in queries], dtype=bool)
+        if held_out.all() or not held_out.any():
+            held_out = np.ones(len(diffs), dtype=bool)
+        train_diffs = diffs[~held_out] if (~held_out).any() else diffs
+        validation = diffs[held_out]
+
+        fits = list(pool.map(fit_pairwise, [(train_diffs, l2, epochs) for l2 in l2_grid]))
+
+    scores = [pairwise_accuracy(validation, fit) for fit in fits]
+    best = int(np.argmax(scores))
+    fitted = fits[best]
+    if fitted.sum() <= 0:
+        raise ValueError("The logs express no preference for quality or popularity")
+
+    scaled = fitted * (sum(HAND_TUNED.key) / fitted.sum())
+    metadata = {
+        "trained_at": datetime.now().isoformat(),
+        "queries": int(len(np.unique(queries))),
+        "pairs": int(len(diffs)),
+        "validation_pairs": int(len(validation)),
+        "label_window_seconds": window_seconds,
+        "l2": l2_grid[best],
+        "validation_accuracy": scores[best],
+        "hand_tuned_accuracy": pairwise_accuracy(validation, HAND_TUNED.key)
+    }
+    digest = hashlib.sha256(json.dumps([list(scaled), metadata["pairs"], metadata["queries"]]).encode()).hexdigest()[:8]
+    version = f"ltr-{datetime.now():%Y%m%d}-{digest}"
+    logger.info(
+        f"Trained {version} on {metadata['pairs']} pairs from {metadata['queries']} queries: "
+        f"quality {scaled[0]:.3f}, popularity {scaled[1]:.3f}, held-out accuracy "
+        f"{metadata['validation_accuracy']:.3f} (hand-tuned {metadata['hand_tuned_accuracy']:.3f})"
+    )
+    return RankingWeights(scaled[0], scaled[1], version=version, metadata=metadata)
+
+
+def main(argv: Optional[List[str]] = None):
+    """
+    Command line entry point.
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--query-log", type=Path, required=True, help="JSONL query log (ZOMATO_QUERY_LOG)")
+    parser.add_argument("--feedback", type=Path, default=Path("data/feedback/user_feedback.json"), help="JSON feedback log")
+    parser.add_argument("--output-dir", type=Path, default=Path("data/models"), help="Directory of the weight file")
+    parser.add_argument("--window-hours", type=float, default=LTR_LABEL_WINDOW_SECONDS / 3600, help="Hours after a page during which feedback labels it")
+    parser.add_argument("--epochs", type=int, default=LTR_EPOCHS, help="Gradient descent epochs per fit")
+    parser.add_argument("--workers", type=int, default=LTR_WORKERS, help="Worker processes (default: one per CPU)")
+    args = parser.parse_args(argv)
+
+    weights = train(args.query_log, args.feedback, args.window_hours * 3600, epochs=args.epochs, workers=args.workers)
+    path = weights.save(args.output_dir / f"{weights.version}.json")
+    logger.info(f"Wrote {path}; serve it with ZOMATO_RANKING_WEIGHTS={path}")
+
+
+if __name__ == "__main__":
+    main()
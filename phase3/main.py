@@ -2,6 +2,7 @@ import logging
 import sys
 from phase2.main import get_user_preferences
 from phase3.recommender import RecommendationEngine
+from phase3.relaxation import describe_relaxation
 
 # Configure logging
 logging.basicConfig(
@@ -34,6 +35,8 @@ def run_recommendation_flow():
         print("\n\u274c No restaurants found matching your criteria.")
         print("Try expanding your budget or changing the cuisine.")
     else:
+        if response.relaxed_constraints:
+            print(f"\n{describe_relaxation(response.relaxed_constraints)}")
         print(f"\n\u2705 Found {response.count} recommended restaurants for you:")
         print("-" * 60)
         for i, rec in enumerate(response.recommendations, 1):
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field
-from typing import List, Optional
+from pydantic import BaseModel, Field, field_validator
+from typing import Any, Dict, List, Optional, Tuple
 
 class RestaurantRecommendation(BaseModel):
     """
@@ -14,6 +14,78 @@ class RestaurantRecommendation(BaseModel):
     rating: float = Field(..., description="Aggregate rating")
     votes: int = Field(..., description="Number of votes")
     match_score: float = Field(default=0.0, description="Calculated recommendation score")
+    id: Optional[int] = Field(default=None, description="Restaurant id (for similar restaurants)")
+    
+    @classmethod
+    def from_trusted_row(cls, row: Tuple[Any, ...], match_score: float) -> "RestaurantRecommendation":
+        """
+        Build a recommendation from a database row without validation.
+        
+        Equivalent to model_construct with every field set (numeric columns are
+        coerced to their field types), but without its per-field default
+        handling, which makes model_construct slower than validation. Rows whose
+        numbers validation would reject (fractional or NULL counts and costs)
+        go through the validated constructor, so both paths raise alike.
+        
+        Args:
+            row: (name, city, address, cuisines, average_cost, price_category, rating, votes[, id])
+            match_score: Calculated recommendation score
+            
+        Returns:
+            RestaurantRecommendation
+        """
+        name, city, address, cuisines, average_cost, price_category, rating, votes = row[:8]
+        if not (_is_integral(average_cost) and _is_integral(votes) and rating is not None):
+            return cls(
+                name=name, city=city, address=address, cuisines=cuisines, average_cost=average_cost,
+                price_category=price_category, rating=rating, votes=votes, match_score=match_score,
+                id=row[8] if len(row) > 8 else None
+            )
+        rec = cls.__new__(cls)
+        object.__setattr__(rec, "__dict__", {
+            "name": name,
+            "city": city,
+            "address": address,
+            "cuisines": cuisines,
+            "average_cost": int(average_cost),
+            "price_category": price_category,
+            "rating": float(rating),
+            "votes": int(votes),
+            "match_score": float(match_score),
+            "id": row[8] if len(row) > 8 else None
+        })
+        object.__setattr__(rec, "__pydantic_fields_set__", set(_RECOMMENDATION_FIELDS))
+        object.__setattr__(rec, "__pydantic_extra__", None)
+        object.__setattr__(rec, "__pydantic_private__", None)
+        return rec
+
+def _is_integral(value: Any) -> bool:
+    """
+    Whether validation accepts value for an int field unchanged (ints and
+    whole floats).
+    """
+    return type(value) is int or (isinstance(value, float) and value.is_integer())
+
+_RECOMMENDATION_FIELDS = frozenset(RestaurantRecommendation.model_fields)
+
+class ExplainedStatement(BaseModel):
+    """
+    A SQL statement executed for a request and the plan SQLite chose for it.
+    """
+    sql: str = Field(..., description="Statement with its bound values inlined")
+    plan: List[str] = Field(default_factory=list, description="EXPLAIN QUERY PLAN lines, indented by depth")
+
+class ExplainReport(BaseModel):
+    """
+    Profile of one recommendation request (explain mode).
+    """
+    backend: str = Field(..., description="Engine backend (sql or columnar)")
+    path: str = Field(..., description="Ranker that answered: sql, precomputed, columnar, dish, relaxed or cache")
+    timings_us: Dict[str, float] = Field(default_factory=dict, description="Microseconds per stage, in execution order, and the total")
+    statements: List[ExplainedStatement] = Field(default_factory=list, description="SQL executed, in order")
+    candidates: Dict[str, int] = Field(default_factory=dict, description="Rows of the locality, matching the filters, read by the ranker and returned")
+    result_cache: str = Field(default="disabled", description="Result cache outcome: hit, miss or disabled")
+    cache_stats: Dict[str, int] = Field(default_factory=dict, description="Result cache counters")
 
 class RecommendationResponse(BaseModel):
     """
@@ -22,3 +94,29 @@ class RecommendationResponse(BaseModel):
     user_city: str
     count: int
     recommendations: List[RestaurantRecommendation]
+    next_cursor: Optional[str] = Field(default=None, description="Cursor for the next page, if there are more results")
+    relaxed_constraints: List[str] = Field(default_factory=list, description="Constraints relaxed because nothing matched exactly (min_rating, price_range, cuisine)")
+    explain: Optional[ExplainReport] = Field(default=None, description="Request profile, set when explain mode was requested")
+
+class SemanticFilters(BaseModel):
+    """
+    Structured restrictions applied to a free-text semantic search.
+    """
+    city: Optional[str] = Field(default=None, description="Locality/City")
+    price_range: Optional[str] = Field(default=None, description="Price category (budget, mid-range, premium)")
+    min_rating: float = Field(default=0.0, ge=0.0, le=5.0, description="Minimum restaurant rating")
+    
+    @field_validator('city')
+    @classmethod
+    def validate_city(cls, v: Optional[str]) -> Optional[str]:
+        return v.strip().title() if v and v.strip() else None
+    
+    @field_validator('price_range')
+    @classmethod
+    def validate_price_range(cls, v: Optional[str]) -> Optional[str]:
+        if v is None or not v.strip():
+            return None
+        v = v.strip().lower()
+        if v not in ('budget', 'mid-range', 'premium'):
+            raise ValueError("Price range must be one of: budget, mid-range, premium")
+        return v
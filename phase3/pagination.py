@@ -0,0 +1,79 @@
+"""
+Keyset pagination for Phase 3 - Recommendation Engine
+Opaque "load more" cursors: the ranking key of the last row served, the
+database build it came from and a fingerprint of the preferences.
+"""
+
+import base64
+import binascii
+import hashlib
+import json
+from typing import Hashable, Tuple
+
+from phase2.models import UserInput
+from phase3.result_cache import cache_key
+
+# Position in the final ranking: (match_score, rating, votes, restaurant id).
+# Rows are ordered by match score DESC, rating DESC, votes DESC, id ASC.
+RankKey = Tuple[float, float, float, int]
+
+
+class InvalidCursorError(ValueError):
+    """
+    Raised for a cursor that is malformed, belongs to other preferences or to
+    an earlier database build.
+    """
+
+
+def _digest(value: object) -> str:
+    """
+    Short, stable digest of a repr-able value.
+    """
+    return hashlib.sha1(repr(value).encode("utf-8")).hexdigest()[:16]
+
+
+def encode_cursor(version: Hashable, user_input: UserInput, key: RankKey) -> str:
+    """
+    Build the cursor continuing after the row at key.
+    
+    Args:
+        version: Data version the page was served from (build id and file stamp)
+        user_input: Preferences the page was served for
+        key: Ranking key of the last row served
+        
+    Returns:
+        URL-safe opaque cursor
+    """
+    payload = {"b": _digest(version), "q": _digest(cache_key(user_input, 0)), "k": list(key)}
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, version: Hashable, user_input: UserInput) -> RankKey:
+    """
+    Validate a cursor and return the ranking key to continue after.
+    
+    Args:
+        cursor: Cursor returned with a previous page
+        version: Current data version
+        user_input: Preferences of the current request
+        
+    Returns:
+        Ranking key of the last row already served
+        
+    Raises:
+        InvalidCursorError: If the cursor is malformed or stale, or the preferences differ
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        score, rating, votes, restaurant_id = payload["k"]
+        key: RankKey = (float(score), float(rating), float(votes), int(restaurant_id))
+        build, query = payload["b"], payload["q"]
+    except (binascii.Error, UnicodeDecodeError, ValueError, KeyError, TypeError):
+        raise InvalidCursorError("Malformed cursor")
+    
+    if build != _digest(version):
+        raise InvalidCursorError("Cursor is from an earlier database build; start again from the first page")
+    if query != _digest(cache_key(user_input, 0)):
+        raise InvalidCursorError("Cursor belongs to different preferences")
+    return key
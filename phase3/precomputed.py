@@ -0,0 +1,190 @@
+"""
+Materialized recommendations for Phase 3 - Recommendation Engine
+Precomputes the top-N restaurants for every locality x price category x
+cuisine x rating threshold, so common requests are answered with a single
+primary-key lookup instead of live scoring.
+
+Each list stores the cost range its price category had at build time, and
+lookups only use lists whose range matches the current PRICE_CATEGORIES, so
+changing the category boundaries falls back to live scoring until the next
+build instead of serving lists filtered by the old boundaries.
+"""
+
+import json
+import logging
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+from phase1.config import PRECOMPUTED_TABLE_NAME
+from phase1.database_setup import DatabaseManager
+from phase2.config import PRICE_CATEGORIES
+from phase2.models import UserInput
+from phase3.columnar_index import ColumnarIndex, INDEX_COLUMNS, ScoredRow
+from phase3.config import PRECOMPUTED_TOP_N, PRECOMPUTED_RATING_THRESHOLDS, PRECOMPUTE_WORKERS
+from phase3.result_cache import canonical_min_rating
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Primary-key lookup of one combination, joined to its restaurants by id.
+# The LEFT JOINs keep one all-NULL row for a stored empty result, so "no rows"
+# always means the combination was not precomputed.
+PRECOMPUTED_QUERY = """
+SELECT r.name, r.city, r.address, r.cuisines, r.average_cost_for_two, r.price_category,
+       r.aggregate_rating, r.votes, r.id, json_extract(entry.value, '$[1]')
+FROM {precomputed} AS p
+LEFT JOIN json_each(p.entries) AS entry
+LEFT JOIN {table} AS r ON r.id = json_extract(entry.value, '$[0]')
+WHERE p.city = ?1 AND p.price_category = ?2 AND p.price_bounds = ?3 AND p.cuisine = ?4 AND p.min_rating = ?5
+ORDER BY entry.key
+LIMIT ?6
+"""
+
+
+def price_bounds(price_category: str) -> str:
+    """
+    Current cost range of a price category, in the form stored with precomputed lists.
+    """
+    lower, upper = PRICE_CATEGORIES[price_category]
+    return json.dumps([float(lower), float(upper)])
+
+
+def precomputed_key(user_input: UserInput, limit: int) -> Optional[Tuple[str, str, str, str, float]]:
+    """
+    Table key answering a request, or None if it is not precomputed.
+    
+    Covered: a price category without explicit costs, at most one cuisine, no
+    dish, a minimum rating equal to a precomputed threshold and limit <= PRECOMPUTED_TOP_N.
+    
+    Args:
+        user_input: Validated user preferences
+        limit: Maximum number of recommendations requested
+        
+    Returns:
+        (city, price_category, price_bounds, cuisine, min_rating) or None
+    """
+    if user_input.price_range is None or user_input.min_cost is not None or user_input.max_cost is not None:
+        return None
+    if user_input.dish:
+        return None
+    if limit > PRECOMPUTED_TOP_N:
+        return None
+    
+    cuisines = {c.lower() for c in user_input.cuisine} if user_input.cuisine else set()
+    if len(cuisines) > 1:
+        return None
+    
+    min_rating = canonical_min_rating(user_input.min_rating)
+    if min_rating not in PRECOMPUTED_RATING_THRESHOLDS:
+        return None
+    
+    return (user_input.city, user_input.price_range, price_bounds(user_input.price_range), cuisines.pop() if cuisines else "", min_rating)
+
+
+def lookup_precomputed(connection: sqlite3.Connection, table_name: str, user_input: UserInput, limit: int) -> Optional[List[ScoredRow]]:
+    """
+    Answer a request from the precomputed table.
+    
+    Args:
+        connection: Connection holding the city's restaurants
+        table_name: Restaurants table name
+        user_input: Validated user preferences
+        limit: Maximum number of recommendations
+        
+    Returns:
+        Ranked (row, match_score) pairs, or None if the request must be scored live
+        (including lists built with other price category boundaries)
+    """
+    key = precomputed_key(user_input, limit)
+    if key is None:
+        return None
+    
+    try:
+        rows = connection.execute(
+            PRECOMPUTED_QUERY.format(precomputed=PRECOMPUTED_TABLE_NAME, table=table_name),
+            key + (limit,)
+        ).fetchall()
+    except sqlite3.OperationalError:
+        return None  # Built without precomputed recommendations
+    
+    if not rows:
+        return None
+    return [(tuple(row[:-1]), row[-1]) for row in rows if row[0] is not None]
+
+
+def _precompute_city(
+    db_path: Path,
+    city: str,
+    cuisines: Sequence[str],
+    top_n: int,
+    rating_thresholds: Sequence[float]
+) -> List[Tuple[str, str, str, str, float, str]]:
+    """
+    Rank every combination for one city from a single scan of it (runs in a
+    build worker process).
+    
+    Rankings come from a ColumnarIndex, so they are identical to live scoring.
+    """
+    db_manager = DatabaseManager(db_path=db_path)
+    try:
+        index = ColumnarIndex.from_rows(db_manager.iter_by_city(city, columns=INDEX_COLUMNS))
+    finally:
+        db_manager.close()
+    
+    rows = []
+    for price_category in PRICE_CATEGORIES:
+        for cuisine in [""] + list(cuisines):
+            for min_rating in rating_thresholds:
+                user_input = UserInput(city=city, price_range=price_category, cuisine=cuisine or None, min_rating=min_rating)
+                entries = index.top_k_ids(user_input, top_n)
+                rows.append((user_input.city, price_category, price_bounds(price_category), cuisine, min_rating, json.dumps(entries)))
+    return rows
+
+
+def build_precomputed_recommendations(
+    db_manager: DatabaseManager,
+    top_n: int = PRECOMPUTED_TOP_N,
+    rating_thresholds: Sequence[float] = PRECOMPUTED_RATING_THRESHOLDS,
+    workers: Optional[int] = PRECOMPUTE_WORKERS,
+    cities: Optional[Sequence[str]] = None
+) -> int:
+    """
+    Precompute recommendations for every city, one build process per city.
+    
+    Combinations cover every cuisine in the database, so a cuisine missing from
+    a city is stored as an empty result rather than left to live scoring.
+    
+    Args:
+        db_manager: DatabaseManager of the freshly built database (file serving mode)
+        top_n: Restaurants kept per combination
+        rating_thresholds: Minimum ratings to precompute
+        workers: Number of build processes (defaults to the CPU count; 1 runs in-process)
+        cities: Cities to (re)build (defaults to every city)
+        
+    Returns:
+        Number of combinations stored
+    """
+    cities = list(cities) if cities is not None else db_manager.get_cities()
+    cuisines = sorted({cuisine.lower() for cuisine in db_manager.get_cuisines()})
+    logger.info(f"Precomputing recommendations for {len(cities)} cities x {len(cuisines)} cuisines...")
+    
+    args = [(db_manager.db_path, city, cuisines, top_n, tuple(rating_thresholds)) for city in cities]
+    stored = 0
+    if workers == 1 or len(cities) <= 1:
+        results = (_precompute_city(*city_args) for city_args in args)
+        for city, rows in zip(cities, results):
+            db_manager.write_precomputed_recommendations(city, rows)
+            stored += len(rows)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_precompute_city, *city_args) for city_args in args]
+            for city, future in zip(cities, futures):
+                rows = future.result()
+                db_manager.write_precomputed_recommendations(city, rows)
+                stored += len(rows)
+    
+    logger.info(f"Precomputed {stored} recommendation lists")
+    return stored
@@ -0,0 +1,78 @@
+"""
+Query log for Phase 3 - Recommendation Engine
+Appends every served recommendation page to a JSONL file: the preferences,
+whether it was a "load more" page, and the restaurants shown with the
+features they were ranked by. The learning-to-rank trainer joins it with the
+feedback log (see ltr_trainer.py).
+"""
+
+import json
+import logging
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Union
+
+from phase2.models import UserInput
+from phase3.models import RecommendationResponse
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class QueryLog:
+    """
+    Thread-safe, append-only JSONL log of served recommendation pages.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def record(self, user_input: UserInput, response: RecommendationResponse, cursor: Optional[str] = None):
+        """
+        Append one served page (never raises; a failed write is only logged).
+
+        Args:
+            user_input: Validated user preferences
+            response: Page served for them
+            cursor: Cursor the page continued from, if any
+        """
+        entry = {
+            "timestamp": datetime.now().isoformat(),
+            "query": user_input.model_dump(),
+            "page": cursor is not None,
+            "results": [
+                {"id": r.id, "name": r.name, "rating": r.rating, "votes": r.votes, "match_score": r.match_score}
+                for r in response.recommendations
+            ]
+        }
+        line = json.dumps(entry) + "\n"
+        try:
+            with self._lock:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(line)
+        except OSError as e:
+            logger.error(f"Failed to write query log {self.path}: {e}")
+
+
+def read_query_log(path: Union[str, Path]) -> Iterator[Dict[str, Any]]:
+    """
+    Entries of a query log, skipping malformed lines (e.g. a torn last line).
+
+    Args:
+        path: Query log written by QueryLog
+
+    Returns:
+        Iterator over the logged entries
+    """
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(entry, dict) and "results" in entry:
+                yield entry
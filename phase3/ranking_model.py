@@ -0,0 +1,160 @@
+"""
+Ranking weights for Phase 3 - Recommendation Engine
+The match score is a linear model of two features of a restaurant, quality
+(rating / 5) and popularity (votes capped at 1000, / 1000), plus the request
+bonuses (cuisine, dish, feedback). The hand-tuned weights are 7 and 3; a
+weight file exported by the learning-to-rank trainer (see ltr_trainer.py)
+replaces them.
+
+The database's match score index and the precomputed tables are ordered by
+the hand-tuned score, so rankers reading in that order bound the learned
+score of the rows they have not read yet with upper_bound.
+"""
+
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+import numpy as np
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+FEATURES = ("quality", "popularity")
+WEIGHTS_FORMAT = 1
+
+
+def features(rating: np.ndarray, votes: np.ndarray) -> np.ndarray:
+    """
+    Feature matrix of restaurants, one row per restaurant in FEATURES order.
+    """
+    return np.column_stack((rating / 5.0, np.minimum(votes, 1000.0) / 1000.0))
+
+
+class RankingWeights:
+    """
+    Weights of the match score's quality and popularity features.
+    """
+
+    def __init__(self, quality: float = 7.0, popularity: float = 3.0, version: str = "hand-tuned", metadata: Optional[Dict[str, Any]] = None):
+        """
+        Initialize RankingWeights.
+
+        Args:
+            quality: Weight of rating / 5
+            popularity: Weight of min(votes, 1000) / 1000
+            version: Name of the weights (reported by the engine)
+            metadata: Training details stored with exported weights
+
+        Raises:
+            ValueError: If a weight is negative (ranking must not prefer worse ratings)
+        """
+        if quality < 0 or popularity < 0:
+            raise ValueError("Ranking weights must be non-negative")
+        self.quality = float(quality)
+        self.popularity = float(popularity)
+        self.version = version
+        self.metadata = metadata or {}
+
+    @property
+    def key(self) -> Tuple[float, float]:
+        return (self.quality, self.popularity)
+
+    @property
+    def is_hand_tuned(self) -> bool:
+        """
+        True for the weights MATCH_SCORE_EXPR and the precomputed tables are ordered by.
+        """
+        return self.key == HAND_TUNED.key
+
+    def base(self, rating: float, votes: float) -> float:
+        """
+        Unrounded score of one restaurant before request bonuses.
+        """
+        return (float(rating) / 5.0) * self.quality + (min(float(votes), 1000.0) / 1000.0) * self.popularity
+
+    def base_array(self, rating: np.ndarray, votes: np.ndarray) -> np.ndarray:
+        """
+        base for a batch of restaurants, with the same float arithmetic.
+        """
+        return (rating / 5.0) * self.quality + (np.minimum(votes, 1000.0) / 1000.0) * self.popularity
+
+    def upper_bound(self, hand_tuned_base: float) -> float:
+        """
+        Highest base score of any restaurant whose hand-tuned base score is at
+        most hand_tuned_base: the maximum of the linear score over the
+        feature box cut by the hand-tuned score, found at a vertex.
+
+        Args:
+            hand_tuned_base: Unrounded hand-tuned score (MATCH_SCORE_EXPR)
+
+        Returns:
+            Upper bound of base (exact for the hand-tuned weights)
+        """
+        if self.is_hand_tuned:
+            return hand_tuned_base
+        limit = max(hand_tuned_base, 0.0)
+        wq, wp = HAND_TUNED.key
+        vertices = [(0.0, 0.0), (min(1.0, limit / wq), 0.0), (0.0, min(1.0, limit / wp))]
+        if limit >= wq:
+            vertices.append((1.0, min(1.0, (limit - wq) / wp)))
+        if limit >= wp:
+            vertices.append((min(1.0, (limit - wp) / wq), 1.0))
+        return max(q * self.quality + p * self.popularity for q, p in vertices)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "format": WEIGHTS_FORMAT,
+            "version": self.version,
+            "features": list(FEATURES),
+            "weights": [self.quality, self.popularity],
+            "metadata": self.metadata
+        }
+
+    def save(self, path: Union[str, Path]) -> Path:
+        """
+        Write the weights atomically (readers never see a partial file).
+
+        Args:
+            path: Weight file to write
+
+        Returns:
+            Path of the written file
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        os.replace(temp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "RankingWeights":
+        """
+        Read a weight file written by save.
+
+        Args:
+            path: Weight file
+
+        Returns:
+            RankingWeights
+
+        Raises:
+            ValueError: If the file has another format or other features
+        """
+        with open(path) as f:
+            payload = json.load(f)
+        if payload.get("format") != WEIGHTS_FORMAT or tuple(payload.get("features", ())) != FEATURES:
+            raise ValueError(f"Unsupported ranking weight file {path}")
+        quality, popularity = payload["weights"]
+        weights = cls(quality, popularity, version=payload["version"], metadata=payload.get("metadata"))
+        logger.info(f"Loaded ranking weights {weights.version}: quality {weights.quality:.3f}, popularity {weights.popularity:.3f}")
+        return weights
+
+
+HAND_TUNED = RankingWeights()
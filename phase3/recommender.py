@@ -1,32 +1,287 @@
+import asyncio
+import heapq
+import json
 import logging
-from typing import List, Optional, Tuple, Any
-from phase1.database_setup import DatabaseManager
+import math
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple, Union
+from phase1.config import DATABASE_SERVING_MODE
+from phase1.database_setup import DatabaseManager, ConnectionPool, MATCH_SCORE_EXPR
 from phase2.models import UserInput
-from phase3.models import RestaurantRecommendation, RecommendationResponse
+from phase2.catalog import database_stamp
+from phase3.columnar_index import ColumnarIndex, ScoredRow, INDEX_COLUMNS
+from phase3.dish_index import DishIndex, fetch_ranked_rows
+from phase3.explain import ExplainTrace
+from phase3.config import (
+    ASYNC_MAX_WORKERS, BATCH_WORKERS, DISH_LIKED_BONUS, FEEDBACK_AGGREGATES_PATH, PRECOMPUTED_TOP_N,
+    QUERY_LOG_PATH, RANKING_WEIGHTS_PATH, RECOMMENDATION_BACKEND, RECOMMENDATION_BACKENDS, RELAX_EMPTY_RESULTS,
+    RESULT_CACHE_SIZE, RESULT_CACHE_TTL_SECONDS, SEMANTIC_DEFAULT_LIMIT, SIMILAR_DEFAULT_LIMIT, TRUSTED_DATABASE_ROWS
+)
+from phase3.feedback import FeedbackAdjustments, FeedbackStore
+from phase3.models import RestaurantRecommendation, RecommendationResponse, SemanticFilters
+from phase3.pagination import InvalidCursorError, RankKey, decode_cursor, encode_cursor
+from phase3.precomputed import lookup_precomputed
+from phase3.query_log import QueryLog
+from phase3.ranking_model import HAND_TUNED, RankingWeights
+from phase3.relaxation import Relaxation
+from phase3.result_cache import ResultCache, cache_key
+from phase3.semantic import SemanticIndex, fetch_hits, semantic_index_path
+from phase3.similarity import lookup_similar
 
 logger = logging.getLogger(__name__)
 
+# The one statement used for every request. Its text never depends on the
+# request (cuisines are passed as a JSON array and expanded with json_each),
+# so SQLite parses it once per connection and serves it from the statement
+# cache afterwards. The budget is a numeric cost range, so price category
+# boundaries are applied at query time rather than baked into the data.
+#
+# Rows come back in descending order of MATCH_SCORE_EXPR, the unrounded match
+# score computed with the same float arithmetic as _calculate_match_score, and
+# are streamed from the idx_city_match expression index without a sort. The
+# cost and rating filters are written as +column so the planner keeps to that
+# index instead of idx_city_cost. The caller stops reading once the top-k is
+# settled (see _score_candidates), so latency depends on how selective the
+# filters are, not on the size of the locality. ?6 is an upper bound on the
+# unrounded score (infinity for a first page): a "load more" page seeks
+# straight to the score of its cursor, so deeper pages cost the same as the
+# first. ?7 is (min_rating / 5) * 7, the lowest score a row passing the
+# rating filter can have. It ends the index range there, so a request with
+# few matches stops before the low-rated tail of the locality instead of
+# walking it.
+RECOMMENDATION_QUERY = """
+SELECT name, city, address, cuisines, average_cost_for_two, price_category, aggregate_rating, votes, id
+FROM {{table}}
+WHERE city = ?1
+  AND +average_cost_for_two >= ?2
+  AND +average_cost_for_two < ?3
+  AND +aggregate_rating >= ?4
+  AND (?5 IS NULL OR EXISTS (
+      SELECT 1 FROM json_each(?5) WHERE {{table}}.cuisines LIKE '%' || json_each.value || '%'
+  ))
+  AND {expr} <= ?6
+  AND {expr} >= ?7
+ORDER BY {expr} DESC, aggregate_rating DESC, votes DESC, id
+""".format(expr=MATCH_SCORE_EXPR)
+
+
+def score_floor(min_rating: float) -> float:
+    """
+    Lowest MATCH_SCORE_EXPR of a row rated at least min_rating (?7 of RECOMMENDATION_QUERY).
+    """
+    return (min_rating / 5.0) * 7.0
+
+
+def _ranking_key(item: ScoredRow):
+    """
+    Final ranking: match score, then rating, votes and id (the row's last column).
+    """
+    row, match_score = item
+    return (-match_score, -row[6], -row[7], row[-1])
+
+
+def _rank_key(item: ScoredRow) -> RankKey:
+    """
+    Cursor form of a row's ranking position.
+    """
+    row, match_score = item
+    return (match_score, row[6], row[7], row[-1])
+
+
+def _build_response(
+    city: str,
+    scored: List[ScoredRow],
+    trusted: bool = False,
+    next_cursor: Optional[str] = None,
+    relaxed_constraints: Optional[List[str]] = None
+) -> RecommendationResponse:
+    """
+    Build the response models for ranked (row, match_score) pairs.
+    
+    Only the final rows reach this point, so at most limit models are built
+    per request. With trusted=True the rows are assumed to satisfy the schema
+    (as rows written by the Phase 1 build do) and models are constructed
+    without validation; numeric columns are still coerced to their field types.
+    Rows without a cost (only reachable from similar and semantic lookups,
+    which do not filter on cost) are left out on both paths.
+    """
+    final_recs: List[RestaurantRecommendation] = []
+    if any(row[4] is None for row, _ in scored):
+        scored = [item for item in scored if item[0][4] is not None]
+    
+    if trusted:
+        final_recs = [RestaurantRecommendation.from_trusted_row(row, match_score) for row, match_score in scored]
+        # Model instances are not revalidated, so the envelope stays cheap
+        return RecommendationResponse(
+            user_city=city, count=len(final_recs), recommendations=final_recs, next_cursor=next_cursor,
+            relaxed_constraints=relaxed_constraints or []
+        )
+    
+    for row, match_score in scored:
+        name, row_city, address, cuisines, avg_cost, price_cat, rating, votes = row[:8]
+        
+        rec = RestaurantRecommendation(
+            name=name,
+            city=row_city,
+            address=address,
+            cuisines=cuisines,
+            average_cost=avg_cost,
+            price_category=price_cat,
+            rating=rating,
+            votes=votes,
+            match_score=match_score,
+            id=row[8] if len(row) > 8 else None
+        )
+        final_recs.append(rec)
+    
+    return RecommendationResponse(
+        user_city=city, count=len(final_recs), recommendations=final_recs, next_cursor=next_cursor,
+        relaxed_constraints=relaxed_constraints or []
+    )
+
+
+def _build_page(
+    user_input: UserInput,
+    scored: List[ScoredRow],
+    limit: int,
+    version: Optional[Hashable],
+    trusted: bool = False
+) -> RecommendationResponse:
+    """
+    Build the response for up to limit + 1 ranked rows: the first limit rows,
+    and a next cursor if the extra row shows that more results exist (and the
+    data version is known).
+    """
+    next_cursor = None
+    if len(scored) > limit:
+        scored = scored[:limit]
+        if version is not None and scored:
+            next_cursor = encode_cursor(version, user_input, _rank_key(scored[-1]))
+    return _build_response(user_input.city, scored, trusted, next_cursor)
+
+
+def _recommend_city_batch(
+    db_path: Path,
+    serving_mode: str,
+    city: str,
+    inputs: List[UserInput],
+    limit: int,
+    trusted: bool = False,
+    version: Optional[Hashable] = None,
+    feedback: Optional[FeedbackAdjustments] = None,
+    weights: RankingWeights = HAND_TUNED
+) -> List[RecommendationResponse]:
+    """
+    Answer every input for one city from a single scan of it (runs in a batch
+    worker process).
+    
+    The city's rows are read once into a ColumnarIndex, which returns the same
+    rankings as the SQL backend (feedback adjustments and ranking weights included).
+    """
+    db_manager = DatabaseManager(db_path=db_path, serving_mode=serving_mode)
+    try:
+        index = ColumnarIndex.from_rows(db_manager.iter_by_city(city, columns=INDEX_COLUMNS))
+        return [
+            _build_page(user_input, index.top_k(user_input, limit + 1, feedback=feedback, weights=weights), limit, version, trusted)
+            for user_input in inputs
+        ]
+    finally:
+        db_manager.close()
+
+
 class RecommendationEngine:
     """
     Engine responsible for querying the database and ranking restaurant recommendations.
     """
-    def __init__(self, db_manager: Optional[DatabaseManager] = None):
+    def __init__(
+        self,
+        db_manager: Optional[DatabaseManager] = None,
+        max_workers: int = ASYNC_MAX_WORKERS,
+        backend: str = RECOMMENDATION_BACKEND,
+        cache_size: int = RESULT_CACHE_SIZE,
+        cache_ttl: float = RESULT_CACHE_TTL_SECONDS,
+        use_precomputed: bool = True,
+        trusted_rows: bool = TRUSTED_DATABASE_ROWS,
+        feedback_path: Optional[Union[str, Path]] = FEEDBACK_AGGREGATES_PATH,
+        ranking_weights: Optional[RankingWeights] = None,
+        query_log_path: Optional[Union[str, Path]] = QUERY_LOG_PATH,
+        relax_empty: bool = RELAX_EMPTY_RESULTS
+    ):
         """
         Initialize the engine.
         
         Args:
             db_manager: DatabaseManager instance for database operations.
+                Defaults to a read-only manager in the configured serving mode.
+            max_workers: Size of the executor and connection pool behind aget_recommendations.
+            backend: "sql" queries SQLite per request; "columnar" serves requests
+                from an in-memory ColumnarIndex loaded once per database build.
+            cache_size: Maximum number of cached responses (0 disables the result cache).
+            cache_ttl: Seconds a cached response stays valid.
+            use_precomputed: Let the SQL backend answer covered requests from the
+                precomputed_recommendations table built by Phase 1.
+            trusted_rows: Build response models without pydantic validation
+                (for databases written by the Phase 1 build).
+            feedback_path: Feedback aggregates written by FeedbackCollector, folded
+                into match scores (None ranks without feedback).
+            ranking_weights: Quality and popularity weights of the match score.
+                Defaults to the weight file at ZOMATO_RANKING_WEIGHTS, else the hand-tuned 7 and 3.
+            query_log_path: JSONL file every served page is appended to, for
+                the learning-to-rank trainer (None disables the log).
+            relax_empty: Answer a request that matches nothing with the best
+                results of relaxed constraints (see relaxation.py).
+                
+        Raises:
+            ValueError: If the backend is unknown
         """
-        self.db_manager = db_manager or DatabaseManager()
+        if backend not in RECOMMENDATION_BACKENDS:
+            raise ValueError(f"Unknown recommendation backend '{backend}'. Expected one of: {', '.join(RECOMMENDATION_BACKENDS)}")
+        
+        self.db_manager = db_manager or DatabaseManager(serving_mode=DATABASE_SERVING_MODE)
+        self.backend = backend
+        self.use_precomputed = use_precomputed
+        self.trusted_rows = trusted_rows
+        self._query = RECOMMENDATION_QUERY.format(table=self.db_manager.table_name)
+        self._columnar: Optional[ColumnarIndex] = None
+        self._columnar_lock = threading.Lock()
+        self._semantic: Optional[Tuple[Tuple[int, int], SemanticIndex]] = None
+        self._semantic_lock = threading.Lock()
+        self._dishes: Optional[DishIndex] = None
+        self._feedback = FeedbackStore(feedback_path) if feedback_path is not None else None
+        if ranking_weights is None:
+            ranking_weights = RankingWeights.load(RANKING_WEIGHTS_PATH) if RANKING_WEIGHTS_PATH else HAND_TUNED
+        self.ranking_weights = ranking_weights
+        self._query_log = QueryLog(query_log_path) if query_log_path is not None else None
+        self.relax_empty = relax_empty
+        
+        # Responses for repeated preferences, dropped whenever the database is rebuilt
+        self._cache = ResultCache(cache_size, cache_ttl)
+        self._data_versions: Optional[Tuple[Tuple[int, int], Hashable]] = None
+        
+        # Async data access is created lazily so sync-only callers never start threads
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pool: Optional[ConnectionPool] = None
+        self._async_lock = threading.Lock()
 
-    def _calculate_match_score(self, rating: float, votes: int, user_input: UserInput, restaurant_cuisine: str) -> float:
+    def _calculate_match_score(
+        self,
+        rating: float,
+        votes: int,
+        user_input: UserInput,
+        restaurant_cuisine: str,
+        known_for_dish: bool = False,
+        adjustment: float = 0.0
+    ) -> float:
         """
         Calculate a match score (0-10) for a restaurant based on user preferences.
+        known_for_dish adds DISH_LIKED_BONUS (the restaurant lists a requested dish in dish_liked);
+        adjustment is the restaurant's feedback adjustment (see feedback.py).
+        Quality and popularity are weighted by ranking_weights (7 and 3 unless learned).
         """
-        quality_score: float = (float(rating) / 5.0) * 7.0
-        popularity_score: float = (min(float(votes), 1000.0) / 1000.0) * 3.0
-        
-        score: float = quality_score + popularity_score
+        score: float = self.ranking_weights.base(rating, votes)
         
         # Check if any of the preferred cuisines match
         if user_input.cuisine:
@@ -34,86 +289,888 @@ class RecommendationEngine:
                 if cuisine.lower() in restaurant_cuisine.lower():
                     score += 1.0
                     break # Only add bonus once
+        
+        if known_for_dish:
+            score += DISH_LIKED_BONUS
+        
+        if adjustment:
+            score += adjustment
             
-        return float(min(round(score, 2), 10.0))
+        return float(min(max(round(score, 2), 0.0), 10.0))
 
-    def get_recommendations(self, user_input: UserInput, limit: int = 5) -> RecommendationResponse:
+    def _score_candidates(
+        self,
+        db_manager: DatabaseManager,
+        user_input: UserInput,
+        limit: int,
+        after: Optional[RankKey] = None,
+        feedback: Optional[FeedbackAdjustments] = None,
+        trace: Optional[ExplainTrace] = None
+    ) -> List[ScoredRow]:
+        """
+        SQL backend: exact top-k by match score, optionally continuing after a cursor.
+        
+        Rows arrive best first by unrounded score, so rounded scores never
+        increase along the stream. Once limit rows are read, only rows tying
+        with the limit-th score can still enter the top-k (on rating, votes or
+        id); reading stops at the first row scoring lower.
+        
+        After a cursor, the query seeks to the cursor's score bucket and rows
+        ranked at or before the cursor are skipped.
+        
+        Feedback adjustments move a row by at most max_boost up or max_penalty
+        down (plus rounding), so the seek starts max_penalty higher and reading
+        stops once a row's unadjusted score plus max_boost is below the
+        limit-th adjusted score. Without feedback both margins are 0.
+        
+        With learned ranking weights the rows still arrive in hand-tuned
+        order; the learned score of every row not read yet is bounded with
+        RankingWeights.upper_bound, and a cursor is resumed by skipping rows
+        instead of seeking.
+        
+        With a trace, the statement, the row fetches, the scoring and the
+        final sort are timed as separate stages.
+        """
+        if limit <= 0:
+            return []
+        
+        weights = self.ranking_weights
+        learned = not weights.is_hand_tuned
+        bonus = 1.0 if user_input.cuisine else 0.0
+        boost = penalty = slack = 0.0
+        if feedback:
+            boost, penalty, slack = feedback.max_boost, feedback.max_penalty, 0.01
+        if learned:
+            slack = 0.01
+        
+        cuisines_json = json.dumps(user_input.cuisine) if user_input.cuisine else None
+        min_cost, max_cost = user_input.cost_bounds()
+        max_raw = math.inf
+        if after is not None and not learned and after[0] + penalty < 10.0:
+            # Highest unrounded score (before the cuisine bonus) that rounds to the cursor's score
+            max_raw = after[0] + penalty - bonus + 0.006 + slack
+        params = (user_input.city, min_cost, max_cost, user_input.min_rating, cuisines_json, max_raw, score_floor(user_input.min_rating))
+        after_key = (-after[0], -after[1], -after[2], after[3]) if after is not None else None
+        
+        scored: List[ScoredRow] = []
+        top_scores: List[float] = []  # Min-heap of the limit best scores so far
+        cursor = db_manager.connection_for(user_input.city).cursor()
+        try:
+            cursor.execute(self._query, params)
+            if trace is not None:
+                trace.lap("sql_execute")
+            rows = cursor if trace is None else trace.rows(cursor)
+            for row in rows:
+                match_score = self._calculate_match_score(row[6], row[7], user_input, row[3])
+                if len(top_scores) == limit:
+                    upper = weights.upper_bound(HAND_TUNED.base(row[6], row[7])) + bonus if learned else match_score
+                    if upper + boost + slack < top_scores[0]:
+                        break
+                adjustment = feedback.get(row[0]) if feedback else 0.0
+                if adjustment:
+                    match_score = self._calculate_match_score(row[6], row[7], user_input, row[3], adjustment=adjustment)
+                item = (tuple(row), match_score)
+                if after_key is not None and _ranking_key(item) <= after_key:
+                    continue
+                scored.append(item)
+                if len(top_scores) < limit:
+                    heapq.heappush(top_scores, match_score)
+                elif match_score > top_scores[0]:
+                    heapq.heapreplace(top_scores, match_score)
+        finally:
+            cursor.close()
+        
+        if trace is not None:
+            trace.lap("score")
+        scored.sort(key=_ranking_key)
+        if trace is not None:
+            trace.lap("sort")
+        return scored[:limit]
+
+    def _score_dish_candidates(
+        self,
+        db_manager: DatabaseManager,
+        user_input: UserInput,
+        limit: int,
+        after: Optional[RankKey] = None,
+        feedback: Optional[FeedbackAdjustments] = None,
+        trace: Optional[ExplainTrace] = None
+    ) -> List[ScoredRow]:
+        """
+        Dish requests: exact top-k among the restaurants of the posting-list
+        intersection, ranked from the dish index's columns; only the final
+        rows are read, by primary key, instead of scanning the city.
+        """
+        if limit <= 0:
+            return []
+        
+        dishes = self._get_dish_index(db_manager).city(db_manager, user_input.city)
+        if trace is not None:
+            trace.lap("dish_index")
+        if dishes is None:
+            logger.warning("The database has no dish index; run the Phase 1 pipeline to build it")
+            return []
+        
+        ranked = dishes.top_k(user_input, limit, after, feedback, self.ranking_weights)
+        if trace is not None:
+            trace.lap("dish_top_k")
+        if not ranked:
+            return []
+        scored = fetch_ranked_rows(db_manager.connection_for(user_input.city), db_manager.table_name, ranked)
+        if trace is not None:
+            trace.lap("dish_fetch")
+        return scored
+
+    def _relax(
+        self,
+        db_manager: DatabaseManager,
+        user_input: UserInput,
+        limit: int,
+        feedback: Optional[FeedbackAdjustments] = None,
+        trace: Optional[ExplainTrace] = None
+    ) -> Optional[RecommendationResponse]:
+        """
+        Best results of the first relaxation level that matches anything, from
+        a single pass over the city with the loosest constraints (see
+        relaxation.py). Dishes stay required. Relaxed pages carry no next
+        cursor because cursors belong to the original preferences.
+        
+        Returns:
+            Response tagged with the relaxed constraints, or None if even the
+            loosest relaxation matches nothing
+        """
+        relaxation = Relaxation(user_input)
+        if relaxation.first_level is None:
+            return None
+        
+        if self.backend == "columnar" and not user_input.dish:
+            level, scored = self._get_columnar_index(db_manager).relaxed_top_k(user_input, relaxation, limit, feedback, self.ranking_weights)
+        else:
+            level, scored = self._score_relaxed(db_manager, user_input, relaxation, limit, feedback, trace)
+        if trace is not None:
+            trace.lap("relax")
+        if level is None:
+            return None
+        
+        relaxed = relaxation.relaxed(level)
+        logger.info(f"No exact matches in {user_input.city}; relaxed {', '.join(relaxed) or 'nothing'}")
+        response = _build_response(user_input.city, scored, self.trusted_rows, relaxed_constraints=relaxed)
+        if trace is not None:
+            trace.path = "relaxed"
+            trace.lap("build_models")
+        return response
+
+    def _score_relaxed(
+        self,
+        db_manager: DatabaseManager,
+        user_input: UserInput,
+        relaxation: Relaxation,
+        limit: int,
+        feedback: Optional[FeedbackAdjustments] = None,
+        trace: Optional[ExplainTrace] = None
+    ) -> Tuple[Optional[int], List[ScoredRow]]:
+        """
+        SQL backend (and dish requests): stream the city best first with the
+        loosest constraints, keeping every row at its first admitting level.
+        
+        Rows below the best level seen so far are skipped before scoring. Only
+        the first level that loosens anything can settle early, because level
+        0 matched nothing: once it has limit rows and no later row can
+        outscore them (the bound of _score_candidates), reading stops.
+        Otherwise the whole city is read.
+        
+        Returns:
+            (lowest level found, its top-k), or (None, []) if nothing matched
+        """
+        served = liked = None
+        if user_input.dish:
+            dishes = self._get_dish_index(db_manager).city(db_manager, user_input.city)
+            if dishes is None:
+                return None, []
+            served_ids, liked_ids = dishes.lookup(user_input.dish)
+            served, liked = set(served_ids.tolist()), set(liked_ids.tolist())
+        
+        first = relaxation.first_level
+        weights = self.ranking_weights
+        bonus = 1.0 if user_input.cuisine else 0.0
+        boost = feedback.max_boost if feedback else 0.0
+        best: Optional[int] = None
+        scored: List[ScoredRow] = []  # Rows of level best
+        top_scores: List[float] = []  # Min-heap of the limit best scores of level best
+        cursor = db_manager.connection_for(user_input.city).cursor()
+        try:
+            cursor.execute(self._query, (
+                user_input.city, relaxation.relaxed_lower, relaxation.relaxed_upper, relaxation.relaxed_rating,
+                None, math.inf, score_floor(relaxation.relaxed_rating)
+            ))
+            rows = cursor if trace is None else trace.rows(cursor)
+            for row in rows:
+                # Rounding moves a score by at most 0.005
+                if best == first and len(top_scores) == limit:
+                    if weights.upper_bound(HAND_TUNED.base(row[6], row[7])) + bonus + boost + 0.01 < top_scores[0]:
+                        break
+                level = relaxation.level(row[4], row[6], row[3])
+                if (best is not None and level > best) or (served is not None and row[8] not in served):
+                    continue
+                if best is None or level < best:
+                    best, scored, top_scores = level, [], []
+                match_score = self._calculate_match_score(
+                    row[6], row[7], user_input, row[3],
+                    known_for_dish=liked is not None and row[8] in liked,
+                    adjustment=feedback.get(row[0]) if feedback else 0.0
+                )
+                scored.append((tuple(row), match_score))
+                if len(top_scores) < limit:
+                    heapq.heappush(top_scores, match_score)
+                elif match_score > top_scores[0]:
+                    heapq.heapreplace(top_scores, match_score)
+        finally:
+            cursor.close()
+        
+        scored.sort(key=_ranking_key)
+        return best, scored[:limit]
+
+    def _rerank_precomputed(
+        self,
+        db_manager: DatabaseManager,
+        user_input: UserInput,
+        limit: int,
+        feedback: Optional[FeedbackAdjustments]
+    ) -> Optional[List[ScoredRow]]:
+        """
+        Precomputed top-N (ranked by hand-tuned scores) rescored with feedback
+        adjustments and the engine's ranking weights, or None if rows beyond
+        the stored N could still enter the top-k: their hand-tuned scores are
+        at most the N-th stored score, which bounds their rescored scores.
+        """
+        if limit > PRECOMPUTED_TOP_N:
+            return None
+        stored = lookup_precomputed(db_manager.connection_for(user_input.city), db_manager.table_name, user_input, PRECOMPUTED_TOP_N)
+        if stored is None:
+            return None
+        
+        scored = sorted(
+            (
+                (row, self._calculate_match_score(row[6], row[7], user_input, row[3], adjustment=feedback.get(row[0]) if feedback else 0.0))
+                for row, _ in stored
+            ),
+            key=_ranking_key
+        )
+        if len(stored) == PRECOMPUTED_TOP_N:
+            last_score = stored[-1][1]
+            if last_score >= 10.0 or len(scored) < limit:
+                return None
+            bonus = 1.0 if user_input.cuisine else 0.0
+            upper = self.ranking_weights.upper_bound(last_score - bonus + 0.005) + bonus
+            if upper + (feedback.max_boost if feedback else 0.0) + 0.01 >= scored[limit - 1][1]:
+                return None
+        return scored[:limit]
+
+    def _get_feedback(self) -> Optional[FeedbackAdjustments]:
+        """
+        Current feedback adjustments, or None if there are none to fold in.
+        """
+        if self._feedback is None:
+            return None
+        feedback = self._feedback.adjustments()
+        return feedback if len(feedback) else None
+
+    def _get_dish_index(self, db_manager: DatabaseManager) -> DishIndex:
+        """
+        Get the dish index of the current database version (cities load on first use).
+        """
+        version = self._data_version(db_manager)
+        index = self._dishes
+        if index is None or version is None or index.version != version:
+            index = DishIndex(version)
+            self._dishes = index
+        return index
+
+    def _get_columnar_index(self, db_manager: DatabaseManager) -> ColumnarIndex:
+        """
+        Get the columnar index, (re)loading it when the database file has changed.
+        """
+        stamp = database_stamp(db_manager)
+        index = self._columnar
+        if index is not None and index.stamp == stamp:
+            return index
+        
+        with self._columnar_lock:
+            if self._columnar is None or self._columnar.stamp != stamp:
+                self._columnar = ColumnarIndex.from_database(db_manager, stamp=stamp)
+            return self._columnar
+
+    def _get_semantic_index(self, db_manager: DatabaseManager) -> Optional[SemanticIndex]:
+        """
+        Get the semantic index stored next to the database, (re)loading it when
+        the index file changes. None if it is missing or from another build.
+        """
+        path = semantic_index_path(db_manager.db_path)
+        try:
+            stat = path.stat()
+        except OSError:
+            logger.warning(f"No semantic index at {path}; run the Phase 1 pipeline to build it")
+            return None
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        
+        with self._semantic_lock:
+            if self._semantic is None or self._semantic[0] != stamp:
+                self._semantic = (stamp, SemanticIndex.load(path))
+                logger.info(f"Loaded semantic index: {len(self._semantic[1])} restaurants")
+            index = self._semantic[1]
+        
+        version = self._data_version(db_manager)
+        if version is not None and index.build_id != version[0]:
+            logger.warning(f"Semantic index {path} is from another database build; ignoring it")
+            return None
+        return index
+
+    def _cursor_version(self, version: Optional[Hashable]) -> Optional[Hashable]:
+        """
+        Version cursors are issued for: the data version, plus the ranking
+        weights unless they are hand-tuned (rank keys of other weights are
+        meaningless).
+        """
+        if version is None or self.ranking_weights.is_hand_tuned:
+            return version
+        return version + (self.ranking_weights.version,)
+    
+    def _data_version(self, db_manager: DatabaseManager) -> Optional[Hashable]:
+        """
+        Version of the data behind db_manager: (build id, file stamp), or None if
+        it cannot be determined (then nothing is cached).
+        
+        The build id is only re-read when the file stamp changes. The stamp is
+        part of the version so that writes made without a new build id are
+        still seen.
+        """
+        stamp = database_stamp(db_manager)
+        if stamp is None:
+            return None
+        
+        known = self._data_versions
+        if known is not None and known[0] == stamp:
+            return known[1]
+        
+        version = (db_manager.get_build_id(), stamp)
+        self._data_versions = (stamp, version)
+        return version
+
+    def _recommend_cached(
+        self,
+        db_manager: DatabaseManager,
+        user_input: UserInput,
+        limit: int,
+        cursor: Optional[str] = None,
+        trace: Optional[ExplainTrace] = None
+    ) -> RecommendationResponse:
+        """
+        _recommend behind the result cache; served pages go to the query log.
+        """
+        version = self._data_version(db_manager)
+        if trace is not None:
+            trace.lap("data_version")
+        if version is None or self._cache.max_entries <= 0:
+            response = self._recommend(db_manager, user_input, limit, cursor, version, trace)
+        else:
+            # Cached responses also expire with the feedback they were ranked with
+            feedback = self._get_feedback()
+            cache_version = (version, feedback.generation if feedback else None)
+            key = cache_key(user_input, limit) + (cursor,)
+            response = self._cache.get(key, cache_version)
+            if trace is not None:
+                trace.result_cache = "miss" if response is None else "hit"
+                if response is not None:
+                    trace.path = "cache"
+                trace.lap("cache_lookup")
+            if response is None:
+                response = self._recommend(db_manager, user_input, limit, cursor, version, trace)
+                self._cache.put(key, cache_version, response)
+            
+            # Callers get their own list; the cached response is never mutated
+            response = response.model_copy(update={"recommendations": list(response.recommendations)})
+            if trace is not None:
+                trace.lap("cache_store")
+        
+        if self._query_log is not None:
+            self._query_log.record(user_input, response, cursor)
+            if trace is not None:
+                trace.lap("query_log")
+        return response
+
+    def _recommend_explained(
+        self,
+        db_manager: DatabaseManager,
+        user_input: UserInput,
+        limit: int,
+        cursor: Optional[str],
+        trace: ExplainTrace
+    ) -> RecommendationResponse:
+        """
+        _recommend_cached with the request profiled; the response carries the ExplainReport.
+        """
+        trace.watch(db_manager, user_input.city)
+        trace.lap("connect")
+        try:
+            response = self._recommend_cached(db_manager, user_input, limit, cursor, trace)
+        finally:
+            trace.unwatch()
+        report = trace.report(db_manager, user_input, response, self.backend, self.cache_stats())
+        return response.model_copy(update={"explain": report})
+
+    def cache_stats(self) -> dict:
+        """
+        Get result cache counters.
+        
+        Returns:
+            Dictionary with size, hits, misses, evictions, expirations and invalidations
+        """
+        return self._cache.stats()
+
+    def clear_cache(self):
+        """
+        Drop every cached response.
+        """
+        self._cache.clear()
+
+    def _recommend(
+        self,
+        db_manager: DatabaseManager,
+        user_input: UserInput,
+        limit: int,
+        cursor: Optional[str] = None,
+        version: Optional[Hashable] = None,
+        trace: Optional[ExplainTrace] = None
+    ) -> RecommendationResponse:
+        """
+        Query and rank one page of recommendations on an already connected DatabaseManager.
+        
+        One row beyond limit is ranked to tell whether a next page exists; the
+        next cursor is only issued when the data version is known. Every
+        backend folds the current feedback adjustments into the match scores.
+        A first page without results is answered with relaxed constraints
+        when relax_empty is set.
+        
+        Raises:
+            InvalidCursorError: If the cursor is malformed, stale or for other preferences
+        """
+        after = None
+        if cursor is not None:
+            if version is None:
+                raise InvalidCursorError("Cursors are not supported for this database")
+            after = decode_cursor(cursor, self._cursor_version(version), user_input)
+        
+        feedback = self._get_feedback()
+        if trace is not None:
+            trace.lap("prepare")
+        if user_input.dish:
+            if trace is not None:
+                trace.path = "dish"
+            scored = self._score_dish_candidates(db_manager, user_input, limit + 1, after, feedback, trace)
+        elif self.backend == "columnar":
+            index = self._get_columnar_index(db_manager)
+            if trace is not None:
+                trace.path = "columnar"
+                trace.lap("columnar_index")
+            scored = index.top_k(user_input, limit + 1, after, feedback, self.ranking_weights)
+            if trace is not None:
+                trace.lap("columnar_top_k")
+        else:
+            scored = None
+            if self.use_precomputed and after is None:
+                if feedback or not self.ranking_weights.is_hand_tuned:
+                    scored = self._rerank_precomputed(db_manager, user_input, limit + 1, feedback)
+                else:
+                    scored = lookup_precomputed(db_manager.connection_for(user_input.city), db_manager.table_name, user_input, limit + 1)
+                if trace is not None:
+                    trace.path = "precomputed"
+                    trace.lap("precomputed")
+            if scored is None:
+                if trace is not None:
+                    trace.path = "sql"
+                scored = self._score_candidates(db_manager, user_input, limit + 1, after, feedback, trace)
+        
+        if not scored and after is None and self.relax_empty:
+            relaxed = self._relax(db_manager, user_input, limit, feedback, trace)
+            if relaxed is not None:
+                return relaxed
+        
+        response = _build_page(user_input, scored, limit, self._cursor_version(version), self.trusted_rows)
+        if trace is not None:
+            trace.lap("build_models")
+        logger.info(f"Found {response.count} recommendations for {user_input.city}")
+        return response
+
+    def get_recommendations(
+        self,
+        user_input: UserInput,
+        limit: int = 5,
+        cursor: Optional[str] = None,
+        explain: bool = False
+    ) -> RecommendationResponse:
         """
         Fetch and rank recommendations from the database.
         
         Args:
             user_input: Validated user preferences.
             limit: Maximum number of recommendations to return.
+            cursor: next_cursor of a previous page, to continue after it ("load more").
+            explain: Profile the request: the response's explain field reports
+                per-stage timings, the SQL executed with its query plans,
+                candidate counts and the result cache outcome.
             
         Returns:
-            RecommendationResponse object.
+            RecommendationResponse object; next_cursor is set when more results exist.
+            
+        Raises:
+            InvalidCursorError: If the cursor is malformed, from an earlier build or for other preferences.
         """
+        trace = ExplainTrace() if explain else None
         try:
             self.db_manager.connect()
+            if trace is not None:
+                return self._recommend_explained(self.db_manager, user_input, limit, cursor, trace)
+            return self._recommend_cached(self.db_manager, user_input, limit, cursor)
+        except InvalidCursorError:
+            raise
+        except Exception as e:
+            logger.error(f"Error getting recommendations: {e}")
+            return RecommendationResponse(user_city=user_input.city, count=0, recommendations=[])
+        finally:
+            self.db_manager.close()
+
+    def get_recommendations_batch(
+        self,
+        inputs: Sequence[UserInput],
+        limit: int = 5,
+        workers: Optional[int] = BATCH_WORKERS
+    ) -> List[RecommendationResponse]:
+        """
+        Fetch and rank recommendations for many preference sets, e.g. for
+        offline campaign scoring.
+        
+        Inputs are grouped by city (the partition key). Each city is scanned
+        once and all of its inputs are answered from that scan; identical
+        preference sets are answered once. Cities are spread over a process
+        pool. Inputs with a dish are answered from the dish index instead (no
+        scan needed). Results match get_recommendations item by item.
+        
+        Args:
+            inputs: Validated user preferences
+            limit: Maximum number of recommendations per input
+            workers: Number of worker processes (defaults to the CPU count; 1 runs in-process)
             
-            # Build query
-            query = f"SELECT name, city, address, cuisines, average_cost_for_two, price_category, aggregate_rating, votes FROM {self.db_manager.table_name} WHERE city = ?"
-            params: List[Any] = [user_input.city]
-            
-            # Filtering by price category
-            query += " AND price_category = ?"
-            params.append(user_input.price_range)
-            
-            # Filtering by min rating
-            query += " AND aggregate_rating >= ?"
-            params.append(user_input.min_rating)
-            
-            # Optional cuisine filter (SQL level for efficiency)
-            if user_input.cuisine:
-                cuisine_clauses = " OR ".join(["cuisines LIKE ?" for _ in user_input.cuisine])
-                query += f" AND ({cuisine_clauses})"
-                for c in user_input.cuisine:
-                    params.append(f"%{c}%")
-            
-            # Sorting by rating and votes as a baseline
-            query += " ORDER BY aggregate_rating DESC, votes DESC LIMIT 50" # Fetch more for scoring
-            
-            assert self.db_manager.connection is not None
-            cursor = self.db_manager.connection.cursor()
-            cursor.execute(query, params)
-            rows = cursor.fetchall()
-            
-            recommendations: List[RestaurantRecommendation] = []
-            
-            for row in rows:
-                name, city, address, cuisines, avg_cost, price_cat, rating, votes = row
-                
-                match_score = self._calculate_match_score(rating, votes, user_input, cuisines)
-                
-                rec = RestaurantRecommendation(
-                    name=name,
-                    city=city,
-                    address=address,
-                    cuisines=cuisines,
-                    average_cost=avg_cost,
-                    price_category=price_cat,
-                    rating=rating,
-                    votes=votes,
-                    match_score=match_score
+        Returns:
+            List of RecommendationResponse objects, in input order. Duplicate
+            inputs share one response object.
+        """
+        # city -> canonical key -> (representative input, positions in inputs)
+        groups: Dict[str, Dict[Hashable, Tuple[UserInput, List[int]]]] = {}
+        dish_inputs: Dict[Hashable, Tuple[UserInput, List[int]]] = {}
+        for position, user_input in enumerate(inputs):
+            by_key = dish_inputs if user_input.dish else groups.setdefault(user_input.city, {})
+            key = cache_key(user_input, limit)
+            if key in by_key:
+                by_key[key][1].append(position)
+            else:
+                by_key[key] = (user_input, [position])
+        
+        # Pages carry next cursors like get_recommendations (None if the version is unknown)
+        version = self._data_version(self.db_manager)
+        feedback = self._get_feedback()
+        
+        # Workers open their own read-only connections; an in-memory copy per
+        # process would cost more than it saves for one scan per city
+        serving_mode = "file" if self.db_manager.serving_mode == "memory" else self.db_manager.serving_mode
+        args = {
+            city: (self.db_manager.db_path, serving_mode, city, [user_input for user_input, _ in by_key.values()], limit, self.trusted_rows, self._cursor_version(version), feedback, self.ranking_weights)
+            for city, by_key in groups.items()
+        }
+        
+        results: List[Optional[RecommendationResponse]] = [None] * len(inputs)
+        
+        def collect(city: str, responses: List[RecommendationResponse]):
+            for (_, positions), response in zip(groups[city].values(), responses):
+                for position in positions:
+                    results[position] = response
+        
+        def fail(city: str, error: Exception):
+            logger.error(f"Error getting batch recommendations for {city}: {error}")
+            collect(city, [RecommendationResponse(user_city=city, count=0, recommendations=[])] * len(groups[city]))
+        
+        if workers == 1 or len(groups) <= 1:
+            for city, city_args in args.items():
+                try:
+                    collect(city, _recommend_city_batch(*city_args))
+                except Exception as e:
+                    fail(city, e)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = {city: executor.submit(_recommend_city_batch, *city_args) for city, city_args in args.items()}
+                for city, future in futures.items():
+                    try:
+                        collect(city, future.result())
+                    except Exception as e:
+                        fail(city, e)
+        
+        # Inputs that matched nothing are relaxed like get_recommendations does
+        empty = []
+        if self.relax_empty:
+            for by_key in groups.values():
+                empty.extend(entry for entry in by_key.values() if not results[entry[1][0]].recommendations)
+        if empty:
+            try:
+                self.db_manager.connect()
+                for user_input, positions in empty:
+                    try:
+                        relaxed = self._relax(self.db_manager, user_input, limit, feedback)
+                    except Exception as e:
+                        logger.error(f"Error relaxing batch input for {user_input.city}: {e}")
+                        relaxed = None
+                    for position in positions:
+                        results[position] = relaxed or results[position]
+            finally:
+                self.db_manager.close()
+        
+        if dish_inputs:
+            try:
+                self.db_manager.connect()
+                for user_input, positions in dish_inputs.values():
+                    try:
+                        response = self._recommend(self.db_manager, user_input, limit, None, version)
+                    except Exception as e:
+                        logger.error(f"Error getting batch recommendations for {user_input.city}: {e}")
+                        response = RecommendationResponse(user_city=user_input.city, count=0, recommendations=[])
+                    for position in positions:
+                        results[position] = response
+            finally:
+                self.db_manager.close()
+        
+        logger.info(f"Answered {len(inputs)} batch inputs over {len(groups)} cities")
+        return results  # type: ignore[return-value]
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """
+        Get the dedicated, bounded executor (and its connection pool), creating them on first use.
+        """
+        with self._async_lock:
+            if self._executor is None:
+                self._pool = ConnectionPool(
+                    db_path=self.db_manager.db_path,
+                    serving_mode=self.db_manager.serving_mode,
+                    size=self.max_workers
                 )
-                recommendations.append(rec)
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="recommendation-engine"
+                )
+            return self._executor
+
+    def _get_recommendations_pooled(
+        self,
+        user_input: UserInput,
+        limit: int,
+        cursor: Optional[str],
+        explain: bool = False
+    ) -> RecommendationResponse:
+        """
+        Run a recommendation query on a pooled connection (executor side of aget_recommendations).
+        """
+        assert self._pool is not None
+        trace = ExplainTrace() if explain else None
+        try:
+            with self._pool.acquire() as db_manager:
+                if trace is not None:
+                    return self._recommend_explained(db_manager, user_input, limit, cursor, trace)
+                return self._recommend_cached(db_manager, user_input, limit, cursor)
+        except InvalidCursorError:
+            raise
+        except Exception as e:
+            logger.error(f"Error getting recommendations: {e}")
+            return RecommendationResponse(user_city=user_input.city, count=0, recommendations=[])
+
+    async def aget_recommendations(
+        self,
+        user_input: UserInput,
+        limit: int = 5,
+        cursor: Optional[str] = None,
+        explain: bool = False
+    ) -> RecommendationResponse:
+        """
+        Async variant of get_recommendations with the same semantics.
+        
+        The query runs on the engine's bounded executor with a pooled connection,
+        so the calling event loop is never blocked by SQLite.
+        
+        Args:
+            user_input: Validated user preferences.
+            limit: Maximum number of recommendations to return.
+            cursor: next_cursor of a previous page, to continue after it ("load more").
+            explain: Profile the request (see get_recommendations).
             
-            # Re-sort by match score
-            recommendations.sort(key=lambda x: x.match_score, reverse=True)
+        Returns:
+            RecommendationResponse object; next_cursor is set when more results exist.
             
-            # Apply limit
-            final_recs = recommendations[:limit]
+        Raises:
+            InvalidCursorError: If the cursor is malformed, from an earlier build or for other preferences.
+        """
+        executor = self._get_executor()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, self._get_recommendations_pooled, user_input, limit, cursor, explain)
+
+    def _similar(self, db_manager: DatabaseManager, restaurant_id: int, city: Optional[str], limit: int) -> RecommendationResponse:
+        """
+        Look up the stored neighbours of a restaurant on an already connected DatabaseManager.
+        
+        Raises:
+            ValueError: If the database is partitioned and no city is given
+        """
+        if city is None and db_manager.is_partitioned:
+            raise ValueError("A city is required to find similar restaurants in a partitioned database")
+        
+        connection = db_manager.connection_for(city) if city is not None else db_manager.connect()
+        scored = lookup_similar(connection, db_manager.table_name, restaurant_id, limit)
+        if scored is None:
+            logger.warning("Database was built without similar restaurants")
+            scored = []
+        
+        response = _build_response(scored[0][0][1] if scored else (city or ""), scored, self.trusted_rows)
+        logger.info(f"Found {response.count} restaurants similar to {restaurant_id}")
+        return response
+
+    def similar(self, restaurant_id: int, city: Optional[str] = None, limit: int = SIMILAR_DEFAULT_LIMIT) -> RecommendationResponse:
+        """
+        "More like this": the restaurants most similar to one restaurant, as
+        precomputed by the Phase 1 build (one primary-key lookup).
+        
+        Args:
+            restaurant_id: Id of the restaurant (RestaurantRecommendation.id).
+            city: City of the restaurant; required when the database is partitioned,
+                since restaurant ids are only unique within a partition.
+            limit: Maximum number of similar restaurants to return.
             
-            logger.info(f"Found {len(final_recs)} recommendations for {user_input.city}")
+        Returns:
+            RecommendationResponse whose match_score fields hold the cosine
+            similarity (0 to 1); empty for an unknown restaurant.
             
-            return RecommendationResponse(
-                user_city=user_input.city,
-                count=len(final_recs),
-                recommendations=final_recs
-            )
+        Raises:
+            ValueError: If the database is partitioned and no city is given.
+        """
+        try:
+            self.db_manager.connect()
+            return self._similar(self.db_manager, restaurant_id, city, limit)
+        except ValueError:
+            raise
+        except Exception as e:
+            logger.error(f"Error getting similar restaurants: {e}")
+            return RecommendationResponse(user_city=city or "", count=0, recommendations=[])
+        finally:
+            self.db_manager.close()
+
+    def _similar_pooled(self, restaurant_id: int, city: Optional[str], limit: int) -> RecommendationResponse:
+        """
+        Look up similar restaurants on a pooled connection (executor side of asimilar).
+        """
+        assert self._pool is not None
+        try:
+            with self._pool.acquire() as db_manager:
+                return self._similar(db_manager, restaurant_id, city, limit)
+        except ValueError:
+            raise
+        except Exception as e:
+            logger.error(f"Error getting similar restaurants: {e}")
+            return RecommendationResponse(user_city=city or "", count=0, recommendations=[])
+
+    async def asimilar(self, restaurant_id: int, city: Optional[str] = None, limit: int = SIMILAR_DEFAULT_LIMIT) -> RecommendationResponse:
+        """
+        Async variant of similar with the same semantics, run on the engine's bounded executor.
+        """
+        executor = self._get_executor()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, self._similar_pooled, restaurant_id, city, limit)
+
+    def _semantic_search(
+        self,
+        db_manager: DatabaseManager,
+        text: str,
+        filters: Optional[SemanticFilters],
+        limit: int
+    ) -> RecommendationResponse:
+        """
+        Run a semantic search on an already connected DatabaseManager.
+        """
+        city = filters.city if filters is not None and filters.city else ""
+        index = self._get_semantic_index(db_manager)
+        if index is None:
+            return RecommendationResponse(user_city=city, count=0, recommendations=[])
+        
+        scored = fetch_hits(db_manager, index.search(text, filters, limit))
+        response = _build_response(city, scored, self.trusted_rows)
+        logger.info(f"Found {response.count} restaurants for query '{text}'")
+        return response
+
+    def semantic_search(
+        self,
+        text: str,
+        filters: Optional[SemanticFilters] = None,
+        limit: int = SEMANTIC_DEFAULT_LIMIT
+    ) -> RecommendationResponse:
+        """
+        Free-text search ("rooftop with live music and craft beer") over
+        restaurant names, cuisines, types, liked dishes and reviews, served
+        offline from the semantic index built by Phase 1.
+        
+        Args:
+            text: Free-text query.
+            filters: Optional city, price category and minimum rating restrictions.
+            limit: Maximum number of restaurants to return.
             
+        Returns:
+            RecommendationResponse whose match_score fields hold the cosine
+            similarity to the query; empty if the index is missing or stale.
+        """
+        try:
+            self.db_manager.connect()
+            return self._semantic_search(self.db_manager, text, filters, limit)
         except Exception as e:
-            logger.error(f"Error getting recommendations: {e}")
-            return RecommendationResponse(user_city=user_input.city, count=0, recommendations=[])
+            logger.error(f"Error running semantic search: {e}")
+            return RecommendationResponse(user_city=(filters.city or "") if filters else "", count=0, recommendations=[])
         finally:
             self.db_manager.close()
+
+    def _semantic_search_pooled(self, text: str, filters: Optional[SemanticFilters], limit: int) -> RecommendationResponse:
+        """
+        Run a semantic search on a pooled connection (executor side of asemantic_search).
+        """
+        assert self._pool is not None
+        try:
+            with self._pool.acquire() as db_manager:
+                return self._semantic_search(db_manager, text, filters, limit)
+        except Exception as e:
+            logger.error(f"Error running semantic search: {e}")
+            return RecommendationResponse(user_city=(filters.city or "") if filters else "", count=0, recommendations=[])
+
+    async def asemantic_search(
+        self,
+        text: str,
+        filters: Optional[SemanticFilters] = None,
+        limit: int = SEMANTIC_DEFAULT_LIMIT
+    ) -> RecommendationResponse:
+        """
+        Async variant of semantic_search with the same semantics, run on the engine's bounded executor.
+        """
+        executor = self._get_executor()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, self._semantic_search_pooled, text, filters, limit)
+
+    def close(self):
+        """
+        Shut down the async executor and close pooled connections.
+        """
+        with self._async_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+            if self._pool is not None:
+                self._pool.close()
+                self._pool = None
@@ -0,0 +1,109 @@
+"""
+Zero-result relaxation for Phase 3 - Recommendation Engine
+When a request matches nothing, its constraints are relaxed in a fixed
+order: min_rating is lowered by RELAX_MIN_RATING_STEP, then the budget is
+widened to the adjacent price categories, then the cuisine is dropped. The
+relaxations are cumulative.
+
+A single pass over the city with the loosest constraints finds every
+candidate. Each row gets the first relaxation level that admits it, and the
+best results of the lowest non-empty level are returned, so no query is
+issued per level. The SQL backend streams the city best first and stops
+early once the first relaxation that loosens anything has a settled top-k.
+The columnar backend filters its in-memory partition in one vectorized pass.
+"""
+
+from typing import List, Optional, Tuple
+
+from phase2.config import PRICE_CATEGORIES
+from phase2.models import UserInput
+from phase3.config import RELAX_MIN_RATING_STEP
+
+# Relaxation order; the tags reported in RecommendationResponse.relaxed_constraints
+RELAXATION_STEPS = ("min_rating", "price_range", "cuisine")
+
+
+def adjacent_cost_bounds(lower: float, upper: float) -> Tuple[float, float]:
+    """
+    Widen a cost range to the price categories next to the ones it touches.
+    For example, budget becomes budget plus mid-range.
+
+    Args:
+        lower: Inclusive lower bound (see UserInput.cost_bounds)
+        upper: Exclusive upper bound
+
+    Returns:
+        Widened (lower inclusive, upper exclusive) bounds
+    """
+    categories = sorted(PRICE_CATEGORIES.values())
+    first = max([i for i, (low, _) in enumerate(categories) if low <= lower] or [0])
+    last = min([i for i, (_, high) in enumerate(categories) if upper <= high] or [len(categories) - 1])
+    return (
+        float(min(lower, categories[max(first - 1, 0)][0])),
+        float(max(upper, categories[min(last + 1, len(categories) - 1)][1]))
+    )
+
+
+class Relaxation:
+    """
+    Relaxation levels of one request. Level 0 is the request itself, and
+    level i relaxes the first i RELAXATION_STEPS.
+    """
+
+    def __init__(self, user_input: UserInput, rating_step: float = RELAX_MIN_RATING_STEP):
+        """
+        Initialize the Relaxation.
+
+        Args:
+            user_input: Validated user preferences
+            rating_step: How far min_rating is lowered
+        """
+        self.min_rating = user_input.min_rating
+        self.relaxed_rating = max(user_input.min_rating - rating_step, 0.0)
+        self.lower, self.upper = user_input.cost_bounds()
+        self.relaxed_lower, self.relaxed_upper = adjacent_cost_bounds(self.lower, self.upper)
+        self.cuisines: Optional[List[str]] = [c.lower() for c in user_input.cuisine] if user_input.cuisine else None
+        # Steps that loosen something for this request (others are not reported)
+        self.applies = (
+            self.relaxed_rating < self.min_rating,
+            (self.relaxed_lower, self.relaxed_upper) != (self.lower, self.upper),
+            self.cuisines is not None
+        )
+
+    @property
+    def first_level(self) -> Optional[int]:
+        """
+        Lowest level that loosens anything (None if nothing can be relaxed).
+        """
+        return next((i + 1 for i, applies in enumerate(self.applies) if applies), None)
+
+    def level(self, cost: float, rating: float, cuisines: Optional[str]) -> int:
+        """
+        First level that admits a row passing the loosest constraints.
+        """
+        if self.cuisines is not None and not any(c in (cuisines or "").lower() for c in self.cuisines):
+            return 3
+        if not self.lower <= cost < self.upper:
+            return 2
+        if rating < self.min_rating:
+            return 1
+        return 0
+
+    def relaxed(self, level: int) -> List[str]:
+        """
+        Tags of the constraints relaxed up to level.
+        """
+        return [step for step, applies in zip(RELAXATION_STEPS[:level], self.applies) if applies]
+
+
+RELAXATION_LABELS = {"min_rating": "minimum rating", "price_range": "price range", "cuisine": "cuisine"}
+
+
+def describe_relaxation(relaxed_constraints: List[str]) -> str:
+    """
+    User-facing note for a response answered with relaxed constraints.
+    """
+    labels = [RELAXATION_LABELS.get(tag, tag) for tag in relaxed_constraints]
+    if len(labels) > 1:
+        labels = [", ".join(labels[:-1]) + " and " + labels[-1]]
+    return f"No exact matches, so these results relax the {labels[0]}." if labels else ""
@@ -0,0 +1,169 @@
+"""
+Result cache for Phase 3 - Recommendation Engine
+LRU + TTL cache of recommendation responses, keyed on a canonical form of the
+user's preferences and scoped to one database version.
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from phase2.models import UserInput
+
+
+def canonical_min_rating(min_rating: float) -> float:
+    """
+    Round a minimum rating up to one decimal, the precision of stored ratings,
+    so e.g. 3.95 and 4.0 select exactly the same restaurants.
+    """
+    return math.ceil(round(min_rating * 10, 6)) / 10
+
+
+def cache_key(user_input: UserInput, limit: int) -> Tuple[Hashable, ...]:
+    """
+    Canonical key for a request: preferences that always produce the same
+    results map to the same key.
+    
+    Cuisines are case-folded, de-duplicated and sorted (matching is
+    case-insensitive and any cuisine may match); dishes (already normalized)
+    are sorted. min_rating goes through canonical_min_rating. The resolved
+    cost range is part of the key, so a request for a price category is not
+    answered from results of its earlier boundaries.
+    
+    Args:
+        user_input: Validated user preferences
+        limit: Maximum number of recommendations requested
+        
+    Returns:
+        Hashable key
+    """
+    cuisines = tuple(sorted({c.casefold() for c in user_input.cuisine})) if user_input.cuisine else None
+    min_rating = canonical_min_rating(user_input.min_rating)
+    dishes = tuple(sorted(user_input.dish)) if user_input.dish else None
+    return (
+        user_input.city,
+        user_input.price_range,
+        user_input.cost_bounds(),
+        user_input.min_cost,
+        user_input.max_cost,
+        cuisines,
+        min_rating,
+        dishes,
+        limit
+    )
+
+
+class ResultCache:
+    """
+    Thread-safe LRU cache with a per-entry time to live.
+    
+    Every lookup names the data version (e.g. the database build) it expects;
+    a new version empties the cache, so results never outlive their build.
+    """
+    
+    def __init__(self, max_entries: int, ttl_seconds: float, clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the ResultCache.
+        
+        Args:
+            max_entries: Maximum number of cached results (least recently used are evicted)
+            ttl_seconds: Seconds a result stays valid after it was stored
+            clock: Time source (monotonic seconds)
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._version: Optional[Hashable] = None
+        self._lock = threading.Lock()
+        
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        
+    def _check_version(self, version: Hashable):
+        """
+        Empty the cache if the data version changed (caller holds the lock).
+        """
+        if version != self._version:
+            if self._entries:
+                self.invalidations += 1
+                self._entries.clear()
+            self._version = version
+            
+    def get(self, key: Hashable, version: Hashable) -> Optional[Any]:
+        """
+        Look up a cached result.
+        
+        Args:
+            key: Cache key (see cache_key)
+            version: Data version the result must belong to
+            
+        Returns:
+            The cached result, or None on a miss
+        """
+        with self._lock:
+            self._check_version(version)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+                
+            expires_at, value = entry
+            if self._clock() >= expires_at:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+                
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+            
+    def put(self, key: Hashable, version: Hashable, value: Any):
+        """
+        Store a result, evicting the least recently used entries if full.
+        
+        Args:
+            key: Cache key (see cache_key)
+            version: Data version the result was computed from
+            value: Result to cache (shared between callers; treat as read-only)
+        """
+        if self.max_entries <= 0:
+            return
+            
+        with self._lock:
+            self._check_version(version)
+            self._entries[key] = (self._clock() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+                
+    def clear(self):
+        """
+        Drop every cached result (counters are kept).
+        """
+        with self._lock:
+            self._entries.clear()
+            
+    def stats(self) -> Dict[str, int]:
+        """
+        Get cache counters.
+        
+        Returns:
+            Dictionary with size, hits, misses, evictions, expirations and invalidations
+        """
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations
+            }
@@ -0,0 +1,501 @@
+"""
+Offline semantic search for Phase 3 - Recommendation Engine
+Embeds every restaurant from its name, cuisines, restaurant type, liked dishes
+and review text with a hashing vectorizer (TF-IDF weighted) reduced by a
+truncated SVD, and answers free-text queries ("rooftop with live music and
+craft beer") from an IVF index persisted next to the database.
+
+Everything runs locally with NumPy: no model downloads, network or GPU.
+"""
+
+import json
+import logging
+import math
+import os
+import random
+import re
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from phase1.database_setup import DatabaseManager
+from phase3.columnar_index import ScoredRow
+from phase3.config import (
+    SEMANTIC_DIMS, SEMANTIC_FIT_SAMPLE, SEMANTIC_HASH_DIMS, SEMANTIC_IVF_LISTS, SEMANTIC_NPROBE
+)
+from phase3.models import SemanticFilters
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Columns read to build the index: metadata for the filters, then the text fields
+SEMANTIC_COLUMNS = (
+    "id", "city", "price_category", "aggregate_rating",
+    "name", "cuisines", "rest_type", "dish_liked", "reviews_text"
+)
+
+# Result rows by id, in RECOMMENDATION_QUERY column order
+SEMANTIC_ROWS_QUERY = """
+SELECT name, city, address, cuisines, average_cost_for_two, price_category, aggregate_rating, votes, id
+FROM {table}
+WHERE id IN (SELECT value FROM json_each(?1))
+"""
+
+# Restaurants embedded per step of the streaming build
+_EMBED_CHUNK = 4096
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def semantic_index_path(db_path: Path) -> Path:
+    """
+    Location of the semantic index of a database (zomato.db -> zomato.semantic.npz).
+    """
+    return Path(db_path).with_suffix(".semantic.npz")
+
+
+def _document(row: Sequence[Any]) -> str:
+    """
+    Text embedded for one SEMANTIC_COLUMNS row.
+    """
+    return " ".join(str(value) for value in row[4:] if value)
+
+
+def _hash_text(text: str, dims: int) -> Dict[int, float]:
+    """
+    Signed, sublinear term frequencies of the hashed unigrams and bigrams of a text.
+
+    Terms are hashed with CRC-32 (stable across processes, unlike hash()); the
+    low bits pick the feature and the top bit its sign, so colliding terms
+    tend to cancel out instead of adding up.
+    """
+    words = _WORD.findall(text.lower())
+    counts: Dict[int, float] = {}
+    for term in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+        h = zlib.crc32(term.encode("utf-8"))
+        feature = h & (dims - 1)
+        counts[feature] = counts.get(feature, 0.0) + (1.0 if h & 0x80000000 else -1.0)
+    return {feature: math.copysign(1.0 + math.log(abs(count)), count) for feature, count in counts.items() if count}
+
+
+def _hashed_csr(texts: Iterable[str], dims: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Hashed term frequencies of several texts as CSR arrays (indptr, indices, data).
+    """
+    indptr = [0]
+    indices: List[int] = []
+    data: List[float] = []
+    for text in texts:
+        counts = _hash_text(text, dims)
+        indices.extend(counts)
+        data.extend(counts.values())
+        indptr.append(len(indices))
+    return np.array(indptr, dtype=np.int64), np.array(indices, dtype=np.int64), np.array(data, dtype=np.float32)
+
+
+def _tfidf(indptr: np.ndarray, indices: np.ndarray, data: np.ndarray, idf: np.ndarray) -> np.ndarray:
+    """
+    Weight CSR term frequencies by IDF and L2-normalize each row (returns the new data).
+    """
+    weighted = data * idf[indices]
+    row_of = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+    norms = np.sqrt(np.bincount(row_of, weights=weighted.astype(np.float64) ** 2, minlength=len(indptr) - 1))
+    return (weighted / np.where(norms > 0, norms, 1.0)[row_of]).astype(np.float32)
+
+
+def _row_chunks(indptr: np.ndarray) -> Iterable[Tuple[int, int]]:
+    """
+    Row ranges of a CSR matrix, _EMBED_CHUNK rows at a time (bounds the
+    memory of the dense per-entry contributions below).
+    """
+    for start in range(0, len(indptr) - 1, _EMBED_CHUNK):
+        yield start, min(start + _EMBED_CHUNK, len(indptr) - 1)
+
+
+def _csr_dot(indptr: np.ndarray, indices: np.ndarray, data: np.ndarray, dense: np.ndarray) -> np.ndarray:
+    """
+    CSR matrix times a dense matrix: every stored entry contributes
+    weight * dense[term], summed per row with one reduceat.
+    """
+    result = np.zeros((len(indptr) - 1, dense.shape[1]), dtype=np.float32)
+    for start, stop in _row_chunks(indptr):
+        lo, hi = indptr[start], indptr[stop]
+        nonempty = start + np.flatnonzero(np.diff(indptr[start:stop + 1]) > 0)
+        if nonempty.size:
+            contributions = dense[indices[lo:hi]] * data[lo:hi, None]
+            result[nonempty] = np.add.reduceat(contributions, indptr[nonempty] - lo, axis=0)
+    return result
+
+
+def _csr_tdot(indptr: np.ndarray, indices: np.ndarray, data: np.ndarray, dense: np.ndarray, width: int) -> np.ndarray:
+    """
+    Transposed CSR matrix (width columns) times a dense matrix with one row per CSR row,
+    summed one output column at a time with bincount (much faster than np.add.at).
+    """
+    result = np.zeros((width, dense.shape[1]), dtype=np.float32)
+    for start, stop in _row_chunks(indptr):
+        lo, hi = indptr[start], indptr[stop]
+        row_of = np.repeat(np.arange(start, stop), np.diff(indptr[start:stop + 1]))
+        for column in range(dense.shape[1]):
+            result[:, column] += np.bincount(indices[lo:hi], weights=dense[row_of, column] * data[lo:hi], minlength=width)
+    return result
+
+
+def _truncated_svd(
+    indptr: np.ndarray,
+    indices: np.ndarray,
+    data: np.ndarray,
+    width: int,
+    dims: int,
+    rng: np.random.Generator,
+    oversample: int = 16,
+    power_iterations: int = 2
+) -> np.ndarray:
+    """
+    Top right singular vectors of a CSR matrix (randomized SVD, Halko et al.),
+    as a (width x dims) projection.
+    """
+    rank = min(dims + oversample, len(indptr) - 1, width)
+    sketch = _csr_dot(indptr, indices, data, rng.standard_normal((width, rank)).astype(np.float32))
+    for _ in range(power_iterations):
+        basis, _ = np.linalg.qr(sketch)
+        basis, _ = np.linalg.qr(_csr_tdot(indptr, indices, data, basis, width))
+        sketch = _csr_dot(indptr, indices, data, basis)
+    basis, _ = np.linalg.qr(sketch)
+    # Small (rank x width) problem with the same right singular vectors
+    projected = _csr_tdot(indptr, indices, data, basis, width).T
+    _, _, vt = np.linalg.svd(projected, full_matrices=False)
+    components = np.zeros((width, dims), dtype=np.float32)
+    components[:, :min(dims, vt.shape[0])] = vt[:dims].T
+    return components
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    """
+    Scale rows to unit length (zero rows stay zero).
+    """
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms > 0, norms, 1.0)
+
+
+def _spherical_kmeans(vectors: np.ndarray, lists: int, rng: np.random.Generator, iterations: int = 10) -> np.ndarray:
+    """
+    Unit-length centroids of unit vectors, maximizing cosine similarity.
+    """
+    centroids = vectors[rng.choice(len(vectors), size=lists, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, vectors)
+        empty = ~sums.any(axis=1)
+        sums[empty] = vectors[rng.choice(len(vectors), size=int(empty.sum()))]  # Reseed empty lists
+        centroids = _normalize(sums)
+    return centroids
+
+
+class SemanticIndex:
+    """
+    Restaurant embeddings grouped into IVF lists, with the metadata the filters need.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        """
+        Initialize the SemanticIndex (use build or load).
+
+        Args:
+            arrays: Index arrays, as written by save
+        """
+        self.build_id = str(arrays["build_id"])
+        self.idf = arrays["idf"]
+        self.components = arrays["components"]
+        self.centroids = arrays["centroids"]
+        self.offsets = arrays["offsets"]
+        self.vectors = arrays["vectors"]
+        self.ids = arrays["ids"]
+        self.city_codes = arrays["city_codes"]
+        self.price_codes = arrays["price_codes"]
+        self.ratings = arrays["ratings"]
+        self.cities = [str(city) for city in arrays["cities"]]
+        self.prices = [str(price) for price in arrays["prices"]]
+        self._arrays = arrays
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def build(
+        cls,
+        db_manager: DatabaseManager,
+        build_id: str,
+        hash_dims: int = SEMANTIC_HASH_DIMS,
+        dims: int = SEMANTIC_DIMS,
+        fit_sample: int = SEMANTIC_FIT_SAMPLE,
+        lists: Optional[int] = SEMANTIC_IVF_LISTS,
+        seed: int = 13
+    ) -> "SemanticIndex":
+        """
+        Build the index from every restaurant, in two streaming passes.
+
+        The first pass samples fit_sample documents to fit the IDF weights and
+        the SVD; the second embeds every restaurant in chunks, so memory holds
+        the embeddings but never all texts. IVF centroids are fitted on a
+        sample of the embeddings.
+
+        Args:
+            db_manager: DatabaseManager of the built database
+            build_id: Build id of that database (stale indexes are ignored)
+            hash_dims: Hashed feature dimensions (a power of two)
+            dims: Embedding dimensions
+            fit_sample: Documents sampled to fit the IDF, SVD and centroids
+            lists: Number of IVF lists (defaults to the square root of the restaurant count)
+            seed: Random seed
+
+        Returns:
+            SemanticIndex
+        """
+        rng = np.random.default_rng(seed)
+        sampler = random.Random(seed)
+
+        # Pass 1: reservoir sample of documents
+        sample: List[str] = []
+        total = 0
+        for row in db_manager.iter_all(columns=SEMANTIC_COLUMNS):
+            total += 1
+            if len(sample) < fit_sample:
+                sample.append(_document(row))
+            else:
+                slot = sampler.randrange(total)
+                if slot < fit_sample:
+                    sample[slot] = _document(row)
+        if not total:
+            raise ValueError("Cannot build a semantic index for an empty database")
+
+        indptr, indices, data = _hashed_csr(sample, hash_dims)
+        document_frequency = np.bincount(indices, minlength=hash_dims)
+        idf = (np.log((1.0 + len(sample)) / (1.0 + document_frequency)) + 1.0).astype(np.float32)
+        components = _truncated_svd(indptr, indices, _tfidf(indptr, indices, data, idf), hash_dims, dims, rng)
+
+        # Pass 2: embed every restaurant
+        vectors = np.zeros((total, dims), dtype=np.float32)
+        ids = np.zeros(total, dtype=np.int64)
+        ratings = np.zeros(total, dtype=np.float32)
+        city_codes = np.zeros(total, dtype=np.int32)
+        price_codes = np.zeros(total, dtype=np.int32)
+        cities: Dict[str, int] = {}
+        prices: Dict[str, int] = {}
+        start = 0
+        rows = db_manager.iter_all(columns=SEMANTIC_COLUMNS)
+        while True:
+            chunk = [row for _, row in zip(range(_EMBED_CHUNK), rows)]
+            if not chunk:
+                break
+            stop = start + len(chunk)
+            c_indptr, c_indices, c_data = _hashed_csr((_document(row) for row in chunk), hash_dims)
+            vectors[start:stop] = _normalize(_csr_dot(c_indptr, c_indices, _tfidf(c_indptr, c_indices, c_data, idf), components))
+            ids[start:stop] = [row[0] for row in chunk]
+            city_codes[start:stop] = [cities.setdefault(row[1], len(cities)) for row in chunk]
+            price_codes[start:stop] = [prices.setdefault(row[2] or "", len(prices)) for row in chunk]
+            ratings[start:stop] = [row[3] if row[3] is not None else np.nan for row in chunk]
+            start = stop
+
+        # IVF: group embeddings by nearest centroid
+        lists = max(1, min(lists or int(math.sqrt(total)), total))
+        fit = vectors[rng.choice(total, size=min(total, max(fit_sample, lists)), replace=False)]
+        centroids = _spherical_kmeans(fit, lists, rng)
+        assignment = np.concatenate([
+            np.argmax(vectors[i:i + _EMBED_CHUNK] @ centroids.T, axis=1) for i in range(0, total, _EMBED_CHUNK)
+        ])
+        order = np.argsort(assignment, kind="stable")
+        offsets = np.searchsorted(assignment[order], np.arange(lists + 1)).astype(np.int64)
+
+        logger.info(f"Built semantic index: {total} restaurants, {dims} dimensions, {lists} lists")
+        return cls({
+            "build_id": np.array(build_id),
+            "idf": idf,
+            "components": components,
+            "centroids": centroids.astype(np.float32),
+            "offsets": offsets,
+            "vectors": vectors[order],
+            "ids": ids[order],
+            "city_codes": city_codes[order],
+            "price_codes": price_codes[order],
+            "ratings": ratings[order],
+            "cities": np.array(list(cities), dtype=str),
+            "prices": np.array(list(prices), dtype=str)
+        })
+
+    def save(self, path: Path):
+        """
+        Write the index atomically (readers never see a partial file).
+
+        Args:
+            path: Destination .npz file
+        """
+        tmp_path = Path(str(path) + ".tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **self._arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path) -> "SemanticIndex":
+        """
+        Read an index written by save.
+
+        Args:
+            path: Index .npz file
+
+        Returns:
+            SemanticIndex
+        """
+        with np.load(path, allow_pickle=False) as npz:
+            return cls({name: npz[name] for name in npz.files})
+
+    def embed(self, text: str) -> Optional[np.ndarray]:
+        """
+        Unit-length embedding of a query, or None if none of its terms are known.
+
+        Args:
+            text: Free-text query
+
+        Returns:
+            Embedding vector or None
+        """
+        counts = _hash_text(text, len(self.idf))
+        if not counts:
+            return None
+        indices = np.fromiter(counts, dtype=np.int64, count=len(counts))
+        weights = np.fromiter(counts.values(), dtype=np.float32, count=len(counts)) * self.idf[indices]
+        vector = weights @ self.components[indices]
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm > 0 else None
+
+    def _filter_mask(self, start: int, stop: int, city: Optional[int], price: Optional[int], min_rating: float) -> Optional[np.ndarray]:
+        """
+        Filter mask of the positions start:stop, or None when nothing is filtered.
+        """
+        mask = None
+        if city is not None:
+            mask = self.city_codes[start:stop] == city
+        if price is not None:
+            matches = self.price_codes[start:stop] == price
+            mask = matches if mask is None else mask & matches
+        if min_rating > 0:
+            matches = self.ratings[start:stop] >= min_rating
+            mask = matches if mask is None else mask & matches
+        return mask
+
+    def search(
+        self,
+        text: str,
+        filters: Optional[SemanticFilters] = None,
+        limit: int = 10,
+        nprobe: int = SEMANTIC_NPROBE
+    ) -> List[Tuple[int, str, float]]:
+        """
+        Restaurants closest to a free-text query.
+
+        The nprobe lists whose centroids are closest to the query are scanned;
+        when the filters leave fewer than limit restaurants there, the number
+        of probed lists doubles until enough are found or every list is scanned.
+
+        Args:
+            text: Free-text query
+            filters: City, price category and minimum rating restrictions
+            limit: Maximum number of results
+            nprobe: IVF lists scanned first
+
+        Returns:
+            Up to limit (restaurant id, city, cosine similarity) tuples, best first
+        """
+        filters = filters or SemanticFilters()
+        query = self.embed(text)
+        if query is None or limit <= 0:
+            return []
+
+        city = price = None
+        if filters.city is not None:
+            if filters.city not in self.cities:
+                return []
+            city = self.cities.index(filters.city)
+        if filters.price_range is not None:
+            if filters.price_range not in self.prices:
+                return []
+            price = self.prices.index(filters.price_range)
+
+        probe_order = np.argsort(-(self.centroids @ query))
+        positions: List[np.ndarray] = []
+        found = 0
+        probed, target = 0, max(1, nprobe)
+        while found < limit and probed < len(probe_order):
+            for lst in probe_order[probed:target].tolist():
+                start, stop = int(self.offsets[lst]), int(self.offsets[lst + 1])
+                mask = self._filter_mask(start, stop, city, price, filters.min_rating)
+                hits = np.arange(start, stop) if mask is None else start + np.flatnonzero(mask)
+                positions.append(hits)
+                found += hits.size
+            probed, target = target, target * 2
+        if not found:
+            return []
+
+        candidates = np.concatenate(positions)
+        scores = self.vectors[candidates] @ query
+        if candidates.size > limit:
+            top = np.argpartition(-scores, limit - 1)[:limit]
+            candidates, scores = candidates[top], scores[top]
+        ranked = sorted(zip(candidates.tolist(), scores.tolist()), key=lambda hit: (-round(hit[1], 4), int(self.ids[hit[0]])))
+        return [(int(self.ids[i]), self.cities[int(self.city_codes[i])], round(score, 4)) for i, score in ranked]
+
+
+def build_semantic_index(db_manager: DatabaseManager, path: Optional[Path] = None, **options) -> int:
+    """
+    Build and persist the semantic index of a database (Phase 1 build step,
+    run once the build id is written).
+
+    Args:
+        db_manager: DatabaseManager of the built database
+        path: Destination (defaults to semantic_index_path(db_manager.db_path))
+        **options: Passed to SemanticIndex.build
+
+    Returns:
+        Number of restaurants indexed
+    """
+    build_id = db_manager.get_build_id()
+    if build_id is None:
+        raise ValueError("The database has no build metadata; run write_build_metadata first")
+    index = SemanticIndex.build(db_manager, build_id, **options)
+    index.save(path or semantic_index_path(db_manager.db_path))
+    return len(index)
+
+
+def fetch_hits(db_manager: DatabaseManager, hits: List[Tuple[int, str, float]]) -> List[ScoredRow]:
+    """
+    Restaurant rows of search hits, in hit order.
+
+    Args:
+        db_manager: Connected DatabaseManager
+        hits: (restaurant id, city, score) tuples from SemanticIndex.search
+
+    Returns:
+        (row, score) pairs; hits whose restaurant no longer exists are dropped
+    """
+    # Ids are only unique within a partition, so partitioned lookups go per city
+    groups: Dict[Optional[str], List[int]] = {}
+    for restaurant_id, city, _ in hits:
+        groups.setdefault(city if db_manager.is_partitioned else None, []).append(restaurant_id)
+
+    rows: Dict[Tuple[Optional[str], int], Tuple[Any, ...]] = {}
+    query = SEMANTIC_ROWS_QUERY.format(table=db_manager.table_name)
+    for city, ids in groups.items():
+        connection = db_manager.connection_for(city) if city is not None else db_manager.connect()
+        for row in connection.execute(query, (json.dumps(ids),)):
+            rows[(city, row[-1])] = tuple(row)
+
+    scored = []
+    for restaurant_id, city, score in hits:
+        row = rows.get((city if db_manager.is_partitioned else None, restaurant_id))
+        if row is not None:
+            scored.append((row, score))
+    return scored
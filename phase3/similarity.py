@@ -0,0 +1,246 @@
+"""
+Similar restaurants for Phase 3 - Recommendation Engine
+Describes every restaurant as a sparse TF-IDF vector over its cuisines,
+restaurant type, liked dishes and cost band, and stores the top-N nearest
+neighbours (cosine similarity) of each restaurant within its locality, so
+"more like this" is a single primary-key lookup at serving time.
+"""
+
+import json
+import logging
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from phase1.config import SIMILAR_TABLE_NAME
+from phase1.database_setup import DatabaseManager
+from phase3.columnar_index import ScoredRow
+from phase3.config import SIMILAR_BLOCK_ROWS, SIMILAR_COST_BAND_WIDTH, SIMILAR_TOP_N, SIMILAR_WORKERS
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Columns the feature vectors are built from
+SIMILARITY_COLUMNS = ("id", "cuisines", "rest_type", "dish_liked", "average_cost_for_two")
+
+# Primary-key lookup of one restaurant's neighbours, joined to their rows by id
+# (columns as RECOMMENDATION_QUERY returns them, then the similarity)
+SIMILAR_QUERY = """
+SELECT r.name, r.city, r.address, r.cuisines, r.average_cost_for_two, r.price_category,
+       r.aggregate_rating, r.votes, r.id, json_extract(entry.value, '$[1]')
+FROM {similar} AS s
+JOIN json_each(s.neighbors) AS entry
+JOIN {table} AS r ON r.id = json_extract(entry.value, '$[0]')
+WHERE s.id = ?1
+ORDER BY entry.key
+LIMIT ?2
+"""
+
+
+def restaurant_terms(row: Sequence[Any], cost_band_width: int = SIMILAR_COST_BAND_WIDTH) -> List[str]:
+    """
+    Feature terms of one restaurant, prefixed by the field they come from.
+
+    Args:
+        row: (id, cuisines, rest_type, dish_liked, average_cost_for_two)
+        cost_band_width: Width of a cost band in INR
+
+    Returns:
+        Distinct terms such as "cuisine:cafe", "type:casual dining", "dish:pasta", "cost:3"
+    """
+    _, cuisines, rest_type, dish_liked, cost = row
+    terms = []
+    for prefix, value in (("cuisine", cuisines), ("type", rest_type), ("dish", dish_liked)):
+        terms.extend(f"{prefix}:{token.strip().lower()}" for token in (value or "").split(",") if token.strip())
+    if cost is not None:
+        terms.append(f"cost:{int(cost // cost_band_width)}")
+    return list(dict.fromkeys(terms))
+
+
+class TfidfMatrix:
+    """
+    L2-normalized TF-IDF vectors in CSR form (indptr, indices, data), one row per restaurant.
+    Terms are binary (a restaurant has a cuisine or not), weighted by smoothed IDF.
+    """
+
+    def __init__(self, documents: List[List[str]]):
+        vocabulary: Dict[str, int] = {}
+        indptr = [0]
+        indices: List[int] = []
+        for terms in documents:
+            indices.extend(vocabulary.setdefault(term, len(vocabulary)) for term in terms)
+            indptr.append(len(indices))
+
+        self.vocabulary = vocabulary
+        self.indptr = np.array(indptr, dtype=np.int64)
+        self.indices = np.array(indices, dtype=np.int64)
+
+        document_frequency = np.bincount(self.indices, minlength=len(vocabulary))
+        idf = np.log((1.0 + len(documents)) / (1.0 + document_frequency)) + 1.0
+        data = idf[self.indices]
+        self._row_of = np.repeat(np.arange(len(documents)), np.diff(self.indptr))
+        norms = np.sqrt(np.bincount(self._row_of, weights=data * data, minlength=len(documents)))
+        self.data = (data / np.where(norms > 0, norms, 1.0)[self._row_of]).astype(np.float32)
+
+    def __len__(self) -> int:
+        return len(self.indptr) - 1
+
+    def dense_rows(self, start: int, stop: int, terms: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Rows start:stop as a dense array, over every term or only the given
+        (sorted) term ids: (rows x vocabulary) or (rows x len(terms)).
+        """
+        lo, hi = self.indptr[start], self.indptr[stop]
+        rows, columns, data = self._row_of[lo:hi] - start, self.indices[lo:hi], self.data[lo:hi]
+        width = len(self.vocabulary)
+        if terms is not None:
+            position = np.full(width, -1, dtype=np.int64)
+            position[terms] = np.arange(len(terms))
+            keep = position[columns] >= 0
+            rows, columns, data = rows[keep], position[columns[keep]], data[keep]
+            width = len(terms)
+        block = np.zeros((stop - start, width), dtype=np.float32)
+        block[rows, columns] = data
+        return block
+
+    def similarities(self, start: int, stop: int) -> np.ndarray:
+        """
+        Cosine similarities of rows start:stop to every row, as a dense
+        (rows x len(self)) array.
+
+        Only the terms used by the block can contribute, so both sides are
+        densified over those terms alone and multiplied with one matrix product.
+        """
+        terms = np.unique(self.indices[self.indptr[start]:self.indptr[stop]])
+        block = self.dense_rows(start, stop, terms)
+        return block @ self.dense_rows(0, len(self), terms).T
+
+
+def _top_neighbors(similarities: np.ndarray, ids: np.ndarray, offset: int, top_n: int) -> List[List[List[Any]]]:
+    """
+    Most similar restaurants of each row of a block, highest similarity first
+    and ties by id; the restaurant itself and zero similarities are left out.
+    Columns must be in id order.
+
+    Similarities are compared as stored (rounded to 4 decimals), so ties are
+    decided by id rather than by float noise.
+    """
+    block_size, width = similarities.shape
+    if top_n <= 0 or width <= 1:
+        return [[] for _ in range(block_size)]
+
+    similarities[np.arange(block_size), offset + np.arange(block_size)] = -1.0
+    k = min(top_n, width - 1)
+    kth = np.partition(similarities, width - k, axis=1)[:, width - k]
+
+    neighbors = []
+    for row, threshold in zip(similarities, kth.tolist()):
+        # Everything that can round to at least the k-th value (ties included)
+        columns = np.flatnonzero(row >= max(threshold - 1e-4, 5e-5))
+        rounded = np.round(row[columns].astype(np.float64), 4)
+        order = np.lexsort((columns, -rounded))
+        order = order[rounded[order] > 0][:k]
+        neighbors.append([[restaurant_id, value] for restaurant_id, value in zip(ids[columns[order]].tolist(), rounded[order].tolist())])
+    return neighbors
+
+
+def _similar_city(
+    db_path: Path,
+    city: str,
+    top_n: int,
+    block_rows: int,
+    cost_band_width: int
+) -> List[Tuple[int, str]]:
+    """
+    Nearest neighbours of every restaurant of one city (runs in a build worker process).
+    """
+    db_manager = DatabaseManager(db_path=db_path)
+    try:
+        rows = sorted(db_manager.iter_by_city(city, columns=SIMILARITY_COLUMNS))
+    finally:
+        db_manager.close()
+
+    matrix = TfidfMatrix([restaurant_terms(row, cost_band_width) for row in rows])
+    ids = np.array([row[0] for row in rows], dtype=np.int64)
+    result = []
+    for start in range(0, len(rows), block_rows):
+        stop = min(start + block_rows, len(rows))
+        neighbors = _top_neighbors(matrix.similarities(start, stop), ids, start, top_n)
+        result.extend((int(ids[i]), json.dumps(entry)) for i, entry in zip(range(start, stop), neighbors))
+    return result
+
+
+def build_similar_restaurants(
+    db_manager: DatabaseManager,
+    top_n: int = SIMILAR_TOP_N,
+    block_rows: int = SIMILAR_BLOCK_ROWS,
+    workers: Optional[int] = SIMILAR_WORKERS,
+    cost_band_width: int = SIMILAR_COST_BAND_WIDTH,
+    cities: Optional[Sequence[str]] = None
+) -> int:
+    """
+    Store the top-N similar restaurants of every restaurant, one build process per city.
+
+    Neighbours are looked for within the restaurant's locality (the dataset
+    lists chains once per locality, so a city-wide search would mostly return
+    the same chain elsewhere).
+
+    Args:
+        db_manager: DatabaseManager of the freshly built database (file serving mode)
+        top_n: Neighbours kept per restaurant
+        block_rows: Rows per blocked similarity product (bounds worker memory)
+        workers: Number of build processes (defaults to the CPU count; 1 runs in-process)
+        cost_band_width: Width of a cost band in INR
+        cities: Cities to (re)build (defaults to every city)
+
+    Returns:
+        Number of restaurants whose neighbours were stored
+    """
+    cities = list(cities) if cities is not None else db_manager.get_cities()
+    logger.info(f"Computing similar restaurants for {len(cities)} cities...")
+
+    args = [(db_manager.db_path, city, top_n, block_rows, cost_band_width) for city in cities]
+    stored = 0
+    if workers == 1 or len(cities) <= 1:
+        results = (_similar_city(*city_args) for city_args in args)
+        for city, rows in zip(cities, results):
+            db_manager.write_similar_restaurants(city, rows)
+            stored += len(rows)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_similar_city, *city_args) for city_args in args]
+            for city, future in zip(cities, futures):
+                rows = future.result()
+                db_manager.write_similar_restaurants(city, rows)
+                stored += len(rows)
+
+    logger.info(f"Stored similar restaurants for {stored} restaurants")
+    return stored
+
+
+def lookup_similar(connection: sqlite3.Connection, table_name: str, restaurant_id: int, limit: int) -> Optional[List[ScoredRow]]:
+    """
+    Read the stored neighbours of one restaurant.
+
+    Args:
+        connection: Connection holding the restaurant's city
+        table_name: Restaurants table name
+        restaurant_id: Restaurant to find similar places for
+        limit: Maximum number of neighbours
+
+    Returns:
+        (row, similarity) pairs, most similar first (empty for an unknown id),
+        or None if the database was built without similar restaurants
+    """
+    try:
+        rows = connection.execute(
+            SIMILAR_QUERY.format(similar=SIMILAR_TABLE_NAME, table=table_name),
+            (restaurant_id, limit)
+        ).fetchall()
+    except sqlite3.OperationalError:
+        return None
+    return [(tuple(row[:-1]), row[-1]) for row in rows]
@@ -0,0 +1,70 @@
+import io
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from phase1.database_setup import DatabaseManager
+from phase2.input_validator import InputValidator
+from phase2.models import UserInput
+from phase3.batch import run_batch
+from phase3.recommender import RecommendationEngine
+from benchmarks.synthetic import build_database, make_queries
+
+class TestBatchRecommendations(unittest.TestCase):
+    """
+    Tests for get_recommendations_batch and the JSONL batch runner.
+    """
+    @classmethod
+    def setUpClass(cls):
+        cls.temp_dir = tempfile.TemporaryDirectory()
+        cls.db_path = build_database(Path(cls.temp_dir.name) / "test.db", 3000)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.temp_dir.cleanup()
+
+    def setUp(self):
+        self.db_manager = DatabaseManager(db_path=self.db_path)
+        self.engine = RecommendationEngine(self.db_manager, cache_size=0)
+
+    def tearDown(self):
+        self.db_manager.close()
+
+    def test_batch_matches_single_requests(self):
+        """Test that batch results equal per-input results, in input order"""
+        inputs = make_queries(200)
+        inputs += inputs[:20]  # duplicates are answered once
+        inputs.append(UserInput(city="Atlantis", price_range="budget"))
+        expected = [self.engine.get_recommendations(user_input) for user_input in inputs]
+
+        for workers in (1, 2):
+            self.assertEqual(self.engine.get_recommendations_batch(inputs, workers=workers), expected, msg=f"workers={workers}")
+
+    def test_run_batch_jsonl(self):
+        """Test that every input line gets a result line, including invalid ones"""
+        validator = InputValidator(self.db_manager)
+        city = validator.available_cities[0]
+        lines = [
+            json.dumps({"id": "u1", "city": city, "price_range": "budget"}),
+            "not json",
+            "",
+            json.dumps({"id": "u2", "city": "Atlantis", "price_range": "budget"}),
+            json.dumps({"city": city, "max_cost": 800, "cuisine": ["Cafe"]})
+        ]
+        output = io.StringIO()
+        counts = run_batch(lines, output, self.engine, validator, limit=3, workers=1, chunk_size=2)
+
+        records = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual(counts, {"answered": 2, "invalid": 2})
+        self.assertEqual([record["line"] for record in records], [1, 2, 4, 5])
+        self.assertEqual(records[0]["id"], "u1")
+        self.assertEqual(records[0]["count"], len(records[0]["recommendations"]))
+        self.assertIn("error", records[1])
+        self.assertIn("error", records[2])
+        self.assertIsNone(records[3]["id"])
+
+        expected = self.engine.get_recommendations(UserInput(city=city, max_cost=800, cuisine=["Cafe"]), limit=3)
+        self.assertEqual(records[3]["recommendations"], [rec.model_dump() for rec in expected.recommendations])
+
+if __name__ == '__main__':
+    unittest.main()
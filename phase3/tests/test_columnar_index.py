@@ -0,0 +1,97 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+from phase1.database_setup import DatabaseManager
+from phase2.models import UserInput
+from phase3.columnar_index import ColumnarIndex
+from phase3.recommender import RecommendationEngine
+from benchmarks.synthetic import build_database, make_queries
+
+class TestColumnarIndex(unittest.TestCase):
+    """
+    Tests that the columnar backend returns exactly what the SQL backend returns.
+    """
+    @classmethod
+    def setUpClass(cls):
+        cls.temp_dir = tempfile.TemporaryDirectory()
+        cls.db_path = build_database(Path(cls.temp_dir.name) / "test.db", 3000)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.temp_dir.cleanup()
+
+    def setUp(self):
+        self.db_manager = DatabaseManager(db_path=self.db_path)
+        self.db_manager.connect()
+        self.sql = RecommendationEngine(self.db_manager, backend="sql")
+        self.columnar = RecommendationEngine(self.db_manager, backend="columnar")
+
+    def tearDown(self):
+        self.db_manager.close()
+
+    def assertSameResults(self, user_input: UserInput, limit: int = 5):
+        expected = self.sql._recommend(self.db_manager, user_input, limit)
+        actual = self.columnar._recommend(self.db_manager, user_input, limit)
+        self.assertEqual(actual, expected, msg=str(user_input))
+
+    def test_matches_sql_backend(self):
+        """Test a mixed workload of categories, ratings and cuisines"""
+        for user_input in make_queries(300):
+            self.assertSameResults(user_input)
+
+    def test_matches_sql_backend_edge_cases(self):
+        """Test cost ranges, substring cuisines, unknown cuisines and cities"""
+        cases = [
+            UserInput(city="Whitefield", max_cost=600),
+            UserInput(city="Whitefield", min_cost=1000, max_cost=1000),
+            UserInput(city="Hsr", price_range="premium", cuisine=["indian"], min_rating=4.0),
+            UserInput(city="Hsr", price_range="budget", cuisine=["Thai", "Momos", "Pizza"]),
+            UserInput(city="Hsr", price_range="mid-range", cuisine=["Cafe, Pizza"]),
+            UserInput(city="Hsr", price_range="mid-range", cuisine=["Martian"]),
+            UserInput(city="Atlantis", price_range="budget")
+        ]
+        for user_input in cases:
+            self.assertSameResults(user_input, limit=10)
+
+    def test_index_reloads_when_database_changes(self):
+        """Test that a rebuilt database is reloaded on next use"""
+        db_manager = DatabaseManager(db_path=build_database(Path(self.temp_dir.name) / "reload.db", 200))
+        db_manager.connect()
+        engine = RecommendationEngine(db_manager, backend="columnar")
+        index = engine._get_columnar_index(db_manager)
+        self.assertIs(engine._get_columnar_index(db_manager), index)
+
+        db_manager.insert_data([{'name': 'Only One', 'city': 'Hsr', 'cuisines': 'Thai', 'average_cost_for_two': 400, 'aggregate_rating': 4.0, 'votes': 10, 'price_category': 'budget', 'address': '1 Road'}])
+        reloaded = engine._get_columnar_index(db_manager)
+        db_manager.close()
+        self.assertIsNot(reloaded, index)
+        self.assertEqual(len(reloaded), 1)
+
+    def test_unknown_backend(self):
+        """Test that an unknown backend is rejected"""
+        with self.assertRaises(ValueError):
+            RecommendationEngine(self.db_manager, backend="gpu")
+
+    def test_from_rows(self):
+        """Test building an index directly from rows"""
+        index = ColumnarIndex.from_rows([
+            (1, "A", "Hsr", "addr", "Thai, Chinese", 400.0, "budget", 4.0, 10),
+            (2, "B", "Hsr", "addr", "Italian", 300.0, "budget", 4.5, 5),
+        ])
+        results = index.top_k(UserInput(city="Hsr", price_range="budget", cuisine=["chinese"]), 5)
+        self.assertEqual([row[0] for row, _ in results], ["A"])
+        self.assertEqual(results[0][1], round((4.0 / 5.0) * 7.0 + (10 / 1000.0) * 3.0 + 1.0, 2))
+
+    def test_query_masks_are_bounded(self):
+        """Test that distinct cuisine lists from requests do not grow the mask cache without limit"""
+        index = self.columnar._get_columnar_index(self.db_manager)
+        with patch("phase3.columnar_index.COLUMNAR_QUERY_MASK_CACHE_SIZE", 4):
+            for i in range(10):
+                self.assertSameResults(UserInput(city="Hsr", price_range="budget", cuisine=["Thai", f"Unknown {i}"]))
+            self.assertEqual(len(index._query_masks), 4)
+            self.assertIn(("Thai", "Unknown 9"), index._query_masks)
+
+if __name__ == '__main__':
+    unittest.main()
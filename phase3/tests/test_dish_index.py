@@ -0,0 +1,159 @@
+import tempfile
+import unittest
+from pathlib import Path
+import numpy as np
+from phase1.data_cleaner import normalize_dish
+from phase1.database_setup import DatabaseManager
+from phase2.models import UserInput
+from phase3.dish_index import CityDishes, build_dish_index, decode_postings, dish_postings, encode_postings
+from phase3.precomputed import build_precomputed_recommendations, lookup_precomputed
+from phase3.recommender import RecommendationEngine
+from phase3.similarity import build_similar_restaurants
+from benchmarks.synthetic import build_database, make_restaurants
+
+class TestPostings(unittest.TestCase):
+    """
+    Tests for the delta-encoded posting lists and the dish vocabulary.
+    """
+    def test_round_trip(self):
+        """Test that encoding then decoding returns the ids, small and large gaps alike"""
+        rng = np.random.default_rng(5)
+        for ids in ([], [0], [1, 2, 3, 130, 20000], np.unique(rng.integers(0, 2 ** 40, 3000))):
+            np.testing.assert_array_equal(decode_postings(encode_postings(ids)), np.asarray(ids, dtype=np.int64))
+        # Dense ids cost one byte each
+        self.assertEqual(len(encode_postings(range(1, 1001))), 1000)
+
+    def test_lookup_matches_phrases_and_intersects(self):
+        """Test phrase matching against the vocabulary, intersection and liked restaurants"""
+        dishes = CityDishes(dish_postings([
+            (1, "Chicken Biryani", "chicken biryani, raita"),
+            (2, None, "mutton biryani, kebabs"),
+            (3, "Kebabs", "kebabs, biryani"),
+            (4, None, "chicken 65")
+        ]))
+        self.assertEqual(sorted(dishes.match("Biryani")), ["biryani", "chicken biryani", "mutton biryani"])
+        self.assertEqual(dishes.match("chicken biryani"), ["chicken biryani"])
+
+        served, liked = dishes.lookup(["biryani"])
+        self.assertEqual(served.tolist(), [1, 2, 3])
+        self.assertEqual(liked.tolist(), [1])
+        served, liked = dishes.lookup(["biryani", "kebabs"])
+        self.assertEqual(served.tolist(), [2, 3])
+        self.assertEqual(liked.tolist(), [3])
+        self.assertEqual(dishes.lookup(["biryani", "pizza"])[0].size, 0)
+
+
+class TestDishRecommendations(unittest.TestCase):
+    """
+    Tests for dish requests through RecommendationEngine.
+    """
+    @classmethod
+    def setUpClass(cls):
+        cls.temp_dir = tempfile.TemporaryDirectory()
+        cls.db_path = build_database(Path(cls.temp_dir.name) / "test.db", 3000)
+        db_manager = DatabaseManager(db_path=cls.db_path)
+        cls.lists = build_dish_index(db_manager)
+        db_manager.write_build_metadata()
+        columns = ("id", "city", "cuisines", "average_cost_for_two", "aggregate_rating", "votes", "dish_liked", "dishes")
+        cls.rows = list(db_manager.iter_all(columns=columns))
+        db_manager.close()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.temp_dir.cleanup()
+
+    def expected(self, user_input: UserInput):
+        """Brute-force ranking of a dish request over every row"""
+        def serves(value, dish):
+            return any(f" {dish} " in f" {normalize_dish(name)} " for name in (value or "").split(","))
+
+        engine = RecommendationEngine(DatabaseManager(db_path=self.db_path))
+        lower, upper = user_input.cost_bounds()
+        ranked = []
+        for restaurant_id, city, cuisines, cost, rating, votes, dish_liked, dishes in self.rows:
+            if city != user_input.city or not lower <= cost < upper or rating < user_input.min_rating:
+                continue
+            if user_input.cuisine and not any(c.lower() in cuisines.lower() for c in user_input.cuisine):
+                continue
+            if not all(serves(dishes, dish) for dish in user_input.dish):
+                continue
+            known = any(serves(dish_liked, dish) for dish in user_input.dish)
+            score = engine._calculate_match_score(rating, votes, user_input, cuisines, known)
+            ranked.append((-score, -rating, -votes, restaurant_id))
+        return [item[3] for item in sorted(ranked)]
+
+    def test_matches_brute_force(self):
+        """Test dish rankings against a scan of every restaurant, for both backends"""
+        self.assertGreater(self.lists, 0)
+        inputs = [
+            UserInput(city="Btm", max_cost=4000, dish="Biryani"),
+            UserInput(city="Btm", price_range="premium", dish="chicken biryani", min_rating=3.0),
+            UserInput(city="Hsr", max_cost=4000, dish=["Momos", "Filter Coffee"]),
+            UserInput(city="Hsr", max_cost=4000, dish="Biryani", cuisine=["Chinese"])
+        ]
+        for backend in ("sql", "columnar"):
+            engine = RecommendationEngine(DatabaseManager(db_path=self.db_path), backend=backend)
+            for user_input in inputs:
+                expected = self.expected(user_input)
+                response = engine.get_recommendations(user_input, limit=10)
+                self.assertGreater(len(expected), 0)
+                self.assertEqual([r.id for r in response.recommendations], expected[:10], msg=user_input)
+            engine.close()
+
+    def test_pages_and_batch_agree(self):
+        """Test that cursors walk the whole dish ranking and batch answers match"""
+        user_input = UserInput(city="Btm", max_cost=4000, dish="Biryani")
+        engine = RecommendationEngine(DatabaseManager(db_path=self.db_path))
+        ids, cursor = [], None
+        while True:
+            page = engine.get_recommendations(user_input, limit=7, cursor=cursor)
+            ids.extend(r.id for r in page.recommendations)
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+        self.assertEqual(ids, self.expected(user_input))
+
+        plain = UserInput(city="Btm", max_cost=4000)
+        batch = engine.get_recommendations_batch([user_input, plain, user_input], limit=5, workers=1)
+        self.assertEqual(batch[0].recommendations, engine.get_recommendations(user_input, limit=5).recommendations)
+        self.assertIs(batch[0], batch[2])
+        self.assertNotEqual([r.id for r in batch[1].recommendations], [r.id for r in batch[0].recommendations])
+        engine.close()
+
+    def test_partitioned_database(self):
+        """Test that dish postings are stored and read per partition"""
+        db_manager = DatabaseManager(db_path=Path(self.temp_dir.name) / "partitioned.db")
+        db_manager.build_partitions(make_restaurants(600), workers=1)
+        build_dish_index(db_manager)
+        db_manager.write_build_metadata()
+        db_manager.close()
+
+        engine = RecommendationEngine(DatabaseManager(db_path=db_manager.db_path))
+        response = engine.get_recommendations(UserInput(city="Hsr", max_cost=4000, dish="Biryani"), limit=5)
+        self.assertGreater(response.count, 0)
+        self.assertEqual({r.city for r in response.recommendations}, {"Hsr"})
+        engine.close()
+
+    def test_replace_partition_rebuilds_derived_tables(self):
+        """Test that replacing a partition keeps its dish postings, precomputed lists and neighbours"""
+        restaurants = make_restaurants(600)
+        db_manager = DatabaseManager(db_path=Path(self.temp_dir.name) / "replaced.db")
+        db_manager.build_partitions(restaurants, workers=1)
+        build_precomputed_recommendations(db_manager, workers=1)
+        build_similar_restaurants(db_manager, workers=1)
+        build_dish_index(db_manager)
+        db_manager.write_build_metadata()
+        hsr = [restaurant for restaurant in restaurants if restaurant["city"] == "Hsr"][:-5]
+        db_manager.replace_partition("Hsr", hsr)
+        user_input = UserInput(city="Hsr", price_range="mid-range")
+        self.assertIsNotNone(lookup_precomputed(db_manager.connection_for("Hsr"), db_manager.table_name, user_input, 5))
+        db_manager.close()
+
+        engine = RecommendationEngine(DatabaseManager(db_path=db_manager.db_path))
+        response = engine.get_recommendations(UserInput(city="Hsr", max_cost=4000, dish="Biryani"), limit=5)
+        self.assertGreater(response.count, 0)
+        self.assertGreater(engine.similar(response.recommendations[0].id, city="Hsr").count, 0)
+        engine.close()
+
+if __name__ == '__main__':
+    unittest.main()
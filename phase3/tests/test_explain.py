@@ -0,0 +1,109 @@
+import asyncio
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+from phase1.database_setup import DatabaseManager
+from phase2.models import UserInput
+from phase3.dish_index import build_dish_index
+from phase3.explain import query_plan
+from phase3.recommender import RecommendationEngine
+from benchmarks.synthetic import LOCALITIES, build_database
+
+class TestQueryPlan(unittest.TestCase):
+    """
+    Tests for planning executed statements.
+    """
+    def test_infinite_bounds_are_planned(self):
+        """Test that bare Inf values are planned and quoted ones are left alone"""
+        connection = sqlite3.connect(":memory:")
+        connection.execute("CREATE TABLE t (a REAL, b TEXT)")
+        connection.execute("CREATE INDEX idx_a ON t (a)")
+        plan = query_plan(connection, "SELECT b FROM t WHERE a <= Inf AND a >= -Inf AND b <> 'Inf'")
+        self.assertEqual(len(plan), 1)
+        self.assertIn("idx_a", plan[0])
+        self.assertTrue(query_plan(connection, "SELECT * FROM missing")[0].startswith("unavailable"))
+
+class TestExplainMode(unittest.TestCase):
+    """
+    Tests for get_recommendations(explain=True).
+    """
+    @classmethod
+    def setUpClass(cls):
+        cls.temp_dir = tempfile.TemporaryDirectory()
+        cls.db_path = build_database(Path(cls.temp_dir.name) / "test.db", 3000)
+        db_manager = DatabaseManager(db_path=cls.db_path)
+        build_dish_index(db_manager)
+        db_manager.write_build_metadata()
+        columns = ("city", "cuisines", "average_cost_for_two", "aggregate_rating")
+        cls.rows = list(db_manager.iter_all(columns=columns))
+        db_manager.close()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.temp_dir.cleanup()
+
+    def counts(self, user_input: UserInput):
+        """Rows of the locality and rows passing the filters, counted in Python"""
+        lower, upper = user_input.cost_bounds()
+        locality = [row for row in self.rows if row[0] == user_input.city]
+        matched = [
+            row for row in locality
+            if lower <= row[2] < upper and row[3] >= user_input.min_rating
+            and (not user_input.cuisine or any(c.lower() in row[1].lower() for c in user_input.cuisine))
+        ]
+        return len(locality), len(matched)
+
+    def test_sql_report(self):
+        """Test stages, the executed statement and its plan, counts and the cache outcome"""
+        engine = RecommendationEngine(DatabaseManager(db_path=self.db_path), feedback_path=None)
+        user_input = UserInput(city=LOCALITIES[0], max_cost=4000, cuisine="Thai")
+        plain = engine.get_recommendations(user_input, limit=5)
+        self.assertIsNone(plain.explain)
+        engine.clear_cache()
+
+        response = engine.get_recommendations(user_input, limit=5, explain=True)
+        report = response.explain
+        self.assertEqual(response.recommendations, plain.recommendations)
+        self.assertEqual((report.backend, report.path, report.result_cache), ("sql", "sql", "miss"))
+        for stage in ("connect", "cache_lookup", "sql_execute", "sql_fetch", "score", "sort", "build_models"):
+            self.assertIn(stage, report.timings_us)
+        stages = sum(value for stage, value in report.timings_us.items() if stage != "total")
+        self.assertLessEqual(stages, report.timings_us["total"] + 1.0)
+
+        statement = next(s for s in report.statements if "ORDER BY" in s.sql)
+        self.assertIn(f"city = '{LOCALITIES[0]}'", statement.sql)
+        self.assertIn("idx_city_match", statement.plan[0])
+        locality, matched = self.counts(user_input)
+        self.assertEqual((report.candidates["locality"], report.candidates["matched"]), (locality, matched))
+        self.assertEqual(report.candidates["returned"], 5)
+        self.assertLessEqual(report.candidates["read"], matched)
+
+        cached = engine.get_recommendations(user_input, limit=5, explain=True)
+        self.assertEqual((cached.explain.path, cached.explain.result_cache), ("cache", "hit"))
+        self.assertEqual(cached.explain.statements, [])
+        self.assertIsNone(engine.get_recommendations(user_input, limit=5).explain)
+
+    def test_other_paths(self):
+        """Test the columnar, dish and relaxed paths and the async variant"""
+        columnar = RecommendationEngine(DatabaseManager(db_path=self.db_path), backend="columnar", feedback_path=None)
+        report = columnar.get_recommendations(UserInput(city=LOCALITIES[1], price_range="mid-range"), explain=True).explain
+        self.assertEqual(report.path, "columnar")
+        self.assertIn("columnar_top_k", report.timings_us)
+        columnar.close()
+
+        engine = RecommendationEngine(DatabaseManager(db_path=self.db_path), feedback_path=None)
+        report = engine.get_recommendations(UserInput(city=LOCALITIES[0], max_cost=4000, dish="Biryani"), explain=True).explain
+        self.assertEqual(report.path, "dish")
+        self.assertIn("dish_fetch", report.timings_us)
+
+        empty = UserInput(city=LOCALITIES[0], price_range="budget", min_rating=4.9, cuisine="Mexican")
+        response = asyncio.run(engine.aget_recommendations(empty, limit=5, explain=True))
+        self.assertTrue(response.relaxed_constraints)
+        self.assertEqual(response.explain.path, "relaxed")
+        self.assertEqual(response.explain.candidates["matched"], 0)
+        self.assertEqual(len([s for s in response.explain.statements if "ORDER BY" in s.sql]), 2)
+        engine.close()
+
+if __name__ == '__main__':
+    unittest.main()
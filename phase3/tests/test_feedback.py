@@ -0,0 +1,168 @@
+import random
+import tempfile
+import unittest
+from pathlib import Path
+from phase1.database_setup import DatabaseManager
+from phase2.models import UserInput
+from phase3.dish_index import build_dish_index
+from phase3.feedback import FeedbackStore, adjustment, feedback_key, feedback_signal, smoothed_score
+from phase3.precomputed import build_precomputed_recommendations
+from phase3.recommender import RecommendationEngine
+from benchmarks.synthetic import LOCALITIES, build_database
+
+class TestFeedbackStore(unittest.TestCase):
+    """
+    Tests for the incrementally maintained feedback aggregates.
+    """
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.now = 1_000_000_000.0
+        self.store = FeedbackStore(Path(self.temp_dir.name) / "aggregates.db", refresh_seconds=0, clock=lambda: self.now)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_smoothing_and_signals(self):
+        """Test the beta prior and the mapping of thumbs and stars"""
+        self.assertEqual(smoothed_score(0, 0), 0.5)
+        self.assertAlmostEqual(smoothed_score(1, 0), 3.5 / 6)
+        self.assertGreater(smoothed_score(1000, 0), 0.99)
+        self.assertEqual(adjustment(0, 0), 0.0)
+        self.assertAlmostEqual(adjustment(1e9, 0), 1.0)
+        self.assertAlmostEqual(adjustment(0, 1e9), -1.0)
+        self.assertEqual([feedback_signal(r) for r in (0, 1, 3, 5)], [0.0, 1.0, 0.5, 1.0])
+        self.assertEqual(feedback_key("  Cafe   COFFEE Day "), "cafe coffee day")
+
+    def test_incremental_refresh(self):
+        """Test that writes show up on the next refresh and only changed rows are re-read"""
+        self.assertEqual(len(self.store.adjustments()), 0)
+        self.store.record("Good Place", 1)
+        self.store.record("Bad Place", 0)
+        first = self.store.adjustments()
+        self.assertAlmostEqual(first.get("good place"), adjustment(1, 0))
+        self.assertAlmostEqual(first.get("Bad Place"), adjustment(0, 1))
+        self.assertEqual((first.max_boost, first.max_penalty), (adjustment(1, 0), -adjustment(0, 1)))
+        self.assertIs(self.store.adjustments(), first)  # Nothing changed
+
+        self.store.record("Good Place", 5)
+        second = self.store.adjustments()
+        self.assertGreater(second.generation, first.generation)
+        self.assertAlmostEqual(second.get("Good Place"), adjustment(2, 0))
+        self.assertEqual(second.get("Bad Place"), first.get("Bad Place"))
+        self.assertAlmostEqual(first.get("Good Place"), adjustment(1, 0))  # Snapshots are immutable
+
+    def test_decay(self):
+        """Test that old feedback weighs less than recent feedback"""
+        half_life = 30 * 86400
+        self.store.record("Place", 0, timestamp=self.now - 2 * half_life)
+        self.store.record("Place", 1, timestamp=self.now - half_life)
+        self.store.record("Place", 1)
+        # Two thumbs down decayed to 1/4 and 1/2 of the weight of an up: 0.25 down, 1.5 up
+        self.assertAlmostEqual(self.store.adjustments().get("Place"), adjustment(1.5, 0.25))
+
+class TestFeedbackRanking(unittest.TestCase):
+    """
+    Tests that every backend ranks by the feedback-adjusted match score.
+    """
+    @classmethod
+    def setUpClass(cls):
+        cls.temp_dir = tempfile.TemporaryDirectory()
+        cls.db_path = build_database(Path(cls.temp_dir.name) / "test.db", 3000)
+        db_manager = DatabaseManager(db_path=cls.db_path)
+        build_precomputed_recommendations(db_manager, workers=1)
+        build_dish_index(db_manager)
+        db_manager.write_build_metadata()
+        columns = ("name", "city", "cuisines", "average_cost_for_two", "aggregate_rating", "votes", "id")
+        cls.rows = list(db_manager.iter_all(columns=columns))
+        db_manager.close()
+
+        # Feedback on half of the restaurants near the top of each locality
+        cls.feedback_path = Path(cls.temp_dir.name) / "aggregates.db"
+        store = FeedbackStore(cls.feedback_path)
+        rng = random.Random(7)
+        ranked = sorted(cls.rows, key=lambda row: -(row[4] / 5.0 * 7.0 + min(row[5], 1000) / 1000.0 * 3.0))
+        for city in LOCALITIES[:5]:
+            for row in [row for row in ranked if row[1] == city][:40]:
+                if rng.random() < 0.5:
+                    for _ in range(rng.randint(1, 12)):
+                        store.record(row[0], rng.choice([0, 0, 1]))
+        cls.adjustments = FeedbackStore(cls.feedback_path).adjustments()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.temp_dir.cleanup()
+
+    def expected(self, user_input: UserInput):
+        """Brute-force ranking with feedback over every row"""
+        engine = RecommendationEngine(DatabaseManager(db_path=self.db_path), feedback_path=None)
+        lower, upper = user_input.cost_bounds()
+        ranked = []
+        for name, city, cuisines, cost, rating, votes, restaurant_id in self.rows:
+            if city != user_input.city or not lower <= cost < upper or rating < user_input.min_rating:
+                continue
+            if user_input.cuisine and not any(c.lower() in cuisines.lower() for c in user_input.cuisine):
+                continue
+            score = engine._calculate_match_score(rating, votes, user_input, cuisines, adjustment=self.adjustments.get(name))
+            ranked.append((-score, -rating, -votes, restaurant_id))
+        return [item[3] for item in sorted(ranked)]
+
+    def test_feedback_changes_rankings(self):
+        """Test that the adjustments are large enough to reorder results"""
+        self.assertGreater(self.adjustments.max_boost, 0.3)
+        self.assertGreater(self.adjustments.max_penalty, 0.3)
+        user_input = UserInput(city=LOCALITIES[0], max_cost=4000)
+        plain = RecommendationEngine(DatabaseManager(db_path=self.db_path), feedback_path=None)
+        with_feedback = RecommendationEngine(DatabaseManager(db_path=self.db_path), feedback_path=self.feedback_path)
+        self.assertNotEqual(
+            [r.id for r in plain.get_recommendations(user_input, limit=10).recommendations],
+            [r.id for r in with_feedback.get_recommendations(user_input, limit=10).recommendations]
+        )
+
+    def test_backends_match_brute_force(self):
+        """Test SQL, precomputed and columnar rankings and their cursors"""
+        inputs = [
+            UserInput(city=LOCALITIES[0], max_cost=4000),
+            UserInput(city=LOCALITIES[1], price_range="mid-range"),
+            UserInput(city=LOCALITIES[2], price_range="premium", cuisine="north indian"),
+            UserInput(city=LOCALITIES[3], price_range="premium", min_rating=3.0),
+            UserInput(city=LOCALITIES[4], max_cost=4000, cuisine=["Chinese", "Biryani"], min_rating=3.5)
+        ]
+        for backend in ("sql", "columnar"):
+            for use_precomputed in (True, False):
+                engine = RecommendationEngine(DatabaseManager(db_path=self.db_path), backend=backend, use_precomputed=use_precomputed, feedback_path=self.feedback_path)
+                for user_input in inputs:
+                    expected = self.expected(user_input)
+                    self.assertGreater(len(expected), 5)
+                    response = engine.get_recommendations(user_input, limit=10)
+                    self.assertEqual([r.id for r in response.recommendations], expected[:10], msg=(backend, user_input))
+
+                    ids, cursor = [], None
+                    for _ in range(4):
+                        page = engine.get_recommendations(user_input, limit=7, cursor=cursor)
+                        ids.extend(r.id for r in page.recommendations)
+                        cursor = page.next_cursor
+                        if cursor is None:
+                            break
+                    self.assertEqual(ids, expected[:len(ids)], msg=(backend, user_input))
+                engine.close()
+
+    def test_dish_and_batch_requests(self):
+        """Test that dish and batch answers fold in the same adjustments"""
+        engine = RecommendationEngine(DatabaseManager(db_path=self.db_path), feedback_path=self.feedback_path)
+        plain = UserInput(city=LOCALITIES[0], max_cost=4000)
+        dish = UserInput(city=LOCALITIES[0], max_cost=4000, dish="Biryani")
+        batch = engine.get_recommendations_batch([plain, dish], limit=5, workers=1)
+        self.assertEqual([r.id for r in batch[0].recommendations], self.expected(plain)[:5])
+        self.assertEqual(batch[1].recommendations, engine.get_recommendations(dish, limit=5).recommendations)
+
+        names = {row[6]: row[0] for row in self.rows if row[1] == dish.city}
+        unadjusted = RecommendationEngine(DatabaseManager(db_path=self.db_path), feedback_path=None).get_recommendations(dish, limit=50)
+        adjusted = {r.id: r.match_score for r in engine.get_recommendations(dish, limit=50).recommendations}
+        moved = [r for r in unadjusted.recommendations if r.id in adjusted and self.adjustments.get(names[r.id])]
+        self.assertTrue(moved)
+        for r in moved:
+            self.assertAlmostEqual(adjusted[r.id], min(max(r.match_score + self.adjustments.get(names[r.id]), 0.0), 10.0), delta=0.011)
+        engine.close()
+
+if __name__ == '__main__':
+    unittest.main()
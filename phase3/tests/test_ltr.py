@@ -0,0 +1,170 @@
+import json
+import random
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+from phase1.database_setup import DatabaseManager
+from phase2.models import UserInput
+from phase3.dish_index import build_dish_index
+from phase3.ltr_trainer import train
+from phase3.precomputed import build_precomputed_recommendations
+from phase3.query_log import read_query_log
+from phase3.ranking_model import HAND_TUNED, RankingWeights
+from phase3.recommender import RecommendationEngine
+from benchmarks.synthetic import LOCALITIES, build_database
+
+class TestRankingWeights(unittest.TestCase):
+    """
+    Tests for the weight file and the bound used by streaming rankers.
+    """
+    def test_upper_bound(self):
+        """Test that upper_bound bounds every restaurant with a lower hand-tuned score"""
+        rng = random.Random(1)
+        for weights in (RankingWeights(2.0, 8.0), RankingWeights(9.5, 0.5), RankingWeights(0.0, 10.0), HAND_TUNED):
+            for _ in range(2000):
+                rating, votes = rng.uniform(0, 5), rng.choice([0, rng.randint(0, 1500)])
+                limit = HAND_TUNED.base(rating, votes)
+                self.assertLessEqual(weights.base(rating, votes), weights.upper_bound(limit) + 1e-9)
+        self.assertEqual(HAND_TUNED.upper_bound(6.25), 6.25)
+        with self.assertRaises(ValueError):
+            RankingWeights(-1.0, 3.0)
+
+    def test_save_and_load(self):
+        """Test that a saved weight file loads back with its metadata"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = RankingWeights(4.5, 5.5, version="ltr-test", metadata={"pairs": 3}).save(Path(temp_dir) / "w.json")
+            loaded = RankingWeights.load(path)
+            self.assertEqual((loaded.key, loaded.version, loaded.metadata), ((4.5, 5.5), "ltr-test", {"pairs": 3}))
+            self.assertFalse(loaded.is_hand_tuned)
+
+            path.write_text(json.dumps({"format": 1, "version": "x", "features": ["quality"], "weights": [1.0]}))
+            with self.assertRaises(ValueError):
+                RankingWeights.load(path)
+
+class TestTrainer(unittest.TestCase):
+    """
+    Tests for the offline pairwise trainer.
+    """
+    def test_learns_preference_from_logs(self):
+        """Test that users who only like popular places shift weight to popularity"""
+        rng = random.Random(5)
+        start = datetime(2026, 1, 1)
+        queries, feedback = [], []
+        for number in range(300):
+            served = start + timedelta(minutes=number)
+            results = [
+                {"id": i, "name": f"R{number}-{i}", "rating": round(rng.uniform(2.5, 5.0), 1), "votes": rng.randint(0, 1000), "match_score": 0.0}
+                for i in range(8)
+            ]
+            queries.append({"timestamp": served.isoformat(), "query": {}, "page": False, "results": results})
+            for result in rng.sample(results, 4):
+                feedback.append({
+                    "timestamp": (served + timedelta(minutes=2)).isoformat(),
+                    "restaurant": result["name"],
+                    "rating": 1 if result["votes"] > 500 else 0
+                })
+        # Feedback outside the label window is ignored
+        feedback.append({"timestamp": (start - timedelta(days=3)).isoformat(), "restaurant": "R0-0", "rating": 1})
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            query_log, feedback_file = Path(temp_dir) / "queries.jsonl", Path(temp_dir) / "feedback.json"
+            query_log.write_text("".join(json.dumps(q) + "\n" for q in queries) + "{torn")
+            feedback_file.write_text(json.dumps(feedback))
+            weights = train(query_log, feedback_file, epochs=300, workers=1)
+
+        self.assertAlmostEqual(weights.quality + weights.popularity, 10.0)
+        self.assertGreater(weights.popularity, 7.0)
+        self.assertTrue(weights.version.startswith("ltr-"))
+        self.assertGreater(weights.metadata["queries"], 250)
+        self.assertGreater(weights.metadata["validation_accuracy"], weights.metadata["hand_tuned_accuracy"])
+
+class TestLearnedRanking(unittest.TestCase):
+    """
+    Tests that every backend ranks by learned weights exactly.
+    """
+    @classmethod
+    def setUpClass(cls):
+        cls.temp_dir = tempfile.TemporaryDirectory()
+        cls.db_path = build_database(Path(cls.temp_dir.name) / "test.db", 3000)
+        db_manager = DatabaseManager(db_path=cls.db_path)
+        build_precomputed_recommendations(db_manager, workers=1)
+        build_dish_index(db_manager)
+        db_manager.write_build_metadata()
+        columns = ("city", "cuisines", "average_cost_for_two", "aggregate_rating", "votes", "id")
+        cls.rows = list(db_manager.iter_all(columns=columns))
+        db_manager.close()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.temp_dir.cleanup()
+
+    def expected(self, user_input: UserInput, weights: RankingWeights):
+        """Brute-force ranking with the given weights over every row"""
+        engine = RecommendationEngine(DatabaseManager(db_path=self.db_path), ranking_weights=weights)
+        lower, upper = user_input.cost_bounds()
+        ranked = []
+        for city, cuisines, cost, rating, votes, restaurant_id in self.rows:
+            if city != user_input.city or not lower <= cost < upper or rating < user_input.min_rating:
+                continue
+            if user_input.cuisine and not any(c.lower() in cuisines.lower() for c in user_input.cuisine):
+                continue
+            score = engine._calculate_match_score(rating, votes, user_input, cuisines)
+            ranked.append((-score, -rating, -votes, restaurant_id))
+        return [item[3] for item in sorted(ranked)]
+
+    def test_backends_match_brute_force(self):
+        """Test SQL, precomputed and columnar rankings and their cursors"""
+        inputs = [
+            UserInput(city=LOCALITIES[0], max_cost=4000),
+            UserInput(city=LOCALITIES[1], price_range="mid-range"),
+            UserInput(city=LOCALITIES[2], price_range="premium", cuisine="north indian"),
+            UserInput(city=LOCALITIES[3], max_cost=4000, cuisine=["Chinese", "Biryani"], min_rating=3.5)
+        ]
+        for weights in (RankingWeights(2.0, 8.0), RankingWeights(9.0, 1.0)):
+            self.assertNotEqual(self.expected(inputs[0], weights)[:10], self.expected(inputs[0], HAND_TUNED)[:10])
+            for backend in ("sql", "columnar"):
+                for use_precomputed in (True, False):
+                    engine = RecommendationEngine(DatabaseManager(db_path=self.db_path), backend=backend, use_precomputed=use_precomputed, ranking_weights=weights)
+                    for user_input in inputs:
+                        expected = self.expected(user_input, weights)
+                        response = engine.get_recommendations(user_input, limit=10)
+                        self.assertEqual([r.id for r in response.recommendations], expected[:10], msg=(weights.key, backend, user_input))
+
+                        ids, cursor = [], None
+                        for _ in range(4):
+                            page = engine.get_recommendations(user_input, limit=7, cursor=cursor)
+                            ids.extend(r.id for r in page.recommendations)
+                            cursor = page.next_cursor
+                            if cursor is None:
+                                break
+                        self.assertEqual(ids, expected[:len(ids)], msg=(weights.key, backend, user_input))
+                    engine.close()
+
+    def test_dish_batch_and_query_log(self):
+        """Test dish and batch answers under learned weights and that served pages are logged"""
+        weights = RankingWeights(2.0, 8.0)
+        query_log = Path(self.temp_dir.name) / "queries.jsonl"
+        engine = RecommendationEngine(DatabaseManager(db_path=self.db_path), ranking_weights=weights, query_log_path=query_log)
+        plain = UserInput(city=LOCALITIES[0], max_cost=4000)
+        dish = UserInput(city=LOCALITIES[0], max_cost=4000, dish="Biryani")
+        batch = engine.get_recommendations_batch([plain, dish], limit=5, workers=1)
+        self.assertEqual([r.id for r in batch[0].recommendations], self.expected(plain, weights)[:5])
+
+        response = engine.get_recommendations(dish, limit=20)
+        self.assertEqual(batch[1].recommendations, response.recommendations[:5])
+        scores = [r.match_score for r in response.recommendations]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        for r in response.recommendations:
+            self.assertGreaterEqual(r.match_score, round(weights.base(r.rating, r.votes), 2))
+
+        engine.get_recommendations(dish, limit=3, cursor=response.next_cursor)
+        engine.close()
+        entries = list(read_query_log(query_log))
+        self.assertEqual(len(entries), 2)
+        self.assertEqual(entries[0]["query"]["dish"], dish.dish)
+        self.assertEqual([r["id"] for r in entries[0]["results"]], [r.id for r in response.recommendations])
+        self.assertEqual((entries[0]["page"], entries[1]["page"]), (False, True))
+
+if __name__ == '__main__':
+    unittest.main()
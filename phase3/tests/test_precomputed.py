@@ -0,0 +1,107 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+from phase1.config import PRECOMPUTED_TABLE_NAME
+from phase1.database_setup import DatabaseManager
+from phase2.config import PRICE_CATEGORIES
+from phase2.models import UserInput
+from phase3.precomputed import build_precomputed_recommendations, lookup_precomputed, precomputed_key
+from phase3.recommender import RecommendationEngine
+from phase3.result_cache import cache_key
+from benchmarks.synthetic import CUISINES, LOCALITIES, build_database, make_restaurants
+
+class TestPrecomputedRecommendations(unittest.TestCase):
+    """
+    Tests that precomputed lookups return exactly what live scoring returns.
+    """
+    @classmethod
+    def setUpClass(cls):
+        cls.temp_dir = tempfile.TemporaryDirectory()
+        cls.db_path = build_database(Path(cls.temp_dir.name) / "test.db", 3000)
+        db_manager = DatabaseManager(db_path=cls.db_path)
+        cls.stored = build_precomputed_recommendations(db_manager, workers=2)
+        db_manager.close()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.temp_dir.cleanup()
+
+    def setUp(self):
+        self.db_manager = DatabaseManager(db_path=self.db_path)
+        self.db_manager.connect()
+        self.engine = RecommendationEngine(self.db_manager, cache_size=0)
+
+    def tearDown(self):
+        self.db_manager.close()
+
+    def lookup(self, user_input: UserInput, limit: int = 5):
+        return lookup_precomputed(self.db_manager.connection_for(user_input.city), self.db_manager.table_name, user_input, limit)
+
+    def test_every_combination_is_stored(self):
+        """Test one list per locality x price x (no cuisine + each cuisine) x threshold"""
+        self.assertEqual(self.stored, len(LOCALITIES) * 3 * (len(CUISINES) + 1) * 5)
+
+    def test_lookup_matches_live_scoring(self):
+        """Test covered requests against the live SQL path"""
+        for city in LOCALITIES[:6]:
+            for price_range in ("budget", "mid-range", "premium"):
+                for cuisine in [None, "cafe", "Biryani", "ICE CREAM"]:
+                    for min_rating in (0.0, 3.95, 4.5):
+                        user_input = UserInput(city=city, price_range=price_range, cuisine=cuisine, min_rating=min_rating)
+                        precomputed = self.lookup(user_input, limit=10)
+                        self.assertIsNotNone(precomputed, msg=str(user_input))
+                        self.assertEqual(precomputed, self.engine._score_candidates(self.db_manager, user_input, 10), msg=str(user_input))
+
+    def test_uncovered_requests_fall_back(self):
+        """Test that multi-cuisine, cost range and off-threshold requests are scored live"""
+        uncovered = [
+            UserInput(city="Hsr", price_range="budget", cuisine=["Cafe", "Thai"]),
+            UserInput(city="Hsr", max_cost=600),
+            UserInput(city="Hsr", price_range="budget", min_rating=3.7),
+            UserInput(city="Hsr", price_range="budget", cuisine=["caf"])
+        ]
+        for user_input in uncovered:
+            self.assertIsNone(self.lookup(user_input), msg=str(user_input))
+        self.assertIsNone(precomputed_key(UserInput(city="Hsr", price_range="budget"), 500))
+
+        # Engine results are the same either way
+        for user_input in uncovered:
+            self.assertEqual(
+                self.engine._recommend(self.db_manager, user_input, 5),
+                RecommendationEngine(self.db_manager, use_precomputed=False)._recommend(self.db_manager, user_input, 5)
+            )
+
+    def test_changed_price_boundaries_fall_back(self):
+        """Test that lists built with other category boundaries are not served"""
+        user_input = UserInput(city=LOCALITIES[0], price_range="budget")
+        key = cache_key(user_input, 10)
+        self.assertIsNotNone(self.lookup(user_input, limit=10))
+        with patch.dict(PRICE_CATEGORIES, {"budget": (0, 300)}):
+            self.assertIsNone(self.lookup(user_input, limit=10))
+            self.assertNotEqual(cache_key(user_input, 10), key)
+            response = self.engine.get_recommendations(user_input, limit=10)
+            live = self.engine._score_candidates(self.db_manager, user_input, 10)
+            self.assertEqual([r.id for r in response.recommendations], [row[-1] for row, _ in live])
+            self.assertTrue(response.recommendations)
+            self.assertTrue(all(r.average_cost < 300 for r in response.recommendations))
+        self.assertIsNotNone(self.lookup(user_input, limit=10))
+
+    def test_empty_results_and_invalidation(self):
+        """Test stored empty lists, unknown cuisines and invalidation by new data"""
+        db_path = Path(self.temp_dir.name) / "small.db"
+        db_manager = DatabaseManager(db_path=db_path)
+        db_manager.connect()
+        db_manager.insert_data(make_restaurants(50))
+        build_precomputed_recommendations(db_manager, workers=1)
+        self.assertIsNone(lookup_precomputed(db_manager.connection_for("Hsr"), db_manager.table_name, UserInput(city="Hsr", price_range="premium", cuisine="Martian"), 5))
+        self.assertEqual(lookup_precomputed(db_manager.connection_for("Hsr"), db_manager.table_name, UserInput(city="Hsr", price_range="premium", cuisine="Cafe", min_rating=4.5), 5), [])
+
+        # New data invalidates the precomputed table
+        db_manager.insert_data(make_restaurants(10, seed=1), if_exists='append')
+        tables = {row[0] for row in db_manager.connect().execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        self.assertNotIn(PRECOMPUTED_TABLE_NAME, tables)
+        db_manager.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,14 @@
+import asyncio
+import os
+import tempfile
 import unittest
+from pathlib import Path
 from unittest.mock import MagicMock, patch
+from pydantic import ValidationError
+from phase1.database_setup import DatabaseManager
 from phase2.models import UserInput
-from phase3.recommender import RecommendationEngine
+from phase3.pagination import InvalidCursorError
+from phase3.recommender import RecommendationEngine, _build_response
 from phase3.models import RecommendationResponse
 
 class TestRecommendationEngine(unittest.TestCase):
@@ -11,7 +18,10 @@ class TestRecommendationEngine(unittest.TestCase):
     def setUp(self):
         self.mock_db = MagicMock()
         self.mock_db.table_name = "restaurants"
-        self.recommender = RecommendationEngine(db_manager=self.mock_db)
+        self.mock_db.connection_for.return_value = self.mock_db.connection
+        # A mock connection cannot hold the precomputed table; always score live.
+        # Empty mock results would also issue the relaxation query (see test_relaxation.py)
+        self.recommender = RecommendationEngine(db_manager=self.mock_db, use_precomputed=False, relax_empty=False)
 
     def test_calculate_match_score_exact_cuisine(self):
         """Test match score calculation with a cuisine match"""
@@ -35,12 +45,12 @@ class TestRecommendationEngine(unittest.TestCase):
         """Test fetching recommendations successfully"""
         user_input = UserInput(city="Indiranagar", price_range="mid-range", cuisine="Cafe", min_rating=3.0)
         
-        # Mocking cursor fetchall
-        # Columns: name, city, address, cuisines, average_cost, price_category, rating, votes
-        self.mock_db.connection.cursor.return_value.fetchall.return_value = [
-            ("Cafe Blue", "Indiranagar", "123 Street", "Cafe, Bakery", 800, "mid-range", 4.5, 500),
-            ("Coffee House", "Indiranagar", "456 Avenue", "Cafe, Desserts", 600, "mid-range", 4.0, 200)
-        ]
+        # Mocking the streamed cursor rows, best first
+        # Columns: name, city, address, cuisines, average_cost, price_category, rating, votes, id
+        self.mock_db.connection.cursor.return_value.__iter__.return_value = iter([
+            ("Cafe Blue", "Indiranagar", "123 Street", "Cafe, Bakery", 800, "mid-range", 4.5, 500, 1),
+            ("Coffee House", "Indiranagar", "456 Avenue", "Cafe, Desserts", 600, "mid-range", 4.0, 200, 2)
+        ])
         
         response = self.recommender.get_recommendations(user_input, limit=5)
         
@@ -52,11 +62,188 @@ class TestRecommendationEngine(unittest.TestCase):
     def test_get_recommendations_no_results(self):
         """Test fetching recommendations when no matches found"""
         user_input = UserInput(city="Nonexistent", price_range="premium", cuisine=None, min_rating=0.0)
-        self.mock_db.connection.cursor.return_value.fetchall.return_value = []
+        self.mock_db.connection.cursor.return_value.__iter__.return_value = iter([])
         
         response = self.recommender.get_recommendations(user_input)
         self.assertEqual(response.count, 0)
         self.assertEqual(len(response.recommendations), 0)
 
+    def test_statement_is_request_independent(self):
+        """Test that every request executes the same SQL text"""
+        cursor = self.mock_db.connection.cursor.return_value
+        
+        for cuisine in [None, "Cafe", ["Cafe", "Chinese", "Thai"]]:
+            user_input = UserInput(city="Indiranagar", price_range="budget", cuisine=cuisine)
+            self.recommender.get_recommendations(user_input)
+        
+        statements = {call.args[0] for call in cursor.execute.call_args_list}
+        self.assertEqual(len(statements), 1)
+
+
+class TestRecommendationEngineDatabase(unittest.TestCase):
+    """
+    Tests for RecommendationEngine against a real SQLite database.
+    """
+    def setUp(self):
+        temp_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
+        temp_db.close()
+        self.db_path = Path(temp_db.name)
+        
+        db_manager = DatabaseManager(db_path=self.db_path)
+        db_manager.connect()
+        db_manager.insert_data([
+            {'name': 'Cafe Blue', 'city': 'Indiranagar', 'cuisines': 'Cafe, Bakery', 'average_cost_for_two': 800, 'aggregate_rating': 4.5, 'votes': 500, 'price_category': 'mid-range', 'address': '1 Street'},
+            {'name': 'Dragon Wok', 'city': 'Indiranagar', 'cuisines': 'Chinese, Thai', 'average_cost_for_two': 900, 'aggregate_rating': 4.1, 'votes': 300, 'price_category': 'mid-range', 'address': '2 Street'},
+            {'name': 'Dosa Point', 'city': 'Indiranagar', 'cuisines': 'South Indian', 'average_cost_for_two': 300, 'aggregate_rating': 4.3, 'votes': 900, 'price_category': 'budget', 'address': '3 Street'},
+            {'name': 'Pasta Street', 'city': 'Koramangala 5Th Block', 'cuisines': 'Italian', 'average_cost_for_two': 1000, 'aggregate_rating': 4.6, 'votes': 800, 'price_category': 'mid-range', 'address': '4 Street'}
+        ])
+        db_manager.close()
+        self.engine = RecommendationEngine(DatabaseManager(db_path=self.db_path))
+
+    def tearDown(self):
+        self.engine.close()
+        if self.db_path.exists():
+            os.unlink(self.db_path)
+
+    def test_cuisine_filter_matches_any_selected_cuisine(self):
+        """Test that the JSON cuisine list filters like the per-cuisine LIKE clauses"""
+        user_input = UserInput(city="Indiranagar", price_range="mid-range", cuisine=["bakery", "Thai"])
+        response = self.engine.get_recommendations(user_input)
+        self.assertEqual([r.name for r in response.recommendations], ["Cafe Blue", "Dragon Wok"])
+
+        user_input = UserInput(city="Indiranagar", price_range="mid-range", cuisine=["Thai"])
+        response = self.engine.get_recommendations(user_input)
+        self.assertEqual([r.name for r in response.recommendations], ["Dragon Wok"])
+
+    def test_no_cuisine_returns_whole_price_band(self):
+        """Test that a request without cuisines is not filtered by cuisine"""
+        user_input = UserInput(city="Indiranagar", price_range="mid-range", min_rating=4.2)
+        response = self.engine.get_recommendations(user_input)
+        self.assertEqual([r.name for r in response.recommendations], ["Cafe Blue"])
+
+    def test_cost_range_filter(self):
+        """Test that numeric budgets filter on the cost itself, inclusive of max_cost"""
+        user_input = UserInput(city="Indiranagar", max_cost=800)
+        response = self.engine.get_recommendations(user_input)
+        self.assertEqual([r.name for r in response.recommendations], ["Dosa Point", "Cafe Blue"])
+
+        user_input = UserInput(city="Indiranagar", min_cost=850, max_cost=2000)
+        response = self.engine.get_recommendations(user_input)
+        self.assertEqual([r.name for r in response.recommendations], ["Dragon Wok"])
+
+    def test_trusted_rows_build_identical_models(self):
+        """Test that unvalidated models equal validated ones, field types included"""
+        user_input = UserInput(city="Indiranagar", max_cost=2000)
+        expected = self.engine.get_recommendations(user_input)
+        trusted = RecommendationEngine(DatabaseManager(db_path=self.db_path), trusted_rows=True).get_recommendations(user_input)
+
+        self.assertEqual(trusted, expected)
+        self.assertEqual(trusted.model_dump_json(), expected.model_dump_json())
+        self.assertIsInstance(trusted.recommendations[0].average_cost, int)
+
+    def test_trusted_rows_follow_validation(self):
+        """Test that NULL costs are skipped and fractional costs rejected on both paths"""
+        row = ("Cafe Blue", "Indiranagar", "1 Road", "Cafe", 400.0, "budget", 4.2, 100, 7)
+        null_cost = row[:4] + (None,) + row[5:]
+        for trusted in (False, True):
+            response = _build_response("Indiranagar", [(null_cost, 5.0), (row, 4.0)], trusted)
+            self.assertEqual([(r.name, r.average_cost) for r in response.recommendations], [("Cafe Blue", 400)])
+            with self.assertRaises(ValidationError):
+                _build_response("Indiranagar", [(row[:4] + (400.5,) + row[5:], 4.0)], trusted)
+
+    def test_top_k_is_exact_beyond_rating_order(self):
+        """Test that a popular restaurant outranks better-rated ones it trails in rating order"""
+        db_manager = DatabaseManager(db_path=self.db_path)
+        db_manager.connect()
+        db_manager.insert_data([
+            {'name': f'Quiet {i}', 'city': 'Hsr', 'cuisines': 'Cafe', 'average_cost_for_two': 400, 'aggregate_rating': 4.5, 'votes': 0, 'price_category': 'budget', 'address': f'{i} Road'}
+            for i in range(60)
+        ] + [
+            {'name': 'Crowd Favourite', 'city': 'Hsr', 'cuisines': 'Cafe', 'average_cost_for_two': 400, 'aggregate_rating': 4.0, 'votes': 1000, 'price_category': 'budget', 'address': '99 Road'}
+        ], if_exists='append')
+        db_manager.close()
+
+        for backend in ("sql", "columnar"):
+            engine = RecommendationEngine(DatabaseManager(db_path=self.db_path), backend=backend)
+            response = engine.get_recommendations(UserInput(city="Hsr", price_range="budget"), limit=3)
+            # 4.0 rating + 1000 votes = 8.6 beats 4.5 rating + 0 votes = 6.3; ties keep id order
+            self.assertEqual([r.name for r in response.recommendations], ["Crowd Favourite", "Quiet 0", "Quiet 1"], msg=backend)
+
+    def test_pages_concatenate_to_one_large_page(self):
+        """Test that following next_cursor walks the full ranking once, ties included"""
+        db_manager = DatabaseManager(db_path=self.db_path)
+        db_manager.connect()
+        db_manager.insert_data([
+            {'name': f'Tied {i}', 'city': 'Hsr', 'cuisines': 'Cafe', 'average_cost_for_two': 400, 'aggregate_rating': 4.0 + (i % 3) / 10, 'votes': 100 * (i % 2), 'price_category': 'budget', 'address': f'{i} Road'}
+            for i in range(23)
+        ], if_exists='append')
+        db_manager.write_build_metadata()
+        db_manager.close()
+
+        user_input = UserInput(city="Hsr", price_range="budget")
+        for backend in ("sql", "columnar"):
+            engine = RecommendationEngine(DatabaseManager(db_path=self.db_path), backend=backend)
+            expected = [r.name for r in engine.get_recommendations(user_input, limit=50).recommendations]
+
+            names, cursor = [], None
+            while True:
+                page = engine.get_recommendations(user_input, limit=5, cursor=cursor)
+                names.extend(r.name for r in page.recommendations)
+                cursor = page.next_cursor
+                if cursor is None:
+                    break
+            self.assertEqual(len(expected), 23, msg=backend)
+            self.assertEqual(names, expected, msg=backend)
+            engine.close()
+
+    def test_invalid_cursors_are_rejected(self):
+        """Test that malformed, foreign and stale cursors raise InvalidCursorError"""
+        user_input = UserInput(city="Indiranagar", max_cost=2000)
+        cursor = self.engine.get_recommendations(user_input, limit=1).next_cursor
+        self.assertIsNotNone(cursor)
+
+        with self.assertRaises(InvalidCursorError):
+            self.engine.get_recommendations(user_input, limit=1, cursor="not-a-cursor")
+        with self.assertRaises(InvalidCursorError):
+            self.engine.get_recommendations(UserInput(city="Indiranagar", max_cost=900), limit=1, cursor=cursor)
+
+        db_manager = DatabaseManager(db_path=self.db_path)
+        db_manager.connect()
+        db_manager.write_build_metadata()
+        db_manager.close()
+        with self.assertRaises(InvalidCursorError):
+            self.engine.get_recommendations(user_input, limit=1, cursor=cursor)
+
+    def test_aget_recommendations_matches_sync(self):
+        """Test that the async path returns the same results as the sync path"""
+        user_input = UserInput(city="Indiranagar", price_range="mid-range", cuisine=["Cafe", "Thai"])
+        expected = self.engine.get_recommendations(user_input)
+
+        async def fetch_concurrently():
+            return await asyncio.gather(*[self.engine.aget_recommendations(user_input) for _ in range(8)])
+
+        for response in asyncio.run(fetch_concurrently()):
+            self.assertEqual(response, expected)
+
+    def test_result_cache_serves_repeats_until_rebuild(self):
+        """Test that equivalent requests hit the cache and a new build invalidates it"""
+        first = self.engine.get_recommendations(UserInput(city="Indiranagar", price_range="mid-range", cuisine=["Thai", "Cafe"]))
+        second = self.engine.get_recommendations(UserInput(city="Indiranagar", price_range="mid-range", cuisine=["cafe", "thai"]))
+        self.assertEqual(second, first)
+        stats = self.engine.cache_stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+
+        db_manager = DatabaseManager(db_path=self.db_path)
+        db_manager.connect()
+        db_manager.insert_data([
+            {'name': 'Thai Garden', 'city': 'Indiranagar', 'cuisines': 'Thai', 'average_cost_for_two': 700, 'aggregate_rating': 4.9, 'votes': 50, 'price_category': 'mid-range', 'address': '5 Street'}
+        ])
+        db_manager.write_build_metadata()
+        db_manager.close()
+
+        third = self.engine.get_recommendations(UserInput(city="Indiranagar", price_range="mid-range", cuisine=["Cafe", "Thai"]))
+        self.assertIn("Thai Garden", [r.name for r in third.recommendations])
+        self.assertEqual(self.engine.cache_stats()["invalidations"], 1)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,131 @@
+import tempfile
+import unittest
+from pathlib import Path
+from phase1.database_setup import DatabaseManager
+from phase2.models import UserInput
+from phase3.dish_index import build_dish_index
+from phase3.relaxation import Relaxation, adjacent_cost_bounds, describe_relaxation
+from phase3.ranking_model import HAND_TUNED, RankingWeights
+from phase3.recommender import RecommendationEngine
+from benchmarks.synthetic import LOCALITIES, build_database
+
+class TestRelaxationLevels(unittest.TestCase):
+    """
+    Tests for the relaxed bounds and levels.
+    """
+    def test_adjacent_cost_bounds(self):
+        """Test that budgets widen to the neighbouring price categories"""
+        self.assertEqual(adjacent_cost_bounds(0, 500), (0.0, 1500.0))
+        self.assertEqual(adjacent_cost_bounds(500, 1500), (0.0, float("inf")))
+        self.assertEqual(adjacent_cost_bounds(1500, float("inf")), (500.0, float("inf")))
+        self.assertEqual(adjacent_cost_bounds(200, 300), (0.0, 1500.0))
+        self.assertEqual(adjacent_cost_bounds(0, float("inf")), (0.0, float("inf")))
+
+    def test_bounds_and_tags(self):
+        """Test the loosest bounds and that only steps that loosen something are reported"""
+        relaxation = Relaxation(UserInput(city="Btm", price_range="budget", min_rating=4.0, cuisine="Thai"))
+        self.assertEqual((relaxation.relaxed_lower, relaxation.relaxed_upper, relaxation.relaxed_rating), (0.0, 1500.0, 3.0))
+        self.assertEqual(relaxation.level(300, 4.2, "Thai, Asian"), 0)
+        self.assertEqual(relaxation.level(300, 3.5, "Thai"), 1)
+        self.assertEqual(relaxation.level(800, 4.5, "thai"), 2)
+        self.assertEqual(relaxation.level(300, 4.5, "Chinese"), 3)
+        self.assertEqual(relaxation.relaxed(1), ["min_rating"])
+        self.assertEqual(relaxation.relaxed(3), ["min_rating", "price_range", "cuisine"])
+
+        unrated = Relaxation(UserInput(city="Btm", min_cost=0, cuisine="Thai"))
+        self.assertEqual(unrated.relaxed(3), ["cuisine"])
+        self.assertEqual(describe_relaxation(["min_rating", "price_range"]), "No exact matches, so these results relax the minimum rating and price range.")
+        self.assertEqual(describe_relaxation([]), "")
+
+class TestRelaxedRecommendations(unittest.TestCase):
+    """
+    Tests that empty requests are answered with the best relaxed results.
+    """
+    @classmethod
+    def setUpClass(cls):
+        cls.temp_dir = tempfile.TemporaryDirectory()
+        cls.db_path = build_database(Path(cls.temp_dir.name) / "test.db", 3000)
+        db_manager = DatabaseManager(db_path=cls.db_path)
+        build_dish_index(db_manager)
+        db_manager.write_build_metadata()
+        columns = ("city", "cuisines", "average_cost_for_two", "aggregate_rating", "votes", "id")
+        cls.rows = list(db_manager.iter_all(columns=columns))
+        db_manager.close()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.temp_dir.cleanup()
+
+    def expected(self, user_input: UserInput, weights: RankingWeights = HAND_TUNED):
+        """Rankings of the cumulative relaxations, tried one request at a time"""
+        engine = RecommendationEngine(DatabaseManager(db_path=self.db_path), feedback_path=None, ranking_weights=weights)
+        rating = max(user_input.min_rating - 1.0, 0.0)
+        bounds = user_input.cost_bounds()
+        steps = [
+            (user_input.min_rating, bounds, user_input.cuisine),
+            (rating, bounds, user_input.cuisine),
+            (rating, adjacent_cost_bounds(*bounds), user_input.cuisine),
+            (rating, adjacent_cost_bounds(*bounds), None)
+        ]
+        for level, (min_rating, (lower, upper), cuisine) in enumerate(steps):
+            ranked = []
+            for city, cuisines, cost, row_rating, votes, restaurant_id in self.rows:
+                if city != user_input.city or not lower <= cost < upper or row_rating < min_rating:
+                    continue
+                if cuisine and not any(c.lower() in cuisines.lower() for c in cuisine):
+                    continue
+                score = engine._calculate_match_score(row_rating, votes, user_input, cuisines)
+                ranked.append((-score, -row_rating, -votes, restaurant_id))
+            if ranked:
+                return level, [item[3] for item in sorted(ranked)]
+        return len(steps), []
+
+    def test_relaxes_in_one_pass(self):
+        """Test each relaxation level on both backends against one request per level"""
+        inputs = {
+            ("min_rating",): UserInput(city=LOCALITIES[1], price_range="budget", min_rating=4.8, cuisine="Mexican"),
+            ("min_rating", "price_range"): UserInput(city=LOCALITIES[0], price_range="budget", min_rating=4.9, cuisine="Mexican"),
+            ("min_rating", "price_range", "cuisine"): UserInput(city=LOCALITIES[0], max_cost=150, min_rating=4.5, cuisine="Thai")
+        }
+        for weights in (HAND_TUNED, RankingWeights(2.0, 8.0)):
+            for backend in ("sql", "columnar"):
+                engine = RecommendationEngine(DatabaseManager(db_path=self.db_path), backend=backend, feedback_path=None, ranking_weights=weights)
+                for tags, user_input in inputs.items():
+                    level, expected = self.expected(user_input, weights)
+                    self.assertEqual(level, len(tags))
+                    for limit in (1, 5):
+                        response = engine.get_recommendations(user_input, limit=limit)
+                        self.assertEqual(response.relaxed_constraints, list(tags), msg=(backend, user_input))
+                        self.assertEqual([r.id for r in response.recommendations], expected[:limit], msg=(weights.key, backend, user_input))
+                        self.assertIsNone(response.next_cursor)
+                engine.close()
+
+        strict = RecommendationEngine(DatabaseManager(db_path=self.db_path), feedback_path=None, relax_empty=False)
+        self.assertEqual(strict.get_recommendations(inputs[("min_rating",)], limit=5).count, 0)
+
+    def test_exact_matches_are_not_relaxed(self):
+        """Test that requests with results are untouched and batch answers agree"""
+        engine = RecommendationEngine(DatabaseManager(db_path=self.db_path), feedback_path=None)
+        exact = UserInput(city=LOCALITIES[0], max_cost=4000)
+        empty = UserInput(city=LOCALITIES[0], price_range="budget", min_rating=4.9, cuisine="Mexican")
+        response = engine.get_recommendations(exact, limit=5)
+        self.assertEqual(response.relaxed_constraints, [])
+        self.assertIsNotNone(response.next_cursor)
+
+        batch = engine.get_recommendations_batch([exact, empty], limit=5, workers=1)
+        self.assertEqual(batch[0].recommendations, response.recommendations)
+        self.assertEqual(batch[1], engine.get_recommendations(empty, limit=5))
+
+    def test_dish_stays_required(self):
+        """Test that dish requests relax the other constraints only"""
+        engine = RecommendationEngine(DatabaseManager(db_path=self.db_path), feedback_path=None)
+        user_input = UserInput(city="Btm", price_range="budget", min_rating=4.9, dish="Biryani")
+        response = engine.get_recommendations(user_input, limit=10)
+        self.assertTrue(response.relaxed_constraints)
+        dish_ids = {r.id for r in engine.get_recommendations(UserInput(city="Btm", max_cost=4000, dish="Biryani"), limit=1000).recommendations}
+        self.assertTrue(response.recommendations)
+        self.assertTrue(all(r.id in dish_ids for r in response.recommendations))
+        engine.close()
+
+if __name__ == '__main__':
+    unittest.main()
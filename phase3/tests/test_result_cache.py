@@ -0,0 +1,81 @@
+import unittest
+from phase2.models import UserInput
+from phase3.result_cache import ResultCache, cache_key
+
+class FakeClock:
+    """
+    Manually advanced time source.
+    """
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+class TestCacheKey(unittest.TestCase):
+    """
+    Tests for the canonical request key.
+    """
+    def test_equivalent_inputs_share_a_key(self):
+        """Test that cuisine order, case and duplicates do not change the key"""
+        a = UserInput(city="Indiranagar", price_range="budget", cuisine=["Thai", "cafe"], min_rating=3.95)
+        b = UserInput(city="Indiranagar", price_range="budget", cuisine=["Cafe", "thai", "Thai"], min_rating=4.0)
+        self.assertEqual(cache_key(a, 5), cache_key(b, 5))
+
+    def test_result_changing_fields_change_the_key(self):
+        """Test that rating precision, limit and budget are kept apart"""
+        base = UserInput(city="Indiranagar", price_range="budget", min_rating=4.0)
+        self.assertNotEqual(cache_key(base, 5), cache_key(base, 6))
+        self.assertNotEqual(cache_key(base, 5), cache_key(UserInput(city="Indiranagar", price_range="budget", min_rating=4.05), 5))
+        self.assertNotEqual(cache_key(base, 5), cache_key(UserInput(city="Indiranagar", max_cost=500, min_rating=4.0), 5))
+
+class TestResultCache(unittest.TestCase):
+    """
+    Tests for ResultCache.
+    """
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = ResultCache(max_entries=2, ttl_seconds=10, clock=self.clock)
+
+    def test_hit_and_miss_counters(self):
+        """Test that lookups are counted"""
+        self.assertIsNone(self.cache.get("a", "v1"))
+        self.cache.put("a", "v1", 1)
+        self.assertEqual(self.cache.get("a", "v1"), 1)
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["size"]), (1, 1, 1))
+
+    def test_least_recently_used_is_evicted(self):
+        """Test that the entry not read for longest is evicted first"""
+        self.cache.put("a", "v1", 1)
+        self.cache.put("b", "v1", 2)
+        self.cache.get("a", "v1")
+        self.cache.put("c", "v1", 3)
+        self.assertIsNone(self.cache.get("b", "v1"))
+        self.assertEqual(self.cache.get("a", "v1"), 1)
+        self.assertEqual(self.cache.stats()["evictions"], 1)
+
+    def test_entries_expire(self):
+        """Test that entries older than the TTL are misses"""
+        self.cache.put("a", "v1", 1)
+        self.clock.now = 9.9
+        self.assertEqual(self.cache.get("a", "v1"), 1)
+        self.clock.now = 10.0
+        self.assertIsNone(self.cache.get("a", "v1"))
+        self.assertEqual(self.cache.stats()["expirations"], 1)
+
+    def test_new_version_invalidates(self):
+        """Test that a new data version empties the cache"""
+        self.cache.put("a", "v1", 1)
+        self.assertIsNone(self.cache.get("a", "v2"))
+        stats = self.cache.stats()
+        self.assertEqual((stats["invalidations"], stats["size"]), (1, 0))
+
+    def test_zero_size_disables(self):
+        """Test that a cache without capacity stores nothing"""
+        cache = ResultCache(max_entries=0, ttl_seconds=10)
+        cache.put("a", "v1", 1)
+        self.assertIsNone(cache.get("a", "v1"))
+
+if __name__ == '__main__':
+    unittest.main()
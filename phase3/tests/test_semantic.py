@@ -0,0 +1,123 @@
+import tempfile
+import unittest
+from pathlib import Path
+import numpy as np
+from phase1.database_setup import DatabaseManager
+from phase3.models import SemanticFilters
+from phase3.recommender import RecommendationEngine
+from phase3.semantic import SemanticIndex, build_semantic_index, semantic_index_path
+from benchmarks.synthetic import build_database, make_restaurants
+
+class TestSemanticSearch(unittest.TestCase):
+    """
+    Tests for the offline semantic index and RecommendationEngine.semantic_search.
+    """
+    @classmethod
+    def setUpClass(cls):
+        cls.temp_dir = tempfile.TemporaryDirectory()
+        cls.db_path = build_database(Path(cls.temp_dir.name) / "test.db", 2000)
+        db_manager = DatabaseManager(db_path=cls.db_path)
+        db_manager.write_build_metadata()
+        cls.indexed = build_semantic_index(db_manager, dims=32, fit_sample=1000, lists=16)
+        cls.reviews = dict(db_manager.connect().execute("SELECT id, reviews_text FROM restaurants").fetchall())
+        db_manager.close()
+        cls.index = SemanticIndex.load(semantic_index_path(cls.db_path))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.temp_dir.cleanup()
+
+    def setUp(self):
+        self.engine = RecommendationEngine(DatabaseManager(db_path=self.db_path))
+
+    def test_query_finds_matching_reviews(self):
+        """Test that the top hits mention what the query asks for"""
+        self.assertEqual(self.indexed, 2000)
+        response = self.engine.semantic_search("rooftop with live music and craft beer", limit=5)
+        self.assertEqual(response.count, 5)
+        for restaurant in response.recommendations:
+            self.assertIn("craft beer", self.reviews[restaurant.id])
+        scores = [r.match_score for r in response.recommendations]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+
+    def test_filters_are_applied(self):
+        """Test that city, price category and minimum rating restrict the hits"""
+        filters = SemanticFilters(city="hsr", price_range="Budget", min_rating=3.5)
+        response = self.engine.semantic_search("filter coffee", filters, limit=10)
+        self.assertGreater(response.count, 0)
+        for restaurant in response.recommendations:
+            self.assertEqual(restaurant.city, "Hsr")
+            self.assertEqual(restaurant.price_category, "budget")
+            self.assertGreaterEqual(restaurant.rating, 3.5)
+        self.assertEqual(self.engine.semantic_search("filter coffee", SemanticFilters(city="Atlantis")).count, 0)
+
+    def test_ivf_matches_exhaustive_search(self):
+        """Test that probing a few lists finds most of the exact top 10"""
+        queries = ["quiet cafe for working on a laptop", "biryani late night", "family friendly play area", "cozy date night"]
+        recall = []
+        for text in queries:
+            query = self.index.embed(text)
+            exact = self.index.ids[np.argsort(-(self.index.vectors @ query), kind="stable")[:10]]
+            hits = [hit[0] for hit in self.index.search(text, limit=10, nprobe=4)]
+            recall.append(len(set(hits) & set(exact.tolist())) / 10)
+        self.assertGreaterEqual(np.mean(recall), 0.8)
+        # Probing every list is exhaustive
+        for text in queries:
+            hits = self.index.search(text, limit=10, nprobe=16)
+            query = self.index.embed(text)
+            best = np.sort(self.index.vectors @ query)[::-1][:10]
+            np.testing.assert_allclose([hit[2] for hit in hits], best, atol=1e-4)
+
+    def test_unknown_terms_return_nothing(self):
+        """Test that an empty query has no embedding and no results"""
+        self.assertIsNone(self.index.embed("   "))
+        self.assertEqual(self.engine.semantic_search("").count, 0)
+
+    def test_replaced_partition_is_searched(self):
+        """Test that search results follow a replaced partition, whose ids start over"""
+        restaurants = make_restaurants(800)
+        db_manager = DatabaseManager(db_path=Path(self.temp_dir.name) / "partitioned.db")
+        db_manager.build_partitions(restaurants, workers=1)
+        db_manager.write_build_metadata()
+        build_semantic_index(db_manager, dims=32, lists=8)
+        replaced = [dict(r, name=f"New {r['name']}") for r in restaurants if r["city"] == "Hsr"][::2]
+        db_manager.replace_partition("Hsr", replaced)
+        names = dict(db_manager.connection_for("Hsr").execute("SELECT id, name FROM restaurants").fetchall())
+        db_manager.close()
+
+        engine = RecommendationEngine(DatabaseManager(db_path=db_manager.db_path))
+        response = engine.semantic_search("craft beer", SemanticFilters(city="Hsr"), limit=10)
+        self.assertGreater(response.count, 0)
+        for restaurant in response.recommendations:
+            self.assertEqual(restaurant.name, names[restaurant.id])
+            self.assertTrue(restaurant.name.startswith("New "))
+        engine.close()
+
+    def test_stale_index_is_ignored(self):
+        """Test that an index from another build is not served"""
+        db_path = Path(self.temp_dir.name) / "stale.db"
+        db_path.write_bytes(self.db_path.read_bytes())
+        db_manager = DatabaseManager(db_path=db_path)
+        db_manager.write_build_metadata("first")
+        build_semantic_index(db_manager, dims=16, fit_sample=500, lists=4)
+        db_manager.write_build_metadata("second")
+        db_manager.close()
+
+        engine = RecommendationEngine(DatabaseManager(db_path=db_path))
+        self.assertEqual(engine.semantic_search("craft beer").count, 0)
+
+    def test_partitioned_hits_route_by_city(self):
+        """Test that hits are fetched from the partition of their city"""
+        db_manager = DatabaseManager(db_path=Path(self.temp_dir.name) / "partitioned.db")
+        db_manager.build_partitions(make_restaurants(400), workers=1)
+        db_manager.write_build_metadata()
+        build_semantic_index(db_manager, dims=16, fit_sample=400, lists=4)
+        db_manager.close()
+
+        engine = RecommendationEngine(DatabaseManager(db_path=db_manager.db_path))
+        response = engine.semantic_search("craft beer", SemanticFilters(city="Hsr"), limit=5)
+        self.assertEqual(response.count, 5)
+        self.assertEqual({r.city for r in response.recommendations}, {"Hsr"})
+
+if __name__ == '__main__':
+    unittest.main()
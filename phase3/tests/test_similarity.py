@@ -0,0 +1,100 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+import numpy as np
+from phase1.config import SIMILAR_TABLE_NAME
+from phase1.database_setup import DatabaseManager
+from phase3.recommender import RecommendationEngine
+from phase3.similarity import SIMILARITY_COLUMNS, TfidfMatrix, build_similar_restaurants, restaurant_terms
+from benchmarks.synthetic import build_database, make_restaurants
+
+class TestTfidfMatrix(unittest.TestCase):
+    """
+    Tests for the sparse TF-IDF vectors and the blocked similarity product.
+    """
+    def test_terms_cover_every_field(self):
+        """Test that terms are prefixed by field, lower-cased and de-duplicated"""
+        terms = restaurant_terms((1, "Cafe, Italian", "Casual Dining", "Pasta, pasta, Tiramisu", 799.0), cost_band_width=250)
+        self.assertEqual(terms, ["cuisine:cafe", "cuisine:italian", "type:casual dining", "dish:pasta", "dish:tiramisu", "cost:3"])
+
+    def test_blocked_product_matches_dense_cosine(self):
+        """Test block similarities against a dense cosine computation, empty rows included"""
+        rows = [(i, r['cuisines'], r['rest_type'], r['dish_liked'], r['average_cost_for_two']) for i, r in enumerate(make_restaurants(200))]
+        documents = [restaurant_terms(row) for row in rows] + [[]]
+        matrix = TfidfMatrix(documents)
+
+        dense = matrix.dense_rows(0, len(matrix))
+        expected = dense @ dense.T
+        for start in range(0, len(matrix), 64):
+            stop = min(start + 64, len(matrix))
+            np.testing.assert_allclose(matrix.similarities(start, stop), expected[start:stop], atol=1e-6)
+        np.testing.assert_allclose(np.diag(expected)[:-1], 1.0, atol=1e-6)
+
+
+class TestSimilarRestaurants(unittest.TestCase):
+    """
+    Tests for the stored neighbours and RecommendationEngine.similar.
+    """
+    @classmethod
+    def setUpClass(cls):
+        cls.temp_dir = tempfile.TemporaryDirectory()
+        cls.db_path = build_database(Path(cls.temp_dir.name) / "test.db", 1500)
+        db_manager = DatabaseManager(db_path=cls.db_path)
+        cls.stored = build_similar_restaurants(db_manager, top_n=10, block_rows=32, workers=2)
+        db_manager.close()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.temp_dir.cleanup()
+
+    def setUp(self):
+        self.engine = RecommendationEngine(DatabaseManager(db_path=self.db_path))
+
+    def test_neighbors_are_the_most_similar_in_the_city(self):
+        """Test stored neighbours against a brute-force ranking of the city"""
+        db_manager = DatabaseManager(db_path=self.db_path)
+        rows = sorted(db_manager.iter_by_city("Hsr", columns=SIMILARITY_COLUMNS))
+        stored = dict(db_manager.connect().execute(f"SELECT id, neighbors FROM {SIMILAR_TABLE_NAME}").fetchall())
+        db_manager.close()
+        self.assertEqual(self.stored, 1500)
+
+        matrix = TfidfMatrix([restaurant_terms(row) for row in rows])
+        dense = matrix.dense_rows(0, len(matrix))
+        for i in range(0, len(rows), 7):
+            similarity = dense @ dense[i]
+            ranked = sorted((j for j in range(len(rows)) if j != i), key=lambda j: (-round(float(similarity[j]), 4), rows[j][0]))
+            neighbors = json.loads(stored[rows[i][0]])
+            self.assertEqual([n[0] for n in neighbors], [rows[j][0] for j in ranked[:10]])
+
+    def test_similar_returns_neighbors_best_first(self):
+        """Test the engine lookup: same city, never the restaurant itself, similarity descending"""
+        restaurant_id = 1
+        response = self.engine.similar(restaurant_id, limit=5)
+        self.assertEqual(response.count, 5)
+        self.assertNotIn(restaurant_id, [r.id for r in response.recommendations])
+        self.assertEqual(len({r.city for r in response.recommendations}), 1)
+        scores = [r.match_score for r in response.recommendations]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        self.assertTrue(0 < scores[-1] <= 1)
+
+    def test_unknown_restaurant_is_empty(self):
+        """Test that an id without neighbours returns no results"""
+        self.assertEqual(self.engine.similar(10 ** 9).count, 0)
+
+    def test_partitioned_database_requires_city(self):
+        """Test that partitioned lookups route by city and refuse to guess it"""
+        db_manager = DatabaseManager(db_path=Path(self.temp_dir.name) / "partitioned.db")
+        db_manager.build_partitions(make_restaurants(300), workers=1)
+        build_similar_restaurants(db_manager, workers=1)
+        db_manager.close()
+
+        engine = RecommendationEngine(DatabaseManager(db_path=db_manager.db_path))
+        with self.assertRaises(ValueError):
+            engine.similar(1)
+        response = engine.similar(1, city="Hsr")
+        self.assertGreater(response.count, 0)
+        self.assertEqual({r.city for r in response.recommendations}, {"Hsr"})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,7 @@
 import logging
 from typing import Optional, Any, List
 from phase2.models import UserInput
+from phase3.models import RecommendationResponse
 from phase3.recommender import RecommendationEngine
 from phase4.groq_client import GroqClient
 from phase4.prompts import SYSTEM_PROMPT, USER_PROMPT_TEMPLATE, format_restaurant_context
@@ -18,19 +19,21 @@ class LLMRecommender:
         self.groq_client = groq_client or GroqClient()
         self.engine = engine or RecommendationEngine()
 
-    def get_reasoned_recommendations(self, user_input: UserInput, limit: int = 5) -> str:
+    def get_reasoned_recommendations(self, user_input: UserInput, limit: int = 5, response: Optional[RecommendationResponse] = None) -> str:
         """
         Fetch recommendations from Phase 3 and enhance them using Groq LLM.
         
         Args:
             user_input: Validated user preferences.
             limit: Number of recommendations to process.
+            response: Recommendations already fetched for this input (skips a second engine query).
             
         Returns:
             Reasoned recommendations string from LLM.
         """
         # 1. Get structured recommendations from Phase 3
-        response = self.engine.get_recommendations(user_input, limit=limit)
+        if response is None:
+            response = self.engine.get_recommendations(user_input, limit=limit)
         
         if response.count == 0:
             return f"I'm sorry, but I couldn't find any restaurants in {user_input.city} matching your criteria."
@@ -41,7 +44,7 @@ class LLMRecommender:
         # 3. Create messages for Groq
         user_message = USER_PROMPT_TEMPLATE.format(
             city=user_input.city,
-            price_range=user_input.price_range,
+            price_range=user_input.budget_label,
             cuisine=user_input.cuisine or "any",
             min_rating=user_input.min_rating,
             restaurant_list=restaurant_list
@@ -65,7 +68,7 @@ class LLMRecommender:
         """
         prompt = (
             f"Why is the restaurant '{restaurant.name}' in {user_input.city} a good match for someone looking for "
-            f"{user_input.cuisine or 'any'} cuisine in the {user_input.price_range} price range with at least "
+            f"{user_input.cuisine or 'any'} cuisine in the {user_input.budget_label} price range with at least "
             f"{user_input.min_rating} rating? The restaurant has a rating of {restaurant.rating}, "
             f"serves {restaurant.cuisines}, and costs ₹{restaurant.average_cost} for two. "
             "Provide a short, 1-2 sentence justification starting with 'Why you'll like it:'."
@@ -88,7 +91,7 @@ class LLMRecommender:
         restaurant_names = ", ".join([r.name for r in recommendations])
         prompt = (
             f"I found {len(recommendations)} great spots in {user_input.city} for you: {restaurant_names}. "
-            f"They match your preference for {user_input.price_range} pricing and {user_input.cuisine or 'various'} cuisines. "
+            f"They match your preference for {user_input.budget_label} pricing and {user_input.cuisine or 'various'} cuisines. "
             "Provide a single, welcoming sentence summarizing why these are good choices. "
             "Be energetic and helpful."
         )
@@ -1,8 +1,10 @@
+import csv
 import json
 import logging
 import os
+import textwrap
 from datetime import datetime
-from typing import List, Any, Optional
+from typing import Iterable, Any, Optional, Sequence
 
 logger = logging.getLogger(__name__)
 
@@ -14,31 +16,52 @@ class Exporter:
         self.export_dir = export_dir
         os.makedirs(self.export_dir, exist_ok=True)
 
-    def export_to_json(self, recommendations: List[Any], filename: Optional[str] = None) -> str:
-        """Exports recommendations to a JSON file."""
+    def export_to_json(self, recommendations: Iterable[Any], filename: Optional[str] = None) -> str:
+        """
+        Exports recommendations to a JSON file.
+        Items are written one at a time, so iterators are exported with constant memory.
+        """
         if not filename:
             filename = f"recommendations_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
         
         filepath = os.path.join(self.export_dir, filename)
         
-        # Convert objects to dicts
-        serializable_data = [
-            {
-                "name": r.name,
-                "rating": r.rating,
-                "votes": r.votes,
-                "cuisines": r.cuisines,
-                "average_cost": r.average_cost,
-                "address": r.address
-            } for r in recommendations
-        ]
-        
         with open(filepath, 'w') as f:
-            json.dump(serializable_data, f, indent=4)
+            f.write("[")
+            for i, r in enumerate(recommendations):
+                item = {
+                    "name": r.name,
+                    "rating": r.rating,
+                    "votes": r.votes,
+                    "cuisines": r.cuisines,
+                    "average_cost": r.average_cost,
+                    "address": r.address
+                }
+                f.write(",\n" if i else "\n")
+                f.write(textwrap.indent(json.dumps(item, indent=4), "    "))
+            f.write("\n]")
+        
+        return filepath
+
+    def export_rows_to_csv(self, rows: Iterable[Sequence[Any]], columns: Sequence[str], filename: Optional[str] = None) -> str:
+        """
+        Exports raw database rows to a CSV file.
+        Intended for the streaming DatabaseManager iterators (e.g. iter_by_city),
+        so whole localities are exported with constant memory.
+        """
+        if not filename:
+            filename = f"restaurants_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+        
+        filepath = os.path.join(self.export_dir, filename)
+        
+        with open(filepath, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(columns)
+            writer.writerows(rows)
         
         return filepath
 
-    def export_to_csv(self, recommendations: List[Any], filename: Optional[str] = None) -> str:
+    def export_to_csv(self, recommendations: Iterable[Any], filename: Optional[str] = None) -> str:
         """Exports recommendations to a CSV file."""
         if not filename:
             filename = f"recommendations_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
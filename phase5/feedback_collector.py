@@ -2,16 +2,35 @@ import json
 import logging
 import os
 from datetime import datetime
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+
+from phase3.config import FEEDBACK_AGGREGATES_FILE, FEEDBACK_AGGREGATES_PATH
+from phase3.feedback import FeedbackStore
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_FEEDBACK_FILE = "data/feedback/user_feedback.json"
+
 class FeedbackCollector:
     """
     Collects and stores user feedback for recommendations.
+    Every rating is also folded into the restaurant's aggregate, which the
+    recommendation engine reads to adjust match scores.
     """
-    def __init__(self, feedback_file: str = "data/feedback/user_feedback.json"):
+    def __init__(self, feedback_file: str = DEFAULT_FEEDBACK_FILE, aggregates_file: Optional[str] = None):
+        """
+        Args:
+            feedback_file: JSON feedback log
+            aggregates_file: Aggregates database; defaults to the engine's
+                store for the default log, and to a file next to any other log
+        """
+        if aggregates_file is None:
+            if feedback_file == DEFAULT_FEEDBACK_FILE:
+                aggregates_file = FEEDBACK_AGGREGATES_PATH
+            else:
+                aggregates_file = os.path.join(os.path.dirname(feedback_file), FEEDBACK_AGGREGATES_FILE)
         self.feedback_file = feedback_file
+        self.aggregates = FeedbackStore(aggregates_file)
         self._ensure_storage()
 
     def _ensure_storage(self):
@@ -43,6 +62,7 @@ class FeedbackCollector:
                 data.append(feedback_entry)
                 f.seek(0)
                 json.dump(data, f, indent=4)
+            self.aggregates.record(restaurant_name, rating)
             logger.info(f"Feedback saved for {restaurant_name}")
         except Exception as e:
             logger.error(f"Failed to save feedback: {e}")
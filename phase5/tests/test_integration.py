@@ -14,6 +14,7 @@ class TestPhase5Integration(unittest.TestCase):
     def setUp(self):
         self.test_export_dir = "data/test_exports"
         self.test_feedback_file = "data/test_feedback/test_feedback.json"
+        self.test_aggregates_file = "data/test_feedback/feedback_aggregates.db"
         self.exporter = Exporter(export_dir=self.test_export_dir)
         self.collector = FeedbackCollector(feedback_file=self.test_feedback_file)
         
@@ -32,6 +33,8 @@ class TestPhase5Integration(unittest.TestCase):
                 os.remove(os.path.join(self.test_export_dir, f))
             os.rmdir(self.test_export_dir)
             
+        if os.path.exists(self.test_aggregates_file):
+            os.remove(self.test_aggregates_file)
         if os.path.exists(self.test_feedback_file):
             os.remove(self.test_feedback_file)
             if os.path.exists(os.path.dirname(self.test_feedback_file)):
@@ -54,5 +57,17 @@ class TestPhase5Integration(unittest.TestCase):
             self.assertEqual(data[0]['restaurant'], "Integration Rest")
             self.assertEqual(data[0]['rating'], 5)
 
+        # 3. Test the aggregate the engine reads, kept next to the custom log
+        self.assertEqual(str(self.collector.aggregates.path), os.path.normpath(self.test_aggregates_file))
+        self.assertGreater(self.collector.aggregates.adjustments().get("integration rest"), 0)
+
+    def test_export_rows_to_csv(self):
+        """Test exporting streamed database rows."""
+        rows = iter([("Integration Rest", 4.5), ("Second Rest", 3.9)])
+        csv_path = self.exporter.export_rows_to_csv(rows, ["name", "aggregate_rating"], "rows.csv")
+        with open(csv_path, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        self.assertEqual(lines, ["name,aggregate_rating", "Integration Rest,4.5", "Second Rest,3.9"])
+
 if __name__ == "__main__":
     unittest.main()
@@ -1,12 +1,23 @@
 import logging
-from fastapi import FastAPI, HTTPException, Body
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Body, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
+from starlette.concurrency import run_in_threadpool
 import os
-from typing import List, Optional
+from typing import List, Optional, Union
 from pydantic import BaseModel
+from phase1.config import DATABASE_SERVING_MODE
+from phase1.database_setup import DatabaseManager
+from phase2.config import SUGGEST_DEFAULT_LIMIT, SUGGEST_MAX_LIMIT
 from phase2.models import UserInput
+from phase2.suggest_index import SUGGEST_KINDS, get_suggest_index
+from phase3.config import SEMANTIC_DEFAULT_LIMIT, SEMANTIC_MAX_LIMIT, SIMILAR_DEFAULT_LIMIT, SIMILAR_TOP_N
+from phase3.models import SemanticFilters
+from phase3.pagination import InvalidCursorError
+from phase3.recommender import RecommendationEngine
+from phase3.relaxation import describe_relaxation
 from phase4.recommender import LLMRecommender
 from phase5.feedback_collector import FeedbackCollector
 
@@ -14,10 +25,32 @@ from phase5.feedback_collector import FeedbackCollector
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# One engine per process, so its executor and connection pool are shared by all requests
+_engine: Optional[RecommendationEngine] = None
+
+def get_engine() -> RecommendationEngine:
+    """
+    Get the process-wide RecommendationEngine, creating it on first use.
+    """
+    global _engine
+    if _engine is None:
+        _engine = RecommendationEngine()
+    return _engine
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Release the engine's executor and pooled connections on shutdown.
+    """
+    yield
+    if _engine is not None:
+        _engine.close()
+
 app = FastAPI(
     title="Zomato AI Recommendation API",
     description="API for restaurant recommendations in Bangalore with AI reasoning.",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Standard CORS configuration for React frontend
@@ -39,9 +72,12 @@ app.mount("/static", StaticFiles(directory=frontend_path), name="static")
 # Re-using models or defining API-specific ones
 class RecommendationRequest(BaseModel):
     city: str
-    price_range: str
-    cuisine: Optional[List[str]] = None
+    price_range: Optional[str] = None
+    min_cost: Optional[float] = None  # Average cost for two; narrows or replaces price_range
+    max_cost: Optional[float] = None
+    cuisine: Optional[Union[str, List[str]]] = None  # A single cuisine is accepted, as in UserInput
     min_rating: float = 0.0
+    dish: Optional[Union[str, List[str]]] = None  # Dishes the restaurants must serve
 
 class RestaurantResponse(BaseModel):
     name: str
@@ -67,41 +103,56 @@ async def root():
     return {"message": "Welcome to Zomato AI Recommender API", "status": "active", "api_docs": "/docs"}
 
 @app.post("/api/recommend", response_model=dict)
-async def get_recommendations(request: RecommendationRequest):
+async def get_recommendations(
+    request: RecommendationRequest,
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page, to load more results"),
+    debug: bool = Query(False, description="Include the engine's explain report: stage timings, SQL with query plans, candidate counts, cache outcome")
+):
     """
     Endpoint to get restaurant recommendations with AI reasoning.
+    Pages after the first (cursor set) skip the AI summary. With debug=1 the
+    response carries the engine's explain report (the AI calls are not part of it).
     """
     try:
         # Map API request to internal UserInput model
         user_input = UserInput(
             city=request.city,
             price_range=request.price_range,
+            min_cost=request.min_cost,
+            max_cost=request.max_cost,
             cuisine=request.cuisine,
-            min_rating=request.min_rating
+            min_rating=request.min_rating,
+            dish=request.dish
         )
         
-        recommender = LLMRecommender()
+        recommender = LLMRecommender(engine=get_engine())
         
-        # 1. Get structured restaurants (Phase 3)
-        engine_response = recommender.engine.get_recommendations(user_input, limit=6)
+        # 1. Get structured restaurants (Phase 3) without blocking the event loop
+        engine_response = await recommender.engine.aget_recommendations(user_input, limit=6, cursor=cursor, explain=debug)
+        debug_info = {"debug": engine_response.explain.model_dump() if engine_response.explain else None} if debug else {}
         
         if engine_response.count == 0:
             return {
                 "status": "success",
                 "count": 0,
                 "recommendations": [],
-                "message": f"No restaurants found in {request.city} matching your criteria."
+                "next_cursor": None,
+                "message": f"No restaurants found in {request.city} matching your criteria.",
+                **debug_info
             }
             
-        # 2. Get AI reasoning (Phase 4)
-        ai_reasoning = recommender.get_reasoned_recommendations(user_input, limit=6)
+        # 2. Get AI reasoning (Phase 4); the Groq client is synchronous, so run it off the loop
+        ai_reasoning = None
+        if cursor is None:
+            ai_reasoning = await run_in_threadpool(recommender.get_reasoned_recommendations, user_input, 6, engine_response)
         
         # Format response
         results = []
         for rec in engine_response.recommendations:
             # Get individual reasoning for each restaurant for a richer API response
-            reasoning = recommender.get_individual_reasoning(user_input, rec)
+            reasoning = await run_in_threadpool(recommender.get_individual_reasoning, user_input, rec)
             results.append({
+                "id": rec.id,
                 "name": rec.name,
                 "rating": rec.rating,
                 "votes": rec.votes,
@@ -115,25 +166,161 @@ async def get_recommendations(request: RecommendationRequest):
             "status": "success",
             "count": len(results),
             "recommendations": results,
-            "ai_reasoning_summary": ai_reasoning # Keep summary as well
+            "ai_reasoning_summary": ai_reasoning, # Keep summary as well
+            "next_cursor": engine_response.next_cursor,
+            "relaxed_constraints": engine_response.relaxed_constraints,
+            "message": describe_relaxation(engine_response.relaxed_constraints) or None,
+            **debug_info
         }
         
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"API Error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/restaurants/{restaurant_id}/similar")
+async def get_similar_restaurants(
+    restaurant_id: int,
+    city: Optional[str] = Query(None, description="Locality of the restaurant (required for partitioned databases)"),
+    limit: int = Query(SIMILAR_DEFAULT_LIMIT, ge=1, le=SIMILAR_TOP_N)
+):
+    """
+    "More like this": restaurants similar to one result card, read from the
+    neighbours stored by the Phase 1 build (no AI reasoning).
+    """
+    try:
+        response = await get_engine().asimilar(restaurant_id, city=city, limit=limit)
+        return {
+            "status": "success",
+            "count": response.count,
+            "recommendations": [
+                {
+                    "id": rec.id,
+                    "name": rec.name,
+                    "rating": rec.rating,
+                    "votes": rec.votes,
+                    "cuisines": rec.cuisines,
+                    "average_cost": rec.average_cost,
+                    "address": rec.address,
+                    "similarity": rec.match_score
+                }
+                for rec in response.recommendations
+            ]
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Similar API Error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/search")
+async def semantic_search(
+    q: str = Query(..., min_length=1, description="Free-text query, e.g. 'rooftop with live music and craft beer'"),
+    city: Optional[str] = Query(None, description="Restrict results to one locality"),
+    price_range: Optional[str] = Query(None, description="budget, mid-range or premium"),
+    min_rating: float = Query(0.0, ge=0.0, le=5.0),
+    limit: int = Query(SEMANTIC_DEFAULT_LIMIT, ge=1, le=SEMANTIC_MAX_LIMIT)
+):
+    """
+    Free-text search over names, cuisines, dishes and reviews, served from the
+    offline semantic index built by Phase 1 (no AI reasoning).
+    """
+    try:
+        filters = SemanticFilters(city=city, price_range=price_range, min_rating=min_rating)
+        response = await get_engine().asemantic_search(q, filters, limit=limit)
+        return {
+            "status": "success",
+            "query": q,
+            "count": response.count,
+            "recommendations": [
+                {
+                    "id": rec.id,
+                    "name": rec.name,
+                    "city": rec.city,
+                    "rating": rec.rating,
+                    "votes": rec.votes,
+                    "cuisines": rec.cuisines,
+                    "average_cost": rec.average_cost,
+                    "price_category": rec.price_category,
+                    "address": rec.address,
+                    "similarity": rec.match_score
+                }
+                for rec in response.recommendations
+            ]
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Search API Error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+def _read_database_stats() -> dict:
+    """
+    Read database statistics (served from the build metadata table).
+    """
+    db_manager = DatabaseManager(serving_mode=DATABASE_SERVING_MODE)
+    try:
+        return db_manager.get_database_stats()
+    finally:
+        db_manager.close()
+
+@app.get("/api/stats")
+async def get_stats():
+    """
+    Endpoint to get dataset statistics (record, locality and cuisine counts),
+    plus result cache counters once the engine is running.
+    """
+    try:
+        stats = await run_in_threadpool(_read_database_stats)
+        if _engine is not None:
+            stats["result_cache"] = _engine.cache_stats()
+        return stats
+    except Exception as e:
+        logger.error(f"Stats API Error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/suggest")
+def suggest(
+    q: str = Query("", description="Prefix typed by the user"),
+    type: Optional[str] = Query(None, description="Comma-separated kinds: locality, cuisine, restaurant, dish"),
+    limit: int = Query(SUGGEST_DEFAULT_LIMIT, ge=1, le=SUGGEST_MAX_LIMIT)
+):
+    """
+    Typeahead endpoint: localities, cuisines, restaurant names and dishes starting with q,
+    most popular first. Runs in the threadpool so a rebuild never blocks the event loop.
+    """
+    kinds = [kind.strip() for kind in type.split(",") if kind.strip()] if type else None
+    unknown = [kind for kind in kinds or [] if kind not in SUGGEST_KINDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown suggestion type: {', '.join(unknown)}")
+        
+    try:
+        index = get_suggest_index(DatabaseManager(serving_mode=DATABASE_SERVING_MODE))
+        return {"query": q, "suggestions": index.suggest(q, limit=limit, kinds=kinds)}
+    except Exception as e:
+        logger.error(f"Suggest API Error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+def _record_feedback(feedback: FeedbackRequest):
+    """
+    Append feedback to the log and its restaurant's aggregate. Takes a write
+    lock on the aggregates database, so it runs in the threadpool.
+    """
+    collector = FeedbackCollector()
+    collector.collect_feedback(
+        restaurant_name=feedback.restaurant_name,
+        rating=feedback.rating,
+        comment=feedback.comment
+    )
+
 @app.post("/api/feedback")
 async def submit_feedback(feedback: FeedbackRequest):
     """
     Endpoint to submit user feedback for a recommendation.
     """
     try:
-        collector = FeedbackCollector()
-        collector.collect_feedback(
-            restaurant_name=feedback.restaurant_name,
-            rating=feedback.rating,
-            comment=feedback.comment
-        )
+        await run_in_threadpool(_record_feedback, feedback)
         return {"status": "success", "message": "Feedback submitted successfully"}
     except Exception as e:
         logger.error(f"Feedback API Error: {e}")
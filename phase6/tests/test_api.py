@@ -1,6 +1,16 @@
+import asyncio
+import os
+import tempfile
+import time
 import unittest
+import httpx
+from pathlib import Path
 from fastapi.testclient import TestClient
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
+from phase1.database_setup import DatabaseManager
+from phase3.models import ExplainReport, RecommendationResponse, RestaurantRecommendation
+from phase3.pagination import InvalidCursorError
+from phase3.recommender import RecommendationEngine
 from phase6.api_server import app
 import json
 
@@ -29,8 +39,10 @@ class TestAPI(unittest.TestCase):
         # Mocking engine response
         mock_engine_res = MagicMock()
         mock_engine_res.count = 1
+        mock_engine_res.next_cursor = None
         
         mock_rest = MagicMock()
+        mock_rest.id = 1
         mock_rest.name = "API Test Rest"
         mock_rest.rating = 4.0
         mock_rest.votes = 50
@@ -39,7 +51,7 @@ class TestAPI(unittest.TestCase):
         mock_rest.address = "123 API St"
         
         mock_engine_res.recommendations = [mock_rest]
-        mock_recommender.engine.get_recommendations.return_value = mock_engine_res
+        mock_recommender.engine.aget_recommendations = AsyncMock(return_value=mock_engine_res)
         
         # Mocking AI reasoning
         mock_recommender.get_reasoned_recommendations.return_value = "AI Reasoning Summary"
@@ -50,7 +62,8 @@ class TestAPI(unittest.TestCase):
             "city": "Bangalore",
             "price_range": "budget",
             "cuisine": "Testing",
-            "min_rating": 3.0
+            "min_rating": 3.0,
+            "dish": "Chicken Biryani"
         }
         
         response = client.post("/api/recommend", json=payload)
@@ -63,6 +76,90 @@ class TestAPI(unittest.TestCase):
         self.assertEqual(data["recommendations"][0]["name"], "API Test Rest")
         self.assertEqual(data["recommendations"][0]["reasoning"], "Why you'll like it: Granular")
         self.assertIn("AI Reasoning", data["ai_reasoning_summary"])
+        self.assertEqual(mock_recommender.engine.aget_recommendations.call_args.args[0].dish, ["chicken biryani"])
+
+    @patch('phase6.api_server.LLMRecommender')
+    def test_recommend_endpoint_rejects_invalid_cursor(self, mock_recommender_class):
+        """
+        Test that a stale or malformed cursor is a client error, not a 500.
+        """
+        mock_recommender = MagicMock()
+        mock_recommender_class.return_value = mock_recommender
+        mock_recommender.engine.aget_recommendations = AsyncMock(side_effect=InvalidCursorError("Cursor is from an older database build"))
+
+        response = client.post("/api/recommend?cursor=stale", json={"city": "Bangalore", "price_range": "budget"})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("older database build", response.json()["detail"])
+        self.assertEqual(mock_recommender.engine.aget_recommendations.call_args.kwargs["cursor"], "stale")
+
+    @patch('phase6.api_server.LLMRecommender')
+    def test_recommend_endpoint_debug(self, mock_recommender_class):
+        """
+        Test that debug=1 asks the engine for its explain report and returns it.
+        """
+        mock_recommender = MagicMock()
+        mock_recommender_class.return_value = mock_recommender
+        report = ExplainReport(backend="sql", path="sql", timings_us={"sql_execute": 120.0, "total": 400.0}, candidates={"matched": 0})
+        mock_recommender.engine.aget_recommendations = AsyncMock(
+            return_value=RecommendationResponse(user_city="Btm", count=0, recommendations=[], explain=report)
+        )
+
+        data = client.post("/api/recommend?debug=1", json={"city": "Btm", "price_range": "budget"}).json()
+        self.assertTrue(mock_recommender.engine.aget_recommendations.call_args.kwargs["explain"])
+        self.assertEqual(data["debug"]["timings_us"]["sql_execute"], 120.0)
+        self.assertEqual(data["debug"]["candidates"], {"matched": 0})
+
+        data = client.post("/api/recommend", json={"city": "Btm", "price_range": "budget"}).json()
+        self.assertFalse(mock_recommender.engine.aget_recommendations.call_args.kwargs["explain"])
+        self.assertNotIn("debug", data)
+
+    @patch('phase6.api_server.get_engine')
+    def test_similar_endpoint(self, mock_get_engine):
+        """
+        Test the "more like this" endpoint and its city requirement.
+        """
+        rec = RestaurantRecommendation(
+            name="Twin Cafe", city="Hsr", address="2 Road", cuisines="Cafe", average_cost=400,
+            price_category="budget", rating=4.2, votes=120, match_score=0.93, id=7
+        )
+        mock_engine = mock_get_engine.return_value
+        mock_engine.asimilar = AsyncMock(return_value=RecommendationResponse(user_city="Hsr", count=1, recommendations=[rec]))
+
+        response = client.get("/api/restaurants/3/similar?city=Hsr&limit=4")
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["recommendations"][0]["id"], 7)
+        self.assertEqual(data["recommendations"][0]["similarity"], 0.93)
+        mock_engine.asimilar.assert_awaited_with(3, city="Hsr", limit=4)
+
+        mock_engine.asimilar = AsyncMock(side_effect=ValueError("A city is required"))
+        self.assertEqual(client.get("/api/restaurants/3/similar").status_code, 400)
+
+    @patch('phase6.api_server.get_engine')
+    def test_search_endpoint(self, mock_get_engine):
+        """
+        Test the free-text search endpoint and its filter validation.
+        """
+        rec = RestaurantRecommendation(
+            name="Sky Deck", city="Hsr", address="9 Road", cuisines="Continental", average_cost=1800,
+            price_category="premium", rating=4.5, votes=900, match_score=0.81, id=11
+        )
+        mock_engine = mock_get_engine.return_value
+        mock_engine.asemantic_search = AsyncMock(return_value=RecommendationResponse(user_city="Hsr", count=1, recommendations=[rec]))
+
+        response = client.get("/api/search?q=rooftop%20craft%20beer&city=hsr&price_range=Premium&min_rating=4&limit=3")
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["recommendations"][0]["id"], 11)
+        self.assertEqual(data["recommendations"][0]["similarity"], 0.81)
+        text, filters = mock_engine.asemantic_search.await_args.args
+        self.assertEqual(text, "rooftop craft beer")
+        self.assertEqual((filters.city, filters.price_range, filters.min_rating), ("Hsr", "premium", 4.0))
+        self.assertEqual(mock_engine.asemantic_search.await_args.kwargs, {"limit": 3})
+
+        self.assertEqual(client.get("/api/search?q=beer&price_range=cheap").status_code, 400)
+        self.assertEqual(client.get("/api/search").status_code, 422)
 
     @patch('phase6.api_server.FeedbackCollector')
     def test_feedback_endpoint_success(self, mock_collector_class):
@@ -84,5 +181,98 @@ class TestAPI(unittest.TestCase):
         self.assertEqual(response.json()["status"], "success")
         mock_collector.collect_feedback.assert_called_once()
 
+    @patch('phase6.api_server.DatabaseManager')
+    def test_stats_endpoint(self, mock_db_class):
+        """
+        Test that stats are served from the database manager.
+        """
+        mock_db_class.return_value.get_database_stats.return_value = {"total_records": 3, "cities": 2, "build_id": "b1"}
+
+        response = client.get("/api/stats")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["build_id"], "b1")
+        mock_db_class.return_value.close.assert_called_once()
+
+    @patch('phase6.api_server.get_suggest_index')
+    def test_suggest_endpoint(self, mock_get_index):
+        """
+        Test typeahead suggestions and type validation.
+        """
+        mock_get_index.return_value.suggest.return_value = [{"text": "Jayanagar", "type": "locality", "popularity": 10.0}]
+
+        response = client.get("/api/suggest", params={"q": "jay", "type": "locality,cuisine", "limit": 5})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["suggestions"][0]["text"], "Jayanagar")
+        mock_get_index.return_value.suggest.assert_called_once_with("jay", limit=5, kinds=["locality", "cuisine"])
+        self.assertEqual(client.get("/api/suggest", params={"q": "jay", "type": "planet"}).status_code, 400)
+        self.assertEqual(client.get("/api/suggest", params={"q": "biry", "type": "dish"}).status_code, 200)
+        mock_get_index.return_value.suggest.assert_called_with("biry", limit=10, kinds=["dish"])
+
+class TestAPILoad(unittest.TestCase):
+    """
+    Load test: the event loop must stay responsive while recommendation queries saturate the engine.
+    """
+
+    QUERY_SECONDS = 0.2
+    CONCURRENT_QUERIES = 16
+
+    def setUp(self):
+        # Real engine (executor + connection pool) on an empty database file,
+        # with a slow blocking query standing in for SQLite. The result cache is
+        # off, since every query is identical and must reach the executor.
+        temp_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
+        temp_db.close()
+        self.db_path = Path(temp_db.name)
+        self.engine = RecommendationEngine(db_manager=DatabaseManager(db_path=self.db_path), max_workers=2, cache_size=0)
+
+        def slow_recommend(db_manager, user_input, limit, *args):
+            time.sleep(self.QUERY_SECONDS)
+            return RecommendationResponse(user_city=user_input.city, count=0, recommendations=[])
+
+        self.engine._recommend = slow_recommend
+
+    def tearDown(self):
+        self.engine.close()
+        os.unlink(self.db_path)
+
+    @patch('phase6.api_server.FeedbackCollector')
+    @patch('phase6.api_server.LLMRecommender')
+    def test_event_loop_responsive_under_saturation(self, mock_recommender_class, mock_collector_class):
+        """Root and feedback requests are served quickly while recommendation queries are queued."""
+        mock_recommender_class.return_value.engine = self.engine
+
+        async def scenario():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+                payload = {"city": "Btm", "price_range": "budget"}
+                queries = [
+                    asyncio.create_task(ac.post("/api/recommend", json=payload))
+                    for _ in range(self.CONCURRENT_QUERIES)
+                ]
+                await asyncio.sleep(0.05)  # let the queries reach the executor
+
+                latencies = []
+                for _ in range(5):
+                    start = time.perf_counter()
+                    root = await ac.get("/")
+                    feedback = await ac.post("/api/feedback", json={"restaurant_name": "X", "rating": 1})
+                    latencies.append(time.perf_counter() - start)
+                    self.assertEqual(root.status_code, 200)
+                    self.assertEqual(feedback.status_code, 200)
+
+                responses = await asyncio.gather(*queries)
+                return latencies, responses
+
+        start = time.perf_counter()
+        latencies, responses = asyncio.run(scenario())
+        elapsed = time.perf_counter() - start
+
+        self.assertTrue(all(r.status_code == 200 for r in responses))
+        # 16 queries on 2 workers take >= 1.6s; interactive requests must not wait for them
+        self.assertGreaterEqual(elapsed, self.QUERY_SECONDS * self.CONCURRENT_QUERIES / 2)
+        self.assertLess(max(latencies), self.QUERY_SECONDS)
+
 if __name__ == "__main__":
     unittest.main()
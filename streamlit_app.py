@@ -12,6 +12,7 @@ if BASE_DIR not in sys.path:
 
 from phase2.input_validator import InputValidator
 from phase2.models import UserInput
+from phase3.relaxation import describe_relaxation
 from phase4.recommender import LLMRecommender
 from phase5.feedback_collector import FeedbackCollector
 from phase1.main import Phase1Pipeline
@@ -513,6 +514,9 @@ def main():
                     if engine_response.count == 0:
                         st.info(f"I'm sorry, but I couldn't find any restaurants in {city} matching your criteria.")
                     else:
+                        if engine_response.relaxed_constraints:
+                            st.info(describe_relaxation(engine_response.relaxed_constraints))
+                        
                         # Get AI Reasoning Summary
                         ai_summary = recommender.generate_ai_summary(user_input, engine_response.recommendations)
                         